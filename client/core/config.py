@@ -20,6 +20,9 @@ HOME_DIR = os.path.expanduser("~")
 APP_DATA_DIR = os.path.join(HOME_DIR, ".bigeye")
 DEBUG_LOG_PATH = os.path.join(APP_DATA_DIR, "debug_log.txt")
 RECOVERY_PATH = os.path.join(APP_DATA_DIR, "recovery.json")
+RESULT_CACHE_PATH = os.path.join(APP_DATA_DIR, "result_cache.db")
+TRACE_DIR = os.path.join(APP_DATA_DIR, "traces")
+CONTEXT_CACHE_PATH = os.path.join(APP_DATA_DIR, "context_caches.json")
 
 # Ensure app data dir exists
 os.makedirs(APP_DATA_DIR, exist_ok=True)
@@ -37,6 +40,9 @@ INSPECTOR_WIDTH = 300
 TOP_BAR_HEIGHT = 48
 STATUS_BAR_HEIGHT = 22
 THUMBNAIL_SIZE = 130
+THUMB_CACHE_MB = 256             # disk budget for decoded gallery thumbnails (LRU)
+GALLERY_THUMB_MEMORY = 1000      # decoded thumbnails kept in RAM (LRU; the rest reload from disk)
+GALLERY_PREFETCH_ROWS = 2        # grid rows loaded above / below the visible ones
 
 # Credit refresh interval (ms)
 CREDIT_REFRESH_INTERVAL = 5 * 60 * 1000  # 5 minutes
@@ -134,6 +140,78 @@ TIMEOUT_VIDEO = 600
 TIMEOUT_PHOTO = 60
 MAX_RETRIES = 3
 
+# Gemini REST endpoint (BIGEYE_GEMINI_URL points every engine at e.g. a local fake server)
+GEMINI_API_DEFAULT = "https://generativelanguage.googleapis.com"
+GEMINI_API_BASE = os.environ.get("BIGEYE_GEMINI_URL", GEMINI_API_DEFAULT)
+USE_ASYNC_ENGINE = False         # one event-loop thread instead of a thread per in-flight file
+USE_RESPONSE_SCHEMA = True       # send the metadata JSON schema (responseSchema) with every request
+
+# Photo proxy (downscaled JPEG sent to Gemini instead of the original file)
+IMAGE_PROXY_MAX_EDGE = 1536      # px, long edge
+IMAGE_PROXY_QUALITY = 85         # JPEG quality
+IMAGE_PROXY_CACHE_MB = 512       # disk budget for image_proxy_cache
+
+# iStock keyword dictionary: "local" = matched on the client (prompt stays small),
+# "prompt" = whole dictionary embedded in every request (legacy)
+ISTOCK_DICTIONARY_MODE = "local"
+DICTIONARY_LOCAL_NOTE = (
+    "(no list here — write precise, common English stock keywords; "
+    "they are mapped to the controlled vocabulary automatically)"
+)
+
+# Keyword post-processing memo (clean / stem / dictionary match results, per job)
+KEYWORD_MEMO_SIZE = 50_000       # entries per table before it is emptied
+DEFER_KEYWORD_PROCESSING = False  # True = raw AI keywords kept per file, processed in one batch at export
+
+# Multi-image packing (opt-in via settings["photo_batch_size"]): N photos per generate_content
+PHOTO_BATCH_SIZE = 0             # 0/1 = one photo per request
+PHOTO_BATCH_MAX = 10             # hard cap (response size / per-image attention)
+PHOTO_BATCH_WAIT_SEC = 1.5       # flush a partial batch after this long
+
+# Video transcode stage (proxies prepared ahead of the upload stage)
+VIDEO_PREFETCH_AHEAD = 6         # max proxies in progress or ready-but-unclaimed
+VIDEO_TRANSCODE_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+
+# Video upload (resumable, chunked — resumes from the last acknowledged byte)
+VIDEO_UPLOAD_CONCURRENCY = 4     # parallel uploads per job (shared by all video worker processes)
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # must be a multiple of 256 KiB
+UPLOAD_CHUNK_RETRIES = 5         # per chunk, after SSL / connection / 5xx errors
+
+# Uploaded-file PROCESSING → ACTIVE poller (one thread for all pending videos)
+FILE_POLL_INTERVALS = (1, 1, 2, 3, 5, 8)  # seconds between polls of one file, then stays at the last
+FILE_POLL_BATCH_MIN = 4          # this many files due at once → one list_files() instead of N get_file()
+
+# Per-file stage spans (read / proxy / upload / wait / generate / parse / keywords ...)
+STAGE_TRACE_ENABLED = True       # one JSONL trace per job in TRACE_DIR + percentiles in the summary
+STAGE_TRACE_KEEP = 20            # newest job traces kept on disk
+
+# Gemini context caches (system prompt), reused across jobs with the same prompt + model
+CONTEXT_CACHE_REUSE = True       # False = one cache per job, deleted when the job ends
+CONTEXT_CACHE_TTL_MIN = 60       # TTL of a new cache / extension of a reused one
+CONTEXT_CACHE_MIN_LEFT_MIN = 20  # reused cache with less TTL left than this gets extended
+CONTEXT_CACHE_MAX = 4            # registered caches kept alive; least recently used evicted
+
+# Local result cache (skip Gemini for files already processed with identical settings)
+RESULT_CACHE_MAX_AGE_DAYS = 30
+
+# Adaptive concurrency (AIMD): server values are the starting window,
+# +1 slot after a full window of clean results, ×0.5 on RATE_LIMIT / TIMEOUT
+AIMD_MAX_IMAGE = 16              # ceiling for parallel photo workers
+AIMD_MAX_VIDEO = 4               # ceiling for parallel video workers
+AIMD_MAX_API = 16                # ceiling for parallel generate_content calls
+AIMD_DECREASE_FACTOR = 0.5
+AIMD_COOLDOWN_SEC = 5.0          # ignore further congestion right after a cut
+
+# Proactive Gemini rate limits per model (paid tier 1): requests/min, input tokens/min
+GEMINI_RATE_LIMITS = {
+    "gemini-3-pro-preview": {"rpm": 50, "tpm": 1_000_000},
+    "gemini-2.5-pro": {"rpm": 150, "tpm": 2_000_000},
+    "gemini-2.5-flash": {"rpm": 1000, "tpm": 1_000_000},
+    "gemini-2.5-flash-lite": {"rpm": 4000, "tpm": 4_000_000},
+}
+GEMINI_RATE_LIMIT_DEFAULT = {"rpm": 60, "tpm": 1_000_000}
+RATE_LIMIT_BURST_SEC = 10        # bucket size = this many seconds of budget
+
 # Credit rates per platform — populated from server on startup
 CREDIT_RATES = {"iStock": {"photo": 3, "video": 3}, "Adobe": {"photo": 2, "video": 2}, "Shutterstock": {"photo": 2, "video": 2}}
 
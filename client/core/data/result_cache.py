@@ -0,0 +1,102 @@
+"""
+BigEye Pro — Result Cache
+Persistent store of raw Gemini results keyed by file content + job settings.
+Re-running a folder with unchanged files and settings never re-bills the API.
+"""
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+
+from core.config import RESULT_CACHE_PATH, RESULT_CACHE_MAX_AGE_DAYS
+
+logger = logging.getLogger("bigeye")
+
+
+class ResultCache:
+    """SQLite-backed result store, safe to share across worker threads."""
+
+    def __init__(self, path: str = ""):
+        self._path = path or RESULT_CACHE_PATH
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " result TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(content_hash: str, **parts) -> str:
+        """
+        Build a cache key from the file content hash plus every setting that
+        changes the AI output (model, platform, style, prompt hash, sliders).
+        """
+        payload = json.dumps({"content": content_hash, **parts}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        """Return a copy of the cached result, or None on miss."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT result FROM results WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f"Result cache read failed: {e}")
+            return None
+        if not row:
+            return None
+        try:
+            return json.loads(row[0])
+        except json.JSONDecodeError:
+            return None
+
+    def put(self, key: str, result: dict):
+        """Store a raw (pre post-processing) result."""
+        try:
+            data = json.dumps(result, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Result not cacheable: {e}")
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, result, created_at) VALUES (?, ?, ?)",
+                    (key, data, time.time()),
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"Result cache write failed: {e}")
+
+    def prune(self, max_age_days: int = RESULT_CACHE_MAX_AGE_DAYS) -> int:
+        """Delete entries older than max_age_days. Returns number removed."""
+        cutoff = time.time() - max_age_days * 86400
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM results WHERE created_at < ?", (cutoff,))
+            self._conn.commit()
+        if cur.rowcount:
+            logger.info(f"Result cache pruned: {cur.rowcount} entries")
+        return cur.rowcount
+
+    def clear(self):
+        """Delete all cached results."""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
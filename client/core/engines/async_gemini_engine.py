@@ -0,0 +1,340 @@
+"""
+BigEye Pro — Async Gemini Engine
+asyncio counterpart of GeminiEngine: talks to the Gemini REST API with httpx.AsyncClient
+on a single event-loop thread. Requests, upload waits, PROCESSING waits and retry
+backoffs are all awaited, so hundreds of files can be in flight without a thread each.
+Same process_photo / process_video contract (blocking wrappers), plus awaitable
+aprocess_photo / aprocess_video and submit() for callers that schedule coroutines.
+"""
+import base64
+import asyncio
+import logging
+import mimetypes
+import os
+import threading
+import concurrent.futures
+from contextlib import asynccontextmanager
+
+import httpx
+
+from core.config import (
+    GEMINI_API_BASE, MAX_RETRIES, TIMEOUT_PHOTO, TIMEOUT_VIDEO, AIMD_MAX_API, USE_RESPONSE_SCHEMA,
+)
+from core.engines.gemini_engine import (
+    GeminiEngine, GeminiError, GeminiErrorType, classify_error,
+    VIDEO_ACTIVE_WAIT, RESPONSE_SCHEMA,
+)
+from core.engines.file_poller import FileStatePoller
+from core.engines.rate_limiter import RateLimiter, estimate_tokens
+from core.engines.upload_manager import ResumableUpload, raise_for_status
+from core.managers.stage_trace import span
+
+logger = logging.getLogger("bigeye")
+
+
+class AsyncGeminiEngine(GeminiEngine):
+    """Gemini engine running every call on one asyncio loop thread."""
+
+    def __init__(self, base_url: str = GEMINI_API_BASE, transport=None):
+        super().__init__()
+        self._base_url = base_url.rstrip("/")
+        self._transport = transport    # httpx transport override (tests / local fake server)
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
+        self._client = None            # httpx.AsyncClient, created on the loop
+        self._slot_cond = None         # asyncio.Condition, created on the loop
+        self._in_flight = 0
+
+    # ── Event loop ──
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the engine's event-loop thread on first use."""
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="gemini-async", daemon=True,
+                )
+                self._loop_thread.start()
+            return self._loop
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Schedule a coroutine on the engine loop (thread-safe)."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def close(self):
+        """Cancel in-flight work, close the HTTP client and stop the loop thread."""
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        if loop is None or loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=5)
+        except Exception as e:
+            logger.debug(f"Async engine shutdown failed: {e}")
+        self._client = None
+        self._slot_cond = None
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+        loop.close()
+
+    async def _shutdown(self):
+        current = asyncio.current_task()
+        tasks = [t for t in asyncio.all_tasks() if t is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+
+    # ── Sync contract (same as GeminiEngine) ──
+
+    def process_photo(self, filepath: str, prompt: str,
+                      system_prompt: str = "") -> dict:
+        return self.submit(self.aprocess_photo(filepath, prompt, system_prompt)).result()
+
+    def process_video(self, filepath: str, prompt: str,
+                      system_prompt: str = "") -> dict:
+        return self.submit(self.aprocess_video(filepath, prompt, system_prompt)).result()
+
+    # ── Async processing ──
+
+    async def aprocess_photo(self, filepath: str, prompt: str,
+                             system_prompt: str = "") -> dict:
+        """Photo → inline base64 part + prompt → parsed JSON dict."""
+        with span("file_read"):
+            image = await asyncio.to_thread(self._load_image, filepath)
+        parts = [
+            {"inline_data": {
+                "mime_type": image["mime_type"],
+                "data": base64.b64encode(image["data"]).decode("ascii"),
+            }},
+            {"text": prompt},
+        ]
+        estimated = estimate_tokens([image, prompt], system_prompt or self._system_prompt)
+        return await self._agenerate_with_retry(parts, estimated, system_prompt, TIMEOUT_PHOTO)
+
+    async def aprocess_video(self, filepath: str, prompt: str,
+                             system_prompt: str = "") -> dict:
+        """Upload video → wait ACTIVE → generate → delete remote file."""
+        video = await self._aupload_video(filepath)
+        try:
+            parts = [
+                {"file_data": {
+                    "mime_type": video.get("mimeType", "video/mp4"),
+                    "file_uri": video.get("uri", ""),
+                }},
+                {"text": prompt},
+            ]
+            estimated = estimate_tokens([video, prompt], system_prompt or self._system_prompt)
+            return await self._agenerate_with_retry(parts, estimated, system_prompt, TIMEOUT_VIDEO)
+        finally:
+            await self._adelete_file(video.get("name", ""))
+
+    # ── Internal helpers ──
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Lazily create the shared AsyncClient (must run on the loop)."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self._base_url,
+                timeout=httpx.Timeout(TIMEOUT_VIDEO, connect=30),
+                limits=httpx.Limits(max_connections=AIMD_MAX_API * 2),
+                transport=self._transport,
+            )
+        return self._client
+
+    def _auth_headers(self) -> dict:
+        return {"x-goog-api-key": self._api_key}
+
+    @asynccontextmanager
+    async def _slot(self):
+        """Async gate sized by the same AIMD window as GeminiEngine._api_sem."""
+        if self._slot_cond is None:
+            self._slot_cond = asyncio.Condition()
+        cond = self._slot_cond
+        async with cond:
+            await cond.wait_for(lambda: self._in_flight < self._api_sem.window)
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            async with cond:
+                self._in_flight -= 1
+                cond.notify_all()
+
+    async def _arequest(self, method: str, url: str, timeout: float, **kwargs) -> httpx.Response:
+        """One HTTP call; transport failures become classify_error()-friendly exceptions."""
+        headers = {**self._auth_headers(), **kwargs.pop("headers", {})}
+        try:
+            resp = await self._get_client().request(
+                method, url, headers=headers, timeout=timeout, **kwargs,
+            )
+        except httpx.TimeoutException as e:
+            raise TimeoutError(f"Request timed out ({type(e).__name__})") from e
+        except httpx.TransportError as e:
+            raise ConnectionError(f"HTTP error: {type(e).__name__}: {e}") from e
+        raise_for_status(resp)
+        return resp
+
+    def _request_body(self, parts: list) -> dict:
+        body = {
+            "contents": [{"role": "user", "parts": parts}],
+            "generationConfig": {"responseMimeType": "application/json", "temperature": 0.3},
+        }
+        if USE_RESPONSE_SCHEMA:
+            body["generationConfig"]["responseSchema"] = RESPONSE_SCHEMA
+        if self._cache_name:
+            body["cachedContent"] = self._cache_name
+        elif self._system_prompt:
+            body["systemInstruction"] = {"parts": [{"text": self._system_prompt}]}
+        return body
+
+    async def _agenerate_with_retry(self, parts: list, estimated: int,
+                                    system_prompt: str = "", timeout: int = 60) -> dict:
+        """generateContent with the same retry/classification rules as the sync engine."""
+        if system_prompt and system_prompt != self._system_prompt:
+            self._system_prompt = system_prompt
+        body = self._request_body(parts)
+        url = f"/v1beta/models/{self._model_name}:generateContent"
+        limiter = RateLimiter.for_model(self._model_name)
+        last_error = None
+
+        for attempt in range(1, MAX_RETRIES + 1):
+            try:
+                with span("rate_limit_wait"):
+                    await limiter.acquire_async(estimated)
+                async with self._slot():
+                    with span("generate", attempt=attempt):
+                        resp = await self._arequest("POST", url, timeout, json=body)
+                self._api_sem.on_success()
+                with span("parse"):
+                    return self._parse_generate_response(resp.json(), limiter, estimated)
+
+            except GeminiError:
+                raise  # Already classified, don't wrap again
+            except Exception as e:
+                last_error = classify_error(e)
+                self._api_sem.record(last_error.error_type.value)
+                logger.warning(
+                    f"Gemini attempt {attempt}/{MAX_RETRIES}: "
+                    f"[{last_error.error_type.value}] {last_error}"
+                )
+                if last_error.error_type == GeminiErrorType.RATE_LIMIT:
+                    limiter.penalize()
+                if not last_error.retryable or attempt >= MAX_RETRIES:
+                    raise last_error
+
+                # Exponential backoff: 2s, 4s, 8s... (awaited — the loop keeps serving others)
+                backoff = 2 ** attempt
+                logger.info(f"Retrying in {backoff}s...")
+                with span("backoff", attempt=attempt, reason=last_error.error_type.value):
+                    await asyncio.sleep(backoff)
+
+        raise last_error  # Should not reach here, but safety net
+
+    def _parse_generate_response(self, data: dict, limiter: RateLimiter,
+                                 estimated: int) -> dict:
+        candidates = data.get("candidates") or []
+        if not candidates:
+            raise GeminiError(
+                "Response blocked by safety filters",
+                GeminiErrorType.SAFETY, retryable=False,
+            )
+        parts = candidates[0].get("content", {}).get("parts", [])
+        text = "".join(p.get("text", "") for p in parts).strip()
+        if not text and candidates[0].get("finishReason") == "SAFETY":
+            raise GeminiError(
+                "Response blocked by safety filters",
+                GeminiErrorType.SAFETY, retryable=False,
+            )
+        result = self._parse_json_response(text)
+
+        usage = data.get("usageMetadata")
+        if usage and isinstance(result, dict):
+            result["_token_input"] = usage.get("promptTokenCount", 0)
+            result["_token_output"] = usage.get("candidatesTokenCount", 0)
+            result["_token_cached"] = usage.get("cachedContentTokenCount", 0)
+            limiter.reconcile(estimated, result["_token_input"])
+        return result
+
+    async def _aupload_video(self, filepath: str) -> dict:
+        """Chunked resumable upload (same protocol as UploadManager), then await ACTIVE."""
+        filename = os.path.basename(filepath)
+        logger.info(f"Uploading video: {filename}")
+        mime_type = mimetypes.guess_type(filepath)[0] or "video/mp4"
+        session = ResumableUpload(os.path.getsize(filepath), mime_type, filename)
+        try:
+            with span("upload"):
+                video = await self._aupload(session, filepath)
+        except GeminiError:
+            raise
+        except Exception as e:
+            raise classify_error(e) from e
+        finally:
+            session.close()
+
+        # Wait for video to be processed (ACTIVE state) on the shared poller's schedule,
+        # batched with every other pending video, then fetch the REST resource once
+        with span("processing_wait"):
+            if video.get("state") == "PROCESSING":
+                await FileStatePoller.shared().wait_async(video["name"], VIDEO_ACTIVE_WAIT)
+                resp = await self._arequest("GET", f"/v1beta/{video['name']}", 30)
+                video = resp.json()
+
+        state = video.get("state", "ACTIVE")
+        if state == "FAILED":
+            await self._adelete_file(video.get("name", ""))
+            raise GeminiError(
+                "Gemini ไม่สามารถประมวลผลวิดีโอนี้ได้ กรุณาลองใหม่",
+                GeminiErrorType.UNKNOWN, retryable=False,
+            )
+        if state != "ACTIVE":
+            await self._adelete_file(video.get("name", ""))
+            raise GeminiError(
+                f"วิดีโอไม่พร้อมหลังรอ {VIDEO_ACTIVE_WAIT} วินาที กรุณาลองใหม่",
+                GeminiErrorType.TIMEOUT, retryable=True,
+            )
+
+        logger.info(f"Video ready: {video.get('name', '')}")
+        return video
+
+    async def _aupload(self, session: ResumableUpload, filepath: str) -> dict:
+        """Carry out the session's steps on the loop; chunks are read from disk one at a time."""
+        step = session.advance()
+        while step[0] != "done":
+            result = error = None
+            if step[0] == "post":
+                kwargs = dict(step[1])
+                kwargs["headers"] = {**self._auth_headers(), **kwargs["headers"]}
+                try:
+                    result = await self._get_client().post(**kwargs)
+                except httpx.TransportError as e:
+                    error = e
+            elif step[0] == "read":
+                result = await asyncio.to_thread(self._read_chunk, filepath, step[1], step[2])
+            elif step[0] == "sleep":
+                with span("backoff", reason="upload"):
+                    await asyncio.sleep(step[1])
+            # "reconnect": nothing to do — the pool already dropped the failed connection,
+            # and the AsyncClient is shared by every task on the loop
+            step = session.advance(result, error)
+        return step[1]
+
+    async def _adelete_file(self, name: str):
+        if not name:
+            return
+        try:
+            with span("delete_file"):
+                await self._arequest("DELETE", f"/v1beta/{name}", 30)
+        except Exception:
+            pass  # ข้ามไป Gemini ลบเองใน 48 ชม.
+
+    @staticmethod
+    def _read_chunk(filepath: str, offset: int, size: int) -> bytes:
+        with open(filepath, "rb") as f:
+            f.seek(offset)
+            return f.read(size)
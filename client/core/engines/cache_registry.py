@@ -0,0 +1,129 @@
+"""
+BigEye Pro — Context Cache Registry
+Local record of the Gemini context caches this client created, keyed by a hash of
+(model, system prompt), so the next job with the same prompt reuses the live cache
+instead of paying to create an identical one.
+
+Entries are {key: {"name", "model", "expires", "used"}} (epoch seconds) in a small JSON
+file. The registry never talks to the API: GeminiEngine looks caches up here, extends
+or creates them remotely, and deletes the names the registry hands back as evicted.
+Expired and evicted entries stay on file until pop_expired() hands them to the
+startup cleanup — the only caches that cleanup may delete.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+from core.config import CONTEXT_CACHE_PATH, CONTEXT_CACHE_MAX
+
+logger = logging.getLogger("bigeye")
+
+# An entry this close to its expiry is treated as already gone
+EXPIRY_MARGIN_SEC = 60
+
+
+def cache_key(model: str, system_prompt: str) -> str:
+    """Short stable key for a prompt on a model (also used in the cache display name)."""
+    digest = hashlib.sha256(f"{model}\0{system_prompt}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class ContextCacheRegistry:
+    """Persisted name + expiry of reusable context caches. Safe to share between threads."""
+
+    _lock = threading.Lock()
+
+    def __init__(self, path: str = "", max_entries: int = CONTEXT_CACHE_MAX):
+        self.path = path or CONTEXT_CACHE_PATH
+        self.max_entries = max_entries
+
+    def lookup(self, key: str) -> dict | None:
+        """Live entry for key (None if unknown or about to expire)."""
+        with self._lock:
+            entry = self._load().get(key)
+        if entry and entry.get("expires", 0) > time.time() + EXPIRY_MARGIN_SEC:
+            return entry
+        return None
+
+    def put(self, key: str, name: str, model: str, expires: float) -> list:
+        """
+        Register a cache created now. Returns the names of caches evicted to stay within
+        max_entries (least recently used first) — the caller deletes those remotely.
+        """
+        with self._lock:
+            entries = self._load()
+            entries[key] = {"name": name, "model": model, "expires": expires, "used": time.time()}
+            live = self._live(entries)
+            by_use = sorted(live, key=lambda k: live[k]["used"])
+            evicted = []
+            for k in by_use[:max(0, len(live) - self.max_entries)]:
+                entries[k]["expires"] = 0       # kept as expired until pop_expired()
+                evicted.append(entries[k]["name"])
+            self._save(entries)
+        return evicted
+
+    def touch(self, key: str, expires: float = 0):
+        """Mark an entry used by this job (and record its new expiry after a TTL update)."""
+        with self._lock:
+            entries = self._load()
+            if key in entries:
+                entries[key]["used"] = time.time()
+                if expires:
+                    entries[key]["expires"] = expires
+                self._save(entries)
+
+    def remove(self, name: str):
+        """Forget a cache by name (deleted, or found missing remotely)."""
+        with self._lock:
+            entries = self._load()
+            kept = {k: e for k, e in entries.items() if e.get("name") != name}
+            if len(kept) != len(entries):
+                self._save(kept)
+
+    def live_names(self) -> set:
+        """Names of registered caches that have not expired."""
+        with self._lock:
+            live = self._live(self._load())
+        return {e["name"] for e in live.values()}
+
+    def pop_expired(self) -> set:
+        """Forget expired and evicted entries; returns their names (safe to delete remotely)."""
+        with self._lock:
+            entries = self._load()
+            live = self._live(entries)
+            if len(live) != len(entries):
+                self._save(live)
+        return {e["name"] for k, e in entries.items() if k not in live}
+
+    # ── Storage ──
+
+    @staticmethod
+    def _live(entries: dict) -> dict:
+        now = time.time()
+        return {k: e for k, e in entries.items() if e.get("expires", 0) > now}
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.debug(f"Context cache registry unreadable: {e}")
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {k: e for k, e in data.items() if isinstance(e, dict) and e.get("name")}
+
+    def _save(self, entries: dict):
+        tmp = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.debug(f"Context cache registry not saved: {e}")
@@ -0,0 +1,248 @@
+"""
+BigEye Pro — Uploaded File State Poller
+One background thread tracks every uploaded video still in PROCESSING and polls them on
+an adaptive schedule (fast at first, then backing off). Waiting callers block on an event
+instead of each spinning in its own sleep + get_file loop.
+Video worker processes share one poller too: PollerManager runs it in a helper process
+and each worker waits through a RemotePoller. AsyncGeminiEngine awaits the same schedule
+with wait_async().
+"""
+import time
+import asyncio
+import logging
+import threading
+from multiprocessing.managers import BaseManager
+from typing import Callable, Optional
+
+import google.generativeai as genai
+
+from core.config import FILE_POLL_INTERVALS, FILE_POLL_BATCH_MIN
+
+logger = logging.getLogger("bigeye")
+
+
+class _Pending:
+    """One file being watched (shared by every caller waiting on the same name)."""
+
+    def __init__(self, name: str, first_poll: float):
+        self.name = name
+        self.file = None             # latest genai File seen
+        self.event = threading.Event()
+        self.next_poll = first_poll
+        self.polls = 0
+        self.waiters = 0
+        self.callbacks = []          # called (poll thread, under the lock) once it is done
+
+    def finish(self):
+        self.event.set()
+        for callback in self.callbacks:
+            callback()
+
+
+class FileStatePoller:
+    """
+    Shared PROCESSING poller. Use FileStatePoller.shared() — one per process.
+    wait(name, timeout) returns the latest File once it is no longer PROCESSING
+    (or whatever was last seen when the timeout expires); wait_async() is its awaitable twin.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, get_fn: Optional[Callable] = None, list_fn: Optional[Callable] = None,
+                 intervals: tuple = FILE_POLL_INTERVALS, batch_min: int = FILE_POLL_BATCH_MIN):
+        self._get_fn = get_fn or (lambda name: genai.get_file(name))
+        self._list_fn = list_fn or (lambda: genai.list_files())
+        self._intervals = tuple(intervals) or (1,)
+        self._batch_min = batch_min
+        self._pending = {}           # name → _Pending
+        self._cond = threading.Condition()
+        self._thread = None
+        # Stats for the debug log
+        self.get_calls = 0
+        self.list_calls = 0
+
+    @classmethod
+    def shared(cls) -> "FileStatePoller":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def reset_shared(cls):
+        """Forget the shared poller (tests / API key change)."""
+        with cls._instance_lock:
+            cls._instance = None
+
+    @classmethod
+    def install(cls, poller):
+        """Make `poller` (e.g. a RemotePoller) what shared() returns in this process."""
+        with cls._instance_lock:
+            cls._instance = poller
+
+    def wait(self, name: str, timeout: float):
+        """Block until `name` leaves PROCESSING or `timeout` passes; returns the latest File."""
+        with self._cond:
+            entry = self._watch(name)
+        entry.event.wait(timeout)
+        self._unwatch(entry)
+        if entry.file is None:
+            entry.file = self._get_fn(name)  # never polled successfully — ask once directly
+        return entry.file
+
+    async def wait_async(self, name: str, timeout: float):
+        """wait() for a coroutine: the poll thread wakes the loop, which is never blocked."""
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def wake():
+            try:
+                loop.call_soon_threadsafe(lambda: done.done() or done.set_result(None))
+            except RuntimeError:
+                pass  # loop already closed — nobody is waiting any more
+
+        with self._cond:
+            entry = self._watch(name)
+            if entry.event.is_set():
+                done.set_result(None)
+            else:
+                entry.callbacks.append(wake)
+        try:
+            await asyncio.wait_for(done, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                if wake in entry.callbacks:
+                    entry.callbacks.remove(wake)
+            self._unwatch(entry)
+        if entry.file is None:
+            entry.file = await asyncio.to_thread(self._get_fn, name)
+        return entry.file
+
+    def wait_state(self, name: str, timeout: float) -> str:
+        """wait() for a caller in another process: only the state name crosses over."""
+        video_file = self.wait(name, timeout)
+        return getattr(getattr(video_file, "state", None), "name", "")
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    # ── Internal helpers ──
+
+    def _watch(self, name: str) -> _Pending:
+        """Register one more waiter for `name` (caller holds _cond)."""
+        entry = self._pending.get(name)
+        if entry is None:
+            entry = _Pending(name, time.monotonic() + self._intervals[0])
+            self._pending[name] = entry
+        entry.waiters += 1
+        self._ensure_thread()
+        self._cond.notify_all()
+        return entry
+
+    def _unwatch(self, entry: _Pending):
+        with self._cond:
+            entry.waiters -= 1
+            if entry.waiters <= 0 and self._pending.get(entry.name) is entry:
+                del self._pending[entry.name]  # timed out — stop polling it
+
+    def _ensure_thread(self):
+        """Start the poll thread if it is not running (caller holds _cond)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="file-poller", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._pending:
+                    self._thread = None
+                    return
+                now = time.monotonic()
+                due = [e for e in self._pending.values() if e.next_poll <= now]
+                if not due:
+                    next_poll = min(e.next_poll for e in self._pending.values())
+                    self._cond.wait(max(0.0, next_poll - now))
+                    continue
+
+            files = self._fetch([e.name for e in due])
+
+            with self._cond:
+                now = time.monotonic()
+                for entry in due:
+                    video_file = files.get(entry.name)
+                    if video_file is not None:
+                        entry.file = video_file
+                        if video_file.state.name != "PROCESSING":
+                            entry.finish()
+                            if self._pending.get(entry.name) is entry:
+                                del self._pending[entry.name]
+                            continue
+                    entry.polls += 1
+                    step = self._intervals[min(entry.polls, len(self._intervals) - 1)]
+                    entry.next_poll = now + step
+
+    def _fetch(self, names: list) -> dict:
+        """Latest File for each name — one list_files() pass when many are due."""
+        found = {}
+        if len(names) >= self._batch_min:
+            wanted = set(names)
+            try:
+                self.list_calls += 1
+                for video_file in self._list_fn():
+                    if video_file.name in wanted:
+                        found[video_file.name] = video_file
+                        if len(found) == len(wanted):
+                            break
+            except Exception as e:
+                logger.debug(f"File state list failed: {e}")
+        for name in names:
+            if name in found:
+                continue
+            try:
+                self.get_calls += 1
+                found[name] = self._get_fn(name)
+            except Exception as e:
+                logger.debug(f"File state poll failed {name}: {e}")
+        return found
+
+
+# ── Cross-process sharing (video worker processes) ──
+
+class PollerManager(BaseManager):
+    """Helper process hosting the FileStatePoller every video worker process waits on."""
+
+
+def _serve_poller() -> FileStatePoller:
+    return FileStatePoller.shared()
+
+
+def init_poller_process(api_key: str):
+    """PollerManager.start() initializer: configure genai in the helper process."""
+    from core.engines.gemini_engine import _configure_genai
+    _configure_genai(api_key)
+
+
+PollerManager.register("poller", callable=_serve_poller, exposed=("wait_state",))
+
+
+class RemotePoller:
+    """
+    FileStatePoller.wait() for a worker process: blocks in the PollerManager process
+    (where all pending videos are polled together), then fetches the File once here.
+    """
+
+    def __init__(self, proxy, get_fn: Optional[Callable] = None):
+        self._proxy = proxy
+        self._get_fn = get_fn or (lambda name: genai.get_file(name))
+
+    def wait(self, name: str, timeout: float):
+        self._proxy.wait_state(name, timeout)
+        return self._get_fn(name)
+
+    async def wait_async(self, name: str, timeout: float):
+        return await asyncio.to_thread(self.wait, name, timeout)
@@ -15,10 +15,53 @@ from typing import Optional
 import google.generativeai as genai
 from google.generativeai import caching as genai_caching
 
-from core.config import MAX_RETRIES, TIMEOUT_PHOTO, TIMEOUT_VIDEO
+from core.config import (
+    MAX_RETRIES, TIMEOUT_PHOTO, TIMEOUT_VIDEO, AIMD_MAX_API, GEMINI_API_BASE, GEMINI_API_DEFAULT,
+    CONTEXT_CACHE_REUSE, CONTEXT_CACHE_TTL_MIN, CONTEXT_CACHE_MIN_LEFT_MIN, USE_RESPONSE_SCHEMA,
+)
+from core.managers.adaptive_concurrency import AdaptiveConcurrency
+from core.engines.rate_limiter import RateLimiter, estimate_tokens
+from core.engines.upload_manager import UploadManager
+from core.engines.file_poller import FileStatePoller
+from core.engines.cache_registry import ContextCacheRegistry, cache_key
+from core.engines.json_repair import repair_json
+from core.managers.stage_trace import span
 
 logger = logging.getLogger("bigeye")
 
+VIDEO_ACTIVE_WAIT = 120      # give up waiting for ACTIVE after this many seconds
+
+# Appended to the prompt when several photos share one request
+BATCH_INSTRUCTION = (
+    "\n\nYou are given {count} images, each preceded by its label \"Image N\". "
+    "Apply the instructions above to every image independently. "
+    "Respond with a JSON array of exactly {count} objects in image order; each object has "
+    "the same keys as the single-image response plus \"image\": its number N."
+)
+
+# Structured output: Gemini only emits JSON matching these (photo / video metadata)
+RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "title": {"type": "STRING"},
+        "description": {"type": "STRING"},
+        "keywords": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "category": {"type": "STRING"},
+        "created_date": {"type": "STRING"},             # iStock CSV columns
+        "poster_timecode": {"type": "STRING"},
+        "shot_speed": {"type": "STRING"},
+    },
+    "required": ["title", "description", "keywords"],
+}
+BATCH_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {"image": {"type": "INTEGER"}, **RESPONSE_SCHEMA["properties"]},
+        "required": ["image", *RESPONSE_SCHEMA["required"]],
+    },
+}
+
 
 # ═══════════════════════════════════════
 # Error Classification
@@ -83,18 +126,21 @@ class GeminiEngine:
         self._model = None
         self._cache = None
         self._cache_name = ""
+        self._cache_registry = ContextCacheRegistry()  # caches kept alive across jobs
         self._system_prompt = ""                 # Stored for inline system_instruction
         self._model_lock = threading.Lock()           # Protect lazy model creation
-        self._api_sem = threading.Semaphore(6)          # Allow parallel generates
-        self._upload_lock = threading.Lock()            # Serialize video uploads (SSL corruption fix)
+        self._api_sem = AdaptiveConcurrency(6, maximum=AIMD_MAX_API, name="api")  # Parallel generates (AIMD)
+        self._uploader = None                           # UploadManager (concurrent, resumable)
+        self._upload_slots = None                       # upload cap shared across processes
 
     # ── Configuration ──
 
     def set_api_key(self, key: str):
         """Set the Gemini API key and configure the client."""
         self._api_key = key
-        genai.configure(api_key=key, transport="rest")
+        _configure_genai(key)
         self._model = None  # Reset model when key changes
+        self._uploader = None
 
     def set_model(self, model_name: str):
         """Set the model name (e.g. gemini-2.5-pro)."""
@@ -107,6 +153,24 @@ class GeminiEngine:
             self._system_prompt = system_prompt
             self._model = None  # Rebuild model with new system_instruction
 
+    def set_upload_slots(self, slots):
+        """Share an upload semaphore with other engines (e.g. every video worker process)."""
+        self._upload_slots = slots
+        self._uploader = None
+
+    def set_rate_limits(self, rpm: int, tpm: int):
+        """Override the RPM/TPM budget of the current model (shared by all engines)."""
+        RateLimiter.configure(self._model_name, rpm, tpm)
+
+    def set_concurrency_listener(self, callback):
+        """callback(window) whenever the adaptive generate_content window changes."""
+        self._api_sem.set_listener(callback)
+
+    @property
+    def api_concurrency(self) -> int:
+        """Current number of generate_content calls allowed in parallel."""
+        return self._api_sem.window
+
     def _get_model(self) -> genai.GenerativeModel:
         """Get or create the GenerativeModel instance (thread-safe)."""
         if self._model is None:
@@ -143,28 +207,76 @@ class GeminiEngine:
     # ── Context Caching ──
 
     def create_cache(self, system_prompt: str, display_name: str = "bigeye-prompt",
-                     ttl_minutes: int = 60) -> str:
+                     ttl_minutes: int = CONTEXT_CACHE_TTL_MIN) -> str:
         """
-        Create a context cache with the system prompt.
+        Create a context cache with the system prompt — or reuse the live one a previous
+        job registered for the same prompt + model (TTL extended if it runs low).
         Returns the cache name/ID.
         """
+        key = cache_key(self._model_name, system_prompt)
+        if CONTEXT_CACHE_REUSE:
+            cache = self._reuse_cache(key, ttl_minutes)
+            if cache is not None:
+                self._cache = cache
+                self._cache_name = cache.name
+                self._model = None
+                return self._cache_name
         try:
             self._cache = genai_caching.CachedContent.create(
                 model=self._model_name,
-                display_name=display_name,
+                display_name=f"{display_name}-{key}",
                 system_instruction=system_prompt,
                 ttl=timedelta(minutes=ttl_minutes),
             )
             self._cache_name = self._cache.name
             self._model = None  # Reset to pick up cached content
             logger.info(f"Context cache created: {self._cache_name}")
-            return self._cache_name
         except Exception as e:
             logger.warning(f"Failed to create context cache: {e}")
             # Fallback: use system instruction without caching
             self._cache = None
             self._cache_name = ""
             return ""
+        if CONTEXT_CACHE_REUSE:
+            evicted = self._cache_registry.put(
+                key, self._cache_name, self._model_name, time.time() + ttl_minutes * 60,
+            )
+            for name in evicted:
+                self._delete_remote_cache(name)
+        return self._cache_name
+
+    def _reuse_cache(self, key: str, ttl_minutes: int):
+        """Registered cache for key if it still exists remotely (None otherwise)."""
+        entry = self._cache_registry.lookup(key)
+        if entry is None:
+            return None
+        try:
+            cache = genai_caching.CachedContent.get(entry["name"])
+            if entry["expires"] - time.time() < CONTEXT_CACHE_MIN_LEFT_MIN * 60:
+                cache.update(ttl=timedelta(minutes=ttl_minutes))
+                self._cache_registry.touch(key, time.time() + ttl_minutes * 60)
+                logger.info(f"Context cache reused: {entry['name']} (TTL extended to {ttl_minutes} min)")
+            else:
+                self._cache_registry.touch(key)
+                logger.info(f"Context cache reused: {entry['name']}")
+            return cache
+        except Exception as e:
+            logger.debug(f"Registered cache {entry['name']} not reusable: {e}")
+            self._cache_registry.remove(entry["name"])
+            return None
+
+    def release_cache(self):
+        """
+        End of job: leave a registered cache alive for the next job (it expires on its
+        own TTL, stale ones are evicted at startup); delete an unregistered one.
+        """
+        if self._cache and CONTEXT_CACHE_REUSE and self._cache_name in self._cache_registry.live_names():
+            logger.info(f"Cache kept for reuse: {self._cache_name}")
+            self._cache = None
+            self._cache_name = ""
+            self._model = None
+        else:
+            self.delete_cache()
 
     def delete_cache(self):
         """Delete the current context cache."""
@@ -175,18 +287,34 @@ class GeminiEngine:
             except Exception as e:
                 logger.debug(f"Cache delete failed: {e}")
             finally:
+                self._cache_registry.remove(self._cache_name)
                 self._cache = None
                 self._cache_name = ""
                 self._model = None
 
+    def _delete_remote_cache(self, name: str):
+        """Delete a cache by name (evicted from the registry)."""
+        try:
+            genai_caching.CachedContent.get(name).delete()
+            logger.debug(f"Evicted context cache: {name}")
+        except Exception as e:
+            logger.debug(f"Cache eviction of {name} skipped: {e}")
+
     def cleanup_orphaned_caches(self):
-        """Delete stale context caches from previous sessions."""
+        """
+        Delete context caches this client registered that have expired or been evicted.
+        Unregistered bigeye caches are left alone: another session may be using them,
+        and they expire on their own TTL.
+        """
         if not self._api_key:
             return
+        stale = self._cache_registry.pop_expired()
+        if not stale:
+            return
         try:
             for cache in genai_caching.CachedContent.list():
                 if hasattr(cache, 'display_name') and cache.display_name and \
-                   cache.display_name.startswith("bigeye"):
+                   cache.display_name.startswith("bigeye") and cache.name in stale:
                     try:
                         cache.delete()
                         logger.debug(f"Cleaned orphaned cache: {cache.name}")
@@ -204,13 +332,47 @@ class GeminiEngine:
         Returns parsed JSON dict with title, description, keywords, category.
         Raises GeminiError on classified failure.
         """
-        image_data = self._load_image(filepath)
+        with span("file_read"):
+            image_data = self._load_image(filepath)
         return self._generate_with_retry(
             contents=[image_data, prompt],
             system_prompt=system_prompt,
             timeout=TIMEOUT_PHOTO,
         )
 
+    def process_photo_batch(self, filepaths: list, prompt: str,
+                            system_prompt: str = "") -> list:
+        """
+        Process several photos in one generate_content call (prompt sent once).
+        Returns one entry per filepath: the parsed result dict, or None when the model's
+        entry for that image is missing or invalid (caller retries it with process_photo).
+        Raises GeminiError if the request itself fails.
+        """
+        count = len(filepaths)
+        contents = []
+        with span("file_read", images=count):
+            for i, filepath in enumerate(filepaths, 1):
+                contents.append(f"Image {i}:")
+                contents.append(self._load_image(filepath))
+        contents.append(prompt + BATCH_INSTRUCTION.format(count=count))
+
+        response = self._generate_with_retry(
+            contents=contents,
+            system_prompt=system_prompt,
+            timeout=TIMEOUT_PHOTO * 2,
+            parse=self._parse_batch_response,
+            schema=BATCH_RESPONSE_SCHEMA,
+        )
+        results = self._demux_batch(response.get("items", []), count)
+
+        # Split the request's token usage across the photos it carried
+        for result in results:
+            if result is not None:
+                for key in ("_token_input", "_token_output", "_token_cached"):
+                    if isinstance(response.get(key), int):
+                        result[key] = response[key] // count
+        return results
+
     def process_video(self, filepath: str, prompt: str,
                       system_prompt: str = "") -> dict:
         """
@@ -226,7 +388,8 @@ class GeminiEngine:
             )
         finally:
             try:
-                genai.delete_file(video_file.name)
+                with span("delete_file"):
+                    genai.delete_file(video_file.name)
             except Exception:
                 pass  # ข้ามไป Gemini ลบเองใน 48 ชม.
 
@@ -234,6 +397,10 @@ class GeminiEngine:
         """Deprecated: No-op for backward compatibility."""
         pass
 
+    def close(self):
+        """Release engine resources (no-op here; the async engine stops its loop)."""
+        pass
+
     # ── Internal helpers ──
 
     def _load_image(self, filepath: str) -> dict:
@@ -254,7 +421,7 @@ class GeminiEngine:
     def _reset_client(self):
         """Reset genai client (REST transport — rarely needed)."""
         if self._api_key:
-            genai.configure(api_key=self._api_key, transport="rest")
+            _configure_genai(self._api_key)
             logger.info("Gemini client reset")
 
     def cleanup_all_remote_files(self):
@@ -278,49 +445,9 @@ class GeminiEngine:
             pass
 
     def _upload_video(self, filepath: str):
-        """Upload video to Gemini File API. Serialized with timeout to prevent SSL corruption."""
+        """Upload video to Gemini File API (concurrent, resumable) and wait for ACTIVE."""
         logger.info(f"Uploading video: {os.path.basename(filepath)}")
-        max_upload_retries = 5
-        for attempt in range(1, max_upload_retries + 1):
-            try:
-                # timeout=180s ป้องกัน deadlock ถ้า upload ค้าง
-                acquired = self._upload_lock.acquire(timeout=180)
-                if not acquired:
-                    raise GeminiError(
-                        "Video upload timeout — อัพโหลดวิดีโอนานเกินไป กรุณาลองใหม่",
-                        GeminiErrorType.TIMEOUT, retryable=True,
-                    )
-                try:
-                    video_file = genai.upload_file(filepath)
-                finally:
-                    self._upload_lock.release()
-                break
-            except GeminiError:
-                raise  # ไม่ retry timeout จาก lock
-            except Exception as e:
-                msg = str(e).lower()
-                is_retryable = (
-                    "ssl" in msg or "wrong_version_number" in msg or
-                    "timeout" in msg or "timed out" in msg or "read operation" in msg or
-                    "connection" in msg or "network" in msg or
-                    "httperror" in msg or "http error" in msg
-                )
-                if is_retryable and attempt < max_upload_retries:
-                    logger.warning(f"Video upload error (attempt {attempt}/{max_upload_retries}): {e}")
-                    if "ssl" in msg or "wrong_version_number" in msg:
-                        self._reset_client()
-                    backoff = min(3 ** attempt, 30)
-                    time.sleep(backoff)
-                    continue
-                raise
-
-        # Wait for video to be processed (ACTIVE state)
-        max_wait = 120
-        elapsed = 0
-        while video_file.state.name == "PROCESSING" and elapsed < max_wait:
-            time.sleep(2)
-            elapsed += 2
-            video_file = genai.get_file(video_file.name)
+        video_file = self._upload_and_wait(filepath)
 
         if video_file.state.name == "FAILED":
             # ลบไฟล์ที่ FAILED แล้ว retry upload อีกครั้ง
@@ -329,22 +456,9 @@ class GeminiEngine:
             except Exception:
                 pass
             logger.warning(f"Video FAILED on Gemini side, retrying upload...")
-            time.sleep(3)
-            acquired = self._upload_lock.acquire(timeout=180)
-            if not acquired:
-                raise GeminiError(
-                    "Video upload timeout — อัพโหลดวิดีโอนานเกินไป กรุณาลองใหม่",
-                    GeminiErrorType.TIMEOUT, retryable=True,
-                )
-            try:
-                video_file = genai.upload_file(filepath)
-            finally:
-                self._upload_lock.release()
-            elapsed = 0
-            while video_file.state.name == "PROCESSING" and elapsed < max_wait:
-                time.sleep(2)
-                elapsed += 2
-                video_file = genai.get_file(video_file.name)
+            with span("backoff", reason="processing_failed"):
+                time.sleep(3)
+            video_file = self._upload_and_wait(filepath, attempt=2)
             if video_file.state.name != "ACTIVE":
                 raise GeminiError(
                     f"Gemini ไม่สามารถประมวลผลวิดีโอนี้ได้ กรุณาลองใหม่",
@@ -353,35 +467,76 @@ class GeminiEngine:
 
         if video_file.state.name != "ACTIVE":
             raise GeminiError(
-                f"วิดีโอไม่พร้อมหลังรอ {max_wait} วินาที กรุณาลองใหม่",
+                f"วิดีโอไม่พร้อมหลังรอ {VIDEO_ACTIVE_WAIT} วินาที กรุณาลองใหม่",
                 GeminiErrorType.TIMEOUT, retryable=True,
             )
 
         logger.info(f"Video ready: {video_file.name}")
         return video_file
 
+    def _upload_and_wait(self, filepath: str, attempt: int = 1):
+        """Upload, then wait for the file to leave PROCESSING (each timed as a span)."""
+        with span("upload", attempt=attempt):
+            upload = self._upload_file(filepath)
+        with span("processing_wait", attempt=attempt):
+            return self._wait_active(upload)
+
+    def _get_uploader(self) -> UploadManager:
+        with self._model_lock:
+            if self._uploader is None:
+                self._uploader = UploadManager(self._api_key, slots=self._upload_slots)
+            return self._uploader
+
+    def _upload_file(self, filepath: str) -> dict:
+        """Chunked resumable upload; returns the File resource dict (name, state, ...)."""
+        try:
+            return self._get_uploader().upload(filepath)
+        except GeminiError:
+            raise
+        except Exception as e:
+            raise classify_error(e) from e
+
+    @staticmethod
+    def _wait_active(upload: dict):
+        """genai File for an upload, once it leaves PROCESSING (or VIDEO_ACTIVE_WAIT passes).
+        Waiting is done by the shared FileStatePoller — no per-thread poll loop."""
+        name = upload.get("name", "")
+        if upload.get("state", "PROCESSING") == "PROCESSING":
+            return FileStatePoller.shared().wait(name, VIDEO_ACTIVE_WAIT)
+        return genai.get_file(name)
+
     def _generate_with_retry(self, contents: list, system_prompt: str = "",
-                             timeout: int = 60) -> dict:
+                             timeout: int = 60, parse=None, schema: dict = RESPONSE_SCHEMA) -> dict:
         """
         Call Gemini generate_content with retry logic.
         Retries up to MAX_RETRIES for retryable errors with exponential backoff.
-        Returns parsed JSON response dict.
+        Returns parsed JSON response dict (`parse` overrides _parse_json_response,
+        `schema` is the response schema sent with the request).
         """
+        parse = parse or self._parse_json_response
+        call_options = {"request_options": {"timeout": timeout}}
+        if USE_RESPONSE_SCHEMA and schema:
+            # Merged into the model's generation_config (JSON mime type, temperature)
+            call_options["generation_config"] = {"response_schema": schema}
         # Store system_prompt so _get_model can embed it as system_instruction
         if system_prompt and system_prompt != self._system_prompt:
             self._system_prompt = system_prompt
             self._model = None  # Force model rebuild with new system_instruction
 
         model = self._get_model()
+        limiter = RateLimiter.for_model(self._model_name)
+        estimated = estimate_tokens(contents, self._system_prompt)
         last_error = None
 
         for attempt in range(1, MAX_RETRIES + 1):
             try:
-                with self._api_sem:
-                    response = model.generate_content(
-                        contents,
-                        request_options={"timeout": timeout},
-                    )
+                # Wait for RPM/TPM budget before taking a parallel slot
+                with span("rate_limit_wait"):
+                    limiter.acquire(estimated)
+                with self._api_sem, span("generate", attempt=attempt):
+                    response = model.generate_content(contents, **call_options)
+
+                self._api_sem.on_success()
 
                 # Check for blocked response
                 if not response.candidates:
@@ -391,17 +546,23 @@ class GeminiEngine:
                     )
 
                 # Parse JSON from response
-                text = response.text.strip()
-                result = self._parse_json_response(text)
+                with span("parse"):
+                    text = response.text.strip()
+                    result = parse(text)
 
                 # Add token usage info
                 if hasattr(response, 'usage_metadata') and response.usage_metadata:
                     result["_token_input"] = getattr(
                         response.usage_metadata, 'prompt_token_count', 0
                     )
+                    if isinstance(result["_token_input"], int):
+                        limiter.reconcile(estimated, result["_token_input"])
                     result["_token_output"] = getattr(
                         response.usage_metadata, 'candidates_token_count', 0
                     )
+                    # Part of _token_input served from the context cache (billed at a discount)
+                    cached = getattr(response.usage_metadata, 'cached_content_token_count', 0)
+                    result["_token_cached"] = cached if isinstance(cached, int) else 0
 
                 return result
 
@@ -409,11 +570,15 @@ class GeminiEngine:
                 raise  # Already classified, don't wrap again
             except Exception as e:
                 last_error = classify_error(e)
+                self._api_sem.record(last_error.error_type.value)
                 logger.warning(
                     f"Gemini attempt {attempt}/{MAX_RETRIES}: "
                     f"[{last_error.error_type.value}] {last_error}"
                 )
 
+                if last_error.error_type == GeminiErrorType.RATE_LIMIT:
+                    limiter.penalize()  # pause every worker on this model, not just this one
+
                 if not last_error.retryable or attempt >= MAX_RETRIES:
                     raise last_error
 
@@ -426,16 +591,74 @@ class GeminiEngine:
                 # Exponential backoff: 2s, 4s, 8s...
                 backoff = 2 ** attempt
                 logger.info(f"Retrying in {backoff}s...")
-                time.sleep(backoff)
+                with span("backoff", attempt=attempt, reason=last_error.error_type.value):
+                    time.sleep(backoff)
 
         raise last_error  # Should not reach here, but safety net
 
     def _parse_json_response(self, text: str) -> dict:
         """
         Parse JSON from Gemini response text.
-        Handles markdown code fences and trailing garbage.
+        Handles markdown code fences, surrounding prose and trailing garbage; a truncated
+        or slightly malformed reply is repaired when title/keywords survive (and marked
+        "_repaired" so it is not stored in the result cache).
         """
-        # Strip markdown code fences
+        text = self._strip_code_fence(text)
+
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            result = _repair_object(text)
+            if result is not None:
+                logger.info(f"Repaired malformed JSON response ({len(text)} chars)")
+                return result
+
+            # Show more context in error message
+            preview = text[:300] if len(text) > 300 else text
+            raise GeminiError(
+                f"Cannot parse JSON from response. Preview: {preview}",
+                GeminiErrorType.UNKNOWN, retryable=False,
+            )
+
+    def _parse_batch_response(self, text: str) -> dict:
+        """Parse a multi-image response (JSON array) into {"items": [...]}."""
+        text = self._strip_code_fence(text)
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            data = _repair_array(text)
+            if data is not None:
+                logger.info(f"Repaired malformed JSON array response ({len(text)} chars)")
+        if isinstance(data, dict):
+            # Some replies wrap the array: {"results": [...]} / {"images": [...]}
+            data = next((v for v in data.values() if isinstance(v, list)), [data])
+        if not isinstance(data, list):
+            preview = text[:300] if len(text) > 300 else text
+            raise GeminiError(
+                f"Cannot parse JSON array from response. Preview: {preview}",
+                GeminiErrorType.UNKNOWN, retryable=False,
+            )
+        return {"items": data}
+
+    @staticmethod
+    def _demux_batch(items: list, count: int) -> list:
+        """Map array entries back to image slots (by "image" number, else by position)."""
+        results = [None] * count
+        numbered = all(isinstance(it, dict) and isinstance(it.get("image"), int) for it in items)
+        for pos, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            index = item.pop("image", None) if numbered else pos + 1
+            item.pop("image", None)
+            if not isinstance(index, int) or not 1 <= index <= count or results[index - 1] is not None:
+                continue
+            if _valid_photo_result(item):
+                results[index - 1] = item
+        return results
+
+    @staticmethod
+    def _strip_code_fence(text: str) -> str:
+        """Strip markdown code fences (```json ... ```)."""
         if text.startswith("```"):
             lines = text.split("\n")
             # Remove only first line (```json) and last line (```)
@@ -445,24 +668,60 @@ class GeminiEngine:
                 else:
                     lines = lines[1:]
             text = "\n".join(lines)
+        return text.strip()
 
-        text = text.strip()
 
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            # Try to find JSON object in the text
-            start = text.find("{")
-            end = text.rfind("}") + 1
-            if start >= 0 and end > start:
-                try:
-                    return json.loads(text[start:end])
-                except json.JSONDecodeError:
-                    pass
+def _configure_genai(api_key: str):
+    """genai.configure (REST), honouring a GEMINI_API_BASE override (local fake server)."""
+    if GEMINI_API_BASE.rstrip("/") == GEMINI_API_DEFAULT:
+        genai.configure(api_key=api_key, transport="rest")
+    else:
+        genai.configure(api_key=api_key, transport="rest",
+                        client_options={"api_endpoint": GEMINI_API_BASE.rstrip("/")})
 
-            # Show more context in error message
-            preview = text[:300] if len(text) > 300 else text
-            raise GeminiError(
-                f"Cannot parse JSON from response. Preview: {preview}",
-                GeminiErrorType.UNKNOWN, retryable=False,
-            )
+
+def _repair_object(text: str) -> dict | None:
+    """
+    JSON object recovered from a malformed reply: prose / garbage around a complete
+    object, or a truncated one that still has its title and keyword list.
+    """
+    for complete_only in (True, False):
+        try:
+            result = repair_json(text, complete_only=complete_only)
+        except ValueError:
+            continue
+        if isinstance(result, dict) and (complete_only or _valid_photo_result(result)):
+            if not complete_only:
+                result["_repaired"] = True    # cut short: may be missing keywords / fields
+            return result
+    return None
+
+
+def _repair_array(text: str):
+    """
+    Value recovered from a malformed multi-image reply. In a truncated array the complete
+    entries are kept and only the last one can be cut short: it is marked "_repaired"
+    (demux still rejects it if title / keywords did not survive).
+    """
+    try:
+        return repair_json(text, complete_only=True)
+    except ValueError:
+        pass
+    try:
+        data = repair_json(text)
+    except ValueError:
+        return None
+    items = data
+    if isinstance(data, dict):      # wrapped array (or a lone object), as in _parse_batch_response
+        items = next((v for v in data.values() if isinstance(v, list)), [data])
+    if isinstance(items, list) and items and isinstance(items[-1], dict):
+        items[-1]["_repaired"] = True
+    return data
+
+
+def _valid_photo_result(item: dict) -> bool:
+    """A usable per-image entry: some title/description text and a keyword list."""
+    return (
+        bool(str(item.get("title", "") or item.get("description", "")).strip())
+        and isinstance(item.get("keywords"), list)
+    )
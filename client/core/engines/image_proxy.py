@@ -0,0 +1,134 @@
+"""
+BigEye Pro — Image Proxy
+Creates bounded-resolution JPEG proxies of photos for Gemini upload.
+Features: decode-at-reduced-size, content-addressed disk cache, LRU pruning.
+"""
+import os
+import logging
+import threading
+
+from core.config import (
+    APP_DATA_DIR, IMAGE_PROXY_MAX_EDGE, IMAGE_PROXY_QUALITY, IMAGE_PROXY_CACHE_MB,
+)
+from utils.helpers import file_content_hash
+
+logger = logging.getLogger("bigeye")
+
+IMAGE_PROXY_DIR = os.path.join(APP_DATA_DIR, "image_proxy_cache")
+os.makedirs(IMAGE_PROXY_DIR, exist_ok=True)
+
+# Formats Gemini accepts inline as-is (no re-encode needed when already small)
+_PASSTHROUGH_FORMATS = {"JPEG", "PNG"}
+
+
+class ImageProxy:
+    """Pillow-based photo downscaler — the photo counterpart of Transcoder."""
+
+    @staticmethod
+    def get_proxy_path(input_path: str, max_edge: int = IMAGE_PROXY_MAX_EDGE,
+                       quality: int = IMAGE_PROXY_QUALITY, content_hash: str = "") -> str:
+        """Content-addressed proxy path: same bytes + same settings → same file.
+        content_hash: file_content_hash(input_path) if the caller already has it."""
+        digest = (content_hash or file_content_hash(input_path))[:24]
+        return os.path.join(IMAGE_PROXY_DIR, f"{digest}_{max_edge}q{quality}.jpg")
+
+    @staticmethod
+    def create_proxy(input_path: str, output_path: str = "",
+                     max_edge: int = IMAGE_PROXY_MAX_EDGE,
+                     quality: int = IMAGE_PROXY_QUALITY, content_hash: str = "") -> str:
+        """
+        Create a JPEG proxy whose long edge is at most max_edge pixels.
+        Returns the proxy path, the input path itself when the original is
+        already small enough to send as-is, or empty string on failure.
+        """
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:
+            logger.warning("Pillow not available, sending original images")
+            return ""
+
+        try:
+            if not output_path:
+                output_path = ImageProxy.get_proxy_path(input_path, max_edge, quality, content_hash)
+
+            # Cache hit — bump mtime so prune_cache treats it as recently used
+            if os.path.isfile(output_path):
+                os.utime(output_path, None)
+                logger.debug(f"Image proxy cache hit: {output_path}")
+                return output_path
+
+            with Image.open(input_path) as img:
+                if max(img.size) <= max_edge and img.format in _PASSTHROUGH_FORMATS:
+                    return input_path
+
+                # JPEG: let libjpeg decode at 1/2, 1/4 or 1/8 scale (no full-size bitmap)
+                img.draft("RGB", (max_edge, max_edge))
+                img = ImageOps.exif_transpose(img)
+                if img.mode not in ("RGB", "L"):
+                    img = img.convert("RGB")
+                img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+                # Write to a private temp name first: workers may race on the same hash
+                tmp_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                try:
+                    img.save(tmp_path, "JPEG", quality=quality, optimize=True)
+                except Exception:
+                    # prune_cache only sees finished proxies — don't leave a partial .tmp behind
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+                    raise
+            os.replace(tmp_path, output_path)
+
+            src_kb = os.path.getsize(input_path) / 1024
+            out_kb = os.path.getsize(output_path) / 1024
+            logger.debug(
+                f"Image proxy created: {os.path.basename(input_path)} "
+                f"({src_kb:.0f} KB → {out_kb:.0f} KB)"
+            )
+            return output_path
+
+        except Exception as e:
+            logger.warning(f"Image proxy failed for {os.path.basename(input_path)}: {e}")
+            return ""
+
+    @staticmethod
+    def prune_cache(max_bytes: int = IMAGE_PROXY_CACHE_MB * 1024 * 1024):
+        """Delete least-recently-used proxies until the cache fits in max_bytes."""
+        try:
+            entries = []
+            for f in os.listdir(IMAGE_PROXY_DIR):
+                fp = os.path.join(IMAGE_PROXY_DIR, f)
+                if os.path.isfile(fp):
+                    st = os.stat(fp)
+                    entries.append((st.st_mtime, st.st_size, fp))
+        except OSError as e:
+            logger.debug(f"Image proxy prune skipped: {e}")
+            return
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, fp in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(fp)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        if removed:
+            logger.info(f"Image proxy cache pruned: {removed} files")
+
+    @staticmethod
+    def cleanup_all_proxies():
+        """Delete all image proxies in the cache directory."""
+        try:
+            for f in os.listdir(IMAGE_PROXY_DIR):
+                fp = os.path.join(IMAGE_PROXY_DIR, f)
+                if os.path.isfile(fp):
+                    os.remove(fp)
+            logger.info("Image proxy cache cleared")
+        except OSError as e:
+            logger.debug(f"Image proxy cleanup error: {e}")
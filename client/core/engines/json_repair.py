@@ -0,0 +1,144 @@
+"""
+BigEye Pro — Tolerant JSON repair
+Recovers the JSON value from a Gemini reply that json.loads rejects: prose or garbage
+after the value, trailing commas, raw newlines in strings, and replies cut off mid-way
+(MAX_TOKENS / dropped stream). One pass over the text tracks open containers, open
+strings and the last point where everything so far was a complete element; a truncated
+reply is cut back to that point (or its open object value string is closed) and the
+open arrays / objects are closed.
+"""
+import json
+
+
+class _Level:
+    """One open container: '{' or '[', and what an object expects next."""
+    __slots__ = ("kind", "expect")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.expect = "key" if kind == "{" else "value"
+
+
+def repair_json(text: str, complete_only: bool = False):
+    """
+    Parse the first JSON object / array in text, repairing what can be repaired.
+    complete_only=True refuses truncated values (nothing cut back or closed).
+    Raises ValueError if there is no value to recover.
+    """
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        raise ValueError("no JSON object or array in text")
+
+    out = []                # repaired characters so far
+    stack = []              # open _Level entries
+    safe = (0, ())          # (len(out), open kinds) where out[:len] + closers is complete
+    in_string = False
+    escape = False
+
+    def mark_safe():
+        nonlocal safe
+        safe = (len(out), tuple(level.kind for level in stack))
+
+    def value_done():
+        # a string / number / literal / container just completed the current element
+        if stack:
+            top = stack[-1]
+            if top.kind == "{":
+                top.expect = "colon" if top.expect == "key" else "comma"
+            if top.expect != "colon":
+                mark_safe()
+
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+                value_done()
+            continue
+
+        if ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in "{[":
+            stack.append(_Level(ch))
+            out.append(ch)
+            mark_safe()
+        elif ch in "}]":
+            if not stack or (stack[-1].kind == "{") != (ch == "}"):
+                break                          # stray closer: treat the rest as garbage
+            _strip_trailing_comma(out)
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                return _loads("".join(out))    # complete value; anything after it is garbage
+            value_done()
+        elif ch == ",":
+            if _scalar_pending(out):
+                value_done()
+            if stack and stack[-1].kind == "{":
+                stack[-1].expect = "key"
+            out.append(ch)
+        elif ch == ":":
+            if stack and stack[-1].kind == "{":
+                stack[-1].expect = "value"
+            out.append(ch)
+        elif ch.isspace():
+            if _scalar_pending(out):
+                value_done()
+            out.append(ch)
+        else:
+            out.append(ch)                     # number / true / false / null characters
+
+    # ── Truncated (or broken off at a stray closer): close what is still open ──
+    if complete_only:
+        raise ValueError("JSON value is truncated")
+    if in_string and stack and stack[-1].kind == "{" and stack[-1].expect == "value":
+        if escape:
+            out.pop()                          # dangling backslash
+        out.append('"')
+        stack[-1].expect = "comma"
+        mark_safe()
+    elif not in_string and _scalar_pending(out):
+        # complete number / literal at the very end ("..., 3" or "true")
+        try:
+            json.loads("".join(out[_scalar_start(out):]))
+            value_done()
+        except ValueError:
+            pass
+
+    length, kinds = safe
+    repaired = out[:length]
+    _strip_trailing_comma(repaired)
+    closers = "".join("}" if kind == "{" else "]" for kind in reversed(kinds))
+    return _loads("".join(repaired) + closers)
+
+
+def _loads(text: str):
+    try:
+        return json.loads(text, strict=False)   # strict=False: raw newlines / tabs in strings
+    except json.JSONDecodeError as e:
+        raise ValueError(f"unrepairable JSON: {e}") from e
+
+
+def _strip_trailing_comma(out: list):
+    """Drop whitespace and one trailing comma from the end of out (in place)."""
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def _scalar_start(out: list) -> int:
+    i = len(out)
+    while i > 0 and out[i - 1] not in ',:[{ \t\r\n"':
+        i -= 1
+    return i
+
+
+def _scalar_pending(out: list) -> bool:
+    """out ends with an unterminated number / literal token."""
+    return bool(out) and out[-1] not in ',:[{}] \t\r\n"'
@@ -0,0 +1,254 @@
+"""
+BigEye Pro — Gemini Rate Limiter
+Proactive per-model RPM / TPM token buckets, checked before every generate_content.
+A big batch runs at the quota ceiling instead of bursting into 429s and backing off.
+Video worker processes share the parent's budget: the limiter is hosted in a manager
+process and every process installs a RemoteRateLimiter for it.
+"""
+import io
+import math
+import asyncio
+import time
+import logging
+import threading
+from multiprocessing.managers import BaseProxy
+
+from core.config import GEMINI_RATE_LIMITS, GEMINI_RATE_LIMIT_DEFAULT, RATE_LIMIT_BURST_SEC
+
+logger = logging.getLogger("bigeye")
+
+# Gemini input-token accounting (used for estimates only — reconciled with usage_metadata)
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS_PER_TILE = 258      # one 768×768 tile (or a whole image ≤ 384px)
+VIDEO_TOKENS_PER_SEC = 300       # ~263 video + 32 audio at default resolution
+VIDEO_DEFAULT_SEC = 30           # when the uploaded file has no duration yet
+
+
+def estimate_tokens(contents: list, system_prompt: str = "") -> int:
+    """Rough input-token count of a generate_content call (text + image tiles + video seconds)."""
+    total = len(system_prompt) // CHARS_PER_TOKEN
+    for part in contents:
+        if isinstance(part, str):
+            total += len(part) // CHARS_PER_TOKEN
+        elif isinstance(part, dict) and "data" in part:
+            total += _image_tokens(part["data"])
+        else:
+            total += int(_video_seconds(part) * VIDEO_TOKENS_PER_SEC)
+    return max(total, 1)
+
+
+def _image_tokens(data: bytes) -> int:
+    try:
+        from PIL import Image
+        with Image.open(io.BytesIO(data)) as img:
+            w, h = img.size
+    except Exception:
+        return IMAGE_TOKENS_PER_TILE * 4
+    if w <= 384 and h <= 384:
+        return IMAGE_TOKENS_PER_TILE
+    return math.ceil(w / 768) * math.ceil(h / 768) * IMAGE_TOKENS_PER_TILE
+
+
+def _video_seconds(file_obj) -> float:
+    """Duration of an uploaded genai File (or REST file dict), if the API reported one."""
+    if isinstance(file_obj, dict):
+        # REST: {"videoMetadata": {"videoDuration": "12.5s"}}
+        raw = str(file_obj.get("videoMetadata", {}).get("videoDuration", "")).rstrip("s")
+        try:
+            return float(raw) or VIDEO_DEFAULT_SEC
+        except ValueError:
+            return VIDEO_DEFAULT_SEC
+    duration = getattr(getattr(file_obj, "video_metadata", None), "video_duration", None)
+    if hasattr(duration, "total_seconds"):
+        return duration.total_seconds() or VIDEO_DEFAULT_SEC
+    seconds = getattr(duration, "seconds", None)
+    if isinstance(seconds, (int, float)) and seconds > 0:
+        return float(seconds)
+    return VIDEO_DEFAULT_SEC
+
+
+class TokenBucket:
+    """Classic token bucket. Not thread-safe on its own — RateLimiter holds the lock."""
+
+    def __init__(self, per_minute: float, burst_sec: float = RATE_LIMIT_BURST_SEC):
+        self.rate = per_minute / 60.0                     # tokens per second
+        self.capacity = max(1.0, self.rate * burst_sec)
+        self.tokens = self.capacity
+        self._stamp = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        missing = amount - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else float("inf")
+
+
+class RateLimiter:
+    """
+    RPM + TPM budget for one model, shared by every engine in the process.
+    Use RateLimiter.for_model(name) — limiters are keyed by model name.
+    Buckets are per process; while video workers run, JobManager installs a
+    RemoteRateLimiter in the parent and every worker so they all draw on one budget.
+    """
+
+    _registry: dict = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, model_name: str, rpm: int, tpm: int):
+        self.model_name = model_name
+        self._cond = threading.Condition()
+        self._requests = TokenBucket(rpm)
+        self._tokens = TokenBucket(tpm)
+        self.rpm = rpm
+        self.tpm = tpm
+        self.total_wait = 0.0        # seconds spent waiting for budget (for debug log)
+
+    @classmethod
+    def for_model(cls, model_name: str) -> "RateLimiter":
+        """Get (or create from config) the limiter for a model."""
+        with cls._registry_lock:
+            limiter = cls._registry.get(model_name)
+            if limiter is None:
+                limits = GEMINI_RATE_LIMITS.get(model_name, GEMINI_RATE_LIMIT_DEFAULT)
+                limiter = cls(model_name, limits["rpm"], limits["tpm"])
+                cls._registry[model_name] = limiter
+            return limiter
+
+    @classmethod
+    def configure(cls, model_name: str, rpm: int, tpm: int) -> "RateLimiter":
+        """Override the budget for a model (e.g. user's paid tier)."""
+        with cls._registry_lock:
+            limiter = cls(model_name, rpm, tpm)
+            cls._registry[model_name] = limiter
+        logger.info(f"Rate limit for {model_name}: {rpm} RPM, {tpm} TPM")
+        return limiter
+
+    @classmethod
+    def install(cls, limiter) -> "RateLimiter":
+        """Make `limiter` (e.g. a RemoteRateLimiter) what for_model() returns for its model.
+        Returns the limiter it replaced (None if there was none)."""
+        model_name = limiter.model_name
+        with cls._registry_lock:
+            previous = cls._registry.get(model_name)
+            cls._registry[model_name] = limiter
+        return previous
+
+    @classmethod
+    def reset_all(cls):
+        """Forget all limiters (fresh buckets from config on next use)."""
+        with cls._registry_lock:
+            cls._registry.clear()
+
+    def try_acquire(self, tokens: int) -> float:
+        """
+        Take one request slot + `tokens` if the budget allows right now.
+        Returns 0.0 on success, otherwise the seconds to wait before trying again.
+        Requests larger than the burst size are clamped so they can never deadlock.
+        """
+        tokens = min(max(tokens, 0), self._tokens.capacity)
+        with self._cond:
+            now = time.monotonic()
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            wait = max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+            if wait <= 0:
+                self._requests.tokens -= 1
+                self._tokens.tokens -= tokens
+                return 0.0
+            return wait
+
+    def acquire(self, tokens: int, timeout: float | None = None) -> bool:
+        """Block until the budget allows one request of `tokens` input tokens."""
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                self._add_wait(time.monotonic() - started)
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            with self._cond:
+                # Condition.wait (not time.sleep): wakes early when reconcile() refunds tokens
+                self._cond.wait(min(wait, 1.0))
+
+    async def acquire_async(self, tokens: int):
+        """Event-loop version of acquire(): waits with asyncio.sleep, never blocks the loop."""
+        started = time.monotonic()
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                self._add_wait(time.monotonic() - started)
+                return
+            await asyncio.sleep(min(wait, 1.0))
+
+    def _add_wait(self, seconds: float):
+        with self._cond:
+            self.total_wait += seconds
+
+    def reconcile(self, estimated: int, actual: int):
+        """Correct the TPM bucket with the real token count from usage_metadata."""
+        if actual <= 0:
+            return
+        with self._cond:
+            # May go negative: the overshoot is paid back before the next request
+            self._tokens.tokens -= actual - estimated
+            self._cond.notify_all()
+
+    def penalize(self):
+        """A 429 slipped through — empty the request bucket so every worker pauses."""
+        with self._cond:
+            self._requests.refill(time.monotonic())
+            self._requests.tokens = min(self._requests.tokens, 0.0)
+
+
+# ── Cross-process sharing (video worker processes) ──
+
+class RemoteRateLimiter(BaseProxy):
+    """
+    Proxy of a RateLimiter hosted in a manager process (register it with
+    proxytype=RemoteRateLimiter). Same interface as RateLimiter; every call is a round
+    trip to the one set of buckets, so a penalize() in any process pauses all of them.
+    """
+
+    _exposed_ = ("try_acquire", "acquire", "reconcile", "penalize", "__getattribute__")
+
+    def try_acquire(self, tokens: int) -> float:
+        return self._callmethod("try_acquire", (tokens,))
+
+    def acquire(self, tokens: int, timeout: float | None = None) -> bool:
+        return self._callmethod("acquire", (tokens, timeout))
+
+    async def acquire_async(self, tokens: int):
+        await asyncio.to_thread(self.acquire, tokens)
+
+    def reconcile(self, estimated: int, actual: int):
+        self._callmethod("reconcile", (estimated, actual))
+
+    def penalize(self):
+        self._callmethod("penalize")
+
+    @property
+    def model_name(self) -> str:
+        return self._callmethod("__getattribute__", ("model_name",))
+
+    @property
+    def rpm(self) -> int:
+        return self._callmethod("__getattribute__", ("rpm",))
+
+    @property
+    def tpm(self) -> int:
+        return self._callmethod("__getattribute__", ("tpm",))
+
+    @property
+    def total_wait(self) -> float:
+        """Seconds every process together spent waiting for budget."""
+        return self._callmethod("__getattribute__", ("total_wait",))
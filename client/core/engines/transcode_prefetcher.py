@@ -0,0 +1,153 @@
+"""
+BigEye Pro — Transcode Prefetcher
+Separate transcode stage for video jobs: converts upcoming videos to proxies as soon as
+the job starts, bounded by a look-ahead window, and hands ready proxies to the
+upload stage. ffmpeg (CPU) overlaps with upload/Gemini (network) instead of running
+inline on the same worker slot.
+"""
+import os
+import time
+import logging
+import threading
+import concurrent.futures
+from typing import Callable, Optional
+
+from core.config import VIDEO_PREFETCH_AHEAD, VIDEO_TRANSCODE_WORKERS
+from core.engines.transcoder import Transcoder
+
+logger = logging.getLogger("bigeye")
+
+
+class TranscodePrefetcher:
+    """
+    Look-ahead proxy producer.
+    Videos are transcoded in job order; at most `lookahead` proxies are in progress or
+    ready-but-unclaimed at any time (bounds disk + CPU). get(filepath) hands a proxy to
+    the upload stage — waiting if it is still being made, transcoding inline if the
+    dispatcher has not reached it yet. skip_fn(filepath) → True marks a video that will
+    not be uploaded (e.g. a result cache hit); it is never transcoded ahead.
+    """
+
+    def __init__(self, videos: list, lookahead: int = VIDEO_PREFETCH_AHEAD,
+                 workers: int = VIDEO_TRANSCODE_WORKERS,
+                 create_fn: Optional[Callable[[str], str]] = None,
+                 skip_fn: Optional[Callable[[str], bool]] = None):
+        self._videos = list(videos)
+        self._create_fn = create_fn or Transcoder.create_proxy
+        self._skip_fn = skip_fn
+        self._slots = threading.Semaphore(max(1, lookahead))
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="transcode",
+        )
+        self._futures = {}       # filepath → Future[proxy path]
+        self._claimed = set()    # taken by get()/discard() — dispatcher skips these
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        # Stats for the debug log
+        self.ready_on_arrival = 0
+        self.waited = 0
+        self.inline = 0
+        self.skipped = 0
+        self.wait_time = 0.0
+
+    def start(self):
+        """Start dispatching transcodes in the background."""
+        self._thread = threading.Thread(
+            target=self._dispatch, name="transcode-prefetch", daemon=True,
+        )
+        self._thread.start()
+        logger.info(f"Transcode prefetch started: {len(self._videos)} videos")
+
+    def get(self, filepath: str, timeout: float | None = None) -> str:
+        """Proxy path for `filepath` ("" if transcoding failed — caller uploads the original)."""
+        with self._lock:
+            future = self._futures.pop(filepath, None)
+            self._claimed.add(filepath)
+        if future is None:
+            self.inline += 1
+            return self._create_fn(filepath)
+
+        if future.done():
+            self.ready_on_arrival += 1
+        else:
+            self.waited += 1
+        started = time.monotonic()
+        try:
+            return future.result(timeout) or ""
+        except Exception as e:
+            logger.warning(f"Prefetched proxy failed {os.path.basename(filepath)}: {e}")
+            return ""
+        finally:
+            self.wait_time += time.monotonic() - started
+            self._slots.release()
+
+    def discard(self, filepath: str):
+        """The upload stage won't need this video (e.g. result cache hit) — free its slot."""
+        with self._lock:
+            future = self._futures.pop(filepath, None)
+            self._claimed.add(filepath)
+        if future is None:
+            return
+        self._drop(future)
+        self._slots.release()
+
+    def stop(self):
+        """Cancel pending transcodes and remove proxies nobody claimed."""
+        self._stop.set()
+        with self._lock:
+            futures = list(self._futures.values())
+            self._futures.clear()
+        for future in futures:
+            self._drop(future)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        logger.info(
+            f"Transcode prefetch: {self.ready_on_arrival} ready on arrival, "
+            f"{self.waited} waited ({self.wait_time:.1f}s), {self.inline} inline, "
+            f"{self.skipped} skipped"
+        )
+
+    # ── Internal helpers ──
+
+    def _dispatch(self):
+        for filepath in self._videos:
+            if self._should_skip(filepath):
+                continue
+            # Wait for a free look-ahead slot (poll so stop() is honoured)
+            while not self._slots.acquire(timeout=0.2):
+                if self._stop.is_set():
+                    return
+            if self._stop.is_set():
+                self._slots.release()
+                return
+            with self._lock:
+                if filepath in self._claimed:
+                    self._slots.release()
+                    continue
+                try:
+                    self._futures[filepath] = self._pool.submit(self._create_fn, filepath)
+                except RuntimeError:  # pool shut down by stop()
+                    self._slots.release()
+                    return
+
+    def _should_skip(self, filepath: str) -> bool:
+        if self._skip_fn is None or self._stop.is_set():
+            return False
+        try:
+            skip = self._skip_fn(filepath)
+        except Exception as e:
+            logger.debug(f"Prefetch skip check failed {os.path.basename(filepath)}: {e}")
+            return False
+        if skip:
+            self.skipped += 1
+        return skip
+
+    @staticmethod
+    def _drop(future: concurrent.futures.Future):
+        """Cancel a transcode, or delete its proxy once it finishes."""
+        if future.cancel():
+            return
+        future.add_done_callback(
+            lambda f: Transcoder.cleanup_proxy(f.result())
+            if not f.cancelled() and f.exception() is None else None
+        )
@@ -0,0 +1,266 @@
+"""
+BigEye Pro — Video Upload Manager
+Concurrent, chunked, resumable uploads to the Gemini File API (REST resumable protocol).
+Each upload runs on its own HTTP session; after an SSL / connection error the session is
+rebuilt, the server is asked how many bytes it has, and the upload continues from there
+instead of starting the whole proxy over.
+The protocol itself (ResumableUpload) does no I/O, so AsyncGeminiEngine drives the same
+steps with httpx.AsyncClient.
+"""
+import os
+import time
+import logging
+import mimetypes
+import threading
+
+import httpx
+
+from core.config import (
+    GEMINI_API_BASE, UPLOAD_CHUNK_SIZE, UPLOAD_CHUNK_RETRIES, VIDEO_UPLOAD_CONCURRENCY,
+)
+
+logger = logging.getLogger("bigeye")
+
+CHUNK_GRANULARITY = 256 * 1024   # resumable protocol: non-final chunks are multiples of this
+
+
+def raise_for_status(resp: httpx.Response):
+    """Turn an HTTP error into an exception whose text classify_error() understands."""
+    if resp.status_code < 400:
+        return
+    try:
+        err = resp.json().get("error", {})
+        detail = f"{err.get('status', '')} {err.get('message', '')}".strip()
+    except ValueError:
+        detail = resp.text[:300]
+    raise RuntimeError(f"{resp.status_code} {detail}".strip())
+
+
+def _is_retryable_status(exc: RuntimeError) -> bool:
+    """429 / 5xx from raise_for_status() — worth resuming, unlike other 4xx."""
+    code = str(exc).split(" ", 1)[0]
+    return code == "429" or code.startswith("5")
+
+
+def _should_retry(exc: Exception, attempt: int) -> bool:
+    if attempt >= UPLOAD_CHUNK_RETRIES:
+        return False
+    if isinstance(exc, RuntimeError):
+        return _is_retryable_status(exc)
+    return True
+
+
+def _as_upload_error(exc: Exception) -> Exception:
+    """httpx errors → exceptions whose text classify_error() maps correctly."""
+    if isinstance(exc, httpx.TimeoutException):
+        return TimeoutError(f"Upload timed out ({type(exc).__name__})")
+    if isinstance(exc, httpx.TransportError):
+        return ConnectionError(f"HTTP error: {type(exc).__name__}: {exc}")
+    return exc
+
+
+def _chunk_size_for(chunk_size: int) -> int:
+    """Round down to the protocol granularity (but never below one unit)."""
+    return max(CHUNK_GRANULARITY, chunk_size - chunk_size % CHUNK_GRANULARITY)
+
+
+class ResumableUpload:
+    """
+    The resumable protocol for one file, without I/O. The caller runs the steps it asks
+    for and feeds each result back through advance():
+      ("post", kwargs)          → client.post(**kwargs)'s response, or its httpx error
+      ("read", offset, length)  → the file's bytes at offset
+      ("sleep", seconds)        → backoff before a retry
+      ("reconnect",)            → new HTTP session (stale TLS state), result ignored
+      ("done", file_dict)       → upload finished
+    Chunks that fail are retried after asking the server how much it has, so an upload
+    resumes from the last acknowledged offset instead of starting over.
+    """
+
+    def __init__(self, size: int, mime_type: str, display_name: str,
+                 chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.size = size
+        self.mime_type = mime_type
+        self.display_name = display_name
+        self.chunk_size = _chunk_size_for(chunk_size)
+        self.resumes = 0
+        self._steps = self._run()
+
+    def advance(self, result=None, error: Exception = None) -> tuple:
+        """Feed the last step's result (or the error it raised) in; returns the next step."""
+        try:
+            if error is not None:
+                return self._steps.throw(error)
+            return self._steps.send(result)
+        except StopIteration as done:
+            return "done", done.value
+
+    def close(self):
+        self._steps.close()
+
+    # ── Protocol ──
+
+    def _run(self):
+        url = yield from self._start()
+        offset = 0
+        failures = 0
+        while True:
+            chunk = yield ("read", offset, self.chunk_size)
+            final = offset + len(chunk) >= self.size
+            try:
+                resp = yield ("post", {
+                    "url": url,
+                    "headers": {
+                        "X-Goog-Upload-Command": "upload, finalize" if final else "upload",
+                        "X-Goog-Upload-Offset": str(offset),
+                    },
+                    "content": chunk,
+                })
+                raise_for_status(resp)
+            except (httpx.TransportError, RuntimeError) as e:
+                failures += 1
+                if not _should_retry(e, failures):
+                    raise _as_upload_error(e) from e
+                yield from self._backoff(failures, f"Upload chunk @{offset} failed: {e}")
+                yield ("reconnect",)
+                offset, video = yield from self._query(url)
+                if video is not None:
+                    return video
+                self.resumes += 1
+                logger.info(f"Resuming upload {self.display_name} at {offset}/{self.size}")
+                continue
+
+            failures = 0
+            if final:
+                return resp.json().get("file", {})
+            offset += len(chunk)
+
+    def _start(self):
+        """Open a resumable session; returns its upload URL."""
+        for attempt in range(1, UPLOAD_CHUNK_RETRIES + 1):
+            try:
+                resp = yield ("post", {
+                    "url": "/upload/v1beta/files",
+                    "headers": {
+                        "X-Goog-Upload-Protocol": "resumable",
+                        "X-Goog-Upload-Command": "start",
+                        "X-Goog-Upload-Header-Content-Length": str(self.size),
+                        "X-Goog-Upload-Header-Content-Type": self.mime_type,
+                    },
+                    "json": {"file": {"display_name": self.display_name}},
+                })
+                raise_for_status(resp)
+                url = resp.headers.get("x-goog-upload-url", "")
+                if not url:
+                    raise ConnectionError("HTTP error: upload session URL missing")
+                return url
+            except (httpx.TransportError, ConnectionError, RuntimeError) as e:
+                if not _should_retry(e, attempt):
+                    raise _as_upload_error(e) from e
+                yield from self._backoff(attempt, f"Upload session start failed: {e}")
+
+    def _query(self, url: str):
+        """(bytes the server has, file dict if the upload already finalized)."""
+        for attempt in range(1, UPLOAD_CHUNK_RETRIES + 1):
+            try:
+                resp = yield ("post", {"url": url, "headers": {"X-Goog-Upload-Command": "query"}})
+                raise_for_status(resp)
+                break
+            except (httpx.TransportError, RuntimeError) as e:
+                if not _should_retry(e, attempt):
+                    raise _as_upload_error(e) from e
+                yield from self._backoff(attempt, f"Upload status query failed: {e}")
+
+        if resp.headers.get("x-goog-upload-status", "") == "final":
+            try:
+                return 0, resp.json().get("file", {})
+            except ValueError:
+                pass
+        received = resp.headers.get("x-goog-upload-size-received", "0")
+        try:
+            return int(received), None
+        except ValueError:
+            return 0, None
+
+    @staticmethod
+    def _backoff(attempt: int, message: str):
+        logger.warning(f"{message} (attempt {attempt}/{UPLOAD_CHUNK_RETRIES})")
+        yield ("sleep", min(2 ** attempt, 30))
+
+
+class UploadManager:
+    """
+    Video uploads for one API key.
+    Up to `max_concurrent` uploads run at once (each with its own httpx.Client);
+    files are sent in `chunk_size` pieces and resumed from the last acknowledged offset.
+    `slots` replaces the per-manager cap with a semaphore shared by several managers
+    (JobManager passes one multiprocessing semaphore to every video worker process).
+    """
+
+    def __init__(self, api_key: str, base_url: str = GEMINI_API_BASE,
+                 max_concurrent: int = VIDEO_UPLOAD_CONCURRENCY,
+                 chunk_size: int = UPLOAD_CHUNK_SIZE, transport=None, slots=None):
+        self._api_key = api_key
+        self._base_url = base_url.rstrip("/")
+        self._slots = slots or threading.BoundedSemaphore(max(1, max_concurrent))
+        self._chunk_size = _chunk_size_for(chunk_size)
+        self._transport = transport    # httpx transport override (tests / local fake server)
+        self._lock = threading.Lock()
+        # Stats for the debug log
+        self.uploads = 0
+        self.resumes = 0
+
+    def upload(self, filepath: str, mime_type: str = "", display_name: str = "") -> dict:
+        """Upload a file; returns the File resource dict (name, uri, mimeType, state, ...)."""
+        size = os.path.getsize(filepath)
+        mime_type = mime_type or mimetypes.guess_type(filepath)[0] or "video/mp4"
+        display_name = display_name or os.path.basename(filepath)
+        session = ResumableUpload(size, mime_type, display_name, self._chunk_size)
+
+        with self._slots:
+            try:
+                video = self._run(session, filepath)
+            finally:
+                session.close()
+
+        with self._lock:
+            self.uploads += 1
+            self.resumes += session.resumes
+        return video
+
+    # ── Internal helpers ──
+
+    def _new_client(self) -> httpx.Client:
+        """Fresh session (own connection pool / TLS state) for one upload."""
+        return httpx.Client(
+            base_url=self._base_url,
+            headers={"x-goog-api-key": self._api_key},
+            timeout=httpx.Timeout(120, connect=30),
+            transport=self._transport,
+        )
+
+    def _run(self, session: ResumableUpload, filepath: str) -> dict:
+        """Carry out the session's steps with a blocking client; returns the file dict."""
+        client = self._new_client()
+        try:
+            with open(filepath, "rb") as f:
+                step = session.advance()
+                while step[0] != "done":
+                    result = error = None
+                    if step[0] == "post":
+                        try:
+                            result = client.post(**step[1])
+                        except httpx.TransportError as e:
+                            error = e
+                    elif step[0] == "read":
+                        f.seek(step[1])
+                        result = f.read(step[2])
+                    elif step[0] == "sleep":
+                        time.sleep(step[1])
+                    else:  # reconnect
+                        client.close()
+                        client = self._new_client()
+                    step = session.advance(result, error)
+            return step[1]
+        finally:
+            client.close()
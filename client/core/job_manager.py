@@ -4,42 +4,126 @@ Orchestrates the full processing pipeline:
   reserve → decrypt → cache → process → finalize → CSV → summary → cleanup
 """
 import os
+import re
 import time
+import asyncio
+import shutil
+import multiprocessing
+import hashlib
 import logging
 import threading
 import concurrent.futures
 
 from PySide6.QtCore import QObject, Signal
 
-from core.config import APP_VERSION, AES_KEY_HEX, IMAGE_EXTENSIONS, VIDEO_EXTENSIONS
+from core.config import (
+    APP_VERSION, AES_KEY_HEX, IMAGE_EXTENSIONS, VIDEO_EXTENSIONS, USE_ASYNC_ENGINE,
+    AIMD_MAX_IMAGE, AIMD_MAX_VIDEO, VIDEO_UPLOAD_CONCURRENCY,
+    ISTOCK_DICTIONARY_MODE, DICTIONARY_LOCAL_NOTE, PHOTO_BATCH_SIZE, PHOTO_BATCH_MAX, PHOTO_BATCH_WAIT_SEC,
+    DEFER_KEYWORD_PROCESSING, STAGE_TRACE_ENABLED,
+)
 from core.api_client import api, APIError, NetworkError, MaintenanceError
 from core.engines.gemini_engine import GeminiEngine, GeminiError, GeminiErrorType
+from core.engines.async_gemini_engine import AsyncGeminiEngine
 from core.engines.transcoder import Transcoder
+from core.engines.transcode_prefetcher import TranscodePrefetcher
+from core.engines.image_proxy import ImageProxy
+from core.engines.file_poller import FileStatePoller, PollerManager, RemotePoller, init_poller_process
+from core.engines.rate_limiter import RateLimiter, RemoteRateLimiter
 from core.logic.keyword_processor import KeywordProcessor
 from core.logic.copyright_guard import CopyrightGuard
+from core.logic.dictionary_index import DictionaryIndex
 from core.data.csv_exporter import CSVExporter
+from core.data.result_cache import ResultCache
 from core.managers.queue_manager import QueueManager
 from core.managers.journal_manager import JournalManager
-from utils.helpers import is_video, is_image
+from core.managers.photo_batcher import PhotoBatcher
+from core.managers import stage_trace
+from core.managers.stage_trace import StageTrace, span
+from core.managers.usage_ledger import UsageLedger
+from utils.helpers import is_video, is_image, file_content_hash
 from utils.security import decrypt_aes
 
 logger = logging.getLogger("bigeye")
 
 CACHE_THRESHOLD = 20  # Create context cache if file count >= this
 
+_PLACEHOLDER_RE = re.compile(
+    r"\{(media_type_str|keyword_count|title_min|title_limit|desc_min|desc_limit|"
+    r"video_instruction|keyword_data)\}"
+)
 
-def _video_worker_task(filepath: str, prompt: str, system_prompt: str, api_key: str, model_name: str) -> dict:
-    """Isolated worker process task for Gemini video processing. Solves SSL connection pool sharing."""
+# A packed photo request failing with these won't succeed one photo at a time either
+_BATCH_FATAL = {
+    GeminiErrorType.INVALID_KEY, GeminiErrorType.QUOTA,
+    GeminiErrorType.MODEL_NOT_FOUND, GeminiErrorType.RATE_LIMIT,
+}
+
+
+# ── Video worker processes ──
+# One GeminiEngine per worker process, built once by the pool initializer (genai.configure,
+# model object, TLS session) and reused for every video that process receives.
+_worker_engine = None
+
+
+def _init_video_worker(api_key: str, model_name: str, system_prompt: str, upload_slots=None,
+                       poller=None, limiter=None):
+    """ProcessPoolExecutor initializer: set up the engine once per worker process.
+    upload_slots: multiprocessing semaphore capping uploads across all workers.
+    poller: proxy of the PollerManager's FileStatePoller shared by all workers.
+    limiter: RemoteRateLimiter of the job's budget, shared with the parent's photos."""
+    global _worker_engine
     engine = GeminiEngine()
     engine.set_api_key(api_key)
     engine.set_model(model_name)
+    engine.set_system_prompt(system_prompt)
+    if upload_slots is not None:
+        engine.set_upload_slots(upload_slots)
+    if poller is not None:
+        FileStatePoller.install(RemotePoller(poller))
+    if limiter is not None:
+        RateLimiter.install(limiter)  # every attempt, retry and 429 penalty hits the shared buckets
     try:
-        result = engine.process_video(filepath, prompt, system_prompt)
-        return {"status": "success", "result": result}
-    except GeminiError as e:
-        return {"status": "error", "error_type": e.error_type.value, "error": str(e)}
+        engine._get_model()
     except Exception as e:
-        return {"status": "error", "error_type": "UNKNOWN", "error": str(e)}
+        logger.warning(f"Video worker warm-up failed: {e}")
+    _worker_engine = engine
+
+
+def _warm_video_worker() -> int:
+    """No-op task submitted at job start so workers (and their engines) spawn early."""
+    return os.getpid()
+
+
+def _video_worker_task(filepath: str, prompt: str, system_prompt: str,
+                       api_key: str = "", model_name: str = "") -> dict:
+    """Isolated worker process task for Gemini video processing. Solves SSL connection pool sharing."""
+    engine = _worker_engine
+    if engine is None:
+        # Pool started without the initializer — fall back to a one-off engine
+        engine = GeminiEngine()
+        engine.set_api_key(api_key)
+        engine.set_model(model_name)
+    # Spans recorded in this process are shipped back and replayed into the job trace
+    with stage_trace.collect() as trace:
+        try:
+            result = engine.process_video(filepath, prompt, system_prompt)
+            out = {"status": "success", "result": result}
+        except GeminiError as e:
+            out = {"status": "error", "error_type": e.error_type.value, "error": str(e)}
+        except Exception as e:
+            out = {"status": "error", "error_type": "UNKNOWN", "error": str(e)}
+    if trace.records:
+        out["spans"] = trace.records
+    return out
+
+
+class _VideoHelperManager(PollerManager):
+    """Helper process shared by the video workers: the FileStatePoller they wait on and
+    the job's RateLimiter."""
+
+
+_VideoHelperManager.register("rate_limiter", callable=RateLimiter, proxytype=RemoteRateLimiter)
 
 
 class JobManager(QObject):
@@ -51,12 +135,14 @@ class JobManager(QObject):
     job_failed = Signal(str)                  # error message
     credit_updated = Signal(int)              # new balance
     status_update = Signal(str)              # step description for UI
+    concurrency_changed = Signal(str, int)   # "image" | "video" | "api", window
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self._is_running = False
         self._job_token = ""
         self._results = {}       # filename → result dict
+        self._resumed_results = {}  # filename → result carried over from an interrupted job
         self._files = []
         self._settings = {}
         self._engine = GeminiEngine()
@@ -65,13 +151,32 @@ class JobManager(QObject):
         self._copyright_guard = CopyrightGuard()
         self._prompt_template = ""  # raw prompt with {placeholders}
         self._dictionary = ""       # keyword dictionary for iStock
+        self._dictionary_in_prompt = False  # legacy mode: embed the whole dictionary per request
+        self._prompts = {}          # "image" / "video" → prompt rendered once per job
+        self._prompt_digests = {}   # rendered prompt → sha256 (result cache key part)
+        self._content_hashes = {}   # filepath → ((mtime_ns, size), content hash): key + proxy name
         self._folder_path = ""
-        self._video_pool = None     # ProcessPoolExecutor for video isolation
+        self._video_pool = None     # ProcessPoolExecutor for video isolation (warm workers)
+        self._video_post = None     # ThreadPoolExecutor finishing video results off the pool threads
+        self._video_helper = None   # _VideoHelperManager: poller + rate limiter for all video workers
+        self._local_limiter = None  # this process's limiter while the helper's is installed
+        self._prefetcher = None     # TranscodePrefetcher (video proxies made ahead of upload)
+        self._photo_batcher = None  # PhotoBatcher (several photos per request, opt-in)
+        self._result_cache = None   # ResultCache (None if unavailable)
+        self._use_async = False     # AsyncGeminiEngine + async queue instead of pool threads
+        self._defer_keywords = False  # post-process keywords in one batch at export time
+        self._keyword_rules_ready = False  # blacklist/dictionary loaded (re-export may reprocess)
+        self._blacklist_matcher = None  # guard's matcher, kept for re-export after guard.clear()
+        self._trace = None          # StageTrace: per-file stage spans of this job (JSONL + percentiles)
+        self._usage = UsageLedger()  # tokens per model / media type + files per minute
+        self._rate_wait_base = (None, 0.0)  # (limiter, its total_wait at job start)
 
         # Connect queue signals
         self._queue.file_completed.connect(self._on_file_completed)
         self._queue.progress_updated.connect(self._on_progress)
         self._queue.all_completed.connect(self._on_all_completed)
+        self._queue.concurrency_changed.connect(self.concurrency_changed)
+        self._engine.set_concurrency_listener(lambda w: self.concurrency_changed.emit("api", w))
 
     @property
     def is_running(self) -> bool:
@@ -85,12 +190,19 @@ class JobManager(QObject):
         """
         Start processing job.
         settings keys: api_key, model, platform, platform_rate, keyword_style,
-                       max_keywords, title_length, description_length, balance, folder_path
+                       max_keywords, title_length, description_length, balance, folder_path,
+                       resume_results (optional: {filename: result} already done by a crashed job)
         """
         self._files = files
         self._settings = settings
         self._results = {}
+        self._resumed_results = dict(settings.get("resume_results") or {})
         self._folder_path = settings.get("folder_path", "")
+        self._defer_keywords = bool(settings.get("defer_keywords", DEFER_KEYWORD_PROCESSING))
+        self._keyword_rules_ready = False
+        self._blacklist_matcher = None
+        self._content_hashes = {}
+        self._usage = UsageLedger()
 
         api_key = settings.get("api_key", "")
         model = settings.get("model", "gemini-2.5-pro")
@@ -118,6 +230,7 @@ class JobManager(QObject):
                 video_count=vid_count,
             )
             self._job_token = reserve_data.get("job_token", "")
+            self._open_trace(settings)
             encrypted_config = reserve_data.get("config", "")
             concurrency = reserve_data.get("concurrency", {})
 
@@ -142,6 +255,15 @@ class JobManager(QObject):
                     self._dictionary = ""
             else:
                 self._dictionary = ""
+            self._dictionary_in_prompt = (
+                settings.get("dictionary_mode", ISTOCK_DICTIONARY_MODE) == "prompt"
+            )
+            # Index once per job: AI keywords are snapped to dictionary terms locally
+            self._keyword_processor.reset_memo()
+            self._keyword_processor.set_dictionary(
+                DictionaryIndex(self._dictionary) if self._dictionary else None
+            )
+            self._compile_prompts()
 
             encrypted_bl = reserve_data.get("blacklist", "")
             if encrypted_bl:
@@ -155,18 +277,36 @@ class JobManager(QObject):
                 blacklist = []
             if blacklist:
                 self._copyright_guard.initialize(blacklist)
-                self._keyword_processor.set_blacklist(set(blacklist))
+                self._keyword_processor.set_blacklist(
+                    set(blacklist), matcher=self._copyright_guard.matcher,
+                )
+                self._blacklist_matcher = self._copyright_guard.matcher
+            self._keyword_rules_ready = True
 
             self.status_update.emit("Setting up engine...")
 
             # ── Step 4: Set concurrency limits ──
             max_img = concurrency.get("image", 5)
             max_vid = concurrency.get("video", 2)
-            self._queue.set_concurrency(max_img, max_vid)
+            batch_size = self._photo_batch_size(settings) if img_count > 1 else 0
+            if batch_size > 1:
+                # Each request carries up to batch_size photos, so hold that many more slots
+                self._queue.set_concurrency(
+                    max_img * batch_size, max_vid, image_ceiling=AIMD_MAX_IMAGE * batch_size,
+                )
+            else:
+                self._queue.set_concurrency(max_img, max_vid)
 
             # ── Step 5: Configure Gemini engine ──
+            self._use_async = bool(settings.get("async_engine", USE_ASYNC_ENGINE))
+            if self._use_async and not isinstance(self._engine, AsyncGeminiEngine):
+                self._engine = AsyncGeminiEngine()
+                self._engine.set_concurrency_listener(lambda w: self.concurrency_changed.emit("api", w))
             self._engine.set_api_key(api_key)
             self._engine.set_model(model)
+            # Limiters outlive jobs (process-wide registry): report only this job's wait
+            limiter = RateLimiter.for_model(model)
+            self._rate_wait_base = (limiter, limiter.total_wait)
 
             # ลบไฟล์เก่าที่ค้างใน Gemini (ครั้งเดียวตอนเริ่ม job)
             self.status_update.emit("กำลังเตรียมระบบ...")
@@ -179,28 +319,85 @@ class JobManager(QObject):
                 self._engine.set_system_prompt(self._prompt_template)
                 if len(files) >= cache_threshold:
                     self.status_update.emit("Optimizing batch...")
+                    self._engine.cleanup_orphaned_caches()  # only expired / evicted registered caches
                     self._engine.create_cache(self._prompt_template)
 
             # ── Step 7: Create video proxies ──
-            # (done lazily inside _process_file)
+            # (prefetched by TranscodePrefetcher once the queue starts — Step 9)
+
+            # ── Step 7b: Open local result cache (re-runs skip the API) ──
+            try:
+                self._result_cache = ResultCache()
+                self._result_cache.prune()
+            except Exception as e:
+                logger.warning(f"Result cache unavailable: {e}")
+                self._result_cache = None
 
             # ── Step 8: Create journal ──
             # Use photo_rate from server response, fallback to config
             journal_rate = reserve_data.get("photo_rate", rates.get("photo", 3))
+            resume_settings = {
+                k: settings[k] for k in (
+                    "model", "platform", "keyword_style",
+                    "max_keywords", "title_length", "description_length",
+                ) if k in settings
+            }
+            resumed_paths = [
+                os.path.join(self._folder_path, fn) for fn in self._resumed_results
+            ]
             JournalManager.create_journal(
                 self._job_token, len(files), platform, journal_rate,
+                folder_path=self._folder_path,
+                files=list(files) + resumed_paths,
+                settings=resume_settings,
             )
+            if self._resumed_results:
+                JournalManager.carry_over(self._resumed_results)
 
             # ── Step 9: Initialize Video Process Pool ──
             video_files = [f for f in files if is_video(f)]
+            if video_files and not self._use_async:
+                # Use ProcessPoolExecutor to bypass GIL and separate SSL context per video process.
+                # Workers live for the whole job and build their engine once (initializer).
+                # One upload semaphore for all of them: the cap is per job, not per process.
+                mp_context = multiprocessing.get_context()
+                poller, limiter = self._start_video_helper(mp_context)
+                self._video_pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=max(max_vid, AIMD_MAX_VIDEO),
+                    mp_context=mp_context,
+                    initializer=_init_video_worker,
+                    initargs=(
+                        self._settings.get("api_key", ""),
+                        self._settings.get("model", "gemini-2.5-pro"),
+                        self._prompt_template,
+                        mp_context.BoundedSemaphore(VIDEO_UPLOAD_CONCURRENCY),
+                        poller,
+                        limiter,
+                    ),
+                )
+                for _ in range(max_vid):
+                    self._video_pool.submit(_warm_video_worker)
+                self._video_post = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=2, thread_name_prefix="video-post",
+                )
             if video_files:
-                # Use ProcessPoolExecutor to bypass GIL and separate SSL context per video process
-                self._video_pool = concurrent.futures.ProcessPoolExecutor(max_workers=max_vid)
+                # Transcode ahead of the upload stage so ffmpeg overlaps with network waits
+                self._prefetcher = TranscodePrefetcher(video_files, skip_fn=self._has_cached_result)
+                self._prefetcher.start()
+            if batch_size > 1:
+                self._photo_batcher = PhotoBatcher(
+                    self._process_photo_batch, batch_size, PHOTO_BATCH_WAIT_SEC, workers=max_img,
+                )
+                logger.info(f"Photo batching: up to {batch_size} photos per request")
 
             # ── Step 10: Start processing via QueueManager ──
             self.status_update.emit("Processing...")
             self._is_running = True
-            self._queue.start_queue(files, self._process_file)
+            self._usage.start()
+            if self._use_async:
+                self._queue.start_async_queue(files, self._process_file_async, self._engine.submit)
+            else:
+                self._queue.start_queue(files, self._process_file)
 
         except MaintenanceError as e:
             self.job_failed.emit("ระบบปิดปรับปรุงชั่วคราว กรุณาลองใหม่ภายหลัง")
@@ -220,9 +417,10 @@ class JobManager(QObject):
         self._is_running = False
         self._queue.stop()
 
-        if self._video_pool:
-            self._video_pool.shutdown(wait=False, cancel_futures=True)
-            self._video_pool = None
+        self._shutdown_video_pool()
+        self._stop_photo_batcher()
+        self._stop_prefetcher()
+        logger.info(f"Keyword memo: {self._keyword_processor.memo.summary()}")
 
         # Count what's done so far from _results
         ok = sum(1 for r in self._results.values() if r.get("status") == "success")
@@ -257,7 +455,9 @@ class JobManager(QObject):
 
         # Export CSV for completed files only
         csv_files = []
-        if ok > 0 and self._folder_path:
+        if self._defer_keywords:
+            self.process_keywords(self._export_results())
+        if self._has_exportable() and self._folder_path:
             keyword_style = self._settings.get("keyword_style", "")
             if keyword_style.lower().startswith("single"):
                 style_tag = "Single"
@@ -266,20 +466,26 @@ class JobManager(QObject):
             else:
                 style_tag = ""
             csv_files = CSVExporter.export_for_platform(
-                platform, self._results, self._folder_path, model, style_tag,
+                platform, self._export_results(), self._folder_path, model, style_tag,
             )
 
         # Move completed files to output folder
         output_folder = ""
-        if ok > 0 and self._folder_path:
+        if self._has_exportable() and self._folder_path:
             output_folder = self._move_completed_files(csv_files)
 
         # Cleanup resources
         self._engine.cleanup_prefetched()
-        self._engine.delete_cache()
+        self._engine.release_cache()
+        self._engine.close()
         self._copyright_guard.clear()
+        self._stop_prefetcher()
         Transcoder.cleanup_all_proxies()
+        ImageProxy.prune_cache()
+        self._close_result_cache()
         JournalManager.delete_journal()
+        stages = self._close_trace()
+        logger.info(self._usage.log_line())
 
         charged = (ok_photos * rates.get("photo", 3)) + (ok_videos * rates.get("video", 3))
         summary = {
@@ -294,16 +500,40 @@ class JobManager(QObject):
             "csv_files": csv_files,
             "output_folder": output_folder,
             "cancelled": True,
+            "concurrency": self._concurrency_summary(),
+            "stages": stages,
+            "usage": self._usage.summary(),
         }
         logger.info(f"Job stopped: {ok} ok, {failed} failed, {skipped} skipped, refunded={refunded}")
         self.job_completed.emit(summary)
 
     # ── File processing (runs on worker thread) ──
 
+    def _file_prompt(self, filepath: str) -> str:
+        """Prompt sent for a file (a generic one when the job has no template)."""
+        # Build prompt with placeholders filled
+        if self._prompt_template:
+            return self._build_prompt(filepath)
+        return f"Analyze this {'video' if is_video(filepath) else 'image'} and generate stock metadata in JSON with keys: title, description, keywords."
+
     def _build_prompt(self, filepath: str) -> str:
-        """Build the final prompt by filling in placeholders."""
-        is_vid = is_video(filepath)
-        media_type = "video" if is_vid else "image"
+        """Final prompt for a file: a lookup into the per-job rendered prompts."""
+        media_type = "video" if is_video(filepath) else "image"
+        prompt = self._prompts.get(media_type)
+        if prompt is None:
+            prompt = self._prompts[media_type] = self._render_prompt(media_type)
+        return prompt
+
+    def _compile_prompts(self):
+        """Render the prompt template once per job for each media type."""
+        self._prompts = {}
+        self._prompt_digests = {}
+        if self._prompt_template:
+            for media_type in ("image", "video"):
+                self._prompts[media_type] = self._render_prompt(media_type)
+
+    def _render_prompt(self, media_type: str) -> str:
+        """Fill every {placeholder} of the template in one pass."""
         max_kw = self._settings.get("max_keywords", 45)
         title_limit = self._settings.get("title_length", 70)
         desc_limit = self._settings.get("description_length", 200)
@@ -317,64 +547,198 @@ class JobManager(QObject):
 
         # Video-specific instruction
         video_instruction = ""
-        if is_vid:
+        if media_type == "video":
             video_instruction = (
                 "For video: Also provide 'poster_timecode' (best frame as HH:MM:SS:FF) "
                 "and 'shot_speed' (one of: Real Time, Slow Motion, Time Lapse)."
             )
 
-        prompt = self._prompt_template
-        prompt = prompt.replace("{media_type_str}", media_type)
-        prompt = prompt.replace("{keyword_count}", str(max_kw + 10))  # overfetch
-        prompt = prompt.replace("{title_min}", str(title_min_for_ai))
-        prompt = prompt.replace("{title_limit}", str(title_limit_for_ai))
-        prompt = prompt.replace("{desc_min}", str(desc_min_for_ai))
-        prompt = prompt.replace("{desc_limit}", str(desc_limit_for_ai))
-        prompt = prompt.replace("{video_instruction}", video_instruction)
-
-        # Insert dictionary for iStock mode
-        if "{keyword_data}" in prompt:
-            prompt = prompt.replace("{keyword_data}", self._dictionary)
+        # Insert dictionary for iStock mode (local mode: matched after generation instead)
+        if self._dictionary_in_prompt or not self._dictionary:
+            keyword_data = self._dictionary
+        else:
+            keyword_data = DICTIONARY_LOCAL_NOTE
+
+        values = {
+            "media_type_str": media_type,
+            "keyword_count": str(max_kw + 10),  # overfetch
+            "title_min": str(title_min_for_ai),
+            "title_limit": str(title_limit_for_ai),
+            "desc_min": str(desc_min_for_ai),
+            "desc_limit": str(desc_limit_for_ai),
+            "video_instruction": video_instruction,
+            "keyword_data": keyword_data,
+        }
+        return _PLACEHOLDER_RE.sub(lambda m: values[m.group(1)], self._prompt_template)
 
-        return prompt
+    def _process_file(self, filepath: str) -> dict | concurrent.futures.Future:
+        """Process a single file. Called by QueueManager worker threads.
+        Videos and batched photos return a Future so the pool thread is not parked."""
+        filename = os.path.basename(filepath)
+        start_time = time.time()
 
-    def _process_file(self, filepath: str) -> dict:
-        """Process a single file. Called by QueueManager worker threads."""
+        with stage_trace.file_scope(self._trace, filename):
+            try:
+                prompt, result_cache, cache_key, cached = self._prepare_file(filepath)
+
+                if cached is not None:
+                    result = cached
+                elif is_video(filepath):
+                    # Create proxy for video
+                    self.status_update.emit(f"Uploading / Processing: {filename}")
+                    with span("proxy", media="video"):
+                        proxy = self._get_video_proxy(filepath)
+                    process_path = proxy if proxy else filepath
+
+                    # Hand off to a warm worker process; the pool thread is freed right away
+                    # and QueueManager keeps the video slot until the returned Future resolves
+                    future = self._video_pool.submit(
+                        _video_worker_task, process_path, prompt, self._prompt_template,
+                    )
+                    return self._defer_video_result(
+                        future, proxy, result_cache, cache_key, start_time,
+                        scope=stage_trace.current(),
+                    )
+                else:
+                    # Downscaled proxy keeps upload size + RAM independent of camera resolution
+                    with span("proxy", media="image"):
+                        proxy = ImageProxy.create_proxy(
+                            filepath, content_hash=self._content_hash(filepath) if cache_key else "",
+                        )
+                    batcher = self._photo_batcher
+                    if batcher is not None:
+                        # Packed with other photos into one request; the slot is held until it resolves
+                        return batcher.add((
+                            proxy or filepath, prompt, result_cache, cache_key, start_time,
+                            stage_trace.current(),
+                        ))
+                    result = self._engine.process_photo(proxy or filepath, prompt)
+
+                return self._finish_result(result, result_cache, cache_key, cached, start_time)
+
+            except GeminiError as e:
+                return self._gemini_error_result(e, start_time)
+            except Exception as e:
+                return {
+                    "status": "error",
+                    "error": str(e),
+                    "error_type": "UNKNOWN",
+                    "processing_time": time.time() - start_time,
+                }
+
+    async def _process_file_async(self, filepath: str) -> dict:
+        """Async twin of _process_file, run on the AsyncGeminiEngine loop (no thread per file)."""
         filename = os.path.basename(filepath)
         start_time = time.time()
 
-        try:
-            # Build prompt with placeholders filled
-            if self._prompt_template:
-                prompt = self._build_prompt(filepath)
-            else:
-                prompt = f"Analyze this {'video' if is_video(filepath) else 'image'} and generate stock metadata in JSON with keys: title, description, keywords."
-
-            if is_video(filepath):
-                # Create proxy for video
-                self.status_update.emit(f"Uploading / Processing: {filename}")
-                proxy = Transcoder.create_proxy(filepath)
-                process_path = proxy if proxy else filepath
-
-                # Submit to isolated process pool to prevent SSL connection sharing issues
-                api_key = self._settings.get("api_key", "")
-                model_name = self._settings.get("model", "gemini-2.5-pro")
-                
-                future = self._video_pool.submit(
-                    _video_worker_task,
-                    process_path,
-                    prompt,
-                    self._prompt_template,
-                    api_key,
-                    model_name
+        # The scope is a ContextVar: it follows this task and its asyncio.to_thread calls
+        with stage_trace.file_scope(self._trace, filename):
+            try:
+                prompt, result_cache, cache_key, cached = await asyncio.to_thread(
+                    self._prepare_file, filepath
                 )
-                # Wait for process to complete
-                process_result = future.result()
 
-                # Cleanup proxy
+                if cached is not None:
+                    result = cached
+                elif is_video(filepath):
+                    self.status_update.emit(f"Uploading / Processing: {filename}")
+                    with span("proxy", media="video"):
+                        proxy = await asyncio.to_thread(self._get_video_proxy, filepath)
+                    try:
+                        # One event loop, one HTTP client — no SSL sharing, so no process pool
+                        result = await self._engine.aprocess_video(proxy or filepath, prompt)
+                    finally:
+                        if proxy:
+                            Transcoder.cleanup_proxy(proxy)
+                else:
+                    with span("proxy", media="image"):
+                        proxy = await asyncio.to_thread(
+                            ImageProxy.create_proxy, filepath,
+                            content_hash=self._content_hash(filepath) if cache_key else "",
+                        )
+                    result = await self._engine.aprocess_photo(proxy or filepath, prompt)
+
+                # Keyword/NLTK post-processing is CPU work — keep it off the loop
+                return await asyncio.to_thread(
+                    self._finish_result, result, result_cache, cache_key, cached, start_time
+                )
+
+            except GeminiError as e:
+                return self._gemini_error_result(e, start_time)
+            except Exception as e:
+                return {
+                    "status": "error",
+                    "error": str(e),
+                    "error_type": "UNKNOWN",
+                    "processing_time": time.time() - start_time,
+                }
+
+    def _prepare_file(self, filepath: str) -> tuple:
+        """Build the prompt and look the file up in the result cache.
+        Returns (prompt, result_cache, cache_key, cached_result_or_None)."""
+        prompt = self._file_prompt(filepath)
+        result_cache = self._result_cache  # local ref: stop_job may close it mid-file
+        cache_key = self._result_cache_key(filepath, prompt) if result_cache is not None else ""
+        with span("cache_lookup"):
+            cached = result_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            cached["_cache_hit"] = True
+            logger.debug(f"Result cache hit: {os.path.basename(filepath)}")
+            prefetcher = self._prefetcher
+            if prefetcher is not None and is_video(filepath):
+                prefetcher.discard(filepath)  # proxy not needed — free its look-ahead slot
+        return prompt, result_cache, cache_key, cached
+
+    def _has_cached_result(self, filepath: str) -> bool:
+        """Result cache already holds this file under the job's settings (no upload needed)."""
+        result_cache = self._result_cache
+        if result_cache is None:
+            return False
+        cache_key = self._result_cache_key(filepath, self._file_prompt(filepath))
+        return bool(cache_key) and result_cache.get(cache_key) is not None
+
+    def _defer_video_result(self, future: concurrent.futures.Future, proxy: str,
+                            result_cache, cache_key: str, start_time: float,
+                            scope=None) -> concurrent.futures.Future:
+        """Future of the final result dict, completed off-thread once the worker process returns.
+        scope: the file's stage-trace scope, re-entered on the finishing thread."""
+        outer = concurrent.futures.Future()
+        post = self._video_post
+
+        def _on_done(f):
+            try:
+                post.submit(
+                    self._complete_video, f, outer, proxy, result_cache, cache_key, start_time,
+                    scope,
+                )
+            except (RuntimeError, AttributeError):  # job stopped, post pool gone
                 if proxy:
                     Transcoder.cleanup_proxy(proxy)
+                outer.set_result({"status": "skipped", "error": "Job stopped"})
+
+        future.add_done_callback(_on_done)
+        return outer
+
+    def _complete_video(self, future: concurrent.futures.Future,
+                        outer: concurrent.futures.Future, proxy: str,
+                        result_cache, cache_key: str, start_time: float, scope=None):
+        """Worker-process result → final result dict (cleanup, cache, keyword post-processing)."""
+        with stage_trace.resume(scope):
+            outer.set_result(
+                self._video_result(future, proxy, result_cache, cache_key, start_time)
+            )
 
+    def _video_result(self, future: concurrent.futures.Future, proxy: str,
+                      result_cache, cache_key: str, start_time: float) -> dict:
+        """Cleanup + error mapping + post-processing for one finished video task."""
+        if proxy:
+            Transcoder.cleanup_proxy(proxy)
+        try:
+            if future.cancelled():
+                result = {"status": "skipped", "error": "Job stopped"}
+            else:
+                process_result = future.result()
+                stage_trace.replay(process_result.pop("spans", None))
                 if process_result.get("status") == "error":
                     # Convert dict error back to exception for consistent handling
                     err_type_str = process_result.get("error_type", "UNKNOWN")
@@ -383,74 +747,300 @@ class JobManager(QObject):
                     except ValueError:
                         err_type = GeminiErrorType.UNKNOWN
                     raise GeminiError(process_result.get("error", "Unknown error"), err_type)
-
-                result = process_result.get("result", {})
-            else:
-                result = self._engine.process_photo(filepath, prompt)
-
-            # Post-process keywords
-            keywords = result.get("keywords", [])
-            if keywords:
-                keywords = self._post_process_keywords(keywords)
-                result["keywords"] = keywords
-
-            # Copyright guard scan
-            if self._copyright_guard.is_initialized:
-                violations = self._copyright_guard.scan_result(result)
-                if violations:
-                    result["_copyright_violations"] = violations
-                    # Auto-clean keywords
-                    result["keywords"] = self._copyright_guard.filter_keywords(
-                        result.get("keywords", [])
-                    )
-
-            result["status"] = "success"
-            result["processing_time"] = time.time() - start_time
-            return result
-
+                result = self._finish_result(
+                    process_result.get("result", {}), result_cache, cache_key, None, start_time,
+                )
         except GeminiError as e:
-            if e.error_type == GeminiErrorType.RATE_LIMIT:
-                user_msg = "ส่งงานเร็วเกินไป กรุณารอสักครู่แล้วลองใหม่"
-            elif e.error_type == GeminiErrorType.SAFETY:
-                user_msg = "เนื้อหาไม่ผ่านตัวกรองความปลอดภัย"
-            elif e.error_type == GeminiErrorType.TIMEOUT:
-                user_msg = "ประมวลผลนานเกินไป กรุณาลองใหม่"
-            elif e.error_type == GeminiErrorType.CONTENT_TOO_LARGE:
-                user_msg = "ไฟล์ใหญ่เกินไป กรุณาลดขนาดวิดีโอ"
-            elif e.error_type == GeminiErrorType.INVALID_KEY:
-                user_msg = "API Key ไม่ถูกต้อง กรุณาตรวจสอบ"
-            elif e.error_type == GeminiErrorType.MODEL_NOT_FOUND:
-                user_msg = "ไม่พบ Model ที่เลือก กรุณาเปลี่ยน Model"
-            elif e.error_type == GeminiErrorType.QUOTA:
-                user_msg = "Quota หมด กรุณาตรวจสอบ API Key"
-            else:
-                user_msg = "ไม่สามารถประมวลผลได้ กรุณาลองใหม่"
-            return {
-                "status": "error",
-                "error": user_msg,
-                "error_type": e.error_type.value,
-                "processing_time": time.time() - start_time,
-            }
+            result = self._gemini_error_result(e, start_time)
         except Exception as e:
-            return {
+            result = {
                 "status": "error",
                 "error": str(e),
                 "error_type": "UNKNOWN",
                 "processing_time": time.time() - start_time,
             }
+        return result
+
+    @staticmethod
+    def _photo_batch_size(settings: dict) -> int:
+        """Photos per request (0 = off). The async engine sends photos one by one."""
+        if settings.get("async_engine", USE_ASYNC_ENGINE):
+            return 0
+        try:
+            size = int(settings.get("photo_batch_size", PHOTO_BATCH_SIZE) or 0)
+        except (TypeError, ValueError):
+            return 0
+        return min(size, PHOTO_BATCH_MAX)
+
+    def _process_photo_batch(self, items: list) -> list:
+        """PhotoBatcher callback: one packed request per prompt, single-photo retry for
+        entries that are missing/invalid or when the packed request itself fails."""
+        results = [None] * len(items)
+        groups = {}
+        for i, item in enumerate(items):
+            groups.setdefault(item[1], []).append(i)
+
+        for prompt, indices in groups.items():
+            raw = [None] * len(indices)
+            if len(indices) > 1:
+                try:
+                    # One request for several files: its spans go under a "batch[N]" entry
+                    with stage_trace.file_scope(self._trace, f"batch[{len(indices)}]"):
+                        raw = self._engine.process_photo_batch(
+                            [items[i][0] for i in indices], prompt,
+                        )
+                except GeminiError as e:
+                    if e.error_type in _BATCH_FATAL:
+                        for i in indices:
+                            results[i] = self._gemini_error_result(e, items[i][4])
+                        continue
+                    logger.warning(
+                        f"Photo batch of {len(indices)} failed [{e.error_type.value}], "
+                        f"retrying one by one"
+                    )
+            for i, result in zip(indices, raw):
+                results[i] = self._finish_photo(items[i], result)
+        return results
+
+    def _finish_photo(self, item: tuple, result) -> dict:
+        """Final result for one photo of a batch (falls back to a single-photo request).
+        item: (path, prompt, result_cache, cache_key, start_time[, stage-trace scope])."""
+        path, prompt, result_cache, cache_key, start_time = item[:5]
+        with stage_trace.resume(item[5] if len(item) > 5 else None):
+            try:
+                if result is None:
+                    result = self._engine.process_photo(path, prompt)
+                return self._finish_result(result, result_cache, cache_key, None, start_time)
+            except GeminiError as e:
+                return self._gemini_error_result(e, start_time)
+            except Exception as e:
+                return {
+                    "status": "error",
+                    "error": str(e),
+                    "error_type": "UNKNOWN",
+                    "processing_time": time.time() - start_time,
+                }
+
+    def _stop_photo_batcher(self):
+        if self._photo_batcher is not None:
+            self._photo_batcher.stop()
+            self._photo_batcher = None
+
+    def _start_video_helper(self, mp_context) -> tuple:
+        """
+        Start the helper process every video worker shares: the FileStatePoller they wait on
+        and the job's RateLimiter, installed in this process too so photos and videos draw
+        on one RPM/TPM budget. Returns (poller, limiter) proxies for the worker initializer;
+        (None, None) if the helper won't start (each worker then polls and paces on its own).
+        """
+        model = self._settings.get("model", "gemini-2.5-pro")
+        try:
+            manager = _VideoHelperManager(ctx=mp_context)
+            manager.start(init_poller_process, (self._settings.get("api_key", ""),))
+        except Exception as e:
+            logger.warning(f"Video helper process unavailable: {e}")
+            return None, None
+        self._video_helper = manager
+        local = RateLimiter.for_model(model)
+        limiter = manager.rate_limiter(model, local.rpm, local.tpm)
+        self._local_limiter = RateLimiter.install(limiter)
+        return manager.poller(), limiter
+
+    def _shutdown_video_pool(self):
+        if self._video_pool is not None:
+            self._video_pool.shutdown(wait=False, cancel_futures=True)
+            self._video_pool = None
+        if self._video_post is not None:
+            self._video_post.shutdown(wait=False)
+            self._video_post = None
+        if self._local_limiter is not None:
+            self._restore_local_limiter()
+        if self._video_helper is not None:
+            try:
+                self._video_helper.shutdown()
+            except Exception as e:
+                logger.debug(f"Video helper shutdown: {e}")
+            self._video_helper = None
+
+    def _restore_local_limiter(self):
+        """Re-install this process's limiter, carrying over the wait spent on the shared one
+        (the job's rate-limit wait is read from it after the helper is gone)."""
+        local, self._local_limiter = self._local_limiter, None
+        shared = RateLimiter.install(local)
+        try:
+            local._add_wait(shared.total_wait)
+        except Exception as e:
+            logger.debug(f"Shared rate limiter unavailable: {e}")
+
+    def _get_video_proxy(self, filepath: str) -> str:
+        """Prefetched proxy if the transcode stage is running, else transcode inline."""
+        prefetcher = self._prefetcher
+        if prefetcher is not None:
+            return prefetcher.get(filepath)
+        return Transcoder.create_proxy(filepath)
+
+    def _stop_prefetcher(self):
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+            self._prefetcher = None
+
+    def _finish_result(self, result: dict, result_cache, cache_key: str,
+                       cached, start_time: float) -> dict:
+        """Cache the raw AI result, then post-process keywords + copyright guard."""
+        # Store the raw AI result before post-processing mutates it (a reply repaired
+        # after truncation is not cached, so a re-run asks for the full answer again)
+        if cached is None and cache_key and not result.get("_repaired"):
+            with span("cache_store"):
+                result_cache.put(cache_key, result)
+
+        # Post-process keywords (raw list kept so export / re-export can redo it locally)
+        keywords = result.get("keywords", [])
+        if keywords:
+            result["raw_keywords"] = list(keywords)
+            if not self._defer_keywords:
+                with span("keywords"):
+                    result["keywords"] = self._post_process_keywords(keywords)
+                result["_keyword_settings"] = self._keyword_settings()
+
+        # Copyright guard scan
+        if self._copyright_guard.is_initialized:
+            with span("copyright"):
+                violations = self._copyright_guard.scan_result(result)
+            if violations:
+                result["_copyright_violations"] = violations
+                # Auto-clean keywords
+                result["keywords"] = self._copyright_guard.filter_keywords(
+                    result.get("keywords", [])
+                )
+
+        result["status"] = "success"
+        result["processing_time"] = time.time() - start_time
+        return result
+
+    @staticmethod
+    def _gemini_error_result(e: GeminiError, start_time: float) -> dict:
+        """Map a classified Gemini error to the user-facing (Thai) error result."""
+        if e.error_type == GeminiErrorType.RATE_LIMIT:
+            user_msg = "ส่งงานเร็วเกินไป กรุณารอสักครู่แล้วลองใหม่"
+        elif e.error_type == GeminiErrorType.SAFETY:
+            user_msg = "เนื้อหาไม่ผ่านตัวกรองความปลอดภัย"
+        elif e.error_type == GeminiErrorType.TIMEOUT:
+            user_msg = "ประมวลผลนานเกินไป กรุณาลองใหม่"
+        elif e.error_type == GeminiErrorType.CONTENT_TOO_LARGE:
+            user_msg = "ไฟล์ใหญ่เกินไป กรุณาลดขนาดวิดีโอ"
+        elif e.error_type == GeminiErrorType.INVALID_KEY:
+            user_msg = "API Key ไม่ถูกต้อง กรุณาตรวจสอบ"
+        elif e.error_type == GeminiErrorType.MODEL_NOT_FOUND:
+            user_msg = "ไม่พบ Model ที่เลือก กรุณาเปลี่ยน Model"
+        elif e.error_type == GeminiErrorType.QUOTA:
+            user_msg = "Quota หมด กรุณาตรวจสอบ API Key"
+        else:
+            user_msg = "ไม่สามารถประมวลผลได้ กรุณาลองใหม่"
+        return {
+            "status": "error",
+            "error": user_msg,
+            "error_type": e.error_type.value,
+            "processing_time": time.time() - start_time,
+        }
+
+    def _result_cache_key(self, filepath: str, prompt: str) -> str:
+        """Cache key for this file under the current job settings ("" if caching is off)."""
+        if self._result_cache is None:
+            return ""
+        try:
+            content_hash = self._content_hash(filepath)
+        except OSError:
+            return ""
+        return ResultCache.make_key(
+            content_hash,
+            model=self._settings.get("model", "gemini-2.5-pro"),
+            platform=self._settings.get("platform", "iStock"),
+            keyword_style=self._settings.get("keyword_style", ""),
+            prompt=self._prompt_digest(prompt),
+            max_keywords=self._settings.get("max_keywords", 45),
+            title_length=self._settings.get("title_length", 70),
+            description_length=self._settings.get("description_length", 200),
+        )
+
+    def _content_hash(self, filepath: str) -> str:
+        """file_content_hash, read once per file per job (the image proxy name reuses it).
+        Re-read only if the file's mtime or size changed since."""
+        st = os.stat(filepath)
+        stamp = (st.st_mtime_ns, st.st_size)
+        known = self._content_hashes.get(filepath)
+        if known is not None and known[0] == stamp:
+            return known[1]
+        with span("hash"):
+            content_hash = file_content_hash(filepath)
+        self._content_hashes[filepath] = (stamp, content_hash)
+        return content_hash
+
+    def _prompt_digest(self, prompt: str) -> str:
+        """sha256 of a prompt, computed once per rendered prompt (not once per file)."""
+        digest = self._prompt_digests.get(prompt)
+        if digest is None:
+            digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+            self._prompt_digests[prompt] = digest
+        return digest
+
+    def _close_result_cache(self):
+        if self._result_cache is not None:
+            self._result_cache.close()
+            self._result_cache = None
 
     def _post_process_keywords(self, keywords: list) -> list:
         """Apply keyword processing based on platform/style settings."""
-        platform = self._settings.get("platform", "iStock")
-        style = self._settings.get("keyword_style", "")
-        max_kw = self._settings.get("max_keywords", 45)
+        pipeline = KeywordProcessor.pipeline_for(
+            self._settings.get("platform", "iStock"), self._settings.get("keyword_style", ""),
+        )
+        return self._keyword_processor.process(
+            keywords, pipeline, self._settings.get("max_keywords", 45),
+        )
+
+    def _keyword_settings(self, settings: dict = None) -> dict:
+        """The settings a result's keywords were produced with (re-export compares these)."""
+        settings = settings if settings is not None else self._settings
+        return {
+            "platform": settings.get("platform", "iStock"),
+            "keyword_style": settings.get("keyword_style", ""),
+            "max_keywords": settings.get("max_keywords", 45),
+        }
 
-        if "istock" in platform.lower():
-            return self._keyword_processor.process_istock(keywords, max_kw)
-        elif style.lower().startswith("single"):
-            return self._keyword_processor.process_single(keywords, max_kw)
-        else:
-            return self._keyword_processor.process_hybrid(keywords, max_kw)
+    def process_keywords(self, results: dict, settings: dict = None) -> int:
+        """
+        Batch keyword post-processing over finished results, from their raw AI keywords.
+        Used at export in deferred mode, and by re-export with another style / max_keywords
+        (settings overrides the job's) — no network involved. Results already processed
+        with these settings and keywords edited by the user are left alone.
+        Returns the number updated.
+        """
+        if not self._keyword_rules_ready:
+            return 0  # blacklist / dictionary never loaded — keep keywords as they are
+        settings = {**self._settings, **(settings or {})}
+        wanted = self._keyword_settings(settings)
+        pipeline = KeywordProcessor.pipeline_for(wanted["platform"], wanted["keyword_style"])
+        targets = [
+            r for r in results.values()
+            if r.get("status") == "success" and isinstance(r.get("raw_keywords"), list)
+            and not r.get("_keywords_edited") and r.get("_keyword_settings") != wanted
+        ]
+        if not targets:
+            return 0
+        processed = self._keyword_processor.process_batch(
+            [r["raw_keywords"] for r in targets], pipeline, wanted["max_keywords"],
+        )
+        # The guard is cleared when the job ends; its matcher is kept for re-export
+        matcher = self._copyright_guard.matcher or self._blacklist_matcher
+        for result, keywords in zip(targets, processed):
+            if matcher is not None:
+                keywords = [kw for kw in keywords if not matcher.contains(kw)]
+            result["keywords"] = keywords
+            result["_keyword_settings"] = wanted
+        logger.info(
+            f"Keywords processed in batch: {len(targets)} results ({pipeline}), "
+            f"memo {self._keyword_processor.memo.summary()}"
+        )
+        return len(targets)
 
     # ── Signal handlers ──
 
@@ -464,9 +1054,15 @@ class JobManager(QObject):
 
         is_vid = is_video(filepath)
         success = result.get("status") == "success"
+        if self._trace is not None and "processing_time" in result:
+            elapsed = result["processing_time"]
+            self._trace.add(filename, "total", time.time() - elapsed, elapsed,
+                            status=result.get("status", ""), cached=bool(result.get("_cache_hit")))
+        self._usage.record(self._settings.get("model", "gemini-2.5-pro"),
+                           "video" if is_vid else "image", result)
 
-        # Update journal
-        JournalManager.update_progress(success, is_vid)
+        # Append per-file record (with metadata) to the journal
+        JournalManager.update_progress(success, is_vid, filename, result)
 
         # Emit to UI
         self.file_completed.emit(filepath, result)
@@ -507,7 +1103,9 @@ class JobManager(QObject):
 
         # ── Export CSV ──
         csv_files = []
-        if ok > 0 and self._folder_path:
+        if self._defer_keywords:
+            self.process_keywords(self._export_results())
+        if self._has_exportable() and self._folder_path:
             keyword_style = self._settings.get("keyword_style", "")
             # Shorten style name for filename
             if keyword_style.lower().startswith("single"):
@@ -517,12 +1115,12 @@ class JobManager(QObject):
             else:
                 style_tag = ""
             csv_files = CSVExporter.export_for_platform(
-                platform, self._results, self._folder_path, model, style_tag,
+                platform, self._export_results(), self._folder_path, model, style_tag,
             )
 
         # ── Move completed files to output folder ──
         output_folder = ""
-        if ok > 0 and self._folder_path:
+        if self._has_exportable() and self._folder_path:
             output_folder = self._move_completed_files(csv_files)
 
         # ── Play completion sound ──
@@ -530,10 +1128,19 @@ class JobManager(QObject):
 
         # ── Cleanup ──
         self._engine.cleanup_prefetched()
-        self._engine.delete_cache()
+        self._engine.release_cache()
+        self._engine.close()
         self._copyright_guard.clear()
+        self._shutdown_video_pool()
+        self._stop_photo_batcher()
+        self._stop_prefetcher()
+        logger.info(f"Keyword memo: {self._keyword_processor.memo.summary()}")
         Transcoder.cleanup_all_proxies()
+        ImageProxy.prune_cache()
+        self._close_result_cache()
         JournalManager.delete_journal()
+        stages = self._close_trace()
+        logger.info(self._usage.log_line())
 
         # ── Build summary ──
         charged = (ok * rates.get("photo", 3)) + (videos * rates.get("video", 3))
@@ -548,11 +1155,57 @@ class JobManager(QObject):
             "balance": new_balance,
             "csv_files": csv_files,
             "output_folder": output_folder,
+            "concurrency": self._concurrency_summary(),
+            "stages": stages,
+            "usage": self._usage.summary(),
         }
 
         logger.info(f"Job complete: {ok} ok, {failed} failed, {skipped} skipped, refunded={refunded}")
         self.job_completed.emit(summary)
 
+    def _concurrency_summary(self) -> dict:
+        """Final AIMD windows + history (images/videos/API calls) for summary and debug log."""
+        info = self._queue.concurrency()
+        info["api"] = self._engine.api_concurrency
+        limiter = RateLimiter.for_model(self._settings.get("model", "gemini-2.5-pro"))
+        base_limiter, base_wait = self._rate_wait_base
+        if base_limiter is not limiter:  # replaced by set_rate_limits during the job
+            base_wait = 0.0
+        info["rate_limit_wait"] = round(limiter.total_wait - base_wait, 1)
+        logger.info(
+            f"Concurrency at end: image={info['image']}, video={info['video']}, api={info['api']}, "
+            f"rate-limit wait={info['rate_limit_wait']}s ({limiter.rpm} RPM / {limiter.tpm} TPM)"
+        )
+        return info
+
+    def _open_trace(self, settings: dict):
+        """Start this job's stage trace (JSONL in TRACE_DIR) unless disabled."""
+        self._close_trace()
+        if settings.get("stage_trace", STAGE_TRACE_ENABLED):
+            self._trace = StageTrace.for_job(self._job_token)
+
+    def _close_trace(self) -> dict:
+        """Close the stage trace; returns per-stage percentiles for the job summary."""
+        trace, self._trace = self._trace, None
+        if trace is None:
+            return {}
+        trace.close()
+        stages = trace.summary()
+        if stages:
+            logger.info("Stage timings (p50/p95 s): " + ", ".join(
+                f"{name}={info['p50']}/{info['p95']}" for name, info in stages.items()
+            ) + f" — trace {trace.path}")
+        return stages
+
+    def _export_results(self) -> dict:
+        """Results for CSV/move: carried-over results from a resumed job + this job's."""
+        if not self._resumed_results:
+            return self._results
+        return {**self._resumed_results, **self._results}
+
+    def _has_exportable(self) -> bool:
+        return any(r.get("status") == "success" for r in self._export_results().values())
+
     def _move_completed_files(self, csv_files: list) -> str:
         """สร้างโฟลเดอร์ output และย้ายไฟล์ที่สำเร็จ + CSV ไปไว้ใน folder นั้น
         Returns: path ของ output folder (หรือ "" ถ้าล้มเหลว)
@@ -567,11 +1220,16 @@ class JobManager(QObject):
             logger.warning(f"Cannot create output folder: {e}")
             return ""
 
-        # ย้ายไฟล์ที่ประมวลผลสำเร็จ
+        # ย้ายไฟล์ที่ประมวลผลสำเร็จ (รวมไฟล์จาก job ที่ resume มา)
+        results = self._export_results()
         moved = 0
-        for filepath in self._files:
+        filepaths = list(self._files) + [
+            os.path.join(self._folder_path, fn) for fn in self._resumed_results
+            if fn not in self._results
+        ]
+        for filepath in filepaths:
             filename = os.path.basename(filepath)
-            if self._results.get(filename, {}).get("status") == "success":
+            if results.get(filename, {}).get("status") == "success":
                 dest = os.path.join(output_dir, filename)
                 try:
                     shutil.move(filepath, dest)
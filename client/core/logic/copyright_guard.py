@@ -2,10 +2,13 @@
 BigEye Pro — Copyright Guard (Task B-08)
 Filters trademarked and blacklisted terms from metadata.
 Supports single-word and multi-word blacklist entries with word-boundary matching.
+All terms are matched in one scan by a shared TermMatcher (Aho-Corasick).
 """
 import re
 import logging
-from typing import List, Set, Tuple
+from typing import List, Optional, Set, Tuple
+
+from core.logic.term_matcher import TermMatcher
 
 logger = logging.getLogger("bigeye")
 
@@ -15,7 +18,7 @@ class CopyrightGuard:
 
     def __init__(self):
         self._blacklist: Set[str] = set()
-        self._patterns: list = []  # Compiled regex patterns
+        self._matcher: Optional[TermMatcher] = None  # built once in initialize()
         self._initialized = False
 
     @property
@@ -26,17 +29,16 @@ class CopyrightGuard:
     def word_count(self) -> int:
         return len(self._blacklist)
 
+    @property
+    def matcher(self) -> Optional[TermMatcher]:
+        """The blacklist automaton (shared with KeywordProcessor.set_blacklist)."""
+        return self._matcher
+
     def initialize(self, blacklist_words: list):
-        """Load blacklist words and compile regex patterns."""
+        """Load blacklist words and build the word-boundary matcher."""
         self._blacklist = {w.lower().strip() for w in blacklist_words if w.strip()}
-        # Compile patterns for word-boundary matching (sorted longest first)
-        sorted_words = sorted(self._blacklist, key=len, reverse=True)
-        self._patterns = [
-            re.compile(r'\b' + re.escape(w) + r'\b', re.IGNORECASE)
-            for w in sorted_words
-        ]
+        self._matcher = TermMatcher(self._blacklist)
         self._initialized = True
-        pass  # initialized silently
 
     def is_blacklisted(self, word: str) -> bool:
         """Check if a single word/phrase is in the blacklist."""
@@ -59,11 +61,7 @@ class CopyrightGuard:
         """
         if not self._blacklist or not text:
             return []
-        found = []
-        for pattern in self._patterns:
-            if pattern.search(text):
-                found.append(pattern.pattern.replace(r'\b', '').replace('\\', ''))
-        return found
+        return self._matcher.terms_in(text)
 
     def clean_text(self, text: str) -> Tuple[str, List[str]]:
         """
@@ -72,13 +70,20 @@ class CopyrightGuard:
         """
         if not self._blacklist or not text:
             return text, []
+        spans = self._matcher.spans(text)
+        if not spans:
+            return text, []
         removed = []
-        cleaned = text
-        for pattern in self._patterns:
-            if pattern.search(cleaned):
-                match_text = pattern.pattern.replace(r'\b', '').replace('\\', '')
-                removed.append(match_text)
-                cleaned = pattern.sub('***', cleaned)
+        parts = []
+        last = 0
+        for term, start, end in spans:
+            parts.append(text[last:start])
+            parts.append('***')
+            last = end
+            if term not in removed:
+                removed.append(term)
+        parts.append(text[last:])
+        cleaned = "".join(parts)
         # Clean up multiple asterisks and extra spaces
         cleaned = re.sub(r'\*{3,}', '***', cleaned)
         cleaned = re.sub(r'\s+', ' ', cleaned).strip()
@@ -111,14 +116,11 @@ class CopyrightGuard:
     def clear(self):
         """Clear blacklist data."""
         self._blacklist.clear()
-        self._patterns.clear()
+        self._matcher = None
         self._initialized = False
 
     def _contains_blacklisted(self, text: str) -> bool:
         """Check if text contains any blacklisted term (word-boundary)."""
-        if not text:
+        if not text or self._matcher is None:
             return False
-        for pattern in self._patterns:
-            if pattern.search(text):
-                return True
-        return False
+        return self._matcher.contains(text)
@@ -0,0 +1,96 @@
+"""
+BigEye Pro — Keyword Dictionary Index
+Client-side lookup over the iStock keyword dictionary, built once per job.
+Terms are normalized (lowercase, punctuation stripped, IRREGULAR_MAP, Snowball stem) so
+free-form AI keywords snap to the nearest valid dictionary terms locally — the prompt no
+longer has to carry the whole dictionary.
+"""
+import re
+import logging
+from typing import List
+
+from core.logic.keyword_processor import IRREGULAR_MAP, _get_stemmer
+
+logger = logging.getLogger("bigeye")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def normalize_tokens(text: str) -> tuple:
+    """'Smiling Young-Women!' → ('smile', 'young', 'woman') (stemmed when NLTK is available)."""
+    stemmer = _get_stemmer()
+    tokens = []
+    for word in _TOKEN_RE.findall(text.lower()):
+        word = IRREGULAR_MAP.get(word, word)
+        tokens.append(stemmer.stem(word) if stemmer is not None else word)
+    return tuple(tokens)
+
+
+class DictionaryIndex:
+    """
+    Normalized term → canonical dictionary term, with phrase-aware matching.
+    match("smiling young woman outdoors") finds "Young Woman" + "Smile" + "Outdoors"
+    (longest dictionary phrases first, then remaining single words).
+    """
+
+    def __init__(self, dictionary):
+        """dictionary: newline-separated text (server format) or an iterable of terms."""
+        if isinstance(dictionary, str):
+            dictionary = dictionary.splitlines()
+        self._terms = {}             # normalized token tuple → canonical term
+        self._max_len = 1            # longest phrase, in tokens
+        for raw in dictionary:
+            term = raw.strip() if isinstance(raw, str) else ""
+            if not term:
+                continue
+            key = normalize_tokens(term)
+            if key and key not in self._terms:
+                self._terms[key] = term
+                self._max_len = max(self._max_len, len(key))
+        logger.info(f"Dictionary index: {len(self._terms)} terms")
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, keyword: str) -> bool:
+        return normalize_tokens(keyword) in self._terms
+
+    def match(self, keyword: str) -> List[str]:
+        """Dictionary terms covered by one free-form keyword ([] if none)."""
+        tokens = normalize_tokens(keyword)
+        if not tokens:
+            return []
+        exact = self._terms.get(tokens)
+        if exact is not None:
+            return [exact]
+
+        # Greedy longest-phrase-first scan over the keyword's tokens
+        found = []
+        i = 0
+        while i < len(tokens):
+            for size in range(min(self._max_len, len(tokens) - i), 0, -1):
+                term = self._terms.get(tokens[i:i + size])
+                if term is not None:
+                    found.append(term)
+                    i += size
+                    break
+            else:
+                i += 1
+        return found
+
+    def snap(self, keywords: list, match=None) -> list:
+        """Map AI keywords onto dictionary terms, in order, without duplicates.
+        Keywords with no dictionary match are dropped (iStock is dictionary-strict).
+        match: optional memoized stand-in for self.match (see KeywordProcessor)."""
+        match = match or self.match
+        result = []
+        seen = set()
+        for keyword in keywords:
+            if not isinstance(keyword, str):
+                continue
+            for term in match(keyword):
+                key = term.lower()
+                if key not in seen:
+                    seen.add(key)
+                    result.append(term)
+        return result
@@ -6,7 +6,11 @@ Uses NLTK Snowball stemmer for stem-based dedup (matches Streamlit logic).
 """
 import re
 import logging
-from typing import List, Set
+import threading
+from typing import Callable, List, Optional, Set
+
+from core.config import KEYWORD_MEMO_SIZE
+from core.logic.term_matcher import TermMatcher
 
 logger = logging.getLogger("bigeye")
 
@@ -52,24 +56,149 @@ GENERIC_BLACKLIST = {
 }
 
 
+_LEADING_TRAILING_RE = re.compile(r'^[^\w]+|[^\w]+$')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class KeywordMemo:
+    """
+    Bounded, job-scoped memo for per-keyword normalization (clean, stem, dictionary match).
+    The same stock vocabulary repeats across thousands of files, so after the first few
+    files almost every lookup is a dict hit. Each table is emptied once it holds max_size
+    entries (keeps memory bounded without LRU bookkeeping on the hot path).
+    """
+
+    def __init__(self, max_size: int = KEYWORD_MEMO_SIZE):
+        self._max_size = max(1, max_size)
+        self._tables = {}            # table name → {key: value}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, table: str, key, compute: Callable):
+        entries = self._tables.get(table)
+        if entries is None:
+            entries = self._tables.setdefault(table, {})
+        try:
+            value = entries[key]
+        except KeyError:
+            value = compute()
+            with self._lock:
+                self.misses += 1
+                if len(entries) >= self._max_size:
+                    entries.clear()
+                entries[key] = value
+            return value
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def clear(self, table: Optional[str] = None):
+        """Drop one table (e.g. after the dictionary changes) or everything, stats included."""
+        with self._lock:
+            if table is not None:
+                self._tables.pop(table, None)
+                return
+            self._tables = {}
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._tables.values())
+
+    def summary(self) -> str:
+        return (f"{self.hits} hits / {self.misses} misses "
+                f"({self.hit_rate:.0%} hit rate, {len(self)} entries)")
+
+
 class KeywordProcessor:
     """Post-processes AI-generated keywords based on platform rules."""
 
     def __init__(self):
         self._blacklist: Set[str] = set()
+        self._matcher: Optional[TermMatcher] = None
+        self._dictionary = None  # DictionaryIndex (iStock: snap keywords to valid terms)
+        self._memo = KeywordMemo()
+
+    @property
+    def memo(self) -> KeywordMemo:
+        return self._memo
+
+    def reset_memo(self):
+        """Start a fresh memo (call once per job)."""
+        self._memo.clear()
 
-    def set_blacklist(self, words: set):
-        """Set blacklisted words (lowercase)."""
+    def set_blacklist(self, words: set, matcher: Optional[TermMatcher] = None):
+        """Set blacklisted words (lowercase).
+        Pass CopyrightGuard.matcher to reuse its automaton instead of building another."""
         self._blacklist = {w.lower().strip() for w in words if w.strip()}
+        if matcher is None or set(matcher.terms) != self._blacklist:
+            matcher = TermMatcher(self._blacklist)
+        self._matcher = matcher
+        self._memo.clear("blocked")
+
+    def set_dictionary(self, index):
+        """Set the iStock DictionaryIndex (None = keep AI keywords as-is)."""
+        self._dictionary = index if index is not None and len(index) else None
+        self._memo.clear("match")
 
     # ── Public pipelines ──
 
+    @staticmethod
+    def pipeline_for(platform: str, keyword_style: str) -> str:
+        """Settings → pipeline name: "istock", "single" or "hybrid"."""
+        if "istock" in (platform or "").lower():
+            return "istock"
+        if (keyword_style or "").lower().startswith("single"):
+            return "single"
+        return "hybrid"
+
+    def process(self, keywords: list, pipeline: str, max_count: int = 45) -> list:
+        """Run one named pipeline (see pipeline_for)."""
+        if pipeline == "istock":
+            return self.process_istock(keywords, max_count)
+        if pipeline == "single":
+            return self.process_single(keywords, max_count)
+        if pipeline == "hybrid":
+            return self.process_hybrid(keywords, max_count)
+        raise ValueError(f"Unknown keyword pipeline: {pipeline}")
+
+    def process_batch(self, keyword_lists: list, pipeline: str, max_count: int = 45) -> list:
+        """
+        Run one pipeline over many keyword lists in a single call (export / re-export).
+        Identical lists are processed once; clean / stem / dictionary / blacklist lookups are
+        shared through the memo. Returns one new list per input list, same order.
+        """
+        done = {}                    # tuple(keywords) → processed list
+        results = []
+        for keywords in keyword_lists:
+            keywords = keywords if isinstance(keywords, list) else []
+            try:
+                key = tuple(keywords)
+                hash(key)
+            except TypeError:
+                key = None
+            processed = done.get(key) if key is not None else None
+            if processed is None:
+                processed = self.process(keywords, pipeline, max_count)
+                if key is not None:
+                    done[key] = processed
+            results.append(list(processed))
+        return results
+
     def process_istock(self, keywords: list, max_count: int = 45) -> list:
         """
-        iStock pipeline: clean → case-insensitive dedup → blacklist → trim.
+        iStock pipeline: clean → dictionary snap → case-insensitive dedup → blacklist → trim.
         Keeps original phrases (multi-word allowed).
         """
         cleaned = self._clean(keywords)
+        if self._dictionary is not None:
+            cleaned = self._dictionary.snap(cleaned, match=self._match_dictionary)
         deduped = self._dedup_case_insensitive(cleaned)
         filtered = self._filter_blacklist(deduped)
         return filtered[:max_count]
@@ -139,16 +268,26 @@ class KeywordProcessor:
         for kw in keywords:
             if not isinstance(kw, str):
                 continue
-            # Strip whitespace and quotes
-            kw = kw.strip().strip('"').strip("'").strip()
-            # Remove leading/trailing punctuation (keep internal hyphens/spaces)
-            kw = re.sub(r'^[^\w]+|[^\w]+$', '', kw)
-            # Collapse internal whitespace
-            kw = re.sub(r'\s+', ' ', kw).strip()
-            if kw and len(kw) >= 2:
+            kw = self._memo.get("clean", kw, lambda raw=kw: self._clean_one(raw))
+            if kw:
                 result.append(kw)
         return result
 
+    @staticmethod
+    def _clean_one(kw: str) -> str:
+        """One keyword → cleaned form ("" if it should be dropped)."""
+        # Strip whitespace and quotes
+        kw = kw.strip().strip('"').strip("'").strip()
+        # Remove leading/trailing punctuation (keep internal hyphens/spaces)
+        kw = _LEADING_TRAILING_RE.sub('', kw)
+        # Collapse internal whitespace
+        kw = _WHITESPACE_RE.sub(' ', kw).strip()
+        return kw if len(kw) >= 2 else ""
+
+    def _match_dictionary(self, keyword: str) -> list:
+        """DictionaryIndex.match, memoized per job."""
+        return self._memo.get("match", keyword, lambda: self._dictionary.match(keyword))
+
     def _dedup_case_insensitive(self, keywords: list) -> list:
         """Remove duplicates case-insensitively, keeping first occurrence."""
         seen = set()
@@ -184,7 +323,7 @@ class KeywordProcessor:
             if w_lower in IRREGULAR_MAP:
                 w_lower = IRREGULAR_MAP[w_lower]
 
-            stem = stemmer.stem(w_lower)
+            stem = self._memo.get("stem", w_lower, lambda w=w_lower: stemmer.stem(w))
 
             if stem in stem_best:
                 # Keep the shorter word
@@ -199,15 +338,8 @@ class KeywordProcessor:
         """Remove keywords that contain any blacklisted word."""
         if not self._blacklist:
             return keywords
-        result = []
-        for kw in keywords:
-            kw_lower = kw.lower()
-            # Check if any blacklisted word appears as a whole word in the keyword
-            blocked = False
-            for bw in self._blacklist:
-                if re.search(r'\b' + re.escape(bw) + r'\b', kw_lower):
-                    blocked = True
-                    break
-            if not blocked:
-                result.append(kw)
-        return result
+        # One automaton scan per distinct keyword per job (whole-word, case-insensitive)
+        return [
+            kw for kw in keywords
+            if not self._memo.get("blocked", kw, lambda k=kw: self._matcher.contains(k))
+        ]
@@ -0,0 +1,117 @@
+"""
+BigEye Pro — Term Matcher
+Aho-Corasick automaton over a term list (blacklist) with regex-style word boundaries.
+One scan of a text finds every blacklisted term and its span, whatever the number of
+terms. Built once per job and shared by CopyrightGuard and KeywordProcessor.
+"""
+from collections import deque
+from typing import Iterable, List, Tuple
+
+
+def _is_word(ch: str) -> bool:
+    """Same notion of a word character as regex \\w."""
+    return ch.isalnum() or ch == "_"
+
+
+def _lower(text: str) -> str:
+    """Lowercase without changing length (so spans stay valid for the original text)."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+class TermMatcher:
+    """
+    Case-insensitive multi-term matcher with \\b...\\b semantics:
+    TermMatcher(["nike", "coca cola"]).find("Nike and Coca Cola") →
+    [("nike", 0, 4), ("coca cola", 9, 18)]
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self._terms = sorted({t.lower().strip() for t in terms if t and t.strip()})
+        self._goto = [{}]            # state → {char: next state}
+        self._fail = [0]
+        self._out = [[]]             # state → indices of terms ending here
+        for index, term in enumerate(self._terms):
+            self._add(term, index)
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    @property
+    def terms(self) -> List[str]:
+        return list(self._terms)
+
+    def find(self, text: str) -> List[Tuple[str, int, int]]:
+        """Every (term, start, end) whose span sits on word boundaries — may overlap."""
+        if not text or not self._terms:
+            return []
+        lowered = _lower(text)
+        goto, fail, out, terms = self._goto, self._fail, self._out, self._terms
+        found = []
+        state = 0
+        for pos, ch in enumerate(lowered):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                term = terms[index]
+                start = pos + 1 - len(term)
+                if self._on_boundaries(lowered, start, pos + 1):
+                    found.append((term, start, pos + 1))
+        return found
+
+    def contains(self, text: str) -> bool:
+        """True if any term occurs in text (word-boundary)."""
+        return bool(self.find(text))
+
+    def terms_in(self, text: str) -> List[str]:
+        """Distinct terms found in text, longest first."""
+        unique = {term for term, _, _ in self.find(text)}
+        return sorted(unique, key=lambda t: (-len(t), t))
+
+    def spans(self, text: str) -> List[Tuple[str, int, int]]:
+        """Non-overlapping matches, preferring longer terms — for in-place replacement."""
+        chosen = []
+        taken = [False] * len(text)
+        for term, start, end in sorted(self.find(text), key=lambda m: (m[1] - m[2], m[1])):
+            if not any(taken[start:end]):
+                chosen.append((term, start, end))
+                taken[start:end] = [True] * (end - start)
+        return sorted(chosen, key=lambda m: m[1])
+
+    # ── Internal helpers ──
+
+    def _add(self, term: str, index: int):
+        state = 0
+        for ch in term:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(index)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    @staticmethod
+    def _on_boundaries(text: str, start: int, end: int) -> bool:
+        """Regex \\b at both ends: word-ness differs across each edge."""
+        before = _is_word(text[start - 1]) if start > 0 else False
+        after = _is_word(text[end]) if end < len(text) else False
+        return (before != _is_word(text[start])) and (after != _is_word(text[end - 1]))
@@ -0,0 +1,154 @@
+"""
+BigEye Pro — Adaptive Concurrency
+AIMD window used in place of a fixed semaphore: grows by one slot after a full
+window of clean results, shrinks multiplicatively on RATE_LIMIT / TIMEOUT.
+Throughput follows the user's real Gemini tier instead of a server constant.
+"""
+import time
+import logging
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+from core.config import AIMD_DECREASE_FACTOR, AIMD_COOLDOWN_SEC
+
+logger = logging.getLogger("bigeye")
+
+# classify_error() types that mean "too much in flight"
+CONGESTION_ERRORS = {"RATE_LIMIT", "TIMEOUT"}
+
+
+class AdaptiveConcurrency:
+    """
+    Resizable semaphore with an AIMD controller.
+    acquire()/release() behave like a semaphore whose size is the current window;
+    record() feeds outcomes back (success grows, congestion shrinks).
+    """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 0,
+                 decrease_factor: float = AIMD_DECREASE_FACTOR,
+                 cooldown_sec: float = AIMD_COOLDOWN_SEC,
+                 name: str = "", history_size: int = 200):
+        self._name = name
+        self._min = max(1, minimum)
+        self._max = max(maximum, initial, self._min)
+        self._window = min(max(initial, self._min), self._max)
+        self._decrease_factor = decrease_factor
+        self._cooldown_sec = cooldown_sec
+        self._in_flight = 0
+        self._successes = 0          # clean results since last change
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._history = deque(maxlen=history_size)
+        self._listener: Optional[Callable[[int], None]] = None
+        self._log_change("start")
+
+    # ── Semaphore interface ──
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Block until a slot inside the current window is free."""
+        with self._cond:
+            ok = self._cond.wait_for(lambda: self._in_flight < self._window, timeout)
+            if ok:
+                self._in_flight += 1
+            return ok
+
+    def release(self):
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._cond.notify()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+    # ── Feedback ──
+
+    def record(self, error_type: str = ""):
+        """Feed one outcome: "" = success, classify_error type value otherwise."""
+        if not error_type:
+            self.on_success()
+        elif error_type in CONGESTION_ERRORS:
+            self.on_congestion(error_type)
+        # Other errors (safety, bad key, ...) say nothing about load
+
+    def on_success(self):
+        """Additive increase: +1 slot once a full window completed without congestion."""
+        with self._cond:
+            self._successes += 1
+            if self._successes < self._window or self._window >= self._max:
+                return
+            self._window += 1
+            self._successes = 0
+            self._cond.notify()
+            window = self._log_change("increase")
+        self._notify(window)
+
+    def on_congestion(self, reason: str = "RATE_LIMIT"):
+        """Multiplicative decrease, at most once per cooldown (one cut per burst of 429s)."""
+        with self._cond:
+            self._successes = 0
+            now = time.monotonic()
+            if self._last_decrease and now - self._last_decrease < self._cooldown_sec:
+                return
+            self._last_decrease = now
+            new_window = max(self._min, int(self._window * self._decrease_factor))
+            if new_window == self._window:
+                return
+            self._window = new_window
+            window = self._log_change(reason.lower())
+        logger.info(f"Concurrency {self._name or 'window'} reduced to {window} ({reason})")
+        self._notify(window)
+
+    def reset(self, initial: int, maximum: int = 0):
+        """Restart the controller with a new starting window (e.g. server config)."""
+        with self._cond:
+            self._max = max(maximum or self._max, initial, self._min)
+            self._window = min(max(initial, self._min), self._max)
+            self._successes = 0
+            self._last_decrease = 0.0
+            self._history.clear()
+            self._cond.notify_all()
+            window = self._log_change("start")
+        self._notify(window)
+
+    # ── Observability ──
+
+    def set_listener(self, callback: Optional[Callable[[int], None]]):
+        """callback(window) is called (outside the lock) whenever the window changes."""
+        self._listener = callback
+
+    @property
+    def window(self) -> int:
+        return self._window
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def maximum(self) -> int:
+        return self._max
+
+    def history(self) -> list:
+        """[{time, window, reason}, ...] oldest first; time is epoch seconds."""
+        with self._cond:
+            return list(self._history)
+
+    def _log_change(self, reason: str) -> int:
+        """Append to history. Caller holds the lock."""
+        self._history.append({"time": time.time(), "window": self._window, "reason": reason})
+        return self._window
+
+    def _notify(self, window: int):
+        cb = self._listener
+        if cb is None:
+            return
+        try:
+            cb(window)
+        except Exception as e:
+            logger.debug(f"Concurrency listener failed: {e}")
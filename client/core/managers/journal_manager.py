@@ -1,23 +1,49 @@
 """
 BigEye Pro — Journal Manager (Task B-09)
-Handles crash recovery via recovery.json journal file.
-On startup: detects unfinished jobs → finalizes with backend → refunds unused credits.
+Handles crash recovery via a recovery.json header + append-only recovery.log.
+Each completed file appends one JSON line (with its metadata result); fsync is batched.
+On startup: detects unfinished jobs → replays the log → finalizes with backend → refunds unused credits
+→ offers to resume (completed results kept, only remaining files re-queued).
 """
 import json
 import os
+import time
 import logging
+import threading
 
 from core.config import RECOVERY_PATH
 
 logger = logging.getLogger("bigeye")
 
+# fsync the log after this many records or seconds, whichever comes first.
+# Every record is still flushed to the OS immediately, so an app crash loses nothing;
+# only a power loss can drop the last unsynced batch.
+FSYNC_EVERY_RECORDS = 20
+FSYNC_INTERVAL_SEC = 2.0
+
+
+def _log_path() -> str:
+    """Path of the append-only per-file log that sits next to the header."""
+    return os.path.splitext(RECOVERY_PATH)[0] + ".log"
+
 
 class JournalManager:
     """Manages recovery journal for crash recovery."""
 
+    _lock = threading.Lock()
+    _log_file = None          # open append handle
+    _log_file_path = ""       # path the handle belongs to
+    _unsynced = 0
+    _last_sync = 0.0
+
     @staticmethod
-    def create_journal(job_token: str, file_count: int, mode: str, credit_rate: int):
-        """Create a new recovery journal at start of job."""
+    def create_journal(job_token: str, file_count: int, mode: str, credit_rate: int,
+                       folder_path: str = "", files: list | None = None,
+                       settings: dict | None = None):
+        """
+        Create a new recovery journal at start of job.
+        folder_path/files/settings are kept so an interrupted job can be resumed.
+        """
         data = {
             "job_token": job_token,
             "file_count": file_count,
@@ -27,52 +53,113 @@ class JournalManager:
             "failed_count": 0,
             "photo_count": 0,
             "video_count": 0,
+            "folder_path": folder_path,
+            "files": list(files or []),
+            "settings": dict(settings or {}),
         }
         os.makedirs(os.path.dirname(RECOVERY_PATH), exist_ok=True)
-        with open(RECOVERY_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        with JournalManager._lock:
+            JournalManager._close_log()
+            try:
+                os.remove(_log_path())
+            except OSError:
+                pass
+            with open(RECOVERY_PATH, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
         logger.info(f"Journal created: {job_token}, {file_count} files, {mode}")
 
     @staticmethod
-    def update_progress(success: bool, is_video: bool):
-        """Update journal with per-file progress."""
-        journal = JournalManager.read_journal()
-        if not journal:
-            return
-        if success:
-            journal["success_count"] += 1
-        else:
-            journal["failed_count"] += 1
-        if is_video:
-            journal["video_count"] += 1
-        else:
-            journal["photo_count"] += 1
+    def update_progress(success: bool, is_video: bool,
+                        filename: str = "", result: dict | None = None):
+        """Append one per-file record to the journal log (O(1), no rewrite)."""
+        record = {
+            "file": filename,
+            "success": success,
+            "is_video": is_video,
+            "result": result or {},
+        }
         try:
-            with open(RECOVERY_PATH, "w", encoding="utf-8") as f:
-                json.dump(journal, f, indent=2)
-        except OSError as e:
-            logger.warning(f"Journal update failed: {e}")
+            line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        except (TypeError, ValueError):
+            line = json.dumps({**record, "result": {}}) + "\n"
+
+        JournalManager._append(line)
+
+    @staticmethod
+    def carry_over(results: dict):
+        """
+        Record results finished by an earlier (resumed) job.
+        They are kept for a later resume but not counted toward this job's finalize.
+        """
+        for filename, result in results.items():
+            record = {"file": filename, "carried": True, "result": result}
+            try:
+                line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+            except (TypeError, ValueError):
+                continue
+            JournalManager._append(line)
+        JournalManager.sync()
+
+    @staticmethod
+    def sync():
+        """Force any batched records to disk."""
+        with JournalManager._lock:
+            f = JournalManager._log_file
+            if f is None:
+                return
+            try:
+                f.flush()
+                os.fsync(f.fileno())
+                JournalManager._unsynced = 0
+                JournalManager._last_sync = time.monotonic()
+            except (OSError, ValueError):
+                pass
 
     @staticmethod
     def read_journal() -> dict | None:
-        """Read existing recovery journal."""
+        """
+        Read the journal header and replay the per-file log.
+        Returns header with up-to-date counters plus "results": {filename: result}.
+        """
         if not os.path.isfile(RECOVERY_PATH):
             return None
         try:
             with open(RECOVERY_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
+                journal = json.load(f)
         except (json.JSONDecodeError, OSError):
             return None
 
+        results = {}
+        for record in JournalManager._replay_log():
+            if record.get("carried"):
+                results[record.get("file", "")] = record.get("result", {})
+                continue
+            if record.get("success"):
+                journal["success_count"] = journal.get("success_count", 0) + 1
+            else:
+                journal["failed_count"] = journal.get("failed_count", 0) + 1
+            if record.get("is_video"):
+                journal["video_count"] = journal.get("video_count", 0) + 1
+            else:
+                journal["photo_count"] = journal.get("photo_count", 0) + 1
+            if record.get("file"):
+                results[record["file"]] = record.get("result", {})
+        journal["results"] = results
+        return journal
+
     @staticmethod
     def delete_journal():
         """Delete the recovery journal."""
-        try:
-            if os.path.isfile(RECOVERY_PATH):
-                os.remove(RECOVERY_PATH)
-                logger.info("Journal deleted")
-        except OSError as e:
-            logger.warning(f"Journal delete failed: {e}")
+        with JournalManager._lock:
+            JournalManager._close_log()
+            try:
+                if os.path.isfile(_log_path()):
+                    os.remove(_log_path())
+                if os.path.isfile(RECOVERY_PATH):
+                    os.remove(RECOVERY_PATH)
+                    logger.info("Journal deleted")
+            except OSError as e:
+                logger.warning(f"Journal delete failed: {e}")
 
     @staticmethod
     def recover_on_startup(api_client=None) -> dict | None:
@@ -106,6 +193,20 @@ class JournalManager:
                 unprocessed = total - ok - failed
                 refunded = (unprocessed + failed) * rate
 
+        # Resume data: successful results are kept, everything else is re-queued
+        results = journal.get("results", {})
+        ok_results = {
+            fn: r for fn, r in results.items()
+            if fn and r.get("status") == "success"
+        }
+        folder_path = journal.get("folder_path", "")
+        remaining = [
+            fp for fp in journal.get("files", [])
+            if os.path.basename(fp) not in ok_results and os.path.isfile(fp)
+        ]
+        resumable = bool(folder_path and os.path.isdir(folder_path)
+                         and (remaining or ok_results))
+
         recovery_info = {
             "platform": journal.get("mode", "Unknown"),
             "total_files": total,
@@ -114,7 +215,91 @@ class JournalManager:
             "failed_count": failed,
             "credits_reserved": total * rate,
             "refunded": refunded,
+            "results": results,
+            "ok_results": ok_results,
+            "folder_path": folder_path,
+            "remaining_files": remaining,
+            "settings": journal.get("settings", {}),
+            "resumable": resumable,
         }
 
         JournalManager.delete_journal()
         return recovery_info
+
+    # ── Internal helpers ──
+
+    @staticmethod
+    def _append(line: str):
+        """Append one line to the log, fsyncing in batches."""
+        with JournalManager._lock:
+            f = JournalManager._get_log()
+            if f is None:
+                return
+            try:
+                f.write(line)
+                f.flush()
+                JournalManager._unsynced += 1
+                now = time.monotonic()
+                if (JournalManager._unsynced >= FSYNC_EVERY_RECORDS
+                        or now - JournalManager._last_sync >= FSYNC_INTERVAL_SEC):
+                    os.fsync(f.fileno())
+                    JournalManager._unsynced = 0
+                    JournalManager._last_sync = now
+            except OSError as e:
+                logger.warning(f"Journal update failed: {e}")
+
+    @staticmethod
+    def _get_log():
+        """Open (or reuse) the append handle. Returns None when no journal exists. Caller holds _lock."""
+        path = _log_path()
+        if JournalManager._log_file is not None and JournalManager._log_file_path == path:
+            return JournalManager._log_file
+        JournalManager._close_log()
+        if not os.path.isfile(RECOVERY_PATH):
+            return None
+        try:
+            JournalManager._log_file = open(path, "a", encoding="utf-8")
+            JournalManager._log_file_path = path
+            JournalManager._last_sync = time.monotonic()
+        except OSError as e:
+            logger.warning(f"Journal log open failed: {e}")
+            return None
+        return JournalManager._log_file
+
+    @staticmethod
+    def _close_log():
+        """fsync + close the append handle. Caller holds _lock."""
+        f = JournalManager._log_file
+        JournalManager._log_file = None
+        JournalManager._log_file_path = ""
+        JournalManager._unsynced = 0
+        if f is None:
+            return
+        try:
+            f.flush()
+            os.fsync(f.fileno())
+        except (OSError, ValueError):
+            pass
+        try:
+            f.close()
+        except OSError:
+            pass
+
+    @staticmethod
+    def _replay_log():
+        """Yield records from the log; a torn final line (crash mid-write) is skipped."""
+        path = _log_path()
+        if not os.path.isfile(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        except OSError as e:
+            logger.warning(f"Journal log read failed: {e}")
@@ -0,0 +1,108 @@
+"""
+BigEye Pro — Photo Batcher
+Collects photos handed over by queue workers and runs them through one callback in
+groups of up to `batch_size` (flushed early after `max_wait` seconds), so several images
+share a single generate_content request. Each add() returns a Future for that photo.
+"""
+import logging
+import threading
+import time
+import concurrent.futures
+from typing import Callable
+
+logger = logging.getLogger("bigeye")
+
+
+class PhotoBatcher:
+    """
+    Size/time-bounded batching in front of `run_fn(items) -> list[result]`
+    (one result per item, same order). Batches run on `workers` threads.
+    """
+
+    def __init__(self, run_fn: Callable[[list], list], batch_size: int,
+                 max_wait: float, workers: int = 2):
+        self._run_fn = run_fn
+        self._batch_size = max(1, batch_size)
+        self._max_wait = max_wait
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="photo-batch",
+        )
+        self._pending = []           # [(item, Future)]
+        self._deadline = 0.0         # flush time of the current partial batch
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._timer, name="photo-batcher", daemon=True)
+        self._thread.start()
+        # Stats for the debug log
+        self.batches = 0
+        self.items = 0
+
+    def add(self, item) -> concurrent.futures.Future:
+        """Queue one photo; the Future resolves to its result dict."""
+        future = concurrent.futures.Future()
+        with self._cond:
+            if self._stopped:
+                future.cancel()
+                return future
+            if not self._pending:
+                self._deadline = time.monotonic() + self._max_wait
+                self._cond.notify_all()
+            self._pending.append((item, future))
+            if len(self._pending) >= self._batch_size:
+                self._flush_locked()
+        return future
+
+    def stop(self):
+        """Cancel photos still waiting for a batch; running batches finish on their own."""
+        with self._cond:
+            self._stopped = True
+            pending, self._pending = self._pending, []
+            self._cond.notify_all()
+        for _, future in pending:
+            future.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self.batches:
+            logger.info(
+                f"Photo batching: {self.items} photos in {self.batches} requests "
+                f"(avg {self.items / self.batches:.1f}/request)"
+            )
+
+    # ── Internal helpers ──
+
+    def _timer(self):
+        """Flush a partial batch once it has waited max_wait."""
+        with self._cond:
+            while not self._stopped:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                self._flush_locked()
+
+    def _flush_locked(self):
+        batch, self._pending = self._pending, []
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            self._pool.submit(self._run, batch)
+        except RuntimeError:  # pool shut down by stop()
+            for _, future in batch:
+                future.cancel()
+
+    def _run(self, batch: list):
+        items = [item for item, _ in batch]
+        try:
+            results = self._run_fn(items)
+        except Exception as e:
+            logger.error(f"Photo batch failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for i, (_, future) in enumerate(batch):
+            if i < len(results):
+                future.set_result(results[i])
+            else:
+                future.set_exception(RuntimeError("Photo batch returned too few results"))
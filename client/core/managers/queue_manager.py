@@ -1,28 +1,38 @@
 """
 BigEye Pro — Queue Manager (Task B-09)
-Manages concurrent file processing using QThreadPool with QSemaphore.
-Image: max 5 concurrent, Video: max 2 concurrent.
+Manages concurrent file processing using QThreadPool with adaptive (AIMD) windows.
+Image/Video start at the server limits (5/2) and then track the user's real API tier.
+With an asyncio engine, start_async_queue() schedules coroutines instead of pool threads.
 """
 import os
+import time
 import logging
 import threading
+import concurrent.futures
+from collections import deque
 from typing import Callable, Optional
 
 from PySide6.QtCore import QObject, Signal, QThreadPool, QSemaphore, QRunnable, Slot
 
+from core.config import AIMD_MAX_IMAGE, AIMD_MAX_VIDEO
+from core.managers.adaptive_concurrency import AdaptiveConcurrency
 from utils.helpers import is_video
 
 logger = logging.getLogger("bigeye")
 
 
 class FileWorker(QRunnable):
-    """Processes a single file on a thread pool thread."""
+    """
+    Processes a single file on a thread pool thread.
+    process_fn may return a concurrent.futures.Future (e.g. a video handed to a worker
+    process): the pool thread is freed at once and the slot is held until it resolves.
+    """
 
     class Signals(QObject):
         completed = Signal(str, dict)  # filepath, result_or_error
 
     def __init__(self, filepath: str, process_fn: Callable,
-                 semaphore: QSemaphore, stop_flag: threading.Event):
+                 semaphore: QSemaphore | AdaptiveConcurrency, stop_flag: threading.Event):
         super().__init__()
         self.filepath = filepath
         self._process_fn = process_fn
@@ -35,6 +45,7 @@ class FileWorker(QRunnable):
     def run(self):
         # Acquire semaphore (blocks until slot available)
         self._semaphore.acquire()
+        deferred = False
         try:
             if self._stop_flag.is_set():
                 self.signals.completed.emit(self.filepath, {
@@ -43,6 +54,10 @@ class FileWorker(QRunnable):
                 return
 
             result = self._process_fn(self.filepath)
+            if isinstance(result, concurrent.futures.Future):
+                deferred = True
+                result.add_done_callback(self._deferred_callback())
+                return
             self.signals.completed.emit(self.filepath, result)
 
         except Exception as e:
@@ -53,7 +68,29 @@ class FileWorker(QRunnable):
                 "error_type": type(e).__name__,
             })
         finally:
-            self._semaphore.release()
+            if not deferred:
+                self._semaphore.release()
+
+    def _deferred_callback(self) -> Callable:
+        """Done-callback for a deferred result. Captures plain refs: the QRunnable
+        itself is auto-deleted as soon as run() returns."""
+        filepath, signals, semaphore = self.filepath, self.signals, self._semaphore
+
+        def _done(future: concurrent.futures.Future):
+            try:
+                if future.cancelled():
+                    result = {"status": "skipped", "error": "Job stopped"}
+                else:
+                    result = future.result()
+            except Exception as e:
+                logger.error(f"Worker error {os.path.basename(filepath)}: {e}")
+                result = {"status": "error", "error": str(e), "error_type": type(e).__name__}
+            try:
+                signals.completed.emit(filepath, result)
+            finally:
+                semaphore.release()
+
+        return _done
 
 
 class QueueManager(QObject):
@@ -62,23 +99,56 @@ class QueueManager(QObject):
     progress_updated = Signal(int, int)  # current, total
     file_completed = Signal(str, dict)   # filepath, result
     all_completed = Signal()
+    concurrency_changed = Signal(str, int)  # "image" | "video", window
+    _async_completed = Signal(str, dict)    # loop thread → main thread hop
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self._pool = QThreadPool()
         self._pool.setMaxThreadCount(10)  # 5 image + 3 video + headroom
-        self._image_semaphore = QSemaphore(5)
-        self._video_semaphore = QSemaphore(3)
+        self._image_semaphore = AdaptiveConcurrency(5, maximum=AIMD_MAX_IMAGE, name="image")
+        self._video_semaphore = AdaptiveConcurrency(3, maximum=AIMD_MAX_VIDEO, name="video")
+        self._image_semaphore.set_listener(lambda w: self._on_window_changed("image", w))
+        self._video_semaphore.set_listener(lambda w: self._on_window_changed("video", w))
         self._stop_event = threading.Event()
         self._completed_count = 0
         self._total_count = 0
         self._lock = threading.Lock()
+        # Async mode: files waiting / running per kind (no pool threads involved)
+        self._pending = {"image": deque(), "video": deque()}
+        self._in_flight = {"image": 0, "video": 0}
+        self._coro_fn = None
+        self._submit = None
+        self._async_completed.connect(self._on_file_completed)
+
+    def set_concurrency(self, max_images: int = 5, max_videos: int = 3,
+                        image_ceiling: int = AIMD_MAX_IMAGE):
+        """Set starting concurrency from server config (windows adapt from there).
+        image_ceiling is raised when photos are packed several per request."""
+        self._image_semaphore.reset(max_images, image_ceiling)
+        self._video_semaphore.reset(max_videos, AIMD_MAX_VIDEO)
+        self._resize_pool()
+
+    def concurrency(self) -> dict:
+        """Current windows + change history, for the UI / job summary."""
+        return {
+            "image": self._image_semaphore.window,
+            "video": self._video_semaphore.window,
+            "image_history": self._image_semaphore.history(),
+            "video_history": self._video_semaphore.history(),
+        }
 
-    def set_concurrency(self, max_images: int = 5, max_videos: int = 3):
-        """Set concurrency limits from server config."""
-        self._image_semaphore = QSemaphore(max_images)
-        self._video_semaphore = QSemaphore(max_videos)
-        self._pool.setMaxThreadCount(max_images + max_videos + 3)
+    def _on_window_changed(self, kind: str, window: int):
+        """AIMD listener (worker thread): keep enough pool threads for the new window."""
+        self._resize_pool()
+        self.concurrency_changed.emit(kind, window)
+        if self._submit is not None:
+            self._pump()
+
+    def _resize_pool(self):
+        self._pool.setMaxThreadCount(
+            self._image_semaphore.window + self._video_semaphore.window + 3
+        )
 
     def start_queue(self, files: list, process_fn: Callable):
         """
@@ -88,6 +158,7 @@ class QueueManager(QObject):
         self._stop_event.clear()
         self._completed_count = 0
         self._total_count = len(files)
+        self._submit = None
 
         logger.info(f"Queue started: {self._total_count} files")
 
@@ -100,8 +171,81 @@ class QueueManager(QObject):
             worker.signals.completed.connect(self._on_file_completed)
             self._pool.start(worker)
 
+    def start_async_queue(self, files: list, coro_fn: Callable, submit: Callable):
+        """
+        Queue files on an asyncio engine instead of pool threads.
+        coro_fn(filepath) → coroutine returning the result dict;
+        submit(coro) → concurrent.futures.Future (e.g. AsyncGeminiEngine.submit).
+        Files in flight per kind are capped by the same adaptive windows.
+        """
+        self._stop_event.clear()
+        self._completed_count = 0
+        self._total_count = len(files)
+        with self._lock:
+            self._pending = {"image": deque(), "video": deque()}
+            self._in_flight = {"image": 0, "video": 0}
+            for filepath in files:
+                self._pending["video" if is_video(filepath) else "image"].append(filepath)
+            self._coro_fn = coro_fn
+            self._submit = submit
+
+        logger.info(f"Async queue started: {self._total_count} files")
+        self._pump()
+
+    def _pump(self):
+        """Start pending files while each kind is under its window (stop → skip the rest)."""
+        to_start, to_skip = [], []
+        with self._lock:
+            windows = {"image": self._image_semaphore.window, "video": self._video_semaphore.window}
+            for kind, pending in self._pending.items():
+                if self._stop_event.is_set():
+                    to_skip.extend(pending)
+                    pending.clear()
+                    continue
+                while pending and self._in_flight[kind] < windows[kind]:
+                    self._in_flight[kind] += 1
+                    to_start.append((kind, pending.popleft()))
+
+        for filepath in to_skip:
+            self._async_completed.emit(filepath, {"status": "skipped", "error": "Job stopped"})
+        for kind, filepath in to_start:
+            try:
+                future = self._submit(self._coro_fn(filepath))
+            except Exception as e:
+                logger.error(f"Async submit failed {os.path.basename(filepath)}: {e}")
+                with self._lock:
+                    self._in_flight[kind] -= 1
+                self._async_completed.emit(filepath, {
+                    "status": "error", "error": str(e), "error_type": type(e).__name__,
+                })
+                continue
+            future.add_done_callback(
+                lambda f, k=kind, fp=filepath: self._on_async_done(k, fp, f)
+            )
+
+    def _on_async_done(self, kind: str, filepath: str, future):
+        """Future callback (engine loop thread): report the result, then refill the window."""
+        if future.cancelled():
+            result = {"status": "skipped", "error": "Job stopped"}
+        else:
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Worker error {os.path.basename(filepath)}: {e}")
+                result = {"status": "error", "error": str(e), "error_type": type(e).__name__}
+        with self._lock:
+            self._in_flight[kind] -= 1
+        self._async_completed.emit(filepath, result)
+        self._pump()
+
     def _on_file_completed(self, filepath: str, result: dict):
         """Handle completion of a single file."""
+        # Feed the outcome back to the AIMD window (skipped files / cache hits say nothing about load)
+        status = result.get("status")
+        if status in ("success", "error") and not result.get("_cache_hit"):
+            sem = self._video_semaphore if is_video(filepath) else self._image_semaphore
+            sem.record("" if status == "success" else result.get("error_type", ""))
+
         with self._lock:
             self._completed_count += 1
             current = self._completed_count
@@ -118,16 +262,29 @@ class QueueManager(QObject):
         """Signal all workers to stop."""
         self._stop_event.set()
         logger.info("Queue stop requested")
+        if self._submit is not None:
+            self._pump()  # flush async pending files as skipped
 
     def reset(self):
         """Reset for new job."""
         self._stop_event.clear()
         self._completed_count = 0
         self._total_count = 0
+        self._coro_fn = None
+        self._submit = None
 
     def wait_for_done(self, timeout_ms: int = 30000) -> bool:
         """Wait for all queued tasks to finish. Returns True if all done."""
-        return self._pool.waitForDone(timeout_ms)
+        if self._submit is None:
+            return self._pool.waitForDone(timeout_ms)
+        deadline = time.monotonic() + timeout_ms / 1000
+        while time.monotonic() < deadline:
+            with self._lock:
+                busy = any(self._in_flight.values()) or any(self._pending.values())
+            if not busy:
+                return True
+            time.sleep(0.05)
+        return False
 
     @property
     def is_stopped(self) -> bool:
@@ -0,0 +1,196 @@
+"""
+BigEye Pro — Stage Trace
+Lightweight per-file timing spans (file read, proxy, upload, PROCESSING wait, generate
+attempts, backoff sleeps, JSON parse, keyword post-processing, copyright scan ...).
+
+JobManager opens one StageTrace per job and runs each file inside file_scope(); code
+anywhere below it just does `with span("upload"):`. The active scope lives in a
+ContextVar, so it follows asyncio tasks and asyncio.to_thread; hand it across other
+threads with current() / resume(). Spans outside any scope cost one ContextVar lookup.
+
+Each span becomes one JSONL line in the job's trace file, and durations are kept per
+stage so summary() can report p50 / p95 at the end of the job.
+"""
+import os
+import json
+import math
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+from core.config import TRACE_DIR, STAGE_TRACE_KEEP
+
+logger = logging.getLogger("bigeye")
+
+# (StageTrace, filename) of the file being worked on in this thread / task
+_scope = contextvars.ContextVar("bigeye_stage_scope", default=None)
+
+
+class StageTrace:
+    """Span sink for one job: append-only JSONL file + in-memory durations per stage."""
+
+    def __init__(self, path: str = "", keep_records: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._durations = {}          # stage → [seconds, ...]
+        self.records = [] if keep_records else None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._file = open(path, "a", encoding="utf-8")
+            except OSError as e:
+                logger.warning(f"Stage trace unavailable: {e}")
+
+    @classmethod
+    def for_job(cls, job_token: str) -> "StageTrace":
+        """Trace file for a job in TRACE_DIR (older traces beyond STAGE_TRACE_KEEP removed)."""
+        _prune(TRACE_DIR, STAGE_TRACE_KEEP - 1)
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        safe_token = "".join(c for c in job_token[:16] if c.isalnum() or c in "-_") or "job"
+        return cls(os.path.join(TRACE_DIR, f"{stamp}_{safe_token}.jsonl"))
+
+    def add(self, file: str, stage: str, start: float, seconds: float, **attrs):
+        """Record one finished span (start = wall-clock epoch seconds)."""
+        record = {"file": file, "stage": stage, "start": round(start, 4),
+                  "dur": round(seconds, 4)}
+        record.update(attrs)
+        self.add_record(record)
+
+    def add_record(self, record: dict):
+        """Record a span dict as produced by add() (e.g. replayed from a worker process)."""
+        with self._lock:
+            self._durations.setdefault(record["stage"], []).append(record["dur"])
+            if self.records is not None:
+                self.records.append(record)
+            if self._file is not None:
+                try:
+                    self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                except (OSError, TypeError, ValueError) as e:
+                    logger.debug(f"Stage trace write failed: {e}")
+
+    def summary(self) -> dict:
+        """{stage: {count, total, p50, p95, max}} in seconds."""
+        with self._lock:
+            durations = {stage: sorted(values) for stage, values in self._durations.items()}
+        return {
+            stage: {
+                "count": len(values),
+                "total": round(sum(values), 2),
+                "p50": round(_percentile(values, 50), 3),
+                "p95": round(_percentile(values, 95), 3),
+                "max": round(values[-1], 3),
+            }
+            for stage, values in sorted(durations.items())
+        }
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
+
+
+@contextmanager
+def file_scope(trace, file: str):
+    """Attribute spans opened in this thread / task to `file` (no-op if trace is None)."""
+    if trace is None:
+        yield
+        return
+    token = _scope.set((trace, file))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def current():
+    """The active (trace, file) scope, to hand to another thread with resume()."""
+    return _scope.get()
+
+
+@contextmanager
+def resume(scope):
+    """Re-enter a scope captured with current() on another thread."""
+    if scope is None:
+        yield
+        return
+    token = _scope.set(scope)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+@contextmanager
+def collect():
+    """Fresh in-memory scope (e.g. inside a worker process); yields the StageTrace whose
+    .records are sent back and replayed into the job trace."""
+    trace = StageTrace(keep_records=True)
+    with file_scope(trace, ""):
+        yield trace
+
+
+@contextmanager
+def span(stage: str, **attrs):
+    """Time the enclosed block as `stage` for the current file. An exception escaping
+    the block is recorded as the span's error (and re-raised)."""
+    scope = _scope.get()
+    if scope is None:
+        yield
+        return
+    start = time.time()
+    began = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        attrs["error"] = type(e).__name__
+        raise
+    finally:
+        trace, file = scope
+        trace.add(file, stage, start, time.perf_counter() - began, **attrs)
+
+
+def record(stage: str, seconds: float, **attrs):
+    """Record an already-measured duration for the current file."""
+    scope = _scope.get()
+    if scope is not None:
+        trace, file = scope
+        trace.add(file, stage, time.time() - seconds, seconds, **attrs)
+
+
+def replay(records: list, file: str = ""):
+    """Add spans collected elsewhere (worker process) to the current scope's trace."""
+    scope = _scope.get()
+    if scope is None or not records:
+        return
+    trace, scoped_file = scope
+    for rec in records:
+        if isinstance(rec, dict) and "stage" in rec and "dur" in rec:
+            trace.add_record({**rec, "file": file or scoped_file})
+
+
+def _percentile(ordered: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _prune(folder: str, keep: int):
+    """Delete all but the newest `keep` trace files."""
+    try:
+        names = sorted(n for n in os.listdir(folder) if n.endswith(".jsonl"))
+    except OSError:
+        return
+    for name in names[:max(0, len(names) - max(0, keep))]:
+        try:
+            os.remove(os.path.join(folder, name))
+        except OSError:
+            pass
@@ -0,0 +1,90 @@
+"""
+BigEye Pro — Usage Ledger
+Per-job Gemini token accounting from the usage metadata each engine stores on its
+results (_token_input / _token_output / _token_cached), bucketed by model and media type.
+Results served from the local result cache are counted as hits, not as billed tokens.
+"""
+import time
+import threading
+
+
+def _tokens(result: dict, key: str) -> int:
+    value = result.get(key, 0)
+    return value if isinstance(value, int) and value > 0 else 0
+
+
+class UsageLedger:
+    """Token totals + throughput for one job. record() is safe from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}        # (model, media) → counters
+        self._started = time.time()
+        self._finished = 0        # files completed (any status), for files/min
+
+    def start(self):
+        """Reset the clock (call when the queue starts)."""
+        with self._lock:
+            self._started = time.time()
+
+    def record(self, model: str, media: str, result: dict):
+        """Account one completed file ("image" / "video")."""
+        with self._lock:
+            self._finished += 1
+            bucket = self._buckets.setdefault((model, media), {
+                "files": 0, "failed": 0, "cache_hits": 0,
+                "input": 0, "cached": 0, "output": 0,
+            })
+            if result.get("status") != "success":
+                bucket["failed"] += 1
+                return
+            if result.get("_cache_hit"):
+                bucket["cache_hits"] += 1  # tokens were billed by an earlier job
+                return
+            bucket["files"] += 1
+            bucket["input"] += _tokens(result, "_token_input")
+            bucket["cached"] += _tokens(result, "_token_cached")
+            bucket["output"] += _tokens(result, "_token_output")
+
+    def summary(self) -> dict:
+        """
+        Job totals plus a by_model → by media breakdown. input includes cached
+        (Gemini's prompt_token_count does); tokens_per_file is over billed files only.
+        """
+        with self._lock:
+            buckets = {key: dict(value) for key, value in self._buckets.items()}
+            elapsed = max(time.time() - self._started, 1e-6)
+            finished = self._finished
+
+        totals = {"files": 0, "failed": 0, "cache_hits": 0, "input": 0, "cached": 0, "output": 0}
+        by_model = {}
+        for (model, media), bucket in sorted(buckets.items()):
+            for key in totals:
+                totals[key] += bucket[key]
+            by_model.setdefault(model, {})[media] = _with_rates(bucket)
+        summary = _with_rates(totals)
+        summary["elapsed_sec"] = round(elapsed, 1)
+        summary["files_per_min"] = round(finished / elapsed * 60, 1)
+        summary["by_model"] = by_model
+        return summary
+
+    def log_line(self) -> str:
+        """One-line summary for the debug log."""
+        s = self.summary()
+        parts = [
+            f"Token usage: in={s['input']:,} (cached {s['cached']:,}) out={s['output']:,}",
+            f"{s['tokens_per_file']:,}/file over {s['files']} files",
+            f"{s['cache_hits']} result-cache hits",
+            f"{s['files_per_min']} files/min",
+        ]
+        for model, media_buckets in s["by_model"].items():
+            for media, b in media_buckets.items():
+                parts.append(f"{model}/{media}: {b['files']} files, {b['tokens_per_file']:,}/file")
+        return " | ".join(parts)
+
+
+def _with_rates(bucket: dict) -> dict:
+    out = dict(bucket)
+    out["total"] = bucket["input"] + bucket["output"]
+    out["tokens_per_file"] = round(out["total"] / bucket["files"]) if bucket["files"] else 0
+    return out
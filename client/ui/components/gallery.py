@@ -1,73 +1,113 @@
 """
 BigEye Pro — Center Stage / Gallery Component
+The grid is a QListView over GalleryModel: only rows in (or near) the viewport get a
+thumbnail loaded, and queued loads for rows scrolled past are cancelled.
 """
 import os
+import threading
+from collections import OrderedDict
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QListWidget, QListWidgetItem, QFileDialog, QProgressBar,
+    QListView, QFileDialog, QProgressBar,
     QFrame, QSizePolicy, QAbstractItemView
 )
 from PySide6.QtCore import (
     Qt, Signal, QSize, QThread, QObject, QRunnable,
-    QThreadPool, Slot
+    QThreadPool, Slot, QAbstractListModel, QModelIndex, QTimer, QPoint
 )
 from PySide6.QtGui import (
-    QPixmap, QImage, QIcon, QPainter, QColor, QBrush, QPen,
+    QPixmap, QImage, QImageReader, QIcon, QPainter, QColor, QBrush, QPen,
     QFont, QLinearGradient, QRadialGradient
 )
 
-from core.config import THUMBNAIL_SIZE, ALL_EXTENSIONS
+from core.config import THUMBNAIL_SIZE, ALL_EXTENSIONS, GALLERY_THUMB_MEMORY, GALLERY_PREFETCH_ROWS
 from utils.helpers import scan_folder, count_files, is_video, is_image, format_number
 from utils.video_thumb import extract_first_frame
+from utils import thumb_cache
 
 
 class ThumbnailLoader(QRunnable):
-    """Async thumbnail loader using QThreadPool."""
+    """Async thumbnail loader using QThreadPool (disk cache first, else decode at size)."""
 
     class Signals(QObject):
-        loaded = Signal(str, QPixmap)  # filepath, pixmap
+        loaded = Signal(str, QImage)  # filepath, image (QPixmap is made on the GUI thread)
 
     def __init__(self, filepath: str, size: int = THUMBNAIL_SIZE):
         super().__init__()
         self.filepath = filepath
         self.size = size
         self.signals = self.Signals()
+        self.cancelled = False  # set when the row scrolled away before the load started
         self.setAutoDelete(True)
 
     @Slot()
     def run(self):
+        if self.cancelled:
+            return
         try:
-            load_path = self.filepath
-
-            # For video files, extract first frame via FFmpeg
-            if is_video(self.filepath):
-                frame_path = extract_first_frame(self.filepath)
-                if frame_path:
-                    load_path = frame_path
-                else:
-                    return  # Cannot extract frame
-
-            pixmap = QPixmap(load_path)
-            if pixmap.isNull():
-                img = QImage(load_path)
-                if not img.isNull():
-                    pixmap = QPixmap.fromImage(img)
-
-            if not pixmap.isNull():
-                pixmap = pixmap.scaled(
-                    self.size, self.size,
-                    Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-                    Qt.TransformationMode.SmoothTransformation
-                )
-                # Center crop
-                if pixmap.width() > self.size or pixmap.height() > self.size:
-                    x = (pixmap.width() - self.size) // 2
-                    y = (pixmap.height() - self.size) // 2
-                    pixmap = pixmap.copy(x, y, self.size, self.size)
-
-                self.signals.loaded.emit(self.filepath, pixmap)
+            image = self._load()
         except Exception:
-            pass
+            image = QImage()
+        # Emitted even when empty so the gallery stops tracking the load
+        self.signals.loaded.emit(self.filepath, image)
+
+    def _load(self) -> QImage:
+        cache_path = thumb_cache.thumb_cache_path(self.filepath, self.size)
+        if thumb_cache.lookup(cache_path):
+            image = QImage(cache_path)
+            if not image.isNull():
+                return image
+
+        load_path = self.filepath
+
+        # For video files, extract first frame via FFmpeg
+        if is_video(self.filepath):
+            frame_path = extract_first_frame(self.filepath)
+            if frame_path:
+                load_path = frame_path
+            else:
+                return QImage()  # Cannot extract frame
+
+        image = decode_thumbnail(load_path, self.size)
+        if not image.isNull() and cache_path:
+            tmp = thumb_cache.temp_path(cache_path)
+            if image.save(tmp, "JPG", 90):
+                thumb_cache.store(tmp, cache_path)
+        return image
+
+
+def decode_thumbnail(path: str, size: int = THUMBNAIL_SIZE) -> QImage:
+    """
+    size×size center-cropped thumbnail. QImageReader decodes straight at the scaled size
+    (JPEG: libjpeg DCT scaling), so no full-resolution bitmap is ever allocated.
+    """
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)  # EXIF orientation
+    source = reader.size()
+    if source.isValid() and source.width() > 0 and source.height() > 0:
+        # Smallest size that still covers the square (KeepAspectRatioByExpanding)
+        scale = max(size / source.width(), size / source.height())
+        if scale < 1:
+            reader.setScaledSize(QSize(
+                max(size, round(source.width() * scale)),
+                max(size, round(source.height() * scale)),
+            ))
+    image = reader.read()
+    if image.isNull():
+        return image
+
+    if image.width() != size or image.height() != size:
+        image = image.scaled(
+            size, size,
+            Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+            Qt.TransformationMode.SmoothTransformation
+        )
+        # Center crop
+        if image.width() > size or image.height() > size:
+            x = (image.width() - size) // 2
+            y = (image.height() - size) // 2
+            image = image.copy(x, y, size, size)
+    return image
 
 
 def create_thumbnail_icon(
@@ -187,6 +227,112 @@ def create_thumbnail_icon(
     return canvas
 
 
+class GalleryModel(QAbstractListModel):
+    """
+    Files of the open folder as list rows. Thumbnail pixmaps and the painted icons
+    (thumbnail + filename / badges / status) are made on demand and kept in small LRU
+    maps, so memory does not grow with the folder size.
+    """
+
+    ICON_MEMORY = 400  # painted icons kept (a few screens' worth)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._files = []
+        self._rows = {}                      # filepath → row
+        self._statuses = {}                  # filepath → status
+        self._thumbnails = OrderedDict()     # filepath → QPixmap (null = no preview), LRU
+        self._icons = OrderedDict()          # filepath → QIcon, LRU
+
+    # ── Qt model API ──
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._files)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._files):
+            return None
+        filepath = self._files[index.row()]
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._icon(filepath)
+        if role == Qt.ItemDataRole.UserRole:
+            return filepath
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return os.path.basename(filepath)
+        if role == Qt.ItemDataRole.SizeHintRole:
+            return QSize(THUMBNAIL_SIZE + 10, THUMBNAIL_SIZE + 10)
+        return None
+
+    # ── Contents ──
+
+    def set_files(self, files: list):
+        self.beginResetModel()
+        self._files = list(files)
+        self._rows = {f: row for row, f in enumerate(self._files)}
+        self._statuses = {f: "pending" for f in self._files}
+        self._thumbnails.clear()
+        self._icons.clear()
+        self.endResetModel()
+
+    def filepath(self, row: int) -> str:
+        return self._files[row] if 0 <= row < len(self._files) else ""
+
+    def has_thumbnail(self, filepath: str) -> bool:
+        return filepath in self._thumbnails
+
+    def set_thumbnail(self, filepath: str, pixmap: QPixmap):
+        row = self._rows.get(filepath)
+        if row is None:
+            return  # load finished after the folder changed
+        self._thumbnails[filepath] = pixmap
+        self._thumbnails.move_to_end(filepath)
+        while len(self._thumbnails) > GALLERY_THUMB_MEMORY:
+            evicted, _ = self._thumbnails.popitem(last=False)
+            self._icons.pop(evicted, None)
+        self._changed(filepath, row)
+
+    def set_status(self, filepath: str, status: str):
+        row = self._rows.get(filepath)
+        if row is None:
+            return
+        self._statuses[filepath] = status
+        self._changed(filepath, row)
+
+    def reset_statuses(self):
+        for filepath in self._files:
+            self._statuses[filepath] = "pending"
+        self._icons.clear()
+        if self._files:
+            self.dataChanged.emit(self.index(0), self.index(len(self._files) - 1),
+                                  [Qt.ItemDataRole.DecorationRole])
+
+    # ── Internals ──
+
+    def _changed(self, filepath: str, row: int):
+        self._icons.pop(filepath, None)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def _icon(self, filepath: str) -> QIcon:
+        icon = self._icons.get(filepath)
+        if icon is not None:
+            self._icons.move_to_end(filepath)
+            return icon
+        pixmap = self._thumbnails.get(filepath)
+        if pixmap is not None:
+            self._thumbnails.move_to_end(filepath)
+        icon = QIcon(create_thumbnail_icon(
+            pixmap if pixmap is not None else QPixmap(),
+            os.path.basename(filepath),
+            "video" if is_video(filepath) else "image",
+            self._statuses.get(filepath, "pending"),
+        ))
+        self._icons[filepath] = icon
+        while len(self._icons) > self.ICON_MEMORY:
+            self._icons.popitem(last=False)
+        return icon
+
+
 class Gallery(QWidget):
     """Center stage with toolbar, gallery grid, cost bar, and action bar."""
 
@@ -199,10 +345,15 @@ class Gallery(QWidget):
         super().__init__(parent)
         self._folder_path = ""
         self._file_list = []
-        self._file_statuses = {}  # filepath -> status
-        self._thumbnails = {}  # filepath -> QPixmap
+        self._model = GalleryModel(self)  # rows + per-file status and thumbnails
+        self._loaders = {}  # filepath -> ThumbnailLoader queued or running
         self._thread_pool = QThreadPool()
         self._thread_pool.setMaxThreadCount(4)
+        # Thumbnails are requested once scrolling pauses (rows flown past are never loaded)
+        self._load_timer = QTimer(self)
+        self._load_timer.setSingleShot(True)
+        self._load_timer.setInterval(60)
+        self._load_timer.timeout.connect(self._load_visible_thumbnails)
         self._is_processing = False
         self._setup_ui()
 
@@ -241,32 +392,36 @@ class Gallery(QWidget):
         layout.addWidget(toolbar)
 
         # ── GALLERY GRID ──
-        self.list_widget = QListWidget()
-        self.list_widget.setViewMode(QListWidget.ViewMode.IconMode)
-        self.list_widget.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
-        self.list_widget.setGridSize(QSize(THUMBNAIL_SIZE + 10, THUMBNAIL_SIZE + 10))
-        self.list_widget.setSpacing(10)
-        self.list_widget.setResizeMode(QListWidget.ResizeMode.Adjust)
-        self.list_widget.setWrapping(True)
-        self.list_widget.setMovement(QListWidget.Movement.Static)
-        self.list_widget.setSelectionMode(
+        self.list_view = QListView()
+        self.list_view.setViewMode(QListView.ViewMode.IconMode)
+        self.list_view.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        self.list_view.setGridSize(QSize(THUMBNAIL_SIZE + 10, THUMBNAIL_SIZE + 10))
+        self.list_view.setSpacing(10)
+        self.list_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.list_view.setWrapping(True)
+        self.list_view.setMovement(QListView.Movement.Static)
+        self.list_view.setSelectionMode(
             QAbstractItemView.SelectionMode.SingleSelection
         )
-        self.list_widget.setUniformItemSizes(True)
-        self.list_widget.setStyleSheet("""
-            QListWidget {
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.list_view.setBatchSize(500)
+        self.list_view.setStyleSheet("""
+            QListView {
                 background: #1A1A2E;
                 border: none;
                 padding: 10px;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background: transparent;
                 border: 2px solid #FF00CC;
                 border-radius: 10px;
             }
         """)
-        self.list_widget.currentItemChanged.connect(self._on_item_selected)
-        layout.addWidget(self.list_widget, 1)
+        self.list_view.setModel(self._model)
+        self.list_view.selectionModel().currentChanged.connect(self._on_item_selected)
+        self.list_view.verticalScrollBar().valueChanged.connect(self._schedule_thumbnail_load)
+        layout.addWidget(self.list_view, 1)
 
         # ── COST ESTIMATE BAR ──
         self.cost_bar = QWidget()
@@ -400,8 +555,6 @@ class Gallery(QWidget):
         """Load a folder and populate the gallery."""
         self._folder_path = folder_path
         self._file_list = scan_folder(folder_path)
-        self._file_statuses = {f: "pending" for f in self._file_list}
-        self._thumbnails = {}
 
         # Update path display
         display_path = folder_path
@@ -421,84 +574,84 @@ class Gallery(QWidget):
         # Populate grid
         self._populate_grid()
 
+        # Keep the thumbnail disk cache within budget (off the GUI thread)
+        threading.Thread(target=thumb_cache.prune, name="thumb-prune", daemon=True).start()
+
         # Emit signal
         self.folder_changed.emit(folder_path, self._file_list)
 
     def _populate_grid(self):
-        """Populate the gallery grid with thumbnails."""
-        self.list_widget.clear()
-
-        for filepath in self._file_list:
-            filename = os.path.basename(filepath)
-            file_type = "video" if is_video(filepath) else "image"
-            status = self._file_statuses.get(filepath, "pending")
-
-            # Create placeholder item
-            placeholder = create_thumbnail_icon(
-                QPixmap(), filename, file_type, status
-            )
-            item = QListWidgetItem()
-            item.setIcon(QIcon(placeholder))
-            item.setSizeHint(QSize(THUMBNAIL_SIZE + 10, THUMBNAIL_SIZE + 10))
-            item.setData(Qt.ItemDataRole.UserRole, filepath)
-            item.setToolTip(filename)
-            self.list_widget.addItem(item)
-
-            # Load real thumbnail async (images + videos)
-            loader = ThumbnailLoader(filepath)
-            loader.signals.loaded.connect(self._on_thumbnail_loaded)
-            self._thread_pool.start(loader)
-
-    def _on_thumbnail_loaded(self, filepath: str, pixmap: QPixmap):
-        """Update thumbnail when async load completes."""
-        self._thumbnails[filepath] = pixmap
-        filename = os.path.basename(filepath)
-        file_type = "video" if is_video(filepath) else "image"
-        status = self._file_statuses.get(filepath, "pending")
-
-        icon_pixmap = create_thumbnail_icon(pixmap, filename, file_type, status)
-
-        # Find and update the item
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.data(Qt.ItemDataRole.UserRole) == filepath:
-                item.setIcon(QIcon(icon_pixmap))
+        """Show the folder's files; thumbnails load as rows come into view."""
+        self._cancel_thumbnail_loads(keep=set())
+        self._model.set_files(self._file_list)
+        self._schedule_thumbnail_load()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._schedule_thumbnail_load()
+
+    def _schedule_thumbnail_load(self, *_):
+        self._load_timer.start()  # restarts while scrolling continues
+
+    def _visible_rows(self) -> range:
+        """Rows in the viewport plus GALLERY_PREFETCH_ROWS grid rows above and below."""
+        count = self._model.rowCount()
+        if not count:
+            return range(0)
+        grid = self.list_view.gridSize()
+        viewport = self.list_view.viewport().rect()
+        per_row = max(1, viewport.width() // max(1, grid.width()))
+        first = 0
+        for y in range(0, grid.height(), 8):
+            index = self.list_view.indexAt(QPoint(grid.width() // 2, y))
+            if index.isValid():
+                first = index.row()
                 break
+        rows_visible = viewport.height() // max(1, grid.height()) + 2
+        margin = per_row * GALLERY_PREFETCH_ROWS
+        start = max(0, first - first % per_row - margin)
+        return range(start, min(count, first + rows_visible * per_row + margin))
+
+    def _load_visible_thumbnails(self):
+        """Queue loads for visible rows; drop queued loads for rows no longer near view."""
+        wanted = []
+        for row in self._visible_rows():
+            filepath = self._model.filepath(row)
+            if filepath and not self._model.has_thumbnail(filepath):
+                wanted.append(filepath)
+        self._cancel_thumbnail_loads(keep=set(wanted))
+        for filepath in wanted:
+            if filepath not in self._loaders:
+                loader = ThumbnailLoader(filepath)
+                loader.signals.loaded.connect(self._on_thumbnail_loaded)
+                self._loaders[filepath] = loader
+                self._thread_pool.start(loader)
+
+    def _cancel_thumbnail_loads(self, keep: set):
+        """Take not-yet-started loads (other than `keep`) back out of the pool."""
+        for filepath in [f for f in self._loaders if f not in keep]:
+            loader = self._loaders.pop(filepath)
+            loader.cancelled = True  # in case it is dequeued before tryTake gets it
+            self._thread_pool.tryTake(loader)
+
+    def _on_thumbnail_loaded(self, filepath: str, image: QImage):
+        """Update thumbnail when async load completes."""
+        self._loaders.pop(filepath, None)
+        self._model.set_thumbnail(filepath, QPixmap.fromImage(image))
 
     def _on_item_selected(self, current, previous):
-        if current:
+        if current.isValid():
             filepath = current.data(Qt.ItemDataRole.UserRole)
             if filepath:
                 self.file_selected.emit(filepath)
 
     def update_file_status(self, filepath: str, status: str):
         """Update a file's status and refresh its thumbnail."""
-        self._file_statuses[filepath] = status
-        filename = os.path.basename(filepath)
-        file_type = "video" if is_video(filepath) else "image"
-        pixmap = self._thumbnails.get(filepath, QPixmap())
-
-        icon_pixmap = create_thumbnail_icon(pixmap, filename, file_type, status)
-
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.data(Qt.ItemDataRole.UserRole) == filepath:
-                item.setIcon(QIcon(icon_pixmap))
-                break
+        self._model.set_status(filepath, status)
 
     def reset_file_statuses(self):
         """Reset all file statuses to 'pending' and refresh thumbnails."""
-        for filepath in self._file_list:
-            self._file_statuses[filepath] = "pending"
-            filename = os.path.basename(filepath)
-            file_type = "video" if is_video(filepath) else "image"
-            pixmap = self._thumbnails.get(filepath, QPixmap())
-            icon_pixmap = create_thumbnail_icon(pixmap, filename, file_type, "pending")
-            for i in range(self.list_widget.count()):
-                item = self.list_widget.item(i)
-                if item.data(Qt.ItemDataRole.UserRole) == filepath:
-                    item.setIcon(QIcon(icon_pixmap))
-                    break
+        self._model.reset_statuses()
 
     def update_cost_estimate(self, photo_count: int, video_count: int,
                              photo_rate: int, video_rate: int,
@@ -287,8 +287,11 @@ class Inspector(QWidget):
         self.keywords_label.setText(f"Keywords ({len(kw_list)})")
         # Write directly to shared results dict
         filename = os.path.basename(self._current_file)
-        if filename in self._results:
-            self._results[filename].update(data)
+        result = self._results.get(filename)
+        if result is not None and kw_list != result.get("keywords"):
+            data["_keywords_edited"] = True  # re-export must not reprocess hand-edited keywords
+        if result is not None:
+            result.update(data)
         self.metadata_edited.emit(self._current_file, data)
 
     def _save_current_edits(self):
@@ -4,11 +4,13 @@ BigEye Pro — Recovery Dialog
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QPushButton, QWidget
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 from utils.helpers import format_number
 
 
 class RecoveryDialog(QDialog):
+    resume_requested = Signal()
+
     def __init__(self, info: dict = None, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Unfinished Job Found")
@@ -62,9 +64,26 @@ class RecoveryDialog(QDialog):
 
         layout.addWidget(card)
 
+        if info.get("resumable"):
+            remaining = len(info.get("remaining_files", []))
+            kept = len(info.get("ok_results", {}))
+            btn_resume = QPushButton(
+                f"Resume job ({remaining} remaining)" if remaining
+                else f"Restore {kept} completed results"
+            )
+            btn_resume.setObjectName("confirmButton")
+            btn_resume.setMinimumHeight(40)
+            btn_resume.setCursor(Qt.CursorShape.PointingHandCursor)
+            btn_resume.clicked.connect(self._on_resume)
+            layout.addWidget(btn_resume)
+
         btn = QPushButton("OK")
         btn.setObjectName("confirmButton")
         btn.setMinimumHeight(40)
         btn.setCursor(Qt.CursorShape.PointingHandCursor)
         btn.clicked.connect(self.accept)
         layout.addWidget(btn, alignment=Qt.AlignmentFlag.AlignCenter)
+
+    def _on_resume(self):
+        self.resume_requested.emit()
+        self.accept()
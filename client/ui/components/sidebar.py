@@ -428,6 +428,26 @@ class Sidebar(QWidget):
             "description_length": self.slider_desc.get_value(),
         }
 
+    def apply_settings(self, settings: dict):
+        """Restore settings saved with a job (used when resuming after a crash)."""
+        model = settings.get("model")
+        if model:
+            idx = self.combo_model.findData(model)
+            if idx >= 0:
+                self.combo_model.setCurrentIndex(idx)
+        platform_name = settings.get("platform")
+        if platform_name and self.combo_platform.findText(platform_name) >= 0:
+            self.combo_platform.setCurrentText(platform_name)
+        style = settings.get("keyword_style")
+        if style and self.combo_keyword_style.findText(style) >= 0:
+            self.combo_keyword_style.setCurrentText(style)
+        if "max_keywords" in settings:
+            self.slider_keywords.set_value(settings["max_keywords"])
+        if "title_length" in settings:
+            self.slider_title.set_value(settings["title_length"])
+        if "description_length" in settings:
+            self.slider_desc.set_value(settings["description_length"])
+
     def set_processing(self, is_processing: bool):
         """Lock/unlock all controls during processing."""
         self.api_key_input.setEnabled(not is_processing)
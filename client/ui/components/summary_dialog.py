@@ -15,16 +15,16 @@ class SummaryDialog(QDialog):
     def __init__(self, successful: int, failed: int, photo_count: int,
                  video_count: int, charged: int, refunded: int,
                  balance: int, csv_files: list, output_folder: str = "",
-                 parent=None):
+                 parent=None, usage: dict | None = None):
         super().__init__(parent)
         self.setWindowTitle("ประมวลผลเสร็จสิ้น")
         self.setFixedWidth(460)
         self.setStyleSheet("background: #1A1A2E; color: #E8E8E8;")
         self._setup_ui(successful, failed, photo_count, video_count,
-                       charged, refunded, balance, csv_files, output_folder)
+                       charged, refunded, balance, csv_files, output_folder, usage)
 
     def _setup_ui(self, successful, failed, photo_count, video_count,
-                  charged, refunded, balance, csv_files, output_folder):
+                  charged, refunded, balance, csv_files, output_folder, usage=None):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(24, 24, 24, 24)
         layout.setSpacing(14)
@@ -70,6 +70,18 @@ class SummaryDialog(QDialog):
         cl.addLayout(bal_layout)
         layout.addWidget(credits)
 
+        # Token usage card (Gemini usage metadata, skipped when nothing was billed)
+        if usage and usage.get("total"):
+            tokens = self._card("การใช้โทเคน")
+            tl = tokens.layout()
+            self._add_row(tl, "Input", f"{format_number(usage.get('input', 0))} โทเคน", "#E8E8E8")
+            if usage.get("cached"):
+                self._add_row(tl, "จากแคช", f"{format_number(usage['cached'])} โทเคน", "#00E396")
+            self._add_row(tl, "Output", f"{format_number(usage.get('output', 0))} โทเคน", "#E8E8E8")
+            self._add_row(tl, "เฉลี่ยต่อไฟล์", f"{format_number(usage.get('tokens_per_file', 0))} โทเคน", "#8892A8")
+            self._add_row(tl, "ความเร็ว", f"{usage.get('files_per_min', 0)} ไฟล์/นาที", "#8892A8")
+            layout.addWidget(tokens)
+
         # Output folder card
         if output_folder and os.path.isdir(output_folder):
             out_card = self._card("โฟลเดอร์ผลลัพธ์")
@@ -133,6 +133,9 @@ class MainWindow(QMainWindow):
         self._startup_worker = None
         self._job_manager = JobManager()
         self._job_thread = None
+        self._resume_results = {}  # filename -> result kept from an interrupted job
+        self._start_files = []     # files of the start awaiting the insufficient-credit dialog
+        self._concurrency = {}     # "image"/"video"/"api" -> current adaptive window
 
         self._setup_ui()
         self._setup_shortcuts()
@@ -193,6 +196,12 @@ class MainWindow(QMainWindow):
         )
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Ready")
+        # Live adaptive-concurrency windows (visible while processing)
+        self.concurrency_label = QLabel("")
+        self.concurrency_label.setStyleSheet("color: #8892A8; font-size: 11px; padding-right: 12px;")
+        self.concurrency_label.setToolTip("จำนวนงานที่ส่งพร้อมกัน — ปรับอัตโนมัติตามโควต้า API")
+        self.concurrency_label.hide()
+        self.status_bar.addPermanentWidget(self.concurrency_label)
         # Version label on right side
         version_label = QLabel(f"v{APP_VERSION}")
         version_label.setStyleSheet("color: #4A5568; font-size: 11px; padding-right: 8px;")
@@ -279,8 +288,37 @@ class MainWindow(QMainWindow):
 
     def _on_recovery_found(self, info: dict):
         dialog = RecoveryDialog(info, self)
+        dialog.resume_requested.connect(lambda: self._resume_job(info))
         dialog.exec()
 
+    def _resume_job(self, info: dict):
+        """Re-open the interrupted job's folder, keep its finished files, queue the rest."""
+        import os
+        folder_path = info.get("folder_path", "")
+        if not folder_path or not os.path.isdir(folder_path):
+            QMessageBox.warning(self, "ไม่พบโฟลเดอร์", "ไม่พบโฟลเดอร์ของงานที่ค้างอยู่")
+            return
+
+        self.sidebar.apply_settings(info.get("settings", {}))
+        self.gallery.set_folder(folder_path)  # clears previous results via folder_changed
+
+        ok_results = info.get("ok_results", {})
+        self._results.update(ok_results)
+        for filepath in self.gallery.get_file_list():
+            if os.path.basename(filepath) in ok_results:
+                self.gallery.update_file_status(filepath, "completed")
+
+        in_folder = set(self.gallery.get_file_list())
+        remaining = [fp for fp in info.get("remaining_files", []) if fp in in_folder]
+        logger.info(f"Resuming job: {len(ok_results)} kept, {len(remaining)} remaining")
+        if not remaining:
+            self.inspector.enable_export(bool(ok_results))
+            self.status_bar.showMessage(f"กู้คืนผลลัพธ์ {len(ok_results)} ไฟล์แล้ว")
+            return
+
+        self._resume_results = dict(ok_results)
+        self._confirm_and_start(remaining)
+
     def _on_bank_info_loaded(self, bank_info: dict):
         """Store bank_info from server for use in TopUpDialog."""
         self._bank_info = bank_info
@@ -311,7 +349,11 @@ class MainWindow(QMainWindow):
 
     def _on_start(self):
         """Validate and start processing."""
-        file_list = self.gallery.get_file_list()
+        self._resume_results = {}
+        self._confirm_and_start(self.gallery.get_file_list())
+
+    def _confirm_and_start(self, file_list: list):
+        """Credit check + confirm dialog, then start processing file_list."""
         if not file_list:
             QMessageBox.warning(self, "ไม่พบไฟล์", "กรุณาเปิดโฟลเดอร์ที่มีไฟล์ภาพหรือวิดีโอก่อน")
             return
@@ -332,10 +374,13 @@ class MainWindow(QMainWindow):
         cost = (img_count * photo_rate) + (vid_count * video_rate)
 
         if balance < cost:
+            # "Process what I can afford" slices this list (resume: only the remaining files)
+            self._start_files = file_list
             dialog = InsufficientDialog(cost, balance, photo_rate, self)
             dialog.topup_requested.connect(self._on_topup)
             dialog.partial_requested.connect(self._on_partial_process)
             dialog.exec()
+            self._start_files = []
             return
 
         dialog = ConfirmDialog(
@@ -349,7 +394,8 @@ class MainWindow(QMainWindow):
 
     def _on_partial_process(self, max_files: int):
         """Start processing with limited file count."""
-        file_list = self.gallery.get_file_list()[:max_files]
+        file_list = self._start_files[:max_files]
+        self._start_files = []
         self._begin_processing(file_list)
 
     def _begin_processing(self, file_list: list):
@@ -359,6 +405,16 @@ class MainWindow(QMainWindow):
         self.inspector.clear()
         self.gallery.reset_file_statuses()
 
+        # Resumed job: keep the interrupted run's finished files marked + exportable
+        resume_results = self._resume_results
+        self._resume_results = {}
+        if resume_results:
+            import os
+            self._results.update(resume_results)
+            for filepath in self.gallery.get_file_list():
+                if os.path.basename(filepath) in resume_results:
+                    self.gallery.update_file_status(filepath, "completed")
+
         self._is_processing = True
         self._set_processing_state(True)
         self.inspector.enable_export(False)
@@ -380,12 +436,15 @@ class MainWindow(QMainWindow):
         self._job_manager.job_failed.connect(self._on_job_failed)
         self._job_manager.credit_updated.connect(self.credit_bar.set_balance)
         self._job_manager.status_update.connect(self._on_status_update)
+        self._job_manager.concurrency_changed.connect(self._on_concurrency_changed)
 
         # Build settings dict for JobManager
         settings = self.sidebar.get_settings()
         settings["api_key"] = self.sidebar.get_api_key()
         settings["folder_path"] = self.gallery.get_folder_path()
         settings["balance"] = self.credit_bar.get_balance()
+        if resume_results:
+            settings["resume_results"] = resume_results
 
         # Run on background thread (using threading.Thread instead of QThread+moveToThread
         # to avoid gRPC/Qt event loop deadlock — gRPC channels interfere with Qt signal delivery
@@ -455,15 +514,16 @@ class MainWindow(QMainWindow):
 
         if cancelled:
             skipped = summary.get("skipped", 0)
-            if successful > 0:
-                # Partial results exist — show summary dialog with CSV
+            if successful > 0 or csv_files:
+                # Partial results exist (this run or a resumed one) — show summary dialog with CSV
                 self.status_bar.showMessage(
                     f"หยุดกลางคัน — สำเร็จ {successful} ไฟล์, ยกเลิก {skipped} ไฟล์, คืนเครดิต {refunded} cr"
                 )
                 self.inspector.enable_export(len(csv_files) > 0)
                 dialog = SummaryDialog(
                     successful, failed, img_count, vid_count,
-                    charged, refunded, balance, csv_files, output_folder, self
+                    charged, refunded, balance, csv_files, output_folder, self,
+                    usage=summary.get("usage"),
                 )
                 dialog.exec()
             else:
@@ -486,7 +546,8 @@ class MainWindow(QMainWindow):
 
         dialog = SummaryDialog(
             successful, failed, img_count, vid_count,
-            charged, refunded, balance, csv_files, output_folder, self
+            charged, refunded, balance, csv_files, output_folder, self,
+            usage=summary.get("usage"),
         )
         dialog.exec()
 
@@ -495,6 +556,19 @@ class MainWindow(QMainWindow):
         self.gallery.progress_text.setText(message)
         self.status_bar.showMessage(message)
 
+    def _on_concurrency_changed(self, kind: str, window: int):
+        """Show the current adaptive windows (images · videos · API calls) in the status bar."""
+        self._concurrency[kind] = window
+        parts = []
+        if "image" in self._concurrency:
+            parts.append(f"รูป {self._concurrency['image']}")
+        if "video" in self._concurrency:
+            parts.append(f"วิดีโอ {self._concurrency['video']}")
+        if "api" in self._concurrency:
+            parts.append(f"API {self._concurrency['api']}")
+        self.concurrency_label.setText("⚡ " + " · ".join(parts))
+        self.concurrency_label.show()
+
     def _on_job_failed(self, error_message: str):
         """Handle job failure from JobManager."""
         self._is_processing = False
@@ -515,6 +589,7 @@ class MainWindow(QMainWindow):
             self._job_manager.job_failed.disconnect(self._on_job_failed)
             self._job_manager.credit_updated.disconnect(self.credit_bar.set_balance)
             self._job_manager.status_update.disconnect(self._on_status_update)
+            self._job_manager.concurrency_changed.disconnect(self._on_concurrency_changed)
         except RuntimeError:
             pass
 
@@ -555,6 +630,9 @@ class MainWindow(QMainWindow):
         self.gallery.set_processing(is_processing)
         self.inspector.set_processing(is_processing)
         self.credit_bar.set_processing(is_processing)
+        if not is_processing:
+            self._concurrency.clear()
+            self.concurrency_label.hide()
 
     def _on_file_selected(self, filepath: str):
         self._selected_file = filepath
@@ -562,6 +640,7 @@ class MainWindow(QMainWindow):
 
     def _on_folder_changed(self, folder_path: str, file_list: list):
         """Update cost estimate when folder changes."""
+        self._resume_results = {}
         self._results.clear()
         self.inspector.clear()
         self.inspector.enable_export(False)
@@ -646,6 +725,10 @@ class MainWindow(QMainWindow):
         else:
             style_tag = ""
 
+        # Re-run keyword post-processing locally for the current style / max keywords
+        if not self._job_manager.is_running:
+            self._job_manager.process_keywords(self._results, settings)
+
         csv_files = CSVExporter.export_for_platform(
             platform, self._results, save_dir, model, style_tag,
             re_export=True,
@@ -2,6 +2,7 @@
 BigEye Pro — Helper Utilities
 """
 import os
+import hashlib
 
 from core.config import IMAGE_EXTENSIONS, VIDEO_EXTENSIONS
 from utils.security import get_hardware_id  # noqa: F401 — re-export for backward compat
@@ -46,6 +47,15 @@ def count_files(file_list: list) -> tuple:
     return images, videos
 
 
+def file_content_hash(filepath: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's bytes, read in chunks so large media never sits in RAM."""
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
 def format_number(n: int) -> str:
     """Format number with comma separator."""
     return f"{n:,}"
@@ -0,0 +1,85 @@
+"""
+BigEye Pro — Gallery Thumbnail Cache
+Finished gallery thumbnails (already scaled + cropped) on disk, keyed by the source
+path, its mtime and size, and the thumbnail size — an edited file gets a new entry and
+the stale one ages out. Re-opening a folder reads small JPEGs instead of decoding every
+original again. Least-recently-used entries are pruned to a byte budget.
+"""
+import os
+import hashlib
+import logging
+import threading
+
+from core.config import APP_DATA_DIR, THUMB_CACHE_MB
+
+logger = logging.getLogger("bigeye")
+
+GALLERY_THUMB_DIR = os.path.join(APP_DATA_DIR, "gallery_thumbs")
+os.makedirs(GALLERY_THUMB_DIR, exist_ok=True)
+
+
+def thumb_cache_path(filepath: str, size: int) -> str:
+    """Cache entry for filepath at size (empty string if the file cannot be stat'ed)."""
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return ""
+    key = f"{os.path.abspath(filepath)}|{st.st_mtime_ns}|{st.st_size}"
+    h = hashlib.md5(key.encode("utf-8")).hexdigest()[:20]
+    return os.path.join(GALLERY_THUMB_DIR, f"{h}_{size}.jpg")
+
+
+def lookup(cache_path: str) -> bool:
+    """True if the entry exists (its mtime is bumped so pruning sees it as recently used)."""
+    if not cache_path:
+        return False
+    try:
+        os.utime(cache_path, None)
+        return True
+    except OSError:
+        return False
+
+
+def temp_path(cache_path: str) -> str:
+    """Private name to write an entry to before store() moves it into place."""
+    return f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def store(tmp: str, cache_path: str):
+    """Publish a written entry (loaders may race on the same key)."""
+    try:
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        logger.debug(f"Thumbnail cache store failed: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def prune(max_bytes: int = THUMB_CACHE_MB * 1024 * 1024):
+    """Delete least-recently-used thumbnails until the cache fits in max_bytes."""
+    try:
+        entries = []
+        with os.scandir(GALLERY_THUMB_DIR) as it:
+            for entry in it:
+                if entry.is_file():
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+    except OSError as e:
+        logger.debug(f"Thumbnail cache prune skipped: {e}")
+        return
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, fp in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(fp)
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    if removed:
+        logger.info(f"Thumbnail cache pruned: {removed} files")
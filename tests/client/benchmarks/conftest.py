@@ -0,0 +1,160 @@
+"""
+Benchmark fixtures — opt-in (BIGEYE_BENCH=1), compared against baseline.json.
+
+    BIGEYE_BENCH=1 pytest tests/client/benchmarks                 # check for regressions
+    BIGEYE_BENCH=1 BIGEYE_BENCH_UPDATE=1 pytest tests/client/benchmarks   # record new baseline
+
+A stage fails when its throughput drops below baseline × (1 − BIGEYE_BENCH_TOLERANCE, default
+0.35) or its peak traced allocation grows past baseline × 1.25. Baselines are per machine
+class — re-record after moving CI to different hardware. Stages that stem keywords record
+the stemmer they ran with and are only compared against a baseline with the same one.
+"""
+import os
+import gc
+import json
+import time
+import tracemalloc
+import pytest
+
+from . import generators
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+TOLERANCE = float(os.environ.get("BIGEYE_BENCH_TOLERANCE", "0.35"))
+ALLOC_TOLERANCE = 1.25
+REPEATS = int(os.environ.get("BIGEYE_BENCH_REPEATS", "3"))
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get("BIGEYE_BENCH") == "1":
+        return
+    skip = pytest.mark.skip(reason="benchmarks are opt-in: set BIGEYE_BENCH=1")
+    here = os.path.dirname(os.path.abspath(__file__))
+    for item in items:
+        if str(item.fspath).startswith(here):
+            item.add_marker(skip)
+
+
+class _SuffixStemmer:
+    """Used only when NLTK data is missing, so the suite still runs (recorded in the baseline)."""
+
+    def stem(self, word):
+        for suffix in ("ing", "es", "ed", "er", "s"):
+            if word.endswith(suffix) and len(word) > len(suffix) + 2:
+                return word[: -len(suffix)]
+        return word
+
+
+@pytest.fixture(scope="session")
+def stemmer_name():
+    from core.logic import keyword_processor, dictionary_index
+    try:
+        stemmer = keyword_processor._get_stemmer()
+    except LookupError:
+        stemmer = None
+    if stemmer is not None:
+        yield "snowball"
+        return
+    fallback = _SuffixStemmer()
+    original = keyword_processor._get_stemmer
+    keyword_processor._get_stemmer = dictionary_index._get_stemmer = lambda: fallback
+    yield "suffix"
+    keyword_processor._get_stemmer = dictionary_index._get_stemmer = original
+
+
+# ── Synthetic workloads (built once per session) ──
+
+@pytest.fixture(scope="session")
+def results_10k():
+    return generators.results(10_000)
+
+
+@pytest.fixture(scope="session")
+def blacklist_5k():
+    return generators.blacklist(5_000)
+
+
+@pytest.fixture(scope="session")
+def dictionary_500k():
+    return generators.dictionary(500_000)
+
+
+# ── Measurement + baseline ──
+
+class Bench:
+    """Measures one stage and checks it against the stored baseline."""
+
+    def __init__(self, baseline: dict, recorded: dict, stemmer: str):
+        self._baseline = baseline
+        self._recorded = recorded
+        self._stemmer = stemmer
+
+    def run(self, stage: str, fn, items: int, setup=None, stems: bool = False) -> dict:
+        """fn(state) is timed REPEATS times (best kept), then run once under tracemalloc.
+        setup() builds a fresh state per run, outside the timed region.
+        stems: the stage's code path stems keywords (its numbers depend on the stemmer)."""
+        setup = setup or (lambda: None)
+        best = float("inf")
+        for _ in range(REPEATS):
+            state = setup()
+            gc.collect()
+            start = time.perf_counter()
+            fn(state)
+            best = min(best, time.perf_counter() - start)
+
+        state = setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn(state)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        measured = {
+            "items": items,
+            "seconds": round(best, 4),
+            "items_per_sec": round(items / best, 1) if best > 0 else float("inf"),
+            "peak_kb": round(peak / 1024, 1),
+        }
+        if stems:
+            measured["stemmer"] = self._stemmer
+        self._recorded[stage] = measured
+        print(f"\n[bench] {stage}: {measured['items_per_sec']:.0f} items/s, "
+              f"{measured['seconds']:.3f}s, peak {measured['peak_kb']:.0f} KB")
+        self._check(stage, measured)
+        return measured
+
+    def _check(self, stage: str, measured: dict):
+        if os.environ.get("BIGEYE_BENCH_UPDATE") == "1":
+            return
+        base = self._baseline.get(stage)
+        if not base or base.get("items") != measured["items"]:
+            return  # nothing comparable recorded
+        if base.get("stemmer") != measured.get("stemmer"):
+            pytest.skip(f"{stage}: baseline recorded with stemmer {base.get('stemmer')!r}, "
+                        f"this run uses {measured.get('stemmer')!r}")
+        floor = base["items_per_sec"] * (1 - TOLERANCE)
+        assert measured["items_per_sec"] >= floor, (
+            f"{stage}: throughput regressed to {measured['items_per_sec']:.0f}/s "
+            f"(baseline {base['items_per_sec']:.0f}/s, floor {floor:.0f}/s)"
+        )
+        ceiling = base["peak_kb"] * ALLOC_TOLERANCE + 64
+        assert measured["peak_kb"] <= ceiling, (
+            f"{stage}: peak allocation grew to {measured['peak_kb']:.0f} KB "
+            f"(baseline {base['peak_kb']:.0f} KB, ceiling {ceiling:.0f} KB)"
+        )
+
+
+@pytest.fixture(scope="session")
+def bench(stemmer_name):
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baseline = json.load(f).get("stages", {})
+    recorded = {}
+    yield Bench(baseline, recorded, stemmer_name)
+    if os.environ.get("BIGEYE_BENCH_UPDATE") == "1" and recorded:
+        merged = {**baseline, **recorded}
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump({"stages": dict(sorted(merged.items()))}, f, indent=2)
+            f.write("\n")
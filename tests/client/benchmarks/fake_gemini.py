@@ -0,0 +1,525 @@
+"""
+Local stand-in for the Gemini REST API, for load tests that must not burn real quota.
+
+Implements the surfaces the engines use:
+  POST   /v1beta/models/{model}:generateContent
+  POST   /upload/v1beta/files                (resumable: start / upload / finalize / query)
+  GET    /v1beta/files, /v1beta/files/{id}   (PROCESSING → ACTIVE after a sampled delay)
+  DELETE /v1beta/files/{id}
+  POST / GET / DELETE /v1beta/cachedContents[/{id}]
+
+Latency per surface is drawn from a Latency distribution; 429 / timeout / SSL-style
+connection drops are injected with configurable probabilities. Stdlib only.
+
+    with FakeGeminiServer(FakeGeminiConfig(rate_limit=0.05)) as server:
+        os.environ["BIGEYE_GEMINI_URL"] = server.url
+"""
+import re
+import json
+import math
+import time
+import uuid
+import random
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+_GENERATE_RE = re.compile(r"^/v1beta/models/([^/:]+):generateContent$")
+_FILE_RE = re.compile(r"^/v1beta/(files/[\w-]+)$")
+_CACHE_RE = re.compile(r"^/v1beta/(cachedContents/[\w-]+)$")
+
+_WORDS = (
+    "sunset", "beach", "ocean", "travel", "summer", "nature", "sky", "landscape", "water",
+    "vacation", "tropical", "coast", "sea", "horizon", "outdoors", "scenic", "evening",
+    "golden hour", "silhouette", "relaxation", "tourism", "wave", "sand", "cloud", "color",
+    "people", "lifestyle", "happy", "family", "city", "street", "architecture", "building",
+    "forest", "mountain", "hiking", "adventure", "morning", "light", "reflection",
+)
+
+# TLS alert record (what a proxy speaking TLS sends to a plain-HTTP client) — the client
+# sees a garbled / dropped response, the same shape as SSL EOF / WRONG_VERSION_NUMBER.
+_SSL_GARBAGE = b"\x15\x03\x01\x00\x02\x02\x0a"
+
+
+class Latency:
+    """
+    Delay distribution in seconds.
+    kind: "fixed" (a), "uniform" (a..b), "lognormal" (median a, sigma b), "exponential" (mean a).
+    Parsed from "kind:a[:b]" by Latency.parse (e.g. "lognormal:1.5:0.4").
+    """
+
+    def __init__(self, kind: str = "fixed", a: float = 0.0, b: float = 0.0):
+        if kind not in ("fixed", "uniform", "lognormal", "exponential"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.a = a
+        self.b = b
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        parts = spec.split(":")
+        values = [float(p) for p in parts[1:]] + [0.0, 0.0]
+        return cls(parts[0], values[0], values[1])
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.a), self.b) if self.a > 0 else 0.0
+        if self.kind == "exponential":
+            return rng.expovariate(1.0 / self.a) if self.a > 0 else 0.0
+        return self.a
+
+    def __repr__(self):
+        return f"Latency({self.kind}:{self.a}:{self.b})"
+
+
+class FakeGeminiConfig:
+    """Knobs for one fake server. Fault probabilities apply per request."""
+
+    def __init__(self, generate_latency: Latency = None, upload_latency: Latency = None,
+                 processing_delay: Latency = None, rate_limit: float = 0.0,
+                 timeout: float = 0.0, ssl_error: float = 0.0, processing_failed: float = 0.0,
+                 timeout_hang: float = 2.0, keyword_count: int = 55, seed: int = 0):
+        self.generate_latency = generate_latency or Latency()
+        self.upload_latency = upload_latency or Latency()
+        self.processing_delay = processing_delay or Latency()
+        self.rate_limit = rate_limit              # → 429 RESOURCE_EXHAUSTED
+        self.timeout = timeout                    # → hang timeout_hang s, then 504 DEADLINE_EXCEEDED
+        self.ssl_error = ssl_error                # → garbage bytes + connection closed
+        self.processing_failed = processing_failed  # uploaded file ends FAILED instead of ACTIVE
+        self.timeout_hang = timeout_hang
+        self.keyword_count = keyword_count
+        self.seed = seed
+
+
+class _FakeState:
+    """Files, upload sessions, caches and counters shared by all handler threads."""
+
+    def __init__(self, config: FakeGeminiConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.files = {}       # name → {"resource": dict, "ready_at": float, "final_state": str}
+        self.sessions = {}    # upload id → {"size", "mime", "display_name", "data": bytearray}
+        self.caches = {}      # name → resource dict
+        self.requests = Counter()   # surface → count
+        self.faults = Counter()     # "429" / "timeout" / "ssl" → injected count
+        self.faulted = Counter()    # surface → injected count (each costs the client a retry)
+
+    def sample(self, latency: Latency) -> float:
+        with self.lock:
+            return latency.sample(self.rng)
+
+    def roll(self, probability: float) -> bool:
+        if probability <= 0:
+            return False
+        with self.lock:
+            return self.rng.random() < probability
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeGemini/1.0"
+
+    # ── Dispatch ──
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        if path == "/upload/v1beta/files":
+            return self._upload_start()
+        if path.startswith("/upload/v1beta/files/"):
+            return self._upload_chunk(path.rsplit("/", 1)[-1])
+        match = _GENERATE_RE.match(path)
+        if match:
+            return self._generate(match.group(1))
+        if path == "/v1beta/cachedContents":
+            return self._cache_create()
+        self._error(404, "NOT_FOUND", f"Unknown endpoint {path}")
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/v1beta/files":
+            return self._file_list()
+        match = _FILE_RE.match(path)
+        if match:
+            return self._file_get(match.group(1))
+        if path == "/v1beta/cachedContents":
+            return self._cache_list()
+        match = _CACHE_RE.match(path)
+        if match:
+            return self._cache_get(match.group(1))
+        self._error(404, "NOT_FOUND", f"Unknown endpoint {path}")
+
+    def do_DELETE(self):
+        path = urlsplit(self.path).path
+        match = _FILE_RE.match(path) or _CACHE_RE.match(path)
+        if not match:
+            return self._error(404, "NOT_FOUND", f"Unknown endpoint {path}")
+        self._read_body()
+        state = self.server.state
+        with state.lock:
+            state.requests["delete"] += 1
+            found = state.files.pop(match.group(1), None) or state.caches.pop(match.group(1), None)
+        if found is None:
+            return self._error(404, "NOT_FOUND", f"{match.group(1)} not found")
+        self._json(200, {})
+
+    def log_message(self, format, *args):
+        pass  # keep test / harness output clean
+
+    # ── generateContent ──
+
+    def _generate(self, model: str):
+        body = self._read_json()
+        state = self.server.state
+        with state.lock:
+            state.requests["generate"] += 1
+        if self._inject_fault("generate"):
+            return
+        time.sleep(state.sample(state.config.generate_latency))
+
+        parts = [p for c in body.get("contents", []) for p in c.get("parts", [])]
+        media = [p for p in parts if _part(p, "inline_data") or _part(p, "file_data")]
+        for p in parts:
+            ref = _part(p, "file_data")
+            if ref and not self._file_usable(ref.get("fileUri") or ref.get("file_uri", "")):
+                return self._error(400, "FAILED_PRECONDITION", "File is not in an ACTIVE state")
+
+        with state.lock:
+            if len(media) > 1:
+                payload = [dict(_fake_metadata(state.rng, state.config.keyword_count), image=i)
+                           for i in range(1, len(media) + 1)]
+            else:
+                payload = _fake_metadata(state.rng, state.config.keyword_count)
+        text = json.dumps(payload)
+
+        prompt_chars = sum(len(p.get("text", "")) for p in parts)
+        usage = {
+            "promptTokenCount": 258 * len(media) + prompt_chars // 4,
+            "candidatesTokenCount": len(text) // 4,
+        }
+        cached = body.get("cachedContent") or body.get("cached_content")
+        if cached:
+            with state.lock:
+                cache = state.caches.get(cached)
+            if cache is None:
+                return self._error(404, "NOT_FOUND", f"Cached content {cached} not found")
+            usage["cachedContentTokenCount"] = cache["usageMetadata"]["totalTokenCount"]
+            usage["promptTokenCount"] += usage["cachedContentTokenCount"]
+        usage["totalTokenCount"] = usage["promptTokenCount"] + usage["candidatesTokenCount"]
+
+        self._json(200, {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": text}]},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": usage,
+            "modelVersion": model,
+        })
+
+    def _file_usable(self, uri: str) -> bool:
+        name = "files/" + uri.rstrip("/").rsplit("/", 1)[-1]
+        state = self.server.state
+        with state.lock:
+            entry = state.files.get(name)
+            return entry is not None and self._refresh(entry)["state"] == "ACTIVE"
+
+    # ── Files (resumable upload) ──
+
+    def _upload_start(self):
+        body = self._read_json()
+        state = self.server.state
+        with state.lock:
+            state.requests["upload_start"] += 1
+        if self.headers.get("X-Goog-Upload-Command", "").strip() != "start":
+            return self._error(400, "INVALID_ARGUMENT", "Only the resumable protocol is supported")
+        if self._inject_fault("upload_start"):
+            return
+        upload_id = uuid.uuid4().hex
+        with state.lock:
+            state.sessions[upload_id] = {
+                "size": int(self.headers.get("X-Goog-Upload-Header-Content-Length", "0") or 0),
+                "mime": self.headers.get("X-Goog-Upload-Header-Content-Type", "video/mp4"),
+                "display_name": body.get("file", {}).get("display_name")
+                or body.get("file", {}).get("displayName", ""),
+                "data": bytearray(),
+            }
+        host = self.headers.get("Host", f"127.0.0.1:{self.server.server_address[1]}")
+        self._json(200, {}, headers={
+            "X-Goog-Upload-Status": "active",
+            "X-Goog-Upload-URL": f"http://{host}/upload/v1beta/files/{upload_id}",
+        })
+
+    def _upload_chunk(self, upload_id: str):
+        data = self._read_body()
+        state = self.server.state
+        command = self.headers.get("X-Goog-Upload-Command", "")
+        with state.lock:
+            state.requests["upload_query" if command == "query" else "upload_chunk"] += 1
+            session = state.sessions.get(upload_id)
+        if session is None:
+            return self._error(404, "NOT_FOUND", "Upload session not found")
+        if command == "query":
+            return self._upload_status(session)
+        if self._inject_fault("upload_chunk"):
+            return
+        time.sleep(state.sample(state.config.upload_latency))
+
+        offset = int(self.headers.get("X-Goog-Upload-Offset", "0") or 0)
+        with state.lock:
+            if offset != len(session["data"]):
+                mismatch = len(session["data"])
+            else:
+                mismatch = None
+                session["data"].extend(data)
+        if mismatch is not None:
+            return self._error(400, "INVALID_ARGUMENT",
+                               f"Offset {offset} does not match received {mismatch}")
+        if "finalize" not in command:
+            return self._json(200, {}, headers={"X-Goog-Upload-Status": "active"})
+
+        resource = self._finalize(upload_id, session)
+        self._json(200, {"file": resource}, headers={"X-Goog-Upload-Status": "final"})
+
+    def _upload_status(self, session: dict):
+        if "file" in session:
+            return self._json(200, {"file": session["file"]},
+                              headers={"X-Goog-Upload-Status": "final"})
+        self._json(200, {}, headers={
+            "X-Goog-Upload-Status": "active",
+            "X-Goog-Upload-Size-Received": str(len(session["data"])),
+        })
+
+    def _finalize(self, upload_id: str, session: dict) -> dict:
+        state = self.server.state
+        name = f"files/{upload_id[:12]}"
+        host = self.headers.get("Host", f"127.0.0.1:{self.server.server_address[1]}")
+        now = time.time()
+        resource = {
+            "name": name,
+            "displayName": session["display_name"],
+            "mimeType": session["mime"],
+            "sizeBytes": str(len(session["data"])),
+            "createTime": _timestamp(now),
+            "uri": f"http://{host}/v1beta/{name}",
+            "state": "PROCESSING",
+        }
+        final_state = "FAILED" if state.roll(state.config.processing_failed) else "ACTIVE"
+        delay = state.sample(state.config.processing_delay)
+        with state.lock:
+            state.files[name] = {"resource": resource, "ready_at": now + delay,
+                                 "final_state": final_state}
+            session["file"] = dict(resource)
+            session["data"] = bytearray()   # bytes are not needed once finalized
+            return self._refresh(state.files[name])
+
+    def _file_get(self, name: str):
+        self._read_body()
+        state = self.server.state
+        with state.lock:
+            state.requests["get_file"] += 1
+            entry = state.files.get(name)
+            resource = self._refresh(entry) if entry else None
+        if resource is None:
+            return self._error(404, "NOT_FOUND", f"File {name} not found")
+        self._json(200, resource)
+
+    def _file_list(self):
+        self._read_body()
+        state = self.server.state
+        with state.lock:
+            state.requests["list_files"] += 1
+            files = [self._refresh(entry) for entry in state.files.values()]
+        self._json(200, {"files": files} if files else {})
+
+    @staticmethod
+    def _refresh(entry: dict) -> dict:
+        """PROCESSING until ready_at has passed (caller holds the state lock)."""
+        resource = entry["resource"]
+        if resource["state"] == "PROCESSING" and time.time() >= entry["ready_at"]:
+            resource["state"] = entry["final_state"]
+        return dict(resource)
+
+    # ── cachedContents ──
+
+    def _cache_create(self):
+        body = self._read_json()
+        state = self.server.state
+        with state.lock:
+            state.requests["cache_create"] += 1
+        if self._inject_fault("cache_create"):
+            return
+        instruction = body.get("systemInstruction") or body.get("system_instruction") or {}
+        chars = sum(len(p.get("text", "")) for p in instruction.get("parts", []))
+        name = f"cachedContents/{uuid.uuid4().hex[:12]}"
+        now = time.time()
+        resource = {
+            "name": name,
+            "model": body.get("model", ""),
+            "displayName": body.get("displayName") or body.get("display_name", ""),
+            "createTime": _timestamp(now),
+            "updateTime": _timestamp(now),
+            "expireTime": _timestamp(now + _ttl_seconds(body.get("ttl", "3600s"))),
+            "usageMetadata": {"totalTokenCount": chars // 4},
+        }
+        with state.lock:
+            state.caches[name] = resource
+        self._json(200, resource)
+
+    def _cache_get(self, name: str):
+        self._read_body()
+        state = self.server.state
+        with state.lock:
+            resource = state.caches.get(name)
+        if resource is None:
+            return self._error(404, "NOT_FOUND", f"Cached content {name} not found")
+        self._json(200, resource)
+
+    def _cache_list(self):
+        self._read_body()
+        state = self.server.state
+        with state.lock:
+            caches = list(state.caches.values())
+        self._json(200, {"cachedContents": caches} if caches else {})
+
+    # ── Fault injection ──
+
+    def _inject_fault(self, surface: str) -> bool:
+        """Maybe answer with an injected fault, counted against surface. True = response sent."""
+        state = self.server.state
+        config = state.config
+        if state.roll(config.ssl_error):
+            with state.lock:
+                state.faults["ssl"] += 1
+                state.faulted[surface] += 1
+            self.wfile.write(_SSL_GARBAGE)
+            self.wfile.flush()
+            self.close_connection = True
+            return True
+        if state.roll(config.rate_limit):
+            with state.lock:
+                state.faults["429"] += 1
+                state.faulted[surface] += 1
+            self._error(429, "RESOURCE_EXHAUSTED",
+                        "Resource has been exhausted (e.g. check quota).")
+            return True
+        if state.roll(config.timeout):
+            with state.lock:
+                state.faults["timeout"] += 1
+                state.faulted[surface] += 1
+            time.sleep(config.timeout_hang)
+            self._error(504, "DEADLINE_EXCEEDED", "Deadline exceeded")
+            return True
+        return False
+
+    # ── HTTP helpers ──
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length", "0") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _read_json(self) -> dict:
+        raw = self._read_body()
+        try:
+            data = json.loads(raw) if raw else {}
+        except ValueError:
+            data = {}
+        return data if isinstance(data, dict) else {}
+
+    def _json(self, code: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, code: int, status: str, message: str):
+        self._json(code, {"error": {"code": code, "message": message, "status": status}})
+
+
+class FakeGeminiServer:
+    """Threaded fake Gemini API on 127.0.0.1 (port 0 = pick a free one)."""
+
+    def __init__(self, config: FakeGeminiConfig = None, port: int = 0):
+        self.config = config or FakeGeminiConfig()
+        self._state = _FakeState(self.config)
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.state = self._state
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGeminiServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05},
+            name="fake-gemini", daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self) -> "FakeGeminiServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> dict:
+        """Requests per surface, injected faults by kind and by surface, files / caches held."""
+        state = self._state
+        with state.lock:
+            return {
+                "requests": dict(state.requests),
+                "faults": dict(state.faults),
+                "faulted": dict(state.faulted),
+                "files": len(state.files),
+                "caches": len(state.caches),
+            }
+
+
+def _part(part: dict, snake: str):
+    """A request part field under its snake_case or camelCase (proto JSON) name."""
+    head, _, tail = snake.partition("_")
+    return part.get(snake) or part.get(head + tail.capitalize())
+
+
+def _fake_metadata(rng: random.Random, keyword_count: int) -> dict:
+    words = rng.sample(_WORDS, k=min(len(_WORDS), keyword_count))
+    while len(words) < keyword_count:
+        words.append(f"{rng.choice(_WORDS)} {rng.choice(_WORDS)}")
+    title = " ".join(rng.sample(_WORDS, k=8)).capitalize()
+    return {
+        "title": title,
+        "description": f"{title} in a calm {rng.choice(_WORDS)} scene with soft natural light.",
+        "keywords": words,
+        "category": "Nature",
+    }
+
+
+def _timestamp(seconds: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + "Z"
+
+
+def _ttl_seconds(ttl) -> float:
+    if isinstance(ttl, dict):
+        return float(ttl.get("seconds", 3600))
+    try:
+        return float(str(ttl).rstrip("s"))
+    except ValueError:
+        return 3600.0
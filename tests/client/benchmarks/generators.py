@@ -0,0 +1,102 @@
+"""
+Synthetic, seeded workloads for the post-processing benchmarks.
+Sizes match a large real job: 10k results × 50–100 keywords, a 5k-term blacklist,
+a ~500 KB iStock dictionary.
+"""
+import random
+
+_SYLLABLES = (
+    "sun", "set", "bea", "ch", "wa", "ter", "moun", "tain", "for", "est", "ci", "ty",
+    "peo", "ple", "wo", "man", "fam", "ily", "coff", "ee", "blue", "sky", "gold", "en",
+    "hap", "py", "run", "ning", "smi", "ling", "tra", "vel", "out", "door", "nat", "ure",
+)
+_SUFFIXES = ("", "", "", "s", "ing", "ed", "er", "es")
+
+
+def vocabulary(size: int, seed: int = 1) -> list:
+    """`size` distinct stock-ish words (2–4 syllables + inflections)."""
+    rng = random.Random(seed)
+    words = []
+    seen = set()
+    while len(words) < size:
+        word = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+        word += rng.choice(_SUFFIXES)
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def keyword_lists(count: int = 10_000, low: int = 50, high: int = 100,
+                  vocab_size: int = 4_000, seed: int = 2) -> list:
+    """AI-style keyword lists: Zipf-ish reuse of a shared vocabulary, ~30% phrases,
+    stray punctuation / case noise like real model output."""
+    rng = random.Random(seed)
+    vocab = vocabulary(vocab_size, seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]
+    lists = []
+    for _ in range(count):
+        n = rng.randint(low, high)
+        words = rng.choices(vocab, weights=weights, k=n * 2)
+        keywords = []
+        for i in range(n):
+            kw = words[i]
+            if rng.random() < 0.3:
+                kw = f"{kw} {words[n + i]}"
+            if rng.random() < 0.1:
+                kw = kw.title()
+            if rng.random() < 0.05:
+                kw = f' "{kw}". '
+            keywords.append(kw)
+        lists.append(keywords)
+    return lists
+
+
+def results(count: int = 10_000, seed: int = 3) -> dict:
+    """{filename: result dict} as produced by JobManager (titles, descriptions, keywords)."""
+    rng = random.Random(seed)
+    vocab = vocabulary(2_000, seed)
+    out = {}
+    for i, keywords in enumerate(keyword_lists(count, seed=seed)):
+        ext = ".mp4" if i % 10 == 0 else ".jpg"
+        title = " ".join(rng.choices(vocab, k=rng.randint(6, 12))).capitalize()
+        description = " ".join(rng.choices(vocab, k=rng.randint(15, 30))).capitalize() + "."
+        out[f"IMG_{i:05d}{ext}"] = {
+            "status": "success", "title": title, "description": description,
+            "keywords": keywords, "raw_keywords": list(keywords), "category": "Nature",
+        }
+    return out
+
+
+def blacklist(count: int = 5_000, seed: int = 4) -> list:
+    """Brand-like terms; ~20% multi-word, a few overlapping the keyword vocabulary."""
+    rng = random.Random(seed)
+    names = vocabulary(count + 200, seed + 100)
+    common = vocabulary(4_000, 2)
+    terms = []
+    for i in range(count):
+        if i % 50 == 0:
+            terms.append(rng.choice(common))
+        elif rng.random() < 0.2:
+            terms.append(f"{names[i]} {names[-1 - i % 200]}")
+        else:
+            terms.append(names[i])
+    return terms
+
+
+def dictionary(target_bytes: int = 500_000, seed: int = 5) -> str:
+    """Newline-separated iStock-style dictionary of about target_bytes."""
+    rng = random.Random(seed)
+    vocab = vocabulary(20_000, 2)
+    lines = []
+    size = 0
+    seen = set()
+    while size < target_bytes:
+        n = 1 if rng.random() < 0.6 else rng.randint(2, 3)
+        term = " ".join(rng.choice(vocab[:8_000]) for _ in range(n)).title()
+        if term in seen:
+            continue
+        seen.add(term)
+        lines.append(term)
+        size += len(term) + 1
+    return "\n".join(lines)
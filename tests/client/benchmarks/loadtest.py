@@ -0,0 +1,233 @@
+"""
+End-to-end load test: JobManager + QueueManager + Gemini engine against FakeGeminiServer.
+
+    python -m tests.client.benchmarks.loadtest --files 1000 --video-ratio 0.1 \\
+        --latency lognormal:1.5:0.4 --rate-limit 0.03 --timeout 0.01 --ssl 0.01 \\
+        --processing uniform:2:6 [--async]
+
+Builds a synthetic folder, runs one job with a stub backend (reserve / finalize), and
+reports files/min, p50/p95 per-file latency, retry counts and the server's request mix.
+HOME is pointed at a temp dir first so journals, result cache and proxies stay isolated.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+from unittest.mock import patch
+
+from .fake_gemini import FakeGeminiServer, FakeGeminiConfig, Latency
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+CLIENT_DIR = os.path.join(ROOT, "client")
+
+class _StubBackend:
+    """Stands in for core.api_client.api: unlimited credits, plaintext config."""
+
+    def __init__(self, prompt: str, concurrency: dict, cache_threshold: int):
+        self._prompt = prompt
+        self._concurrency = concurrency
+        self._cache_threshold = cache_threshold
+
+    def reserve_job(self, file_count: int, **_kwargs) -> dict:
+        return {
+            "job_token": f"loadtest-{int(time.time())}",
+            "config": self._prompt,
+            "concurrency": dict(self._concurrency),
+            "cache_threshold": self._cache_threshold,
+            "photo_rate": 0,
+        }
+
+    def finalize_job(self, job_token: str, success: int, failed: int, *_args) -> dict:
+        return {"refunded": 0, "balance": 0}
+
+
+def make_folder(folder: str, count: int, video_ratio: float = 0.1,
+                photo_size: tuple = (320, 240), video_bytes: int = 512 * 1024) -> list:
+    """
+    count synthetic files. Photos are real JPEGs of random pixels (~48 KB at 320x240),
+    so every run misses the result cache but still goes through the image proxy;
+    videos are random bytes (the fake server never decodes them).
+    """
+    from PIL import Image
+
+    files = []
+    every = round(1 / video_ratio) if video_ratio > 0 else 0
+    width, height = photo_size
+    for i in range(count):
+        video = every and i % every == 0
+        path = os.path.join(folder, f"LT_{i:05d}.{'mp4' if video else 'jpg'}")
+        if video:
+            with open(path, "wb") as f:
+                f.write(os.urandom(video_bytes))
+        else:
+            pixels = os.urandom(width * height * 3)
+            Image.frombytes("RGB", (width, height), pixels).save(path, "JPEG")
+        files.append(path)
+    return files
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_load_test(files: int = 1000, video_ratio: float = 0.1,
+                  config: FakeGeminiConfig = None, use_async: bool = False,
+                  concurrency: dict = None, settings: dict = None,
+                  workdir: str = "", job_timeout: float = 3600) -> dict:
+    """Run one job end to end against a fresh fake server; returns the report dict."""
+    workdir = workdir or tempfile.mkdtemp(prefix="bigeye-loadtest-")
+    folder = os.path.join(workdir, "shoot")
+    os.makedirs(folder, exist_ok=True)
+    paths = make_folder(folder, files, video_ratio)
+
+    with FakeGeminiServer(config) as server:
+        env = {"BIGEYE_GEMINI_URL": server.url, "HOME": workdir, "USERPROFILE": workdir}
+        with patch.dict(os.environ, env):
+            report = _run_job(paths, folder, use_async, concurrency, settings, job_timeout)
+        report["server"] = server.stats()
+    report["retries"] = retry_counts(report["server"])
+    return report
+
+
+def retry_counts(stats: dict) -> dict:
+    """
+    Retries per surface, counted server-side: every injected fault costs the client one
+    retry, and every upload status query is a resume. Video attempts run in worker
+    processes, where a log handler in this process would never see them.
+    """
+    faulted = stats.get("faulted", {})
+    counts = {key: faulted.get(key, 0)
+              for key in ("generate", "upload_start", "upload_chunk", "cache_create")}
+    counts["upload_resume"] = stats.get("requests", {}).get("upload_query", 0)
+    return counts
+
+
+def _run_job(paths: list, folder: str, use_async: bool,
+             concurrency: dict, settings: dict, job_timeout: float) -> dict:
+    # core.config reads HOME / BIGEYE_GEMINI_URL at import time — meant for a fresh
+    # interpreter (the CLI, or a subprocess from a test), so drop any earlier import
+    if CLIENT_DIR not in sys.path:
+        sys.path.insert(0, CLIENT_DIR)
+    stale = [name for name in sys.modules if name == "core" or name.startswith("core.")]
+    for name in stale:
+        del sys.modules[name]
+
+    from PySide6.QtCore import QCoreApplication, QTimer
+    from core.job_manager import JobManager
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    backend = _StubBackend(
+        "Describe this {media_type_str} for stock sites: a {title_min}-{title_limit} char title, "
+        "a {desc_min}-{desc_limit} char description and {keyword_count} keywords. "
+        "{video_instruction} Respond in JSON with title, description, keywords, category.",
+        concurrency or {"image": 5, "video": 2},
+        cache_threshold=20,
+    )
+    job_settings = {
+        "api_key": "fake-key", "model": "gemini-2.5-flash", "platform": "Adobe & Shutterstock",
+        "keyword_style": "Hybrid", "max_keywords": 45, "title_length": 100,
+        "description_length": 200, "folder_path": folder, "async_engine": use_async,
+        **(settings or {}),
+    }
+
+    latencies = []
+    outcome = {}
+
+    manager = JobManager()
+    manager.file_completed.connect(
+        lambda _path, result: latencies.append(result.get("processing_time", 0.0))
+    )
+    manager.job_completed.connect(lambda summary: (outcome.update(summary=summary), app.quit()))
+    manager.job_failed.connect(lambda message: (outcome.update(error=message), app.quit()))
+    QTimer.singleShot(int(job_timeout * 1000), app.quit)
+
+    with patch("core.job_manager.api", backend), \
+            patch("core.job_manager.decrypt_aes", lambda data, _key: data):
+        started = time.perf_counter()
+        QTimer.singleShot(0, lambda: manager.start_job(paths, job_settings))
+        app.exec()
+        elapsed = time.perf_counter() - started
+    if manager.is_running:
+        manager.stop_job()
+
+    summary = outcome.get("summary", {})
+    done = summary.get("successful", 0)
+    return {
+        "files": len(paths),
+        "successful": done,
+        "failed": summary.get("failed", 0),
+        "error": outcome.get("error")
+        or ("job timed out" if not summary or summary.get("cancelled") else ""),
+        "engine": "async" if use_async else "threads",
+        "seconds": round(elapsed, 2),
+        "files_per_min": round(done / elapsed * 60, 1) if elapsed > 0 else 0.0,
+        "latency_p50": round(percentile(latencies, 50), 3),
+        "latency_p95": round(percentile(latencies, 95), 3),
+        "concurrency": summary.get("concurrency", {}),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="BigEye end-to-end load test (fake Gemini)")
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--video-ratio", type=float, default=0.1)
+    parser.add_argument("--latency", default="lognormal:1.5:0.4", help="generateContent latency")
+    parser.add_argument("--upload-latency", default="fixed:0.05", help="per upload chunk")
+    parser.add_argument("--processing", default="uniform:2:6", help="PROCESSING → ACTIVE delay")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="429 probability")
+    parser.add_argument("--timeout", type=float, default=0.0, help="timeout probability")
+    parser.add_argument("--timeout-hang", type=float, default=2.0)
+    parser.add_argument("--ssl", type=float, default=0.0, help="connection-drop probability")
+    parser.add_argument("--processing-failed", type=float, default=0.0)
+    parser.add_argument("--image-workers", type=int, default=5)
+    parser.add_argument("--video-workers", type=int, default=2)
+    parser.add_argument("--async", dest="use_async", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    config = FakeGeminiConfig(
+        generate_latency=Latency.parse(args.latency),
+        upload_latency=Latency.parse(args.upload_latency),
+        processing_delay=Latency.parse(args.processing),
+        rate_limit=args.rate_limit, timeout=args.timeout, ssl_error=args.ssl,
+        processing_failed=args.processing_failed, timeout_hang=args.timeout_hang,
+        seed=args.seed,
+    )
+    report = run_load_test(
+        args.files, args.video_ratio, config, use_async=args.use_async,
+        concurrency={"image": args.image_workers, "video": args.video_workers},
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['successful']}/{report['files']} ok, {report['failed']} failed "
+              f"in {report['seconds']}s ({report['engine']} engine)")
+        print(f"throughput: {report['files_per_min']} files/min")
+        print(f"latency: p50 {report['latency_p50']}s, p95 {report['latency_p95']}s")
+        print(f"retries: {report['retries']}")
+        print(f"server: {report['server']}")
+        if report["error"]:
+            print(f"error: {report['error']}")
+    return 0 if not report["error"] else 1
+
+
+if __name__ == "__main__":
+    code = main()
+    # Exit without interpreter finalization. PySide6 6.12 (client/requirements.txt pins
+    # 6.7) drops a reference to True on every Signal.emit(), whatever the arguments;
+    # once a run has emitted enough signals, finalization hits bool_dealloc and SIGABRTs,
+    # replacing a good exit code with -6. It is not a teardown-order problem: drop this
+    # once the test environment runs the pinned PySide6.
+    sys.stdout.flush()
+    sys.stderr.flush()
+    logging.shutdown()
+    os._exit(code)
@@ -0,0 +1,49 @@
+"""
+End-to-end throughput against the local fake Gemini server (see loadtest.py).
+Opt-in like the other benchmarks; each run uses a fresh interpreter because core.config
+reads BIGEYE_GEMINI_URL / HOME at import time.
+"""
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("httpx")
+pytest.importorskip("PIL")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+FILES = int(os.environ.get("BIGEYE_BENCH_E2E_FILES", "200"))
+
+
+def _load_test(*args) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-m", "tests.client.benchmarks.loadtest", "--json",
+         "--files", str(FILES), *args],
+        cwd=ROOT, capture_output=True, text=True, timeout=1800,
+    )
+    assert proc.returncode == 0, proc.stdout[-2000:] + proc.stderr[-2000:]
+    return json.loads(proc.stdout[proc.stdout.index("{"):])
+
+
+class TestEndToEnd:
+
+    @pytest.mark.parametrize("engine", ["threads", "async"])
+    def test_clean_run(self, engine):
+        args = ["--latency", "lognormal:0.3:0.4", "--processing", "uniform:0.5:2"]
+        report = _load_test(*args, *(["--async"] if engine == "async" else []))
+        print(f"\n[e2e] {engine}: {report['files_per_min']} files/min, "
+              f"p50 {report['latency_p50']}s, p95 {report['latency_p95']}s")
+        assert report["successful"] == FILES
+        assert report["retries"]["generate"] == 0
+
+    def test_faults_are_retried(self):
+        report = _load_test(
+            "--latency", "fixed:0.1", "--processing", "fixed:0.5",
+            "--rate-limit", "0.05", "--timeout", "0.02", "--timeout-hang", "0.2", "--ssl", "0.02",
+        )
+        print(f"\n[e2e] faults: {report['files_per_min']} files/min, retries {report['retries']}, "
+              f"server {report['server']['faults']}")
+        assert report["retries"]["generate"] > 0
+        assert report["successful"] >= FILES * 0.95
@@ -0,0 +1,144 @@
+"""
+Throughput / allocation benchmarks for the client post-processing hot paths:
+keyword pipelines, blacklist matching, dictionary snapping, CSV export, prompt building.
+Opt-in — see conftest.py.
+"""
+import copy
+import pytest
+
+from core.logic.keyword_processor import KeywordProcessor
+from core.logic.copyright_guard import CopyrightGuard
+from core.logic.dictionary_index import DictionaryIndex
+from core.data.csv_exporter import CSVExporter
+
+TEMPLATE = (
+    "Describe this {media_type_str}. Title {title_min}-{title_limit} chars, description "
+    "{desc_min}-{desc_limit} chars, {keyword_count} keywords. {video_instruction} "
+    "Dictionary: {keyword_data}"
+)
+
+
+def _raw_lists(results: dict) -> list:
+    return [r["raw_keywords"] for r in results.values()]
+
+
+# ═══════════════════════════════════════
+# Keyword pipelines
+# ═══════════════════════════════════════
+
+class TestKeywordPipelines:
+
+    @pytest.mark.parametrize("pipeline", ["hybrid", "single"])
+    def test_process_batch(self, bench, results_10k, blacklist_5k, pipeline):
+        lists = _raw_lists(results_10k)
+
+        def setup():
+            processor = KeywordProcessor()
+            processor.set_blacklist(set(blacklist_5k))
+            return processor
+
+        bench.run(f"keywords_{pipeline}_10k", lambda p: p.process_batch(lists, pipeline, 45),
+                  items=len(lists), setup=setup, stems=True)
+
+    def test_istock_with_dictionary(self, bench, results_10k, blacklist_5k, dictionary_500k):
+        lists = _raw_lists(results_10k)
+        index = DictionaryIndex(dictionary_500k)
+
+        def setup():
+            processor = KeywordProcessor()
+            processor.set_blacklist(set(blacklist_5k))
+            processor.set_dictionary(index)
+            return processor
+
+        bench.run("keywords_istock_dictionary_10k",
+                  lambda p: p.process_batch(lists, "istock", 45),
+                  items=len(lists), setup=setup, stems=True)
+
+    def test_per_file_hybrid(self, bench, results_10k, blacklist_5k):
+        """The non-deferred path: one process_hybrid call per file."""
+        lists = _raw_lists(results_10k)
+
+        def setup():
+            processor = KeywordProcessor()
+            processor.set_blacklist(set(blacklist_5k))
+            return processor
+
+        def run(processor):
+            for keywords in lists:
+                processor.process_hybrid(keywords, 45)
+
+        bench.run("keywords_hybrid_per_file_10k", run, items=len(lists), setup=setup, stems=True)
+
+
+# ═══════════════════════════════════════
+# Blacklist / dictionary
+# ═══════════════════════════════════════
+
+class TestBlacklist:
+
+    def test_build_matcher(self, bench, blacklist_5k):
+        bench.run("blacklist_build_5k", lambda _: CopyrightGuard().initialize(blacklist_5k),
+                  items=len(blacklist_5k))
+
+    def test_scan_results(self, bench, results_10k, blacklist_5k):
+        guard = CopyrightGuard()
+        guard.initialize(blacklist_5k)
+        values = list(results_10k.values())
+
+        def run(_):
+            for result in values:
+                guard.scan_result(result)
+
+        bench.run("copyright_scan_10k", run, items=len(values))
+
+    def test_clean_text(self, bench, results_10k, blacklist_5k):
+        guard = CopyrightGuard()
+        guard.initialize(blacklist_5k)
+        texts = [r["description"] for r in results_10k.values()]
+
+        def run(_):
+            for text in texts:
+                guard.clean_text(text)
+
+        bench.run("copyright_clean_text_10k", run, items=len(texts))
+
+    def test_dictionary_index_build(self, bench, dictionary_500k):
+        terms = dictionary_500k.count("\n") + 1
+        bench.run("dictionary_index_build_500kb", lambda _: DictionaryIndex(dictionary_500k),
+                  items=terms, stems=True)
+
+
+# ═══════════════════════════════════════
+# CSV export / prompt
+# ═══════════════════════════════════════
+
+class TestExportAndPrompt:
+
+    @pytest.mark.parametrize("platform", ["iStock", "Adobe & Shutterstock"])
+    def test_csv_export(self, bench, results_10k, tmp_path_factory, platform):
+        results = copy.deepcopy(results_10k)
+        for r in results.values():
+            r["keywords"] = r["keywords"][:45]
+        tag = "istock" if platform == "iStock" else "adobe_shutterstock"
+
+        bench.run(
+            f"csv_export_{tag}_10k",
+            lambda folder: CSVExporter.export_for_platform(platform, results, folder, "gemini-2.5-pro"),
+            items=len(results), setup=lambda: str(tmp_path_factory.mktemp("csv")),
+        )
+
+    def test_build_prompt(self, bench, dictionary_500k):
+        from core.job_manager import JobManager
+        manager = JobManager()
+        manager._settings = {"max_keywords": 45, "title_length": 100, "description_length": 200}
+        manager._prompt_template = TEMPLATE
+        manager._dictionary = dictionary_500k
+        manager._dictionary_in_prompt = True
+        paths = [f"/shoot/IMG_{i:05d}.{'mp4' if i % 10 == 0 else 'jpg'}" for i in range(10_000)]
+
+        def run(_):
+            manager._compile_prompts()
+            for path in paths:
+                manager._prompt_digest(manager._build_prompt(path))
+
+        bench.run("build_prompt_500kb_dictionary_10k", run, items=len(paths))
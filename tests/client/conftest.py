@@ -9,3 +9,19 @@ import pytest
 CLIENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "client")
 if CLIENT_DIR not in sys.path:
     sys.path.insert(0, CLIENT_DIR)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_rate_limiters():
+    """Gemini RPM/TPM buckets are process-wide — start every test with full buckets."""
+    from core.engines.rate_limiter import RateLimiter
+    RateLimiter.reset_all()
+    yield
+    RateLimiter.reset_all()
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_registry(tmp_path, monkeypatch):
+    """Engines register context caches in ~/.bigeye — keep tests out of the real file."""
+    monkeypatch.setattr("core.engines.cache_registry.CONTEXT_CACHE_PATH",
+                        str(tmp_path / "context_caches.json"))
@@ -0,0 +1,234 @@
+"""
+Tests for client/core/managers/adaptive_concurrency.py
+Covers: AIMD increase/decrease, cooldown, bounds, blocking acquire, history/listener,
+        QueueManager feedback from file results, GeminiEngine _api_sem feedback.
+"""
+import threading
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+
+from core.managers.adaptive_concurrency import AdaptiveConcurrency
+from core.managers.queue_manager import QueueManager
+from core.engines.gemini_engine import GeminiEngine
+
+
+# ═══════════════════════════════════════
+# AIMD window
+# ═══════════════════════════════════════
+
+class TestWindow:
+
+    def test_grows_after_full_window_of_successes(self):
+        ac = AdaptiveConcurrency(4, maximum=10)
+        for _ in range(3):
+            ac.on_success()
+        assert ac.window == 4
+        ac.on_success()
+        assert ac.window == 5
+
+    def test_growth_capped_at_maximum(self):
+        ac = AdaptiveConcurrency(2, maximum=3)
+        for _ in range(50):
+            ac.on_success()
+        assert ac.window == 3
+
+    def test_rate_limit_halves_window(self):
+        ac = AdaptiveConcurrency(8, maximum=16)
+        ac.record("RATE_LIMIT")
+        assert ac.window == 4
+
+    def test_timeout_counts_as_congestion(self):
+        ac = AdaptiveConcurrency(8, maximum=16)
+        ac.record("TIMEOUT")
+        assert ac.window == 4
+
+    @pytest.mark.parametrize("error_type", ["SAFETY", "INVALID_KEY", "QUOTA", "UNKNOWN"])
+    def test_other_errors_ignored(self, error_type):
+        ac = AdaptiveConcurrency(8, maximum=16)
+        ac.record(error_type)
+        assert ac.window == 8
+
+    def test_never_below_minimum(self):
+        ac = AdaptiveConcurrency(2, minimum=1, cooldown_sec=0)
+        for _ in range(5):
+            ac.on_congestion()
+        assert ac.window == 1
+
+    def test_burst_of_429_cut_once_within_cooldown(self):
+        ac = AdaptiveConcurrency(16, maximum=16, cooldown_sec=60)
+        for _ in range(5):
+            ac.on_congestion()
+        assert ac.window == 8
+
+    def test_congestion_resets_success_streak(self):
+        ac = AdaptiveConcurrency(4, maximum=10)
+        for _ in range(3):
+            ac.on_success()
+        ac.on_congestion()
+        assert ac.window == 2
+        ac.on_success()
+        assert ac.window == 2
+
+    def test_reset_restarts_window(self):
+        ac = AdaptiveConcurrency(8, maximum=16)
+        ac.on_congestion()
+        ac.reset(3, maximum=6)
+        assert ac.window == 3
+        assert ac.maximum == 6
+        assert [h["reason"] for h in ac.history()] == ["start"]
+
+
+# ═══════════════════════════════════════
+# Semaphore behaviour
+# ═══════════════════════════════════════
+
+class TestSemaphore:
+
+    def test_acquire_blocks_at_window(self):
+        ac = AdaptiveConcurrency(2)
+        assert ac.acquire(timeout=0.1)
+        assert ac.acquire(timeout=0.1)
+        assert not ac.acquire(timeout=0.05)
+        ac.release()
+        assert ac.acquire(timeout=0.1)
+
+    def test_growth_wakes_waiter(self):
+        ac = AdaptiveConcurrency(1, maximum=2)
+        ac.acquire()
+        got = []
+        t = threading.Thread(target=lambda: got.append(ac.acquire(timeout=2)))
+        t.start()
+        time.sleep(0.05)
+        ac.on_success()  # window 1 → 2
+        t.join(3)
+        assert got == [True]
+        assert ac.in_flight == 2
+
+    def test_context_manager_releases_on_error(self):
+        ac = AdaptiveConcurrency(1)
+        with pytest.raises(RuntimeError):
+            with ac:
+                raise RuntimeError("boom")
+        assert ac.in_flight == 0
+
+    def test_max_in_flight_respected(self):
+        ac = AdaptiveConcurrency(3)
+        peak = []
+        lock = threading.Lock()
+        active = [0]
+
+        def work():
+            with ac:
+                with lock:
+                    active[0] += 1
+                    peak.append(active[0])
+                time.sleep(0.01)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(12)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert max(peak) <= 3
+
+
+# ═══════════════════════════════════════
+# History / listener
+# ═══════════════════════════════════════
+
+class TestObservability:
+
+    def test_history_records_changes(self):
+        ac = AdaptiveConcurrency(2, maximum=4)
+        ac.on_success()
+        ac.on_success()
+        ac.record("RATE_LIMIT")
+        reasons = [(h["reason"], h["window"]) for h in ac.history()]
+        assert reasons == [("start", 2), ("increase", 3), ("rate_limit", 1)]
+
+    def test_listener_called_on_change(self):
+        ac = AdaptiveConcurrency(4, maximum=8)
+        seen = []
+        ac.set_listener(seen.append)
+        ac.on_congestion()
+        assert seen == [2]
+
+    def test_listener_error_does_not_break(self):
+        ac = AdaptiveConcurrency(4)
+        ac.set_listener(MagicMock(side_effect=RuntimeError("ui gone")))
+        ac.on_congestion()
+        assert ac.window == 2
+
+
+# ═══════════════════════════════════════
+# QueueManager integration
+# ═══════════════════════════════════════
+
+class TestQueueFeedback:
+
+    def test_rate_limited_file_shrinks_image_window(self, qtbot):
+        qm = QueueManager()
+        qm.set_concurrency(max_images=8, max_videos=2)
+        qm._total_count = 10
+        qm._on_file_completed("/tmp/a.jpg", {"status": "error", "error_type": "RATE_LIMIT"})
+        assert qm.concurrency()["image"] == 4
+        assert qm.concurrency()["video"] == 2
+
+    def test_video_result_feeds_video_window(self, qtbot):
+        qm = QueueManager()
+        qm.set_concurrency(max_images=5, max_videos=2)
+        qm._total_count = 10
+        qm._on_file_completed("/tmp/a.mp4", {"status": "error", "error_type": "TIMEOUT"})
+        assert qm.concurrency()["video"] == 1
+        assert qm.concurrency()["image"] == 5
+
+    def test_successes_grow_window_and_pool(self, qtbot):
+        qm = QueueManager()
+        qm.set_concurrency(max_images=2, max_videos=1)
+        qm._total_count = 10
+        with qtbot.waitSignal(qm.concurrency_changed, timeout=1000) as blocker:
+            qm._on_file_completed("/tmp/a.jpg", {"status": "success"})
+            qm._on_file_completed("/tmp/b.jpg", {"status": "success"})
+        assert blocker.args == ["image", 3]
+        assert qm._pool.maxThreadCount() == 3 + 1 + 3
+
+    def test_cache_hits_and_skips_ignored(self, qtbot):
+        qm = QueueManager()
+        qm.set_concurrency(max_images=1, max_videos=1)
+        qm._total_count = 10
+        qm._on_file_completed("/tmp/a.jpg", {"status": "success", "_cache_hit": True})
+        qm._on_file_completed("/tmp/b.jpg", {"status": "skipped"})
+        assert qm.concurrency()["image"] == 1
+
+
+# ═══════════════════════════════════════
+# GeminiEngine _api_sem
+# ═══════════════════════════════════════
+
+class TestEngineFeedback:
+
+    @pytest.fixture
+    def engine(self):
+        e = GeminiEngine()
+        e._api_key = "test-key"
+        e._model = MagicMock()
+        return e
+
+    def test_rate_limit_shrinks_api_window(self, engine):
+        ok = MagicMock(candidates=[MagicMock()], text='{"title": "t"}', usage_metadata=None)
+        engine._model.generate_content.side_effect = [Exception("429 Resource Exhausted"), ok]
+        with patch("core.engines.gemini_engine.time.sleep"):
+            engine._generate_with_retry(contents=["x"], timeout=30)
+        assert engine.api_concurrency == 3
+
+    def test_listener_receives_api_window(self, engine):
+        seen = []
+        engine.set_concurrency_listener(seen.append)
+        engine._model.generate_content.side_effect = Exception("429 rate limit")
+        with patch("core.engines.gemini_engine.time.sleep"):
+            with pytest.raises(Exception):
+                engine._generate_with_retry(contents=["x"], timeout=30)
+        assert seen and seen[0] == 3
@@ -0,0 +1,404 @@
+"""
+Tests for client/core/engines/async_gemini_engine.py (httpx.MockTransport, no network)
+Covers: photo/video contract, request body, retry + awaited backoff, error classification,
+        chunked + resumed video upload (shared ResumableUpload), PROCESSING wait on the
+        shared FileStatePoller, delete, AIMD slot gate,
+        QueueManager.start_async_queue.
+"""
+import json
+import asyncio
+import threading
+from types import SimpleNamespace
+import pytest
+from unittest.mock import patch, AsyncMock
+
+import httpx
+from PIL import Image
+
+from core.engines.async_gemini_engine import AsyncGeminiEngine
+from core.engines.gemini_engine import GeminiError, GeminiErrorType
+from core.engines.upload_manager import ResumableUpload, CHUNK_GRANULARITY
+from core.engines.file_poller import FileStatePoller
+from core.managers.queue_manager import QueueManager
+from core.config import MAX_RETRIES
+from tests.client.test_upload_manager import FakeUploadServer
+
+
+def _ok(payload=None, usage=True):
+    body = {"candidates": [{"content": {"parts": [
+        {"text": json.dumps(payload or {"title": "Sunset", "keywords": ["sun"]})}
+    ]}}]}
+    if usage:
+        body["usageMetadata"] = {"promptTokenCount": 300, "candidatesTokenCount": 50}
+    return httpx.Response(200, json=body)
+
+
+def _engine(handler):
+    e = AsyncGeminiEngine(base_url="https://fake.test", transport=httpx.MockTransport(handler))
+    e._api_key = "test-key"
+    e._model_name = "gemini-2.5-flash"
+    return e
+
+
+@pytest.fixture
+def photo(tmp_path):
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", (64, 48), (10, 20, 30)).save(str(path), "JPEG")
+    return str(path)
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"\x00" * 2048)
+    return str(path)
+
+
+@pytest.fixture
+def no_sleep():
+    """Make awaited backoffs / polls instant."""
+    with patch("core.engines.async_gemini_engine.asyncio.sleep", new_callable=AsyncMock) as m:
+        yield m
+
+
+# ═══════════════════════════════════════
+# Photo
+# ═══════════════════════════════════════
+
+class TestPhoto:
+
+    def test_process_photo_contract(self, photo):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return _ok()
+
+        engine = _engine(handler)
+        try:
+            result = engine.process_photo(photo, "describe")
+        finally:
+            engine.close()
+        assert result["title"] == "Sunset"
+        assert result["_token_input"] == 300
+        assert result["_token_output"] == 50
+        assert result["_token_cached"] == 0
+        req = requests[0]
+        assert req.url.path == "/v1beta/models/gemini-2.5-flash:generateContent"
+        assert req.headers["x-goog-api-key"] == "test-key"
+        body = json.loads(req.content)
+        parts = body["contents"][0]["parts"]
+        assert parts[0]["inline_data"]["mime_type"] == "image/jpeg"
+        assert parts[1]["text"] == "describe"
+        assert body["generationConfig"]["responseMimeType"] == "application/json"
+        schema = body["generationConfig"]["responseSchema"]
+        assert schema["properties"]["keywords"]["type"] == "ARRAY"
+
+    def test_system_prompt_inline_without_cache(self, photo):
+        bodies = []
+        engine = _engine(lambda r: (bodies.append(json.loads(r.content)), _ok())[1])
+        engine.set_system_prompt("SYSTEM")
+        try:
+            engine.process_photo(photo, "p")
+        finally:
+            engine.close()
+        assert bodies[0]["systemInstruction"]["parts"][0]["text"] == "SYSTEM"
+        assert "cachedContent" not in bodies[0]
+
+    def test_cached_content_used_when_available(self, photo):
+        bodies = []
+        engine = _engine(lambda r: (bodies.append(json.loads(r.content)), _ok())[1])
+        engine.set_system_prompt("SYSTEM")
+        engine._cache_name = "cachedContents/abc"
+        try:
+            engine.process_photo(photo, "p")
+        finally:
+            engine.close()
+        assert bodies[0]["cachedContent"] == "cachedContents/abc"
+        assert "systemInstruction" not in bodies[0]
+
+    def test_retry_on_429_then_success(self, photo, no_sleep):
+        responses = [
+            httpx.Response(429, json={"error": {"status": "RESOURCE_EXHAUSTED", "message": "slow down"}}),
+            _ok(),
+        ]
+        engine = _engine(lambda r: responses.pop(0))
+        try:
+            assert engine.process_photo(photo, "p")["title"] == "Sunset"
+        finally:
+            engine.close()
+        no_sleep.assert_any_call(2)
+
+    def test_safety_block_not_retried(self, photo):
+        calls = []
+
+        def handler(request):
+            calls.append(1)
+            return httpx.Response(200, json={"candidates": []})
+
+        engine = _engine(handler)
+        try:
+            with pytest.raises(GeminiError) as exc:
+                engine.process_photo(photo, "p")
+        finally:
+            engine.close()
+        assert exc.value.error_type == GeminiErrorType.SAFETY
+        assert len(calls) == 1
+
+    @pytest.mark.parametrize("status,error,expected", [
+        (400, {"status": "INVALID_ARGUMENT", "message": "API key not valid. Please pass a valid API key."},
+         GeminiErrorType.INVALID_KEY),
+        (404, {"status": "NOT_FOUND", "message": "models/x is not found"}, GeminiErrorType.MODEL_NOT_FOUND),
+    ])
+    def test_http_errors_classified(self, photo, status, error, expected):
+        engine = _engine(lambda r: httpx.Response(status, json={"error": error}))
+        try:
+            with pytest.raises(GeminiError) as exc:
+                engine.process_photo(photo, "p")
+        finally:
+            engine.close()
+        assert exc.value.error_type == expected
+
+    def test_timeout_retried_then_raised(self, photo, no_sleep):
+        calls = []
+
+        def handler(request):
+            calls.append(1)
+            raise httpx.ReadTimeout("slow", request=request)
+
+        engine = _engine(handler)
+        try:
+            with pytest.raises(GeminiError) as exc:
+                engine.process_photo(photo, "p")
+        finally:
+            engine.close()
+        assert exc.value.error_type == GeminiErrorType.TIMEOUT
+        assert len(calls) == MAX_RETRIES
+
+
+# ═══════════════════════════════════════
+# Video
+# ═══════════════════════════════════════
+
+class TestVideo:
+
+    @pytest.fixture
+    def poller(self):
+        """Shared FileStatePoller over fake SDK files: files/v1 turns ACTIVE on its 2nd poll."""
+        polls = []
+
+        def get(name):
+            polls.append(name)
+            state = "ACTIVE" if len(polls) >= 2 else "PROCESSING"
+            return SimpleNamespace(name=name, state=SimpleNamespace(name=state))
+
+        shared = FileStatePoller(get_fn=get, list_fn=lambda: [], intervals=(0.01,))
+        shared.polls = polls
+        FileStatePoller.install(shared)
+        yield shared
+        FileStatePoller.reset_shared()
+
+    def test_upload_wait_generate_delete(self, video, poller):
+        log = []
+
+        def handler(request):
+            path, method = request.url.path, request.method
+            log.append((method, path))
+            if path == "/upload/v1beta/files" and "upload_id" not in str(request.url):
+                assert request.headers["X-Goog-Upload-Command"] == "start"
+                return httpx.Response(200, headers={"x-goog-upload-url": "https://fake.test/upload/v1beta/files?upload_id=1"})
+            if path == "/upload/v1beta/files":
+                assert request.headers["X-Goog-Upload-Command"] == "upload, finalize"
+                assert len(request.content) == 2048
+                return httpx.Response(200, json={"file": {
+                    "name": "files/v1", "uri": "https://fake.test/v1beta/files/v1",
+                    "mimeType": "video/mp4", "state": "PROCESSING",
+                }})
+            if method == "GET" and path == "/v1beta/files/v1":
+                return httpx.Response(200, json={
+                    "name": "files/v1", "uri": "https://fake.test/v1beta/files/v1",
+                    "mimeType": "video/mp4", "state": "ACTIVE",
+                    "videoMetadata": {"videoDuration": "12s"},
+                })
+            if method == "DELETE":
+                return httpx.Response(200, json={})
+            body = json.loads(request.content)
+            assert body["contents"][0]["parts"][0]["file_data"]["file_uri"].endswith("files/v1")
+            return _ok({"title": "Clip"})
+
+        engine = _engine(handler)
+        try:
+            assert engine.process_video(video, "p")["title"] == "Clip"
+        finally:
+            engine.close()
+        assert poller.polls == ["files/v1", "files/v1"]   # waited on the shared schedule
+        assert log.count(("GET", "/v1beta/files/v1")) == 1  # one REST fetch once it is ACTIVE
+        assert ("DELETE", "/v1beta/files/v1") in log
+
+    def test_upload_chunked_and_resumed(self, tmp_path, no_sleep):
+        path = tmp_path / "long.mp4"
+        path.write_bytes(bytes(range(256)) * (CHUNK_GRANULARITY * 2 // 256 + 4))
+        server = FakeUploadServer(fail_offsets=[CHUNK_GRANULARITY])
+        engine = _engine(server.handler)
+        session = ResumableUpload(path.stat().st_size, "video/mp4", "long.mp4", CHUNK_GRANULARITY)
+        try:
+            video = engine.submit(engine._aupload(session, str(path))).result(timeout=5)
+        finally:
+            engine.close()
+        assert video["name"] == "files/0"
+        assert bytes(server.sessions["0"]) == path.read_bytes()
+        assert server.chunk_offsets == [0, CHUNK_GRANULARITY, 2 * CHUNK_GRANULARITY]
+        assert session.resumes == 1   # same session, continued from the acknowledged offset
+
+    def test_upload_error_classified(self, video, no_sleep):
+        server = FakeUploadServer(status_error=(400, "INVALID_ARGUMENT"))
+        engine = _engine(server.handler)
+        try:
+            with pytest.raises(GeminiError):
+                engine.process_video(video, "p")
+        finally:
+            engine.close()
+        assert server.chunk_offsets == []
+
+    def test_failed_state_raises(self, video, no_sleep):
+        def handler(request):
+            if "upload_id" not in str(request.url) and request.url.path.startswith("/upload"):
+                return httpx.Response(200, headers={"x-goog-upload-url": "https://fake.test/upload/v1beta/files?upload_id=1"})
+            if request.url.path.startswith("/upload"):
+                return httpx.Response(200, json={"file": {"name": "files/v1", "state": "FAILED"}})
+            return httpx.Response(200, json={})
+
+        engine = _engine(handler)
+        try:
+            with pytest.raises(GeminiError):
+                engine.process_video(video, "p")
+        finally:
+            engine.close()
+
+
+# ═══════════════════════════════════════
+# Concurrency gate / loop lifecycle
+# ═══════════════════════════════════════
+
+class TestConcurrency:
+
+    def test_in_flight_capped_by_api_window(self, photo):
+        active = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        async def handler(request):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            await asyncio.sleep(0.02)
+            with lock:
+                active["now"] -= 1
+            return _ok()
+
+        engine = _engine(handler)
+        engine._api_sem.reset(2, maximum=2)
+        try:
+            futures = [engine.submit(engine.aprocess_photo(photo, "p")) for _ in range(8)]
+            for f in futures:
+                f.result(timeout=10)
+        finally:
+            engine.close()
+        assert active["peak"] <= 2
+
+    def test_single_loop_thread(self, photo):
+        threads = set()
+
+        def handler(request):
+            threads.add(threading.current_thread().name)
+            return _ok()
+
+        engine = _engine(handler)
+        try:
+            futures = [engine.submit(engine.aprocess_photo(photo, "p")) for _ in range(5)]
+            for f in futures:
+                f.result(timeout=10)
+        finally:
+            engine.close()
+        assert threads == {"gemini-async"}
+
+    def test_close_is_idempotent(self):
+        engine = _engine(lambda r: _ok())
+        engine.close()
+        engine.close()
+
+
+# ═══════════════════════════════════════
+# QueueManager async path
+# ═══════════════════════════════════════
+
+class TestAsyncQueue:
+
+    def test_all_files_complete(self, qtbot, photo):
+        engine = _engine(lambda r: _ok())
+        qm = QueueManager()
+        qm.set_concurrency(max_images=2, max_videos=1)
+        received = []
+        qm.file_completed.connect(lambda fp, r: received.append(r["status"]))
+
+        async def work(fp):
+            result = await engine.aprocess_photo(photo, "p")
+            return {**result, "status": "success"}
+
+        try:
+            with qtbot.waitSignal(qm.all_completed, timeout=10000):
+                qm.start_async_queue([f"/tmp/f{i}.jpg" for i in range(6)], work, engine.submit)
+        finally:
+            engine.close()
+        assert received == ["success"] * 6
+
+    def test_window_caps_files_in_flight(self, qtbot):
+        loop = asyncio.new_event_loop()
+        t = threading.Thread(target=loop.run_forever, daemon=True)
+        t.start()
+        peak = {"now": 0, "max": 0}
+
+        async def work(fp):
+            peak["now"] += 1
+            peak["max"] = max(peak["max"], peak["now"])
+            await asyncio.sleep(0.01)
+            peak["now"] -= 1
+            return {"status": "success"}
+
+        qm = QueueManager()
+        qm.set_concurrency(max_images=3, max_videos=1)
+        try:
+            with qtbot.waitSignal(qm.all_completed, timeout=10000):
+                qm.start_async_queue(
+                    [f"/tmp/f{i}.jpg" for i in range(10)], work,
+                    lambda coro: asyncio.run_coroutine_threadsafe(coro, loop),
+                )
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            t.join(2)
+        assert peak["max"] <= 4  # window may grow by one after a full window of successes
+
+    def test_stop_skips_pending(self, qtbot):
+        gate = threading.Event()
+        loop = asyncio.new_event_loop()
+        t = threading.Thread(target=loop.run_forever, daemon=True)
+        t.start()
+
+        async def work(fp):
+            await asyncio.to_thread(gate.wait, 5)
+            return {"status": "success"}
+
+        qm = QueueManager()
+        qm.set_concurrency(max_images=1, max_videos=1)
+        statuses = []
+        qm.file_completed.connect(lambda fp, r: statuses.append(r["status"]))
+        try:
+            qm.start_async_queue([f"/tmp/f{i}.jpg" for i in range(4)], work,
+                                 lambda coro: asyncio.run_coroutine_threadsafe(coro, loop))
+            qm.stop()
+            gate.set()
+            qtbot.waitUntil(lambda: len(statuses) == 4, timeout=5000)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            t.join(2)
+        assert statuses.count("skipped") == 3
+        assert qm.wait_for_done(1000)
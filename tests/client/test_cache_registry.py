@@ -0,0 +1,79 @@
+"""
+Tests for client/core/engines/cache_registry.py
+Covers: prompt/model keys, lookup of live vs expiring entries, persistence across
+        instances, TTL touch, LRU eviction, expired / evicted names for cleanup,
+        removal by name, corrupt file.
+"""
+import time
+import pytest
+from unittest.mock import patch
+
+from core.engines.cache_registry import ContextCacheRegistry, cache_key
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ContextCacheRegistry(str(tmp_path / "caches.json"), max_entries=2)
+
+
+class TestCacheKey:
+
+    def test_stable_and_short(self):
+        assert cache_key("gemini-2.5-pro", "prompt") == cache_key("gemini-2.5-pro", "prompt")
+        assert len(cache_key("m", "p")) == 16
+
+    def test_differs_by_model_and_prompt(self):
+        keys = {cache_key("a", "p"), cache_key("b", "p"), cache_key("a", "q")}
+        assert len(keys) == 3
+
+
+class TestRegistry:
+
+    def test_put_then_lookup_from_new_instance(self, registry):
+        registry.put("k1", "cachedContents/1", "m", time.time() + 3600)
+        entry = ContextCacheRegistry(registry.path).lookup("k1")
+        assert entry["name"] == "cachedContents/1"
+        assert entry["model"] == "m"
+
+    def test_expiring_entry_not_returned(self, registry):
+        registry.put("k1", "cachedContents/1", "m", time.time() + 30)
+        assert registry.lookup("k1") is None
+        assert registry.live_names() == {"cachedContents/1"}
+
+    def test_expired_entries_kept_until_popped(self, registry):
+        registry.put("old", "cachedContents/old", "m", time.time() - 1)
+        registry.put("new", "cachedContents/new", "m", time.time() + 3600)
+        assert registry.live_names() == {"cachedContents/new"}
+        assert registry.lookup("old") is None
+        assert registry.pop_expired() == {"cachedContents/old"}
+        assert registry.pop_expired() == set()
+        assert registry.live_names() == {"cachedContents/new"}
+
+    def test_touch_extends_expiry(self, registry):
+        registry.put("k1", "cachedContents/1", "m", time.time() + 30)
+        registry.touch("k1", time.time() + 3600)
+        assert registry.lookup("k1")["name"] == "cachedContents/1"
+
+    def test_least_recently_used_evicted(self, registry):
+        with patch("core.engines.cache_registry.time.time", return_value=1000.0):
+            assert registry.put("a", "cachedContents/a", "m", 9000) == []
+        with patch("core.engines.cache_registry.time.time", return_value=1001.0):
+            assert registry.put("b", "cachedContents/b", "m", 9000) == []
+        with patch("core.engines.cache_registry.time.time", return_value=1002.0):
+            registry.touch("a")
+            evicted = registry.put("c", "cachedContents/c", "m", 9000)
+            assert evicted == ["cachedContents/b"]
+            assert registry.live_names() == {"cachedContents/a", "cachedContents/c"}
+            assert registry.pop_expired() == {"cachedContents/b"}
+
+    def test_remove_by_name(self, registry):
+        registry.put("k1", "cachedContents/1", "m", time.time() + 3600)
+        registry.remove("cachedContents/1")
+        assert registry.lookup("k1") is None
+
+    def test_corrupt_file_is_empty(self, registry):
+        with open(registry.path, "w") as f:
+            f.write("{not json")
+        assert registry.lookup("k1") is None
+        registry.put("k1", "cachedContents/1", "m", time.time() + 3600)
+        assert registry.lookup("k1") is not None
@@ -0,0 +1,120 @@
+"""
+Tests for client/core/logic/dictionary_index.py
+Covers: normalization (case, punctuation, IRREGULAR_MAP, stemming), exact and
+        phrase-aware matching, snap() ordering/dedup/dropping, KeywordProcessor iStock
+        snapping, JobManager prompt without the embedded dictionary.
+"""
+import pytest
+from unittest.mock import patch
+
+from core.logic.dictionary_index import DictionaryIndex, normalize_tokens
+from core.logic.keyword_processor import KeywordProcessor
+
+
+class SuffixStemmer:
+    """Deterministic stand-in for Snowball (NLTK data may be missing on CI)."""
+
+    def stem(self, word):
+        for suffix in ("ing", "es", "s"):
+            if word.endswith(suffix) and len(word) > len(suffix) + 2:
+                return word[: -len(suffix)]
+        return word
+
+
+@pytest.fixture(autouse=True)
+def stemmer():
+    with patch("core.logic.dictionary_index._get_stemmer", return_value=SuffixStemmer()):
+        yield
+
+
+DICTIONARY = "\n".join([
+    "Young Woman", "Smile", "Outdoors", "Cup of Coffee", "Beach", "Coffee",
+    "Sunset", "  ", "beach",
+])
+
+
+# ═══════════════════════════════════════
+# Normalization
+# ═══════════════════════════════════════
+
+class TestNormalize:
+
+    def test_case_and_punctuation(self):
+        assert normalize_tokens("  Young-Woman! ") == ("young", "woman")
+
+    def test_irregular_map_before_stem(self):
+        assert normalize_tokens("women") == ("woman",)
+
+    def test_stemming(self):
+        assert normalize_tokens("beaches") == normalize_tokens("beach")
+
+    def test_without_stemmer(self):
+        with patch("core.logic.dictionary_index._get_stemmer", return_value=None):
+            assert normalize_tokens("Beaches") == ("beaches",)
+
+
+# ═══════════════════════════════════════
+# Matching
+# ═══════════════════════════════════════
+
+class TestMatch:
+
+    @pytest.fixture
+    def index(self):
+        return DictionaryIndex(DICTIONARY)
+
+    def test_blank_and_duplicate_terms_skipped(self, index):
+        assert len(index) == 7
+
+    def test_exact_match_returns_canonical_term(self, index):
+        assert index.match("BEACHES") == ["Beach"]
+        assert "young women" in index
+
+    def test_phrase_aware_longest_first(self, index):
+        assert index.match("smiling young women outdoors") == ["Smile", "Young Woman", "Outdoors"]
+        assert index.match("hot cup of coffee") == ["Cup of Coffee"]
+
+    def test_no_match(self, index):
+        assert index.match("spaceship") == []
+        assert index.match("!!!") == []
+
+    def test_snap_orders_dedups_and_drops(self, index):
+        snapped = index.snap(["beaches", "Beach", "spaceship", "coffee", 42, "sunsets"])
+        assert snapped == ["Beach", "Coffee", "Sunset"]
+
+    def test_accepts_term_list(self):
+        assert len(DictionaryIndex(["Beach", "Sunset"])) == 2
+
+
+# ═══════════════════════════════════════
+# Pipeline integration
+# ═══════════════════════════════════════
+
+class TestIntegration:
+
+    def test_istock_snaps_to_dictionary(self):
+        kp = KeywordProcessor()
+        kp.set_dictionary(DictionaryIndex(DICTIONARY))
+        assert kp.process_istock(["beaches", "golden sunsets", "spaceship"]) == ["Beach", "Sunset"]
+
+    def test_istock_without_dictionary_unchanged(self):
+        kp = KeywordProcessor()
+        kp.set_dictionary(DictionaryIndex(""))
+        assert kp.process_istock(["spaceship", "beach"]) == ["spaceship", "beach"]
+
+    @pytest.fixture
+    def jm(self):
+        from core.job_manager import JobManager
+        manager = JobManager()
+        manager._settings = {"max_keywords": 45}
+        manager._prompt_template = "Use only: {keyword_data}"
+        manager._dictionary = DICTIONARY
+        return manager
+
+    def test_prompt_without_dictionary_in_local_mode(self, jm):
+        from core.config import DICTIONARY_LOCAL_NOTE
+        assert jm._build_prompt("/tmp/a.jpg") == f"Use only: {DICTIONARY_LOCAL_NOTE}"
+
+    def test_prompt_mode_embeds_dictionary(self, jm):
+        jm._dictionary_in_prompt = True
+        assert jm._build_prompt("/tmp/a.jpg") == f"Use only: {DICTIONARY}"
@@ -0,0 +1,238 @@
+"""
+Tests for tests/client/benchmarks/fake_gemini.py (the local Gemini stand-in used by the
+load-test harness). Covers: generateContent (single + multi-image), resumable upload with
+query/resume, PROCESSING → ACTIVE, file list/delete, cachedContents, fault injection,
+latency distributions.
+"""
+import json
+import time
+import random
+import urllib.error
+import urllib.request
+import http.client
+import pytest
+
+from tests.client.benchmarks.fake_gemini import FakeGeminiServer, FakeGeminiConfig, Latency
+
+
+def _call(server, method, path, body=None, headers=None, raw=None):
+    """(status, headers, json) for one request; path may be a full upload URL."""
+    url = path if path.startswith("http") else server.url + path
+    data = raw if raw is not None else (json.dumps(body).encode() if body is not None else None)
+    req = urllib.request.Request(url, data=data, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            return resp.status, resp.headers, json.loads(resp.read() or b"{}")
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, json.loads(e.read() or b"{}")
+
+
+def _generate(server, parts, **extra):
+    body = {"contents": [{"role": "user", "parts": parts}], **extra}
+    return _call(server, "POST", "/v1beta/models/gemini-2.5-flash:generateContent", body)
+
+
+def _upload(server, data: bytes, chunk: int = 0):
+    status, headers, _ = _call(server, "POST", "/upload/v1beta/files", {"file": {"display_name": "a.mp4"}}, {
+        "X-Goog-Upload-Protocol": "resumable",
+        "X-Goog-Upload-Command": "start",
+        "X-Goog-Upload-Header-Content-Length": str(len(data)),
+        "X-Goog-Upload-Header-Content-Type": "video/mp4",
+    })
+    assert status == 200
+    url = headers["X-Goog-Upload-URL"]
+    chunk = chunk or len(data)
+    offset = 0
+    while True:
+        piece = data[offset:offset + chunk]
+        final = offset + len(piece) >= len(data)
+        status, _, payload = _call(server, "POST", url, raw=piece, headers={
+            "X-Goog-Upload-Command": "upload, finalize" if final else "upload",
+            "X-Goog-Upload-Offset": str(offset),
+        })
+        assert status == 200
+        if final:
+            return url, payload["file"]
+        offset += len(piece)
+
+
+@pytest.fixture
+def server():
+    with FakeGeminiServer() as srv:
+        yield srv
+
+
+# ═══════════════════════════════════════
+# generateContent
+# ═══════════════════════════════════════
+
+class TestGenerate:
+
+    def test_single_image_returns_metadata_json(self, server):
+        status, _, data = _generate(server, [
+            {"inline_data": {"mime_type": "image/jpeg", "data": "AAAA"}}, {"text": "describe"},
+        ])
+        assert status == 200
+        result = json.loads(data["candidates"][0]["content"]["parts"][0]["text"])
+        assert result["title"] and len(result["keywords"]) == 55
+        assert data["usageMetadata"]["promptTokenCount"] > 0
+        assert data["usageMetadata"]["candidatesTokenCount"] > 0
+
+    def test_multi_image_returns_numbered_array(self, server):
+        parts = []
+        for i in range(1, 4):
+            parts += [{"text": f"Image {i}:"}, {"inlineData": {"mimeType": "image/jpeg", "data": "AA"}}]
+        _, _, data = _generate(server, parts + [{"text": "describe"}])
+        items = json.loads(data["candidates"][0]["content"]["parts"][0]["text"])
+        assert [it["image"] for it in items] == [1, 2, 3]
+
+    def test_cached_content_tokens_reported(self, server):
+        _, _, cache = _call(server, "POST", "/v1beta/cachedContents", {
+            "model": "models/gemini-2.5-flash", "displayName": "bigeye-prompt",
+            "systemInstruction": {"parts": [{"text": "x" * 4000}]}, "ttl": "600s",
+        })
+        _, _, data = _generate(server, [{"text": "go"}], cachedContent=cache["name"])
+        assert data["usageMetadata"]["cachedContentTokenCount"] == 1000
+
+    def test_unknown_cache_is_404(self, server):
+        status, _, _ = _generate(server, [{"text": "go"}], cachedContent="cachedContents/nope")
+        assert status == 404
+
+
+# ═══════════════════════════════════════
+# Files
+# ═══════════════════════════════════════
+
+class TestFiles:
+
+    def test_chunked_upload_then_processing_then_active(self):
+        config = FakeGeminiConfig(processing_delay=Latency("fixed", 0.3))
+        with FakeGeminiServer(config) as server:
+            _, video = _upload(server, b"v" * 1000, chunk=256)
+            assert video["state"] == "PROCESSING"
+            assert video["sizeBytes"] == "1000"
+            _, _, data = _call(server, "GET", f"/v1beta/{video['name']}")
+            assert data["state"] == "PROCESSING"
+            time.sleep(0.35)
+            _, _, data = _call(server, "GET", f"/v1beta/{video['name']}")
+            assert data["state"] == "ACTIVE"
+
+    def test_generate_rejects_file_still_processing(self):
+        config = FakeGeminiConfig(processing_delay=Latency("fixed", 30))
+        with FakeGeminiServer(config) as server:
+            _, video = _upload(server, b"v" * 10)
+            status, _, _ = _generate(server, [
+                {"file_data": {"mime_type": "video/mp4", "file_uri": video["uri"]}},
+            ])
+            assert status == 400
+
+    def test_generate_with_active_file(self, server):
+        _, video = _upload(server, b"v" * 10)
+        status, _, _ = _generate(server, [
+            {"fileData": {"mimeType": "video/mp4", "fileUri": video["uri"]}}, {"text": "go"},
+        ])
+        assert status == 200
+
+    def test_query_reports_received_bytes(self, server):
+        status, headers, _ = _call(server, "POST", "/upload/v1beta/files", {}, {
+            "X-Goog-Upload-Protocol": "resumable", "X-Goog-Upload-Command": "start",
+        })
+        url = headers["X-Goog-Upload-URL"]
+        _call(server, "POST", url, raw=b"x" * 300,
+              headers={"X-Goog-Upload-Command": "upload", "X-Goog-Upload-Offset": "0"})
+        _, headers, _ = _call(server, "POST", url, headers={"X-Goog-Upload-Command": "query"})
+        assert headers["X-Goog-Upload-Status"] == "active"
+        assert headers["X-Goog-Upload-Size-Received"] == "300"
+
+    def test_wrong_offset_rejected(self, server):
+        _, headers, _ = _call(server, "POST", "/upload/v1beta/files", {}, {
+            "X-Goog-Upload-Protocol": "resumable", "X-Goog-Upload-Command": "start",
+        })
+        status, _, _ = _call(server, "POST", headers["X-Goog-Upload-URL"], raw=b"x",
+                             headers={"X-Goog-Upload-Command": "upload", "X-Goog-Upload-Offset": "5"})
+        assert status == 400
+
+    def test_list_and_delete(self, server):
+        _, video = _upload(server, b"v")
+        _, _, listed = _call(server, "GET", "/v1beta/files")
+        assert [f["name"] for f in listed["files"]] == [video["name"]]
+        status, _, _ = _call(server, "DELETE", f"/v1beta/{video['name']}")
+        assert status == 200
+        assert _call(server, "GET", f"/v1beta/{video['name']}")[0] == 404
+        assert _call(server, "GET", "/v1beta/files")[2] == {}
+
+    def test_processing_failed_injection(self):
+        with FakeGeminiServer(FakeGeminiConfig(processing_failed=1.0)) as server:
+            _, video = _upload(server, b"v")
+            assert _call(server, "GET", f"/v1beta/{video['name']}")[2]["state"] == "FAILED"
+
+
+# ═══════════════════════════════════════
+# cachedContents / faults / stats
+# ═══════════════════════════════════════
+
+class TestCachesAndFaults:
+
+    def test_cache_create_list_delete(self, server):
+        _, _, cache = _call(server, "POST", "/v1beta/cachedContents", {"displayName": "bigeye-prompt"})
+        assert cache["name"].startswith("cachedContents/")
+        _, _, listed = _call(server, "GET", "/v1beta/cachedContents")
+        assert listed["cachedContents"][0]["displayName"] == "bigeye-prompt"
+        assert _call(server, "DELETE", f"/v1beta/{cache['name']}")[0] == 200
+        assert server.stats()["caches"] == 0
+
+    def test_rate_limit_injection(self):
+        with FakeGeminiServer(FakeGeminiConfig(rate_limit=1.0)) as server:
+            status, _, data = _generate(server, [{"text": "go"}])
+            assert status == 429
+            assert data["error"]["status"] == "RESOURCE_EXHAUSTED"
+            assert server.stats()["faults"] == {"429": 1}
+
+    def test_timeout_injection_hangs_then_504(self):
+        with FakeGeminiServer(FakeGeminiConfig(timeout=1.0, timeout_hang=0.2)) as server:
+            start = time.monotonic()
+            status, _, data = _generate(server, [{"text": "go"}])
+            assert status == 504
+            assert "deadline" in data["error"]["message"].lower()
+            assert time.monotonic() - start >= 0.2
+
+    def test_ssl_injection_drops_connection(self):
+        with FakeGeminiServer(FakeGeminiConfig(ssl_error=1.0)) as server:
+            with pytest.raises((http.client.HTTPException, urllib.error.URLError, ConnectionError)):
+                _generate(server, [{"text": "go"}])
+            assert server.stats()["faults"] == {"ssl": 1}
+
+    def test_stats_count_surfaces(self, server):
+        _generate(server, [{"text": "go"}])
+        _upload(server, b"v" * 600, chunk=256)
+        requests = server.stats()["requests"]
+        assert requests["generate"] == 1
+        assert requests["upload_start"] == 1
+        assert requests["upload_chunk"] == 3
+
+
+class TestLatency:
+
+    def test_parse(self):
+        latency = Latency.parse("lognormal:1.5:0.4")
+        assert (latency.kind, latency.a, latency.b) == ("lognormal", 1.5, 0.4)
+        assert Latency.parse("fixed:0.2").sample(random.Random(0)) == 0.2
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError):
+            Latency.parse("gaussian:1")
+
+    def test_lognormal_median(self):
+        rng = random.Random(1)
+        samples = sorted(Latency("lognormal", 2.0, 0.5).sample(rng) for _ in range(2001))
+        assert 1.8 < samples[1000] < 2.2
+
+    def test_uniform_bounds(self):
+        rng = random.Random(2)
+        assert all(1 <= Latency("uniform", 1, 3).sample(rng) <= 3 for _ in range(200))
+
+    def test_generate_latency_applied(self):
+        with FakeGeminiServer(FakeGeminiConfig(generate_latency=Latency("fixed", 0.2))) as server:
+            start = time.monotonic()
+            _generate(server, [{"text": "go"}])
+            assert time.monotonic() - start >= 0.2
@@ -0,0 +1,265 @@
+"""
+Tests for client/core/engines/file_poller.py
+Covers: wake on ACTIVE / FAILED, adaptive back-off schedule, batched list_files polling,
+        timeout returns the last seen state, poll errors tolerated, thread exits when idle,
+        coroutines awaiting the same schedule (wait_async),
+        one poller shared across processes (PollerManager / RemotePoller).
+"""
+import asyncio
+import threading
+import time
+import multiprocessing
+from unittest.mock import MagicMock
+
+from core.engines.file_poller import FileStatePoller, PollerManager, RemotePoller
+
+
+def make_file(name, state):
+    f = MagicMock()
+    f.name = name
+    f.state.name = state
+    return f
+
+
+class FakeFiles:
+    """Remote file states; each file turns `final` after `ready_after` polls."""
+
+    def __init__(self, ready_after: dict, final="ACTIVE"):
+        self.ready_after = dict(ready_after)
+        self.final = final
+        self.polls = {name: 0 for name in ready_after}
+        self.get_times = []
+
+    def _state(self, name):
+        self.polls[name] += 1
+        return self.final if self.polls[name] > self.ready_after[name] else "PROCESSING"
+
+    def get(self, name):
+        self.get_times.append(time.monotonic())
+        return make_file(name, self._state(name))
+
+    def list(self):
+        return [make_file(name, self._state(name)) for name in self.ready_after]
+
+
+# ═══════════════════════════════════════
+# Waiting
+# ═══════════════════════════════════════
+
+class TestWait:
+
+    def test_returns_when_active(self):
+        files = FakeFiles({"files/a": 2})
+        poller = FileStatePoller(get_fn=files.get, intervals=(0.01,))
+        assert poller.wait("files/a", timeout=5).state.name == "ACTIVE"
+        assert files.polls["files/a"] == 3
+
+    def test_returns_failed_state(self):
+        files = FakeFiles({"files/a": 0}, final="FAILED")
+        poller = FileStatePoller(get_fn=files.get, intervals=(0.01,))
+        assert poller.wait("files/a", timeout=5).state.name == "FAILED"
+
+    def test_timeout_returns_last_seen(self):
+        files = FakeFiles({"files/a": 10_000})
+        poller = FileStatePoller(get_fn=files.get, intervals=(0.01,))
+        assert poller.wait("files/a", timeout=0.1).state.name == "PROCESSING"
+        assert poller.pending == 0
+
+    def test_poll_errors_tolerated(self):
+        get = MagicMock(side_effect=[RuntimeError("503"), make_file("files/a", "ACTIVE")])
+        poller = FileStatePoller(get_fn=get, intervals=(0.01,))
+        assert poller.wait("files/a", timeout=5).state.name == "ACTIVE"
+
+    def test_thread_exits_when_idle(self):
+        files = FakeFiles({"files/a": 0})
+        poller = FileStatePoller(get_fn=files.get, intervals=(0.01,))
+        poller.wait("files/a", timeout=5)
+        time.sleep(0.05)
+        assert poller._thread is None
+
+
+# ═══════════════════════════════════════
+# Waiting from a coroutine
+# ═══════════════════════════════════════
+
+class TestWaitAsync:
+
+    def test_coroutines_share_the_schedule(self):
+        files = FakeFiles({f"files/{i}": 2 for i in range(5)})
+        list_fn = MagicMock(side_effect=files.list)
+        poller = FileStatePoller(get_fn=files.get, list_fn=list_fn, intervals=(0.01,),
+                                 batch_min=4)
+
+        async def wait_all():
+            return await asyncio.gather(
+                *(poller.wait_async(f"files/{i}", 5) for i in range(5))
+            )
+
+        assert [f.state.name for f in asyncio.run(wait_all())] == ["ACTIVE"] * 5
+        assert list_fn.call_count >= 1     # all five due together → batched list_files
+        assert poller.pending == 0
+
+    def test_loop_not_blocked_while_waiting(self):
+        files = FakeFiles({"files/a": 5})
+        poller = FileStatePoller(get_fn=files.get, intervals=(0.02,))
+        ticks = []
+
+        async def main():
+            async def tick():
+                while True:
+                    ticks.append(time.monotonic())
+                    await asyncio.sleep(0.01)
+
+            ticker = asyncio.create_task(tick())
+            video_file = await poller.wait_async("files/a", 5)
+            ticker.cancel()
+            return video_file
+
+        assert asyncio.run(main()).state.name == "ACTIVE"
+        assert len(ticks) >= 5
+
+    def test_timeout_returns_last_seen(self):
+        files = FakeFiles({"files/a": 10_000})
+        poller = FileStatePoller(get_fn=files.get, intervals=(0.01,))
+        video_file = asyncio.run(poller.wait_async("files/a", 0.1))
+        assert video_file.state.name == "PROCESSING"
+        assert poller.pending == 0
+
+    def test_thread_and_coroutine_wait_on_one_entry(self):
+        files = FakeFiles({"files/a": 2})
+        poller = FileStatePoller(get_fn=files.get, intervals=(0.02,))
+        out = []
+        thread = threading.Thread(target=lambda: out.append(poller.wait("files/a", 5)))
+        thread.start()
+        out.append(asyncio.run(poller.wait_async("files/a", 5)))
+        thread.join(5)
+        assert [f.state.name for f in out] == ["ACTIVE", "ACTIVE"]
+        assert files.polls["files/a"] == 3
+
+
+# ═══════════════════════════════════════
+# Schedule / batching
+# ═══════════════════════════════════════
+
+class TestSchedule:
+
+    def test_backs_off(self):
+        files = FakeFiles({"files/a": 4})
+        poller = FileStatePoller(get_fn=files.get, intervals=(0.01, 0.01, 0.05, 0.1))
+        poller.wait("files/a", timeout=5)
+        gaps = [b - a for a, b in zip(files.get_times, files.get_times[1:])]
+        assert gaps[-1] > gaps[0]
+        assert gaps[-1] >= 0.09
+
+    def test_many_due_use_one_list_call(self):
+        names = [f"files/{i}" for i in range(6)]
+        files = FakeFiles({n: 0 for n in names})
+        get = MagicMock(side_effect=files.get)
+        list_fn = MagicMock(side_effect=files.list)
+        poller = FileStatePoller(get_fn=get, list_fn=list_fn, batch_min=4)
+        found = poller._fetch(names)
+        assert sorted(found) == names
+        list_fn.assert_called_once()
+        get.assert_not_called()
+
+    def test_few_due_use_get_file(self):
+        files = FakeFiles({"files/a": 0, "files/b": 0})
+        list_fn = MagicMock()
+        poller = FileStatePoller(get_fn=files.get, list_fn=list_fn, batch_min=4)
+        assert sorted(poller._fetch(["files/a", "files/b"])) == ["files/a", "files/b"]
+        list_fn.assert_not_called()
+
+    def test_list_miss_falls_back_to_get(self):
+        files = FakeFiles({f"files/{i}": 0 for i in range(5)})
+        get = MagicMock(side_effect=lambda n: make_file(n, "ACTIVE"))
+        poller = FileStatePoller(get_fn=get, list_fn=files.list, batch_min=4)
+        found = poller._fetch([f"files/{i}" for i in range(5)] + ["files/new"])
+        assert len(found) == 6
+        get.assert_called_once_with("files/new")
+
+    def test_same_file_waited_twice_polled_once(self):
+        files = FakeFiles({"files/a": 2})
+        poller = FileStatePoller(get_fn=files.get, intervals=(0.02,))
+        out = []
+        threads = [threading.Thread(target=lambda: out.append(poller.wait("files/a", 5)))
+                   for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+        assert len(out) == 2
+        assert files.polls["files/a"] == 3
+
+
+# ═══════════════════════════════════════
+# Shared across processes
+# ═══════════════════════════════════════
+
+class _CountingPoller(FileStatePoller):
+
+    def calls(self):
+        return self.get_calls + self.list_calls
+
+
+_served = None
+
+
+def _serve_fake_poller():
+    """Runs in the manager process: one poller over fake remote files."""
+    global _served
+    if _served is None:
+        files = FakeFiles({f"files/{i}": 1 for i in range(4)})
+        _served = _CountingPoller(get_fn=files.get, list_fn=files.list, intervals=(0.02,))
+    return _served
+
+
+class _FakePollerManager(PollerManager):
+    pass
+
+
+_FakePollerManager.register("poller", callable=_serve_fake_poller, exposed=("wait_state", "calls"))
+
+
+class TestSharedAcrossProcesses:
+
+    def test_callers_wait_on_one_poller_in_the_manager_process(self):
+        manager = _FakePollerManager(ctx=multiprocessing.get_context("spawn"))
+        manager.start()
+        try:
+            proxy = manager.poller()
+            states = []
+            threads = [
+                threading.Thread(target=lambda n=n: states.append(proxy.wait_state(n, 10)))
+                for n in (f"files/{i}" for i in range(4))
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(15)
+            assert states == ["ACTIVE"] * 4
+            # Each file needs two polls; when all four are due together one batched
+            # list_files pass covers them, so the server-side poller may need only two calls
+            assert proxy.calls() >= 2
+        finally:
+            manager.shutdown()
+
+    def test_remote_poller_fetches_file_after_wait(self):
+        proxy = MagicMock()
+        proxy.wait_state.return_value = "ACTIVE"
+        get = MagicMock(return_value=make_file("files/a", "ACTIVE"))
+        assert RemotePoller(proxy, get_fn=get).wait("files/a", 30).state.name == "ACTIVE"
+        proxy.wait_state.assert_called_once_with("files/a", 30)
+        get.assert_called_once_with("files/a")
+
+    def test_installed_poller_is_shared(self):
+        remote = RemotePoller(MagicMock())
+        FileStatePoller.install(remote)
+        try:
+            assert FileStatePoller.shared() is remote
+        finally:
+            FileStatePoller.reset_shared()
+
+    def test_wait_state_returns_name(self):
+        files = FakeFiles({"files/a": 0})
+        poller = FileStatePoller(get_fn=files.get, intervals=(0.01,))
+        assert poller.wait_state("files/a", 5) == "ACTIVE"
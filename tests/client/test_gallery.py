@@ -0,0 +1,194 @@
+"""
+Tests for client/ui/components/gallery.py (offscreen, pytest-qt)
+Covers: GalleryModel LRU caps for thumbnails / painted icons, row lookup on status
+        updates, visible-row window while scrolling, cancelling queued thumbnail loads
+        for rows scrolled away.
+"""
+import pytest
+from unittest.mock import MagicMock
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import Qt, QPoint
+from PySide6.QtGui import QPixmap
+
+from core.config import GALLERY_PREFETCH_ROWS
+from ui.components.gallery import Gallery, GalleryModel
+
+
+def _files(count: int) -> list:
+    return [f"/shoot/IMG_{i:04d}.jpg" for i in range(count)]
+
+
+@pytest.fixture
+def model(qapp):
+    m = GalleryModel()
+    m.set_files(_files(10))
+    return m
+
+
+@pytest.fixture
+def gallery(qtbot):
+    """Gallery over 600 rows; the thread pool is a mock so loads stay queued."""
+    g = Gallery()
+    qtbot.addWidget(g)
+    g._thread_pool = MagicMock()
+    g.resize(800, 600)
+    g.show()
+    qtbot.waitExposed(g)
+    g._file_list = _files(600)
+    g._populate_grid()
+    g._load_timer.stop()
+    return g
+
+
+# ═══════════════════════════════════════
+# GalleryModel
+# ═══════════════════════════════════════
+
+class TestGalleryModel:
+
+    def test_thumbnails_capped_least_recently_used_first(self, model, monkeypatch):
+        monkeypatch.setattr("ui.components.gallery.GALLERY_THUMB_MEMORY", 3)
+        files = _files(10)
+        for filepath in files[:4]:
+            model.set_thumbnail(filepath, QPixmap(4, 4))
+        assert not model.has_thumbnail(files[0])
+        assert all(model.has_thumbnail(f) for f in files[1:4])
+
+    def test_painting_a_row_refreshes_its_thumbnail(self, model, monkeypatch):
+        monkeypatch.setattr("ui.components.gallery.GALLERY_THUMB_MEMORY", 3)
+        files = _files(10)
+        for filepath in files[:3]:
+            model.set_thumbnail(filepath, QPixmap(4, 4))
+        model.data(model.index(0), Qt.ItemDataRole.DecorationRole)
+        model.set_thumbnail(files[3], QPixmap(4, 4))
+        assert model.has_thumbnail(files[0])
+        assert not model.has_thumbnail(files[1])
+
+    def test_icons_capped(self, model):
+        model.ICON_MEMORY = 2
+        for row in range(5):
+            assert model.data(model.index(row), Qt.ItemDataRole.DecorationRole) is not None
+        assert list(model._icons) == _files(10)[3:5]
+
+    def test_set_files_clears_caches(self, model):
+        model.set_thumbnail(_files(10)[0], QPixmap(4, 4))
+        model.data(model.index(0), Qt.ItemDataRole.DecorationRole)
+        model.set_files(_files(2))
+        assert model.rowCount() == 2
+        assert not model._thumbnails and not model._icons
+
+    def test_status_update_touches_only_its_row(self, model, qtbot):
+        model._files = _Unscannable(model._files)   # row comes from the path → row map
+        with qtbot.waitSignal(model.dataChanged, timeout=1000) as blocker:
+            model.set_status(_files(10)[7], "success")
+        top, bottom, _roles = blocker.args
+        assert top.row() == bottom.row() == 7
+        assert model._statuses[_files(10)[7]] == "success"
+
+    def test_status_update_for_unknown_file_ignored(self, model, qtbot):
+        with qtbot.assertNotEmitted(model.dataChanged):
+            model.set_status("/elsewhere/x.jpg", "success")
+        assert "/elsewhere/x.jpg" not in model._statuses
+
+
+class _Unscannable(list):
+    """A file list that fails the test if it is searched or walked."""
+
+    def index(self, *args):
+        raise AssertionError("linear search of the file list")
+
+    def __iter__(self):
+        raise AssertionError("walk of the file list")
+
+
+# ═══════════════════════════════════════
+# Gallery: visible rows + thumbnail loads
+# ═══════════════════════════════════════
+
+def _scroll_to_end(gallery, qtbot):
+    """Scroll to the last row (the batched layout keeps growing the scroll range)."""
+    bar = gallery.list_view.verticalScrollBar()
+
+    def at_end():
+        bar.setValue(bar.maximum())
+        return gallery._visible_rows().stop == 600
+
+    qtbot.waitUntil(at_end, timeout=3000)
+
+
+class TestVisibleRows:
+
+    def test_window_starts_at_top(self, gallery):
+        rows = gallery._visible_rows()
+        assert rows.start == 0
+        assert 0 < len(rows) < 600
+
+    def test_window_follows_scroll(self, gallery, qtbot):
+        top = gallery._visible_rows()
+        _scroll_to_end(gallery, qtbot)
+        assert gallery._visible_rows().start > top.stop
+
+    def test_window_includes_prefetch_rows(self, gallery, qtbot):
+        view = gallery.list_view
+        bar = view.verticalScrollBar()
+        bar.setValue(bar.maximum() // 2)
+        qtbot.waitUntil(lambda: gallery._visible_rows().start > 0, timeout=2000)
+        grid = view.gridSize()
+        per_row = max(1, view.viewport().width() // grid.width())
+        first_shown = view.indexAt(view.viewport().rect().center()).row()
+        last_shown = first_shown
+        for y in range(view.viewport().height() - 1, 0, -8):
+            index = view.indexAt(QPoint(grid.width() // 2, y))
+            if index.isValid():
+                last_shown = max(last_shown, index.row())
+                break
+        rows = gallery._visible_rows()
+        margin = per_row * GALLERY_PREFETCH_ROWS
+        assert rows.start <= first_shown - margin
+        assert rows.stop >= last_shown + margin
+
+    def test_empty_gallery(self, qtbot):
+        g = Gallery()
+        qtbot.addWidget(g)
+        assert g._visible_rows() == range(0)
+
+
+class TestThumbnailLoads:
+
+    def test_only_visible_rows_queued(self, gallery):
+        gallery._load_visible_thumbnails()
+        rows = gallery._visible_rows()
+        assert set(gallery._loaders) == {gallery._model.filepath(r) for r in rows}
+        assert gallery._thread_pool.start.call_count == len(rows)
+
+    def test_loaded_rows_not_queued_again(self, gallery):
+        first = gallery._model.filepath(0)
+        gallery._on_thumbnail_loaded(first, QPixmap(4, 4).toImage())
+        gallery._load_visible_thumbnails()
+        assert first not in gallery._loaders
+
+    def test_scrolled_away_rows_cancelled(self, gallery, qtbot):
+        gallery._load_visible_thumbnails()
+        queued = dict(gallery._loaders)
+        _scroll_to_end(gallery, qtbot)
+        gallery._load_visible_thumbnails()
+        assert not set(queued) & set(gallery._loaders)
+        assert all(loader.cancelled for loader in queued.values())
+        taken = {c.args[0] for c in gallery._thread_pool.tryTake.call_args_list}
+        assert set(queued.values()) <= taken
+
+    def test_new_folder_cancels_everything(self, gallery):
+        gallery._load_visible_thumbnails()
+        queued = list(gallery._loaders.values())
+        gallery._file_list = _files(3)
+        gallery._populate_grid()
+        assert not gallery._loaders
+        assert all(loader.cancelled for loader in queued)
+
+    def test_late_load_after_folder_change_ignored(self, gallery):
+        gallery._file_list = _files(3)
+        gallery._populate_grid()
+        gallery._on_thumbnail_loaded("/shoot/IMG_0500.jpg", QPixmap(4, 4).toImage())
+        assert not gallery._model.has_thumbnail("/shoot/IMG_0500.jpg")
@@ -1,9 +1,12 @@
 """
 Tests for client/core/engines/gemini_engine.py
 Covers: classify_error, GeminiError, GeminiErrorType, _parse_json_response,
-        _load_image, engine configuration, double-check locking.
+        _load_image, engine configuration, double-check locking,
+        multi-image packing (process_photo_batch, array parsing, demux),
+        context cache reuse across jobs (registry, TTL extension, stale cleanup).
 """
 import json
+import time
 import pytest
 from unittest.mock import patch, MagicMock, mock_open
 
@@ -12,6 +15,8 @@ from core.engines.gemini_engine import (
     GeminiError,
     GeminiErrorType,
     classify_error,
+    RESPONSE_SCHEMA,
+    BATCH_RESPONSE_SCHEMA,
 )
 
 
@@ -179,6 +184,21 @@ class TestParseJsonResponse:
         result = engine._parse_json_response("{}")
         assert result == {}
 
+    def test_truncated_keywords_repaired(self, engine):
+        text = '{"title": "Sunset", "description": "Sun over sea", "keywords": ["sun", "sea", "wav'
+        result = engine._parse_json_response(text)
+        assert result == {"title": "Sunset", "description": "Sun over sea", "keywords": ["sun", "sea"],
+                          "_repaired": True}
+
+    def test_trailing_comma_repaired(self, engine):
+        result = engine._parse_json_response('{"title": "Sunset", "keywords": ["sun",],}')
+        assert result["keywords"] == ["sun"]
+        assert "_repaired" not in result   # complete reply, nothing cut back
+
+    def test_truncated_before_keywords_raises(self, engine):
+        with pytest.raises(GeminiError):
+            engine._parse_json_response('{"title": "Sunset", "description": "Sun ov')
+
 
 # ═══════════════════════════════════════
 # Engine Configuration
@@ -285,3 +305,190 @@ class TestGetModel:
             engine._get_model()
             call_kwargs = mock_genai.GenerativeModel.call_args
             assert call_kwargs.kwargs.get("cached_content") == mock_cache
+
+
+# ═══════════════════════════════════════
+# Context cache reuse across jobs
+# ═══════════════════════════════════════
+
+class TestContextCacheReuse:
+
+    @pytest.fixture
+    def caching(self):
+        with patch("core.engines.gemini_engine.genai_caching") as caching:
+            caching.CachedContent.create.return_value = self._cache("cachedContents/new")
+            yield caching
+
+    @staticmethod
+    def _cache(name, display_name=""):
+        cache = MagicMock(display_name=display_name)
+        cache.name = name  # name= in the constructor would only label the mock
+        return cache
+
+    @staticmethod
+    def _engine():
+        engine = GeminiEngine()
+        engine._api_key = "test-key"
+        engine.set_model("gemini-2.5-flash")
+        return engine
+
+    def test_second_job_reuses_cache(self, caching):
+        first = self._engine()
+        assert first.create_cache("PROMPT") == "cachedContents/new"
+        assert caching.CachedContent.create.call_args.kwargs["display_name"].startswith("bigeye-prompt-")
+        first.release_cache()
+        caching.CachedContent.create.return_value.delete.assert_not_called()
+
+        caching.CachedContent.get.return_value = self._cache("cachedContents/new")
+        second = self._engine()
+        assert second.create_cache("PROMPT") == "cachedContents/new"
+        assert caching.CachedContent.create.call_count == 1
+        caching.CachedContent.get.return_value.update.assert_not_called()
+
+    def test_different_prompt_creates_new_cache(self, caching):
+        self._engine().create_cache("PROMPT")
+        self._engine().create_cache("OTHER PROMPT")
+        assert caching.CachedContent.create.call_count == 2
+
+    def test_low_ttl_extended(self, caching):
+        engine = self._engine()
+        engine.create_cache("PROMPT", ttl_minutes=5)
+        engine.release_cache()
+        reused = self._cache("cachedContents/new")
+        caching.CachedContent.get.return_value = reused
+        self._engine().create_cache("PROMPT", ttl_minutes=60)
+        reused.update.assert_called_once()
+        assert reused.update.call_args.kwargs["ttl"].total_seconds() == 3600
+
+    def test_missing_remote_cache_recreated(self, caching):
+        self._engine().create_cache("PROMPT")
+        caching.CachedContent.get.side_effect = Exception("404 not found")
+        self._engine().create_cache("PROMPT")
+        assert caching.CachedContent.create.call_count == 2
+
+    def test_cleanup_deletes_only_expired_registered_caches(self, caching):
+        engine = self._engine()
+        engine.create_cache("PROMPT")
+        engine._cache_registry.put("old", "cachedContents/old", "m", time.time() - 1)
+        live = self._cache("cachedContents/new", "bigeye-prompt-abc")
+        stale = self._cache("cachedContents/old", "bigeye-prompt-def")
+        unknown = self._cache("cachedContents/y", "bigeye-prompt-123")
+        other = self._cache("cachedContents/x", "someone-else")
+        caching.CachedContent.list.return_value = [live, stale, unknown, other]
+        engine.cleanup_orphaned_caches()
+        live.delete.assert_not_called()
+        stale.delete.assert_called_once()
+        unknown.delete.assert_not_called()   # another session's live cache
+        other.delete.assert_not_called()
+        assert engine._cache_registry.pop_expired() == set()
+
+    def test_cleanup_without_expired_entries_skips_listing(self, caching):
+        engine = self._engine()
+        engine.create_cache("PROMPT")
+        engine.cleanup_orphaned_caches()
+        caching.CachedContent.list.assert_not_called()
+
+    def test_reuse_disabled_deletes_at_job_end(self, caching):
+        with patch("core.engines.gemini_engine.CONTEXT_CACHE_REUSE", False):
+            engine = self._engine()
+            engine.create_cache("PROMPT")
+            cache = engine._cache
+            engine.release_cache()
+        cache.delete.assert_called_once()
+        assert engine._cache is None
+
+
+# ═══════════════════════════════════════
+# Multi-image packing
+# ═══════════════════════════════════════
+
+class TestPhotoBatch:
+
+    @pytest.fixture
+    def engine(self):
+        e = GeminiEngine()
+        e._api_key = "test-key"
+        e._model = MagicMock()
+        e._load_image = MagicMock(side_effect=lambda fp: {"mime_type": "image/jpeg", "data": b"x"})
+        return e
+
+    @staticmethod
+    def _response(text, prompt_tokens=900, output_tokens=300, cached_tokens=0):
+        usage = MagicMock(prompt_token_count=prompt_tokens, candidates_token_count=output_tokens,
+                          cached_content_token_count=cached_tokens)
+        return MagicMock(candidates=[MagicMock()], text=text, usage_metadata=usage)
+
+    def test_one_request_for_all_images(self, engine):
+        items = [{"image": i, "title": f"T{i}", "keywords": ["k"]} for i in (1, 2, 3)]
+        engine._model.generate_content.return_value = self._response(json.dumps(items))
+        results = engine.process_photo_batch(["a.jpg", "b.jpg", "c.jpg"], "PROMPT")
+        assert [r["title"] for r in results] == ["T1", "T2", "T3"]
+        assert all("image" not in r for r in results)
+        engine._model.generate_content.assert_called_once()
+        contents = engine._model.generate_content.call_args.args[0]
+        assert contents[0] == "Image 1:"
+        assert sum(1 for c in contents if isinstance(c, str) and "PROMPT" in c) == 1
+
+    def test_token_usage_split_per_image(self, engine):
+        items = [{"image": i, "title": "T", "keywords": []} for i in (1, 2, 3)]
+        engine._model.generate_content.return_value = self._response(json.dumps(items))
+        results = engine.process_photo_batch(["a.jpg", "b.jpg", "c.jpg"], "P")
+        assert [r["_token_input"] for r in results] == [300, 300, 300]
+        assert results[0]["_token_output"] == 100
+
+    def test_cached_tokens_split_per_image(self, engine):
+        items = [{"image": i, "title": "T", "keywords": []} for i in (1, 2, 3)]
+        engine._model.generate_content.return_value = self._response(json.dumps(items), cached_tokens=600)
+        results = engine.process_photo_batch(["a.jpg", "b.jpg", "c.jpg"], "P")
+        assert [r["_token_cached"] for r in results] == [200, 200, 200]
+
+    def test_demux_by_image_number(self, engine):
+        items = [{"image": 2, "title": "B", "keywords": []}, {"image": 1, "title": "A", "keywords": []}]
+        engine._model.generate_content.return_value = self._response(json.dumps(items))
+        results = engine.process_photo_batch(["a.jpg", "b.jpg"], "P")
+        assert [r["title"] for r in results] == ["A", "B"]
+
+    def test_invalid_and_missing_entries_are_none(self, engine):
+        items = [{"image": 1, "title": "A", "keywords": "not-a-list"}, {"image": 3, "title": "C", "keywords": []}]
+        engine._model.generate_content.return_value = self._response(json.dumps(items))
+        results = engine.process_photo_batch(["a.jpg", "b.jpg", "c.jpg"], "P")
+        assert results[0] is None and results[1] is None
+        assert results[2]["title"] == "C"
+
+    def test_wrapped_array_and_fences(self, engine):
+        text = '```json\n{"results": [{"title": "A", "keywords": []}]}\n```'
+        assert engine._parse_batch_response(text) == {"items": [{"title": "A", "keywords": []}]}
+
+    def test_unparseable_raises(self, engine):
+        with pytest.raises(GeminiError):
+            engine._parse_batch_response("sorry, no JSON here")
+
+    def test_truncated_array_keeps_complete_entries(self, engine):
+        text = '[{"image": 1, "title": "A", "keywords": ["a"]}, {"image": 2, "title": "B", "keyw'
+        engine._model.generate_content.return_value = self._response(text)
+        results = engine.process_photo_batch(["a.jpg", "b.jpg"], "P")
+        assert results[0]["title"] == "A"
+        assert results[1] is None
+
+    def test_truncated_last_entry_marked_repaired(self, engine):
+        text = '[{"image": 1, "title": "A", "keywords": ["a"]}, {"image": 2, "title": "B", "keywords": ["b", "c'
+        engine._model.generate_content.return_value = self._response(text)
+        results = engine.process_photo_batch(["a.jpg", "b.jpg"], "P")
+        assert "_repaired" not in results[0]
+        assert results[1]["keywords"] == ["b"]
+        assert results[1]["_repaired"] is True
+
+    def test_batch_schema_sent(self, engine):
+        engine._model.generate_content.return_value = self._response("[]")
+        engine.process_photo_batch(["a.jpg", "b.jpg"], "P")
+        schema = engine._model.generate_content.call_args.kwargs["generation_config"]["response_schema"]
+        assert schema["type"] == "ARRAY"
+        assert "image" in schema["items"]["required"]
+
+    def test_schema_has_every_exported_field(self):
+        # csv_exporter reads these from the result (iStock: created_date, video fields)
+        for key in ("title", "description", "keywords", "category", "created_date",
+                    "poster_timecode", "shot_speed"):
+            assert key in RESPONSE_SCHEMA["properties"]
+            assert key in BATCH_RESPONSE_SCHEMA["items"]["properties"]
+
@@ -1,7 +1,7 @@
 """
 Tests for client/utils/helpers.py
 Covers: is_image, is_video, is_supported_file, scan_folder, count_files,
-        format_number, truncate_path.
+        format_number, truncate_path, file_content_hash.
 """
 import os
 import pytest
@@ -10,6 +10,7 @@ import tempfile
 from utils.helpers import (
     is_image, is_video, is_supported_file,
     scan_folder, count_files, format_number, truncate_path,
+    file_content_hash,
 )
 
 
@@ -195,3 +196,29 @@ class TestTruncatePath:
     def test_very_short_path_with_few_parts(self):
         path = "/a/b"
         assert truncate_path(path, max_len=5) == path  # ≤3 parts → returned as-is
+
+
+# ═══════════════════════════════════════
+# file_content_hash
+# ═══════════════════════════════════════
+
+class TestFileContentHash:
+
+    def test_same_bytes_same_hash(self, tmp_path):
+        a = tmp_path / "a.jpg"
+        b = tmp_path / "b.jpg"
+        a.write_bytes(b"\xff\xd8" * 1000)
+        b.write_bytes(b"\xff\xd8" * 1000)
+        assert file_content_hash(str(a)) == file_content_hash(str(b))
+
+    def test_different_bytes_different_hash(self, tmp_path):
+        a = tmp_path / "a.jpg"
+        b = tmp_path / "b.jpg"
+        a.write_bytes(b"one")
+        b.write_bytes(b"two")
+        assert file_content_hash(str(a)) != file_content_hash(str(b))
+
+    def test_chunking_does_not_change_hash(self, tmp_path):
+        a = tmp_path / "a.jpg"
+        a.write_bytes(os.urandom(10_000))
+        assert file_content_hash(str(a), chunk_size=7) == file_content_hash(str(a))
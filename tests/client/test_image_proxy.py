@@ -0,0 +1,147 @@
+"""
+Tests for client/core/engines/image_proxy.py
+Covers: create_proxy (downscale, passthrough, cache hit, failure), get_proxy_path,
+        prune_cache, cleanup_all_proxies.
+"""
+import os
+import time
+import pytest
+from unittest.mock import patch
+
+from PIL import Image
+
+from core.engines.image_proxy import ImageProxy
+
+
+@pytest.fixture
+def proxy_dir(tmp_path):
+    """Override IMAGE_PROXY_DIR to use a temp directory."""
+    path = tmp_path / "image_proxy_cache"
+    path.mkdir()
+    with patch("core.engines.image_proxy.IMAGE_PROXY_DIR", str(path)):
+        yield path
+
+
+def _make_image(path, size, fmt="JPEG", mode="RGB", color=(200, 100, 50)):
+    Image.new(mode, size, color).save(str(path), fmt)
+    return str(path)
+
+
+# ═══════════════════════════════════════
+# create_proxy
+# ═══════════════════════════════════════
+
+class TestCreateProxy:
+
+    def test_large_image_downscaled(self, proxy_dir, tmp_path):
+        src = _make_image(tmp_path / "big.jpg", (4000, 3000))
+        out = ImageProxy.create_proxy(src, max_edge=1000)
+        assert out and out != src
+        assert os.path.dirname(out) == str(proxy_dir)
+        with Image.open(out) as img:
+            assert max(img.size) == 1000
+            assert img.format == "JPEG"
+
+    def test_aspect_ratio_kept(self, proxy_dir, tmp_path):
+        src = _make_image(tmp_path / "tall.png", (1000, 3000), fmt="PNG")
+        out = ImageProxy.create_proxy(src, max_edge=600)
+        with Image.open(out) as img:
+            assert img.size == (200, 600)
+
+    def test_small_jpeg_passthrough(self, proxy_dir, tmp_path):
+        src = _make_image(tmp_path / "small.jpg", (800, 600))
+        assert ImageProxy.create_proxy(src, max_edge=1000) == src
+        assert os.listdir(proxy_dir) == []
+
+    def test_tiff_always_reencoded(self, proxy_dir, tmp_path):
+        src = _make_image(tmp_path / "small.tif", (400, 300), fmt="TIFF")
+        out = ImageProxy.create_proxy(src, max_edge=1000)
+        assert out != src
+        with Image.open(out) as img:
+            assert img.format == "JPEG"
+
+    def test_alpha_converted_to_rgb(self, proxy_dir, tmp_path):
+        src = _make_image(tmp_path / "alpha.png", (2000, 2000), fmt="PNG",
+                          mode="RGBA", color=(10, 20, 30, 128))
+        out = ImageProxy.create_proxy(src, max_edge=500)
+        with Image.open(out) as img:
+            assert img.mode == "RGB"
+
+    def test_cache_hit_skips_reencode(self, proxy_dir, tmp_path):
+        src = _make_image(tmp_path / "big.jpg", (3000, 2000))
+        first = ImageProxy.create_proxy(src, max_edge=800)
+        with patch("PIL.Image.open") as mock_open:
+            second = ImageProxy.create_proxy(src, max_edge=800)
+            mock_open.assert_not_called()
+        assert first == second
+
+    def test_same_content_shares_proxy(self, proxy_dir, tmp_path):
+        a = _make_image(tmp_path / "a.jpg", (3000, 2000))
+        b = tmp_path / "copy_of_a.jpg"
+        b.write_bytes(open(a, "rb").read())
+        assert ImageProxy.create_proxy(a, max_edge=800) == ImageProxy.create_proxy(str(b), max_edge=800)
+
+    def test_known_content_hash_not_recomputed(self, proxy_dir, tmp_path):
+        from utils.helpers import file_content_hash
+        src = _make_image(tmp_path / "big.jpg", (3000, 2000))
+        digest = file_content_hash(src)
+        with patch("core.engines.image_proxy.file_content_hash") as hashed:
+            out = ImageProxy.create_proxy(src, max_edge=800, content_hash=digest)
+        hashed.assert_not_called()
+        assert out == ImageProxy.get_proxy_path(src, 800)
+
+    def test_settings_change_proxy_path(self, proxy_dir, tmp_path):
+        src = _make_image(tmp_path / "big.jpg", (3000, 2000))
+        assert ImageProxy.create_proxy(src, max_edge=800) != ImageProxy.create_proxy(src, max_edge=600)
+
+    def test_invalid_image_returns_empty(self, proxy_dir, tmp_path):
+        src = tmp_path / "broken.jpg"
+        src.write_bytes(b"not an image")
+        assert ImageProxy.create_proxy(str(src)) == ""
+
+    def test_missing_file_returns_empty(self, proxy_dir, tmp_path):
+        assert ImageProxy.create_proxy(str(tmp_path / "missing.jpg")) == ""
+
+    def test_no_temp_files_left(self, proxy_dir, tmp_path):
+        src = _make_image(tmp_path / "big.jpg", (3000, 2000))
+        ImageProxy.create_proxy(src, max_edge=800)
+        assert not [f for f in os.listdir(proxy_dir) if f.endswith(".tmp")]
+
+    def test_failed_save_removes_temp(self, proxy_dir, tmp_path):
+        src = _make_image(tmp_path / "big.jpg", (3000, 2000))
+
+        def _partial_save(self, fp, *args, **kwargs):
+            with open(fp, "wb") as f:
+                f.write(b"partial")
+            raise OSError("disk full")
+
+        with patch.object(Image.Image, "save", _partial_save):
+            assert ImageProxy.create_proxy(src, max_edge=800) == ""
+        assert os.listdir(proxy_dir) == []
+
+
+# ═══════════════════════════════════════
+# prune_cache / cleanup_all_proxies
+# ═══════════════════════════════════════
+
+class TestCacheMaintenance:
+
+    def test_prune_removes_oldest_first(self, proxy_dir):
+        now = time.time()
+        for i, name in enumerate(["old.jpg", "mid.jpg", "new.jpg"]):
+            fp = proxy_dir / name
+            fp.write_bytes(b"\x00" * 100)
+            os.utime(fp, (now - 100 + i * 10, now - 100 + i * 10))
+        ImageProxy.prune_cache(max_bytes=250)
+        assert sorted(os.listdir(proxy_dir)) == ["mid.jpg", "new.jpg"]
+
+    def test_prune_under_budget_keeps_all(self, proxy_dir):
+        (proxy_dir / "a.jpg").write_bytes(b"\x00" * 100)
+        ImageProxy.prune_cache(max_bytes=1000)
+        assert os.listdir(proxy_dir) == ["a.jpg"]
+
+    def test_cleanup_all(self, proxy_dir):
+        (proxy_dir / "a.jpg").write_bytes(b"\x00")
+        (proxy_dir / "b.jpg").write_bytes(b"\x00")
+        ImageProxy.cleanup_all_proxies()
+        assert os.listdir(proxy_dir) == []
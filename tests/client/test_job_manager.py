@@ -0,0 +1,673 @@
+"""
+Tests for client/core/job_manager.py file pipeline (no network, no GUI).
+Covers: _process_file with the local result cache (hit/miss/settings change),
+        resumed-job result merging for export, async pipeline (_process_file_async),
+        warm video worker processes + deferred video results (one rate budget shared
+        with the workers through the helper process), per-job rate-limit wait,
+        multi-image photo batches,
+        per-job prompt rendering (+ micro-benchmark vs dictionary size),
+        deferred / batch keyword post-processing and local re-processing,
+        per-file stage spans (trace file + summary percentiles).
+"""
+import os
+import time
+import asyncio
+import multiprocessing
+import concurrent.futures
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+import core.job_manager as job_manager_module
+from core.job_manager import JobManager
+from core.data.result_cache import ResultCache
+
+
+@pytest.fixture
+def photo(tmp_path):
+    path = tmp_path / "sunset.jpg"
+    path.write_bytes(b"\xff\xd8\xff\xe0" + b"\x00" * 100)
+    return str(path)
+
+
+@pytest.fixture
+def jm(tmp_path):
+    """JobManager with a mocked engine and a temp result cache."""
+    manager = JobManager()
+    manager._settings = {"platform": "iStock", "model": "gemini-2.5-pro", "max_keywords": 45}
+    manager._engine = MagicMock()
+    manager._engine.process_photo.side_effect = lambda *a, **kw: {
+        "title": "Sunset", "description": "Sun over sea", "keywords": ["sun", "sea"],
+    }
+    manager._result_cache = ResultCache(str(tmp_path / "result_cache.db"))
+    with patch("core.job_manager.ImageProxy.create_proxy", return_value=""):
+        yield manager
+    manager._close_result_cache()
+
+
+# ═══════════════════════════════════════
+# Result cache
+# ═══════════════════════════════════════
+
+class TestResultCache:
+
+    def test_second_run_served_from_cache(self, jm, photo):
+        first = jm._process_file(photo)
+        second = jm._process_file(photo)
+        assert first["status"] == second["status"] == "success"
+        assert second["_cache_hit"] is True
+        assert second["keywords"] == first["keywords"]
+        assert jm._engine.process_photo.call_count == 1
+
+    def test_changed_content_misses(self, jm, photo):
+        jm._process_file(photo)
+        with open(photo, "ab") as f:
+            f.write(b"edit")
+        jm._process_file(photo)
+        assert jm._engine.process_photo.call_count == 2
+
+    def test_changed_settings_miss(self, jm, photo):
+        jm._process_file(photo)
+        jm._settings["model"] = "gemini-2.5-flash"
+        jm._process_file(photo)
+        assert jm._engine.process_photo.call_count == 2
+
+    def test_errors_not_cached(self, jm, photo):
+        from core.engines.gemini_engine import GeminiError, GeminiErrorType
+        jm._engine.process_photo.side_effect = GeminiError("boom", GeminiErrorType.TIMEOUT)
+        assert jm._process_file(photo)["status"] == "error"
+        assert len(jm._result_cache) == 0
+
+    def test_repaired_result_not_cached(self, jm, photo):
+        jm._engine.process_photo.side_effect = lambda *a, **kw: {
+            "title": "Sunset", "keywords": ["sun"], "_repaired": True,
+        }
+        assert jm._process_file(photo)["status"] == "success"
+        assert len(jm._result_cache) == 0
+
+    def test_no_cache_still_processes(self, jm, photo):
+        jm._close_result_cache()
+        assert jm._process_file(photo)["status"] == "success"
+        assert jm._process_file(photo)["status"] == "success"
+        assert jm._engine.process_photo.call_count == 2
+
+    def test_file_hashed_once_and_shared_with_proxy(self, jm, photo):
+        real_hash = job_manager_module.file_content_hash
+        with patch("core.job_manager.file_content_hash", side_effect=real_hash) as hashed, \
+                patch("core.job_manager.ImageProxy.create_proxy", return_value="") as create:
+            jm._process_file(photo)
+            jm._process_file(photo)
+        hashed.assert_called_once_with(photo)
+        assert create.call_args.kwargs["content_hash"] == real_hash(photo)
+
+    def test_no_cache_leaves_hashing_to_proxy(self, jm, photo):
+        jm._close_result_cache()
+        with patch("core.job_manager.file_content_hash") as hashed, \
+                patch("core.job_manager.ImageProxy.create_proxy", return_value="") as create:
+            jm._process_file(photo)
+        hashed.assert_not_called()
+        assert create.call_args.kwargs["content_hash"] == ""
+
+
+# ═══════════════════════════════════════
+# Resumed jobs
+# ═══════════════════════════════════════
+
+class TestResumedResults:
+
+    def test_export_merges_resumed_and_new(self, jm):
+        jm._resumed_results = {"a.jpg": {"status": "success", "title": "A"}}
+        jm._results = {"b.jpg": {"status": "success", "title": "B"}}
+        assert set(jm._export_results()) == {"a.jpg", "b.jpg"}
+
+    def test_new_result_wins_over_resumed(self, jm):
+        jm._resumed_results = {"a.jpg": {"status": "success", "title": "old"}}
+        jm._results = {"a.jpg": {"status": "success", "title": "new"}}
+        assert jm._export_results()["a.jpg"]["title"] == "new"
+
+    def test_resumed_only_is_exportable(self, jm):
+        jm._resumed_results = {"a.jpg": {"status": "success"}}
+        jm._results = {"b.jpg": {"status": "error"}}
+        assert jm._has_exportable() is True
+
+    def test_nothing_exportable(self, jm):
+        jm._results = {"b.jpg": {"status": "error"}}
+        assert jm._has_exportable() is False
+
+    def test_move_includes_resumed_files(self, jm, tmp_path):
+        folder = tmp_path / "shoot"
+        folder.mkdir()
+        for n in ("a.jpg", "b.jpg", "c.jpg"):
+            (folder / n).write_bytes(b"\x00")
+        jm._folder_path = str(folder)
+        jm._files = [str(folder / "b.jpg"), str(folder / "c.jpg")]
+        jm._resumed_results = {"a.jpg": {"status": "success"}}
+        jm._results = {"b.jpg": {"status": "success"}, "c.jpg": {"status": "error"}}
+        out = jm._move_completed_files([])
+        assert sorted(os.listdir(out)) == ["a.jpg", "b.jpg"]
+        assert (folder / "c.jpg").exists()
+
+
+# ═══════════════════════════════════════
+# Async pipeline
+# ═══════════════════════════════════════
+
+class TestProcessFileAsync:
+
+    @pytest.fixture
+    def async_jm(self, jm):
+        jm._engine.aprocess_photo = AsyncMock(return_value={
+            "title": "Sunset", "description": "Sun over sea", "keywords": ["sun", "sea"],
+        })
+        return jm
+
+    def test_success_matches_sync_shape(self, async_jm, photo):
+        result = asyncio.run(async_jm._process_file_async(photo))
+        assert result["status"] == "success"
+        assert result["title"] == "Sunset"
+        assert "processing_time" in result
+        async_jm._engine.aprocess_photo.assert_awaited_once()
+
+    def test_shares_result_cache_with_sync_path(self, async_jm, photo):
+        async_jm._process_file(photo)
+        result = asyncio.run(async_jm._process_file_async(photo))
+        assert result["_cache_hit"] is True
+        async_jm._engine.aprocess_photo.assert_not_awaited()
+
+    def test_gemini_error_mapped(self, async_jm, photo):
+        from core.engines.gemini_engine import GeminiError, GeminiErrorType
+        async_jm._engine.aprocess_photo.side_effect = GeminiError("429", GeminiErrorType.RATE_LIMIT)
+        result = asyncio.run(async_jm._process_file_async(photo))
+        assert result["status"] == "error"
+        assert result["error_type"] == "RATE_LIMIT"
+
+
+# ═══════════════════════════════════════
+# Video transcode stage
+# ═══════════════════════════════════════
+
+class TestTranscodePrefetch:
+
+    @pytest.fixture
+    def clip(self, tmp_path):
+        path = tmp_path / "clip.mp4"
+        path.write_bytes(b"\x00" * 64)
+        return str(path)
+
+    def test_cache_hit_discards_prefetched_proxy(self, jm, clip):
+        jm._prefetcher = MagicMock()
+        with patch.object(jm._result_cache, "get", return_value={"title": "Clip", "keywords": []}):
+            assert jm._process_file(clip)["_cache_hit"] is True
+        jm._prefetcher.discard.assert_called_once_with(clip)
+        jm._prefetcher.get.assert_not_called()
+
+    def test_cached_video_skipped_by_prefetch(self, jm, clip, tmp_path):
+        other = tmp_path / "other.mp4"
+        other.write_bytes(b"\x01" * 64)
+        jm._result_cache.put(jm._result_cache_key(clip, jm._file_prompt(clip)), {"title": "Clip"})
+        assert jm._has_cached_result(clip) is True
+        assert jm._has_cached_result(str(other)) is False
+        jm._close_result_cache()
+        assert jm._has_cached_result(clip) is False
+
+    def test_video_proxy_taken_from_prefetcher(self, jm, clip):
+        jm._prefetcher = MagicMock()
+        jm._prefetcher.get.return_value = "/tmp/clip_proxy.mp4"
+        assert jm._get_video_proxy(clip) == "/tmp/clip_proxy.mp4"
+
+    def test_inline_transcode_without_prefetcher(self, jm, clip):
+        with patch("core.job_manager.Transcoder.create_proxy", return_value="/tmp/p.mp4") as create:
+            assert jm._get_video_proxy(clip) == "/tmp/p.mp4"
+        create.assert_called_once_with(clip)
+
+
+# ═══════════════════════════════════════
+# Warm video workers
+# ═══════════════════════════════════════
+
+class TestVideoWorkers:
+
+    @pytest.fixture
+    def clip(self, tmp_path):
+        path = tmp_path / "clip.mp4"
+        path.write_bytes(b"\x00" * 64)
+        return str(path)
+
+    @pytest.fixture
+    def pools(self, jm):
+        """In-process stand-ins for the worker process pool + post-processing pool."""
+        jm._video_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        jm._video_post = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        yield jm
+        jm._shutdown_video_pool()
+
+    def test_initializer_builds_engine_once(self):
+        with patch("core.job_manager.GeminiEngine") as engine_cls, \
+                patch.object(job_manager_module, "_worker_engine", None):
+            engine_cls.return_value.process_video.return_value = {"title": "Clip"}
+            job_manager_module._init_video_worker("key", "gemini-2.5-flash", "system")
+            for name in ("a.mp4", "b.mp4", "c.mp4"):
+                out = job_manager_module._video_worker_task(name, "prompt", "system")
+                assert out == {"status": "success", "result": {"title": "Clip"}}
+        engine_cls.assert_called_once()
+        engine = engine_cls.return_value
+        engine.set_api_key.assert_called_once_with("key")
+        engine.set_model.assert_called_once_with("gemini-2.5-flash")
+        assert engine.process_video.call_count == 3
+
+    def test_initializer_shares_upload_slots(self):
+        slots = object()
+        with patch("core.job_manager.GeminiEngine") as engine_cls, \
+                patch.object(job_manager_module, "_worker_engine", None):
+            job_manager_module._init_video_worker("key", "m", "system", slots)
+        engine_cls.return_value.set_upload_slots.assert_called_once_with(slots)
+
+    def test_initializer_installs_shared_poller(self):
+        from core.engines.file_poller import FileStatePoller, RemotePoller
+        with patch("core.job_manager.GeminiEngine"), \
+                patch.object(job_manager_module, "_worker_engine", None):
+            job_manager_module._init_video_worker("key", "m", "system", None, MagicMock())
+        try:
+            assert isinstance(FileStatePoller.shared(), RemotePoller)
+        finally:
+            FileStatePoller.reset_shared()
+
+    def test_initializer_installs_shared_limiter(self):
+        from core.engines.rate_limiter import RateLimiter
+        limiter = MagicMock(model_name="m")
+        with patch("core.job_manager.GeminiEngine"), \
+                patch.object(job_manager_module, "_worker_engine", None):
+            job_manager_module._init_video_worker("key", "m", "system", None, None, limiter)
+        assert RateLimiter.for_model("m") is limiter
+
+    def test_task_without_initializer_builds_engine(self):
+        with patch("core.job_manager.GeminiEngine") as engine_cls, \
+                patch.object(job_manager_module, "_worker_engine", None):
+            engine_cls.return_value.process_video.side_effect = RuntimeError("boom")
+            out = job_manager_module._video_worker_task("a.mp4", "p", "s", "key", "model")
+        assert out["status"] == "error" and out["error_type"] == "UNKNOWN"
+        engine_cls.return_value.set_api_key.assert_called_once_with("key")
+
+    def test_video_returns_future_with_final_result(self, pools, clip):
+        jm = pools
+        worker_out = {"status": "success", "result": {"title": "Clip", "keywords": ["a", "b"]}}
+        with patch("core.job_manager.Transcoder.create_proxy", return_value=""), \
+                patch("core.job_manager._video_worker_task", return_value=worker_out):
+            future = jm._process_file(clip)
+            assert isinstance(future, concurrent.futures.Future)
+            result = future.result(timeout=5)
+        assert result["status"] == "success"
+        assert result["title"] == "Clip"
+        assert "processing_time" in result
+
+    def test_video_worker_error_mapped(self, pools, clip):
+        jm = pools
+        worker_out = {"status": "error", "error_type": "RATE_LIMIT", "error": "429"}
+        with patch("core.job_manager.Transcoder.create_proxy", return_value="/tmp/p.mp4"), \
+                patch("core.job_manager.Transcoder.cleanup_proxy") as cleanup, \
+                patch("core.job_manager._video_worker_task", return_value=worker_out):
+            result = jm._process_file(clip).result(timeout=5)
+        assert result["status"] == "error"
+        assert result["error_type"] == "RATE_LIMIT"
+        cleanup.assert_called_once_with("/tmp/p.mp4")
+
+    def test_stopped_job_resolves_skipped(self, jm):
+        inner = concurrent.futures.Future()
+        outer = jm._defer_video_result(inner, "", None, "", 0.0)  # no post pool
+        inner.set_result({"status": "success", "result": {}})
+        assert outer.result(timeout=1)["status"] == "skipped"
+
+    def test_helper_limiter_shared_then_restored(self, jm):
+        from core.engines.rate_limiter import RateLimiter
+        local = RateLimiter.configure("gemini-test", rpm=600, tpm=1_000_000)  # 10 req/s
+        jm._settings = {"model": "gemini-test", "api_key": ""}
+        _poller, shared = jm._start_video_helper(multiprocessing.get_context("spawn"))
+        try:
+            assert RateLimiter.for_model("gemini-test") is shared
+            assert (shared.rpm, shared.tpm) == (600, 1_000_000)
+            shared.penalize()                  # a worker's 429 empties the one request bucket
+            assert shared.try_acquire(1) > 0
+            assert shared.acquire(1) is True   # waits ~0.1 s in the helper process
+        finally:
+            jm._shutdown_video_pool()
+        assert RateLimiter.for_model("gemini-test") is local
+        assert local.total_wait > 0.05         # the shared wait lands in the job summary
+
+
+# ═══════════════════════════════════════
+# Concurrency summary
+# ═══════════════════════════════════════
+
+class TestConcurrencySummary:
+
+    def test_rate_limit_wait_is_per_job(self, jm):
+        limiter = MagicMock(total_wait=42.0, rpm=150, tpm=2_000_000)
+        jm._rate_wait_base = (limiter, 40.0)
+        with patch("core.job_manager.RateLimiter.for_model", return_value=limiter):
+            assert jm._concurrency_summary()["rate_limit_wait"] == 2.0
+
+    def test_replaced_limiter_counts_from_zero(self, jm):
+        limiter = MagicMock(total_wait=3.0, rpm=150, tpm=2_000_000)
+        jm._rate_wait_base = (MagicMock(), 40.0)
+        with patch("core.job_manager.RateLimiter.for_model", return_value=limiter):
+            assert jm._concurrency_summary()["rate_limit_wait"] == 3.0
+
+
+# ═══════════════════════════════════════
+# Multi-image photo batches
+# ═══════════════════════════════════════
+
+class TestPhotoBatching:
+
+    @staticmethod
+    def _items(jm, tmp_path, count):
+        items = []
+        for i in range(count):
+            path = tmp_path / f"p{i}.jpg"
+            path.write_bytes(b"\xff\xd8" + bytes([i]) * 50)
+            items.append((str(path), "PROMPT", None, "", 0.0))
+        return items
+
+    def test_batch_results_finished_per_photo(self, jm, tmp_path):
+        jm._engine.process_photo_batch.return_value = [
+            {"title": "A", "keywords": ["a"]}, {"title": "B", "keywords": ["b"]},
+        ]
+        results = jm._process_photo_batch(self._items(jm, tmp_path, 2))
+        assert [r["title"] for r in results] == ["A", "B"]
+        assert all(r["status"] == "success" for r in results)
+        jm._engine.process_photo.assert_not_called()
+
+    def test_invalid_entry_retried_alone(self, jm, tmp_path):
+        jm._engine.process_photo_batch.return_value = [{"title": "A", "keywords": []}, None]
+        items = self._items(jm, tmp_path, 2)
+        results = jm._process_photo_batch(items)
+        assert results[1]["title"] == "Sunset"          # single-photo fallback
+        jm._engine.process_photo.assert_called_once_with(items[1][0], "PROMPT")
+
+    def test_failed_batch_falls_back_to_singles(self, jm, tmp_path):
+        from core.engines.gemini_engine import GeminiError, GeminiErrorType
+        jm._engine.process_photo_batch.side_effect = GeminiError("bad json", GeminiErrorType.UNKNOWN)
+        results = jm._process_photo_batch(self._items(jm, tmp_path, 3))
+        assert [r["status"] for r in results] == ["success"] * 3
+        assert jm._engine.process_photo.call_count == 3
+
+    def test_fatal_batch_error_not_retried(self, jm, tmp_path):
+        from core.engines.gemini_engine import GeminiError, GeminiErrorType
+        jm._engine.process_photo_batch.side_effect = GeminiError("key", GeminiErrorType.INVALID_KEY)
+        results = jm._process_photo_batch(self._items(jm, tmp_path, 2))
+        assert [r["error_type"] for r in results] == ["INVALID_KEY", "INVALID_KEY"]
+        jm._engine.process_photo.assert_not_called()
+
+    def test_process_file_hands_photo_to_batcher(self, jm, photo):
+        jm._photo_batcher = MagicMock()
+        jm._photo_batcher.add.return_value = concurrent.futures.Future()
+        out = jm._process_file(photo)
+        assert out is jm._photo_batcher.add.return_value
+        assert jm._photo_batcher.add.call_args.args[0][0] == photo
+        jm._engine.process_photo.assert_not_called()
+
+    @pytest.mark.parametrize("settings, expected", [
+        ({}, 0),
+        ({"photo_batch_size": 6}, 6),
+        ({"photo_batch_size": 500}, 10),
+        ({"photo_batch_size": 6, "async_engine": True}, 0),
+        ({"photo_batch_size": "x"}, 0),
+    ])
+    def test_batch_size_setting(self, settings, expected):
+        assert JobManager._photo_batch_size(settings) == expected
+
+
+# ═══════════════════════════════════════
+# Per-job prompt templates
+# ═══════════════════════════════════════
+
+TEMPLATE = (
+    "Describe this {media_type_str}. Title {title_min}-{title_limit} chars, "
+    "description {desc_min}-{desc_limit} chars, {keyword_count} keywords. "
+    "{video_instruction} Dictionary: {keyword_data}"
+)
+
+
+class TestPromptTemplates:
+
+    @pytest.fixture
+    def pm(self):
+        manager = JobManager()
+        manager._settings = {"max_keywords": 40, "title_length": 100, "description_length": 200}
+        manager._prompt_template = TEMPLATE
+        manager._dictionary = "Beach\nSunset"
+        manager._dictionary_in_prompt = True
+        manager._compile_prompts()
+        return manager
+
+    def test_placeholders_filled(self, pm):
+        prompt = pm._build_prompt("/tmp/a.jpg")
+        assert prompt == (
+            "Describe this image. Title 80-95 chars, description 160-190 chars, "
+            "50 keywords.  Dictionary: Beach\nSunset"
+        )
+        assert "poster_timecode" in pm._build_prompt("/tmp/a.mp4")
+
+    def test_rendered_once_per_job(self, pm):
+        first = pm._build_prompt("/tmp/a.jpg")
+        pm._settings["max_keywords"] = 5          # per-file calls no longer read settings
+        assert pm._build_prompt("/tmp/b.jpg") is first
+        pm._compile_prompts()                    # next job re-renders
+        assert "15 keywords" in pm._build_prompt("/tmp/b.jpg")
+
+    def test_dictionary_placeholders_not_expanded(self, pm):
+        pm._dictionary = "{media_type_str}"
+        pm._compile_prompts()
+        assert pm._build_prompt("/tmp/a.jpg").endswith("Dictionary: {media_type_str}")
+
+    def test_no_template_no_prompts(self):
+        manager = JobManager()
+        manager._compile_prompts()
+        assert manager._prompts == {}
+
+    def test_prompt_digest_memoized(self, pm):
+        prompt = pm._build_prompt("/tmp/a.jpg")
+        with patch("core.job_manager.hashlib.sha256", wraps=__import__("hashlib").sha256) as sha:
+            digests = {pm._prompt_digest(pm._build_prompt(f"/tmp/{i}.jpg")) for i in range(50)}
+        assert len(digests) == 1
+        assert sha.call_count == 1
+        assert digests == {pm._prompt_digest(prompt)}
+
+    def test_benchmark_per_file_cost_independent_of_dictionary(self):
+        """Micro-benchmark: per-file prompt + digest cost with a 1 KB vs a 2 MB dictionary."""
+
+        def per_file_cost(dictionary: str, files: int = 3000) -> float:
+            manager = JobManager()
+            manager._settings = {}
+            manager._prompt_template = TEMPLATE
+            manager._dictionary = dictionary
+            manager._dictionary_in_prompt = True
+            manager._compile_prompts()
+            paths = [f"/tmp/{i}.jpg" for i in range(files)]
+            started = time.perf_counter()
+            for path in paths:
+                manager._prompt_digest(manager._build_prompt(path))
+            return (time.perf_counter() - started) / files
+
+        small = min(per_file_cost("word\n" * 200) for _ in range(3))
+        large = min(per_file_cost("word\n" * 400_000) for _ in range(3))
+        # Re-rendering / re-hashing 2 MB per file would be >1000x slower; allow timer noise
+        assert large < small * 5 + 2e-6
+
+
+
+# ═══════════════════════════════════════
+# Batch keyword post-processing
+# ═══════════════════════════════════════
+
+class TestKeywordBatch:
+
+    @pytest.fixture(autouse=True)
+    def no_stemmer(self):
+        with patch("core.logic.keyword_processor._get_stemmer", return_value=None):
+            yield
+
+    @pytest.fixture
+    def ready(self, jm):
+        jm._keyword_processor.set_blacklist({"nike"})
+        jm._keyword_rules_ready = True
+        jm._settings.update({"platform": "Adobe & Shutterstock", "keyword_style": "Hybrid"})
+        return jm
+
+    def test_raw_keywords_kept(self, ready, photo):
+        ready._engine.process_photo.side_effect = lambda *a, **kw: {
+            "title": "T", "keywords": ["Nike shoes", "sunset", "Sunset"],
+        }
+        result = ready._process_file(photo)
+        assert result["raw_keywords"] == ["Nike shoes", "sunset", "Sunset"]
+        assert result["keywords"] == ["Sunset"]
+
+    def test_deferred_until_export(self, ready, photo):
+        ready._defer_keywords = True
+        ready._engine.process_photo.side_effect = lambda *a, **kw: {
+            "title": "T", "keywords": ["Nike shoes", "sunset", "Sunset"],
+        }
+        result = ready._process_file(photo)
+        assert result["keywords"] == ["Nike shoes", "sunset", "Sunset"]
+        ready._results = {"sunset.jpg": result}
+        assert ready.process_keywords(ready._export_results()) == 1
+        assert result["keywords"] == ["Sunset"]
+
+    def test_reprocess_with_other_settings(self, ready):
+        results = {
+            "a.jpg": {"status": "success", "raw_keywords": ["blue sky", "sea", "sand"]},
+            "b.jpg": {"status": "success", "raw_keywords": ["blue sky", "sea", "sand"]},
+            "c.jpg": {"status": "error"},
+            "d.jpg": {"status": "success", "keywords": ["old"]},
+        }
+        assert ready.process_keywords(results, {"keyword_style": "Single words", "max_keywords": 2}) == 2
+        assert results["a.jpg"]["keywords"] == results["b.jpg"]["keywords"]
+        assert results["a.jpg"]["keywords"] is not results["b.jpg"]["keywords"]
+        assert len(results["a.jpg"]["keywords"]) == 2
+        assert results["d.jpg"]["keywords"] == ["old"]
+        ready._engine.process_photo.assert_not_called()
+
+    def test_same_settings_not_reprocessed(self, ready, photo):
+        ready._engine.process_photo.side_effect = lambda *a, **kw: {
+            "title": "T", "keywords": ["blue sky", "sea"],
+        }
+        result = ready._process_file(photo)
+        assert result["_keyword_settings"]["keyword_style"] == "Hybrid"
+        result["keywords"] = ["kept as is"]
+        assert ready.process_keywords({"sunset.jpg": result}) == 0
+        assert result["keywords"] == ["kept as is"]
+        assert ready.process_keywords({"sunset.jpg": result}, {"max_keywords": 1}) == 1
+        assert len(result["keywords"]) == 1
+
+    def test_user_edited_keywords_not_reprocessed(self, ready):
+        results = {"a.jpg": {
+            "status": "success", "raw_keywords": ["blue sky", "sea"],
+            "keywords": ["my own"], "_keywords_edited": True,
+        }}
+        assert ready.process_keywords(results, {"keyword_style": "Single words"}) == 0
+        assert results["a.jpg"]["keywords"] == ["my own"]
+
+    def test_blacklist_still_applied_after_guard_cleared(self, jm):
+        jm._copyright_guard.initialize(["acme"])
+        jm._blacklist_matcher = jm._copyright_guard.matcher
+        jm._copyright_guard.clear()                  # job finished
+        jm._keyword_rules_ready = True
+        results = {"a.jpg": {"status": "success", "raw_keywords": ["acme logo", "sea"]}}
+        assert jm.process_keywords(results, {"keyword_style": "Hybrid"}) == 1
+        assert results["a.jpg"]["keywords"] == ["sea"]
+
+    def test_no_rules_loaded_keeps_keywords(self, jm):
+        results = {"a.jpg": {"status": "success", "raw_keywords": ["x y"], "keywords": ["kept"]}}
+        assert jm.process_keywords(results) == 0
+        assert results["a.jpg"]["keywords"] == ["kept"]
+
+
+# ═══════════════════════════════════════
+# Stage trace
+# ═══════════════════════════════════════
+
+class TestStageTrace:
+
+    @pytest.fixture
+    def traced(self, jm, tmp_path):
+        from core.managers.stage_trace import StageTrace
+        jm._trace = StageTrace(str(tmp_path / "trace.jsonl"))
+        yield jm
+        jm._close_trace()
+
+    @staticmethod
+    def _stages(jm):
+        import json
+        jm._trace.close()
+        with open(jm._trace.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_photo_stages_recorded_under_filename(self, traced, photo):
+        traced._process_file(photo)
+        records = self._stages(traced)
+        assert {r["file"] for r in records} == {"sunset.jpg"}
+        stages = [r["stage"] for r in records]
+        for stage in ("hash", "cache_lookup", "proxy", "cache_store"):
+            assert stage in stages
+
+    def test_video_worker_spans_replayed(self, traced, tmp_path):
+        clip = tmp_path / "clip.mp4"
+        clip.write_bytes(b"\x00" * 64)
+        traced._video_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        traced._video_post = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        worker_out = {
+            "status": "success", "result": {"title": "Clip", "keywords": ["a"]},
+            "spans": [{"file": "", "stage": "upload", "start": 1.0, "dur": 2.5}],
+        }
+        try:
+            with patch("core.job_manager.Transcoder.create_proxy", return_value=""), \
+                    patch("core.job_manager._video_worker_task", return_value=worker_out):
+                result = traced._process_file(str(clip)).result(timeout=5)
+        finally:
+            traced._shutdown_video_pool()
+        assert "spans" not in result
+        upload = [r for r in self._stages(traced) if r["stage"] == "upload"]
+        assert upload == [{"file": "clip.mp4", "stage": "upload", "start": 1.0, "dur": 2.5}]
+
+    def test_worker_task_ships_engine_spans(self):
+        from core.managers.stage_trace import span
+
+        def process_video(*_args):
+            with span("upload"):
+                pass
+            return {"title": "Clip"}
+
+        with patch.object(job_manager_module, "_worker_engine", MagicMock()) as engine:
+            engine.process_video.side_effect = process_video
+            out = job_manager_module._video_worker_task("a.mp4", "p", "s")
+        assert out["result"] == {"title": "Clip"}
+        assert [s["stage"] for s in out["spans"]] == ["upload"]
+
+    def test_total_span_and_summary(self, traced, photo):
+        traced._is_running = True
+        with patch("core.job_manager.JournalManager.update_progress"):
+            traced._on_file_completed(photo, {"status": "success", "processing_time": 1.25})
+        stages = traced._close_trace()
+        assert stages["total"]["count"] == 1
+        assert stages["total"]["p95"] == 1.25
+        assert traced._trace is None
+
+    def test_disabled_by_setting(self, jm):
+        jm._job_token = "tok"
+        jm._open_trace({"stage_trace": False})
+        assert jm._trace is None
+        assert jm._close_trace() == {}
+
+
+class TestUsageLedger:
+
+    def test_completed_files_recorded_per_model_and_media(self, jm, photo):
+        jm._is_running = True
+        with patch("core.job_manager.JournalManager.update_progress"):
+            jm._on_file_completed(photo, {
+                "status": "success", "_token_input": 1200, "_token_cached": 800, "_token_output": 150,
+            })
+            jm._on_file_completed("/x/clip.mp4", {"status": "success", "_cache_hit": True})
+        usage = jm._usage.summary()
+        assert usage["by_model"]["gemini-2.5-pro"]["image"]["total"] == 1350
+        assert usage["by_model"]["gemini-2.5-pro"]["video"]["cache_hits"] == 1
+        assert usage["cached"] == 800
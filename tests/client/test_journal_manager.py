@@ -1,6 +1,7 @@
 """
 Tests for client/core/managers/journal_manager.py
-Covers: create_journal, update_progress, read_journal, delete_journal, recover_on_startup.
+Covers: create_journal, update_progress, read_journal, delete_journal, recover_on_startup,
+        append-only per-file log (replay, torn lines, fsync batching), resume info.
 """
 import json
 import os
@@ -84,6 +85,78 @@ class TestUpdateProgress:
             JournalManager.update_progress(True, False)
 
 
+# ═══════════════════════════════════════
+# Append-only per-file log
+# ═══════════════════════════════════════
+
+class TestPerFileLog:
+
+    def _log_path(self, journal_path):
+        return os.path.splitext(journal_path)[0] + ".log"
+
+    def test_header_not_rewritten(self, journal_path):
+        with patch("core.managers.journal_manager.RECOVERY_PATH", journal_path):
+            JournalManager.create_journal("token-1", 10, "iStock", 3)
+            before = open(journal_path).read()
+            JournalManager.update_progress(True, False, "a.jpg", {"title": "A"})
+            assert open(journal_path).read() == before
+
+    def test_one_line_per_file(self, journal_path):
+        with patch("core.managers.journal_manager.RECOVERY_PATH", journal_path):
+            JournalManager.create_journal("token-1", 10, "iStock", 3)
+            JournalManager.update_progress(True, False, "a.jpg", {"title": "A"})
+            JournalManager.update_progress(False, True, "b.mp4", {"error": "x"})
+            with open(self._log_path(journal_path), encoding="utf-8") as f:
+                lines = [json.loads(l) for l in f]
+            assert [l["file"] for l in lines] == ["a.jpg", "b.mp4"]
+            assert lines[0]["result"] == {"title": "A"}
+
+    def test_results_replayed(self, journal_path):
+        with patch("core.managers.journal_manager.RECOVERY_PATH", journal_path):
+            JournalManager.create_journal("token-1", 10, "iStock", 3)
+            JournalManager.update_progress(True, False, "a.jpg",
+                                           {"title": "A", "keywords": ["sun"], "status": "success"})
+            data = JournalManager.read_journal()
+            assert data["results"]["a.jpg"]["keywords"] == ["sun"]
+
+    def test_torn_last_line_ignored(self, journal_path):
+        with patch("core.managers.journal_manager.RECOVERY_PATH", journal_path):
+            JournalManager.create_journal("token-1", 10, "iStock", 3)
+            JournalManager.update_progress(True, False, "a.jpg", {"title": "A"})
+            JournalManager.sync()
+            with open(self._log_path(journal_path), "a") as f:
+                f.write('{"file": "b.jpg", "succ')
+            data = JournalManager.read_journal()
+            assert data["success_count"] == 1
+            assert list(data["results"]) == ["a.jpg"]
+
+    def test_create_discards_previous_log(self, journal_path):
+        with patch("core.managers.journal_manager.RECOVERY_PATH", journal_path):
+            JournalManager.create_journal("token-1", 10, "iStock", 3)
+            JournalManager.update_progress(True, False, "a.jpg", {})
+            JournalManager.create_journal("token-2", 5, "iStock", 3)
+            data = JournalManager.read_journal()
+            assert data["success_count"] == 0
+            assert data["results"] == {}
+
+    def test_delete_removes_log(self, journal_path):
+        with patch("core.managers.journal_manager.RECOVERY_PATH", journal_path):
+            JournalManager.create_journal("token-1", 10, "iStock", 3)
+            JournalManager.update_progress(True, False, "a.jpg", {})
+            JournalManager.delete_journal()
+            assert not os.path.isfile(self._log_path(journal_path))
+
+    def test_fsync_batched(self, journal_path):
+        with patch("core.managers.journal_manager.RECOVERY_PATH", journal_path), \
+             patch("core.managers.journal_manager.FSYNC_INTERVAL_SEC", 3600), \
+             patch("core.managers.journal_manager.FSYNC_EVERY_RECORDS", 5), \
+             patch("core.managers.journal_manager.os.fsync") as mock_fsync:
+            JournalManager.create_journal("token-1", 10, "iStock", 3)
+            for i in range(10):
+                JournalManager.update_progress(True, False, f"{i}.jpg", {})
+            assert mock_fsync.call_count == 2
+
+
 # ═══════════════════════════════════════
 # read_journal
 # ═══════════════════════════════════════
@@ -186,4 +259,81 @@ class TestRecoverOnStartup:
             assert "failed_count" in info
             assert "credits_reserved" in info
             assert "refunded" in info
+            assert "results" in info
             assert info["credits_reserved"] == 30  # 10 * 3
+
+    def test_recovery_returns_per_file_results(self, journal_path):
+        with patch("core.managers.journal_manager.RECOVERY_PATH", journal_path):
+            JournalManager.create_journal("token-1", 10, "iStock", 3)
+            JournalManager.update_progress(True, False, "a.jpg", {"title": "A", "status": "success"})
+            info = JournalManager.recover_on_startup()
+            assert info["results"]["a.jpg"]["title"] == "A"
+
+
+# ═══════════════════════════════════════
+# Resume after crash
+# ═══════════════════════════════════════
+
+class TestResumeInfo:
+
+    def _start(self, tmp_path, names):
+        folder = tmp_path / "shoot"
+        folder.mkdir()
+        files = []
+        for n in names:
+            (folder / n).write_bytes(b"\x00")
+            files.append(str(folder / n))
+        JournalManager.create_journal(
+            "token-1", len(files), "iStock", 3,
+            folder_path=str(folder), files=files,
+            settings={"model": "gemini-2.5-flash", "max_keywords": 40},
+        )
+        return str(folder), files
+
+    def test_remaining_excludes_successful(self, journal_path, tmp_path):
+        with patch("core.managers.journal_manager.RECOVERY_PATH", journal_path):
+            folder, files = self._start(tmp_path, ["a.jpg", "b.jpg", "c.mp4"])
+            JournalManager.update_progress(True, False, "a.jpg", {"title": "A", "status": "success"})
+            JournalManager.update_progress(False, False, "b.jpg", {"status": "error"})
+            info = JournalManager.recover_on_startup()
+            assert info["resumable"] is True
+            assert info["folder_path"] == folder
+            assert list(info["ok_results"]) == ["a.jpg"]
+            # Failed files are retried on resume
+            assert info["remaining_files"] == [files[1], files[2]]
+            assert info["settings"]["model"] == "gemini-2.5-flash"
+
+    def test_missing_files_not_requeued(self, journal_path, tmp_path):
+        with patch("core.managers.journal_manager.RECOVERY_PATH", journal_path):
+            _, files = self._start(tmp_path, ["a.jpg", "b.jpg"])
+            os.remove(files[1])
+            info = JournalManager.recover_on_startup()
+            assert info["remaining_files"] == [files[0]]
+
+    def test_missing_folder_not_resumable(self, journal_path, tmp_path):
+        with patch("core.managers.journal_manager.RECOVERY_PATH", journal_path):
+            JournalManager.create_journal("token-1", 2, "iStock", 3,
+                                          folder_path=str(tmp_path / "gone"),
+                                          files=[str(tmp_path / "gone" / "a.jpg")])
+            info = JournalManager.recover_on_startup()
+            assert info["resumable"] is False
+
+    def test_legacy_journal_not_resumable(self, journal_path):
+        with patch("core.managers.journal_manager.RECOVERY_PATH", journal_path):
+            JournalManager.create_journal("token-1", 10, "iStock", 3)
+            info = JournalManager.recover_on_startup()
+            assert info["resumable"] is False
+            assert info["remaining_files"] == []
+
+    def test_carried_results_kept_but_not_counted(self, journal_path, tmp_path):
+        with patch("core.managers.journal_manager.RECOVERY_PATH", journal_path):
+            self._start(tmp_path, ["a.jpg", "b.jpg"])
+            JournalManager.carry_over({"a.jpg": {"title": "A", "status": "success"}})
+            JournalManager.update_progress(True, False, "b.jpg", {"title": "B", "status": "success"})
+            mock_api = MagicMock()
+            mock_api.finalize_job.return_value = {"refunded": 0}
+            info = JournalManager.recover_on_startup(api_client=mock_api)
+            # Only this job's file is finalized — the carried one was charged by the earlier job
+            assert mock_api.finalize_job.call_args[0][1] == 1
+            assert set(info["ok_results"]) == {"a.jpg", "b.jpg"}
+            assert info["remaining_files"] == []
@@ -0,0 +1,84 @@
+"""
+Tests for client/core/engines/json_repair.py
+Covers: surrounding prose / trailing garbage, trailing commas, raw newlines, truncation
+        inside strings / arrays / nested objects / literals, stray closers, complete_only.
+"""
+import json
+import pytest
+
+from core.engines.json_repair import repair_json
+
+
+class TestCompleteValues:
+
+    def test_prose_around_object(self):
+        assert repair_json('Sure! {"title": "Sunset"} Hope this helps {x}') == {"title": "Sunset"}
+
+    def test_trailing_commas(self):
+        assert repair_json('{"keywords": ["a", "b", ], "title": "T", }') == {"keywords": ["a", "b"], "title": "T"}
+
+    def test_raw_newline_in_string(self):
+        assert repair_json('{"description": "line one\nline two"} x') == {"description": "line one\nline two"}
+
+    def test_braces_inside_strings_ignored(self):
+        assert repair_json('{"title": "a } b ] \\" c"} tail') == {"title": 'a } b ] " c'}
+
+    def test_array_value(self):
+        assert repair_json('[{"image": 1}, {"image": 2}] ok') == [{"image": 1}, {"image": 2}]
+
+    def test_no_json(self):
+        with pytest.raises(ValueError):
+            repair_json("no json here")
+
+
+class TestTruncated:
+
+    def test_object_value_string_closed(self):
+        assert repair_json('{"title": "Sunset over the se') == {"title": "Sunset over the se"}
+
+    def test_partial_array_element_dropped(self):
+        text = '{"title": "T", "keywords": ["sun", "sea", "wav'
+        assert repair_json(text) == {"title": "T", "keywords": ["sun", "sea"]}
+
+    def test_dangling_key_dropped(self):
+        assert repair_json('{"title": "T", "keywords"') == {"title": "T"}
+        assert repair_json('{"title": "T", "keywords": ') == {"title": "T"}
+        assert repair_json('{"title": "T", "keyw') == {"title": "T"}
+
+    def test_after_comma(self):
+        assert repair_json('{"keywords": ["a", "b",') == {"keywords": ["a", "b"]}
+
+    def test_nested_containers_closed(self):
+        text = '[{"image": 1, "title": "A", "keywords": ["a"]}, {"image": 2, "keywords": ["x", "y'
+        assert repair_json(text) == [
+            {"image": 1, "title": "A", "keywords": ["a"]}, {"image": 2, "keywords": ["x"]},
+        ]
+
+    def test_partial_literal_dropped_complete_number_kept(self):
+        assert repair_json('{"a": 1, "b": tr') == {"a": 1}
+        assert repair_json('{"a": 1, "b": 25') == {"a": 1, "b": 25}
+
+    def test_dangling_escape(self):
+        assert repair_json('{"title": "quote \\') == {"title": "quote "}
+
+    def test_stray_closer(self):
+        assert repair_json('{"keywords": ["a", "b"}') == {"keywords": ["a", "b"]}
+
+    def test_complete_only_rejects_truncation(self):
+        with pytest.raises(ValueError):
+            repair_json('{"title": "Sunset', complete_only=True)
+
+    def test_every_prefix_parses_or_raises(self):
+        full = json.dumps({
+            "title": "Sunset", "description": "Sun \"over\" sea", "keywords": ["sun", "sea"],
+            "category": "Nature", "poster_timecode": "00:00:01:00", "shot_speed": "Real Time",
+        })
+        for end in range(1, len(full) + 1):
+            try:
+                value = repair_json(full[:end])
+            except ValueError:
+                continue
+            assert isinstance(value, dict)
+            assert set(value) <= {"title", "description", "keywords", "category",
+                                  "poster_timecode", "shot_speed"}
+        assert repair_json(full) == json.loads(full)
@@ -1,12 +1,15 @@
 """
 Tests for client/core/logic/keyword_processor.py
 Covers: _clean, _dedup_case_insensitive, _stem_dedup, _filter_blacklist,
-        process_istock, process_hybrid, process_single pipelines.
+        process_istock, process_hybrid, process_single pipelines, KeywordMemo,
+        process_batch.
 """
 import pytest
 from unittest.mock import patch
 
-from core.logic.keyword_processor import KeywordProcessor, GENERIC_BLACKLIST, IRREGULAR_MAP
+from core.logic.keyword_processor import (
+    KeywordProcessor, KeywordMemo, GENERIC_BLACKLIST, IRREGULAR_MAP,
+)
 
 
 @pytest.fixture
@@ -283,3 +286,113 @@ class TestSetBlacklist:
         processor.set_blacklist({"", "  ", "nike"})
         assert "" not in processor._blacklist
         assert "nike" in processor._blacklist
+
+
+# ═══════════════════════════════════════
+# KeywordMemo
+# ═══════════════════════════════════════
+
+class CountingStemmer:
+    def __init__(self):
+        self.calls = 0
+
+    def stem(self, word):
+        self.calls += 1
+        return word[:-1] if word.endswith("s") else word
+
+
+class TestKeywordMemo:
+
+    def test_hits_and_misses(self):
+        memo = KeywordMemo()
+        assert memo.get("t", "a", lambda: 1) == 1
+        assert memo.get("t", "a", lambda: 2) == 1
+        assert (memo.hits, memo.misses) == (1, 1)
+        assert memo.hit_rate == 0.5
+
+    def test_bounded(self):
+        memo = KeywordMemo(max_size=3)
+        for i in range(10):
+            memo.get("t", i, lambda i=i: i)
+        assert len(memo) <= 3
+
+    def test_clear_table_keeps_others(self):
+        memo = KeywordMemo()
+        memo.get("a", 1, lambda: 1)
+        memo.get("b", 1, lambda: 1)
+        memo.clear("a")
+        assert len(memo) == 1
+        memo.clear()
+        assert len(memo) == 0 and memo.hits == memo.misses == 0
+
+    def test_stemmer_called_once_per_word_across_files(self, processor):
+        stemmer = CountingStemmer()
+        with patch("core.logic.keyword_processor._get_stemmer", return_value=stemmer):
+            for _ in range(50):
+                processor.process_single(["sunset beaches", "beach sunsets"])
+                processor.process_hybrid(["sunset", "beaches"])
+        assert stemmer.calls == 4
+        assert processor.memo.hit_rate > 0.9
+
+    def test_memoized_clean_matches_uncached(self, processor):
+        raw = ['  "Sunset!"  ', "a", "--beach  walk--", 42, "  "]
+        first = processor._clean(raw)
+        assert processor._clean(raw) == first == ["Sunset", "beach walk"]
+
+    def test_dictionary_change_drops_matches(self, processor):
+        class Index:
+            def __init__(self, term):
+                self.term = term
+
+            def __len__(self):
+                return 1
+
+            def match(self, keyword):
+                return [self.term]
+
+            def snap(self, keywords, match=None):
+                return [t for k in keywords for t in (match or self.match)(k)]
+
+        processor.set_dictionary(Index("Beach"))
+        assert processor.process_istock(["sand"]) == ["Beach"]
+        processor.set_dictionary(Index("Shore"))
+        assert processor.process_istock(["sand"]) == ["Shore"]
+
+    def test_reset_memo(self, processor):
+        processor.process_istock(["sunset"])
+        processor.reset_memo()
+        assert len(processor.memo) == 0
+        assert processor.memo.hits == processor.memo.misses == 0
+
+
+# ═══════════════════════════════════════
+# process_batch
+# ═══════════════════════════════════════
+
+class TestProcessBatch:
+
+    def test_pipeline_for(self):
+        assert KeywordProcessor.pipeline_for("iStock", "Hybrid") == "istock"
+        assert KeywordProcessor.pipeline_for("Adobe & Shutterstock", "Single Words") == "single"
+        assert KeywordProcessor.pipeline_for("Adobe & Shutterstock", "Hybrid") == "hybrid"
+
+    def test_matches_per_call_results(self, processor_with_blacklist):
+        lists = [["Sunset", "beach walk", "nike shoes"], ["sea", "sea"], [], ["sunset"]]
+        p = processor_with_blacklist
+        with patch("core.logic.keyword_processor._get_stemmer", return_value=CountingStemmer()):
+            for pipeline, fn in (("istock", p.process_istock),
+                                 ("hybrid", p.process_hybrid),
+                                 ("single", p.process_single)):
+                expected = [fn(kws, 3) for kws in lists]
+                assert p.process_batch(lists, pipeline, 3) == expected
+
+    def test_identical_lists_processed_once(self, processor):
+        with patch.object(processor, "process", wraps=processor.process) as process:
+            out = processor.process_batch([["a b"], ["a b"], ["c d"]], "istock")
+        assert process.call_count == 2
+        out[0].append("x")
+        assert out[1] == ["a b"]
+
+    def test_unknown_pipeline(self, processor):
+        with pytest.raises(ValueError):
+            processor.process_batch([["a"]], "bogus")
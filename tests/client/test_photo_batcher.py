@@ -0,0 +1,93 @@
+"""
+Tests for client/core/managers/photo_batcher.py
+Covers: size-triggered and time-triggered flushes, per-item futures, batch errors,
+        short result lists, stop() cancelling waiting photos.
+"""
+import threading
+import time
+import pytest
+
+from core.managers.photo_batcher import PhotoBatcher
+
+
+class Recorder:
+    def __init__(self, fail=False, short=False):
+        self.batches = []
+        self.fail = fail
+        self.short = short
+        self.lock = threading.Lock()
+
+    def __call__(self, items):
+        with self.lock:
+            self.batches.append(list(items))
+        if self.fail:
+            raise RuntimeError("batch exploded")
+        results = [{"item": item} for item in items]
+        return results[:-1] if self.short else results
+
+
+# ═══════════════════════════════════════
+# Flushing
+# ═══════════════════════════════════════
+
+class TestFlush:
+
+    def test_full_batch_flushes_immediately(self):
+        rec = Recorder()
+        batcher = PhotoBatcher(rec, batch_size=3, max_wait=60)
+        futures = [batcher.add(i) for i in range(3)]
+        assert [f.result(timeout=2)["item"] for f in futures] == [0, 1, 2]
+        assert rec.batches == [[0, 1, 2]]
+        batcher.stop()
+
+    def test_partial_batch_flushed_after_wait(self):
+        rec = Recorder()
+        batcher = PhotoBatcher(rec, batch_size=10, max_wait=0.05)
+        started = time.monotonic()
+        futures = [batcher.add(i) for i in range(2)]
+        assert [f.result(timeout=2)["item"] for f in futures] == [0, 1]
+        assert time.monotonic() - started >= 0.04
+        assert rec.batches == [[0, 1]]
+        batcher.stop()
+
+    def test_overflow_starts_next_batch(self):
+        rec = Recorder()
+        batcher = PhotoBatcher(rec, batch_size=2, max_wait=0.05)
+        futures = [batcher.add(i) for i in range(5)]
+        for f in futures:
+            f.result(timeout=2)
+        assert sorted(len(b) for b in rec.batches) == [1, 2, 2]
+        assert batcher.items == 5 and batcher.batches == 3
+        batcher.stop()
+
+
+# ═══════════════════════════════════════
+# Errors / stop
+# ═══════════════════════════════════════
+
+class TestErrors:
+
+    def test_batch_exception_reaches_every_future(self):
+        batcher = PhotoBatcher(Recorder(fail=True), batch_size=2, max_wait=60)
+        futures = [batcher.add(i) for i in range(2)]
+        for f in futures:
+            with pytest.raises(RuntimeError, match="exploded"):
+                f.result(timeout=2)
+        batcher.stop()
+
+    def test_short_result_list_fails_missing_items(self):
+        batcher = PhotoBatcher(Recorder(short=True), batch_size=2, max_wait=60)
+        first, second = batcher.add("a"), batcher.add("b")
+        assert first.result(timeout=2) == {"item": "a"}
+        with pytest.raises(RuntimeError):
+            second.result(timeout=2)
+        batcher.stop()
+
+    def test_stop_cancels_waiting_photos(self):
+        rec = Recorder()
+        batcher = PhotoBatcher(rec, batch_size=10, max_wait=60)
+        future = batcher.add("a")
+        batcher.stop()
+        assert future.cancelled()
+        assert batcher.add("b").cancelled()
+        assert rec.batches == []
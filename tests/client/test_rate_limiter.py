@@ -0,0 +1,179 @@
+"""
+Tests for client/core/engines/rate_limiter.py
+Covers: token estimation (text / image tiles / video seconds), RPM and TPM pacing,
+        reconcile, penalize, per-model registry (+ install), GeminiEngine integration.
+"""
+import io
+from datetime import timedelta
+from types import SimpleNamespace
+import pytest
+from unittest.mock import patch, MagicMock
+
+from PIL import Image
+
+from core.engines.rate_limiter import (
+    RateLimiter, TokenBucket, estimate_tokens,
+    IMAGE_TOKENS_PER_TILE, VIDEO_TOKENS_PER_SEC, VIDEO_DEFAULT_SEC,
+)
+from core.engines.gemini_engine import GeminiEngine
+
+
+def _jpeg(size):
+    buf = io.BytesIO()
+    Image.new("RGB", size).save(buf, "JPEG")
+    return {"mime_type": "image/jpeg", "data": buf.getvalue()}
+
+
+# ═══════════════════════════════════════
+# estimate_tokens
+# ═══════════════════════════════════════
+
+class TestEstimateTokens:
+
+    def test_text_only(self):
+        assert estimate_tokens(["x" * 400]) == 100
+
+    def test_system_prompt_counted(self):
+        assert estimate_tokens(["x" * 400], system_prompt="y" * 400) == 200
+
+    def test_small_image_single_tile(self):
+        assert estimate_tokens([_jpeg((300, 200))]) == IMAGE_TOKENS_PER_TILE
+
+    def test_large_image_tiled(self):
+        # 1536×1024 → 2×2 tiles
+        assert estimate_tokens([_jpeg((1536, 1024))]) == 4 * IMAGE_TOKENS_PER_TILE
+
+    def test_undecodable_image_has_fallback(self):
+        assert estimate_tokens([{"mime_type": "image/jpeg", "data": b"junk"}]) > 0
+
+    def test_video_uses_reported_duration(self):
+        video = SimpleNamespace(video_metadata=SimpleNamespace(video_duration=timedelta(seconds=10)))
+        assert estimate_tokens([video]) == 10 * VIDEO_TOKENS_PER_SEC
+
+    def test_video_without_metadata_uses_default(self):
+        assert estimate_tokens([SimpleNamespace()]) == VIDEO_DEFAULT_SEC * VIDEO_TOKENS_PER_SEC
+
+
+# ═══════════════════════════════════════
+# Pacing
+# ═══════════════════════════════════════
+
+class TestPacing:
+
+    def test_burst_then_wait(self):
+        # 600 RPM → 10/s, bucket = 10 s of budget = 100 requests
+        limiter = RateLimiter("m", rpm=600, tpm=10_000_000)
+        for _ in range(100):
+            assert limiter.acquire(1, timeout=0)
+        assert not limiter.acquire(1, timeout=0)
+        assert limiter.acquire(1, timeout=0.5)  # refills at 10/s
+
+    def test_tpm_limits_large_requests(self):
+        # 60k TPM → 1k tokens/s, bucket = 10k
+        limiter = RateLimiter("m", rpm=10_000, tpm=60_000)
+        assert limiter.acquire(8_000, timeout=0)
+        assert not limiter.acquire(8_000, timeout=0)
+
+    def test_oversized_request_clamped(self):
+        limiter = RateLimiter("m", rpm=10_000, tpm=60_000)
+        assert limiter.acquire(10_000_000, timeout=0)
+
+    def test_reconcile_charges_overshoot(self):
+        limiter = RateLimiter("m", rpm=10_000, tpm=60_000)
+        assert limiter.acquire(1_000, timeout=0)
+        limiter.reconcile(estimated=1_000, actual=9_500)
+        assert not limiter.acquire(1_000, timeout=0)
+
+    def test_reconcile_refunds_overestimate(self):
+        limiter = RateLimiter("m", rpm=10_000, tpm=60_000)
+        assert limiter.acquire(10_000, timeout=0)
+        limiter.reconcile(estimated=10_000, actual=100)
+        assert limiter.acquire(5_000, timeout=0)
+
+    def test_penalize_pauses_requests(self):
+        limiter = RateLimiter("m", rpm=600, tpm=10_000_000)
+        limiter.penalize()
+        assert not limiter.acquire(1, timeout=0)
+        assert limiter.acquire(1, timeout=0.5)
+
+    def test_token_bucket_wait_time(self):
+        bucket = TokenBucket(per_minute=60, burst_sec=1)  # 1/s, capacity 1
+        bucket.tokens = 0
+        assert bucket.wait_time(1) == pytest.approx(1.0)
+
+
+# ═══════════════════════════════════════
+# Registry
+# ═══════════════════════════════════════
+
+class TestRegistry:
+
+    def test_same_model_shares_limiter(self):
+        assert RateLimiter.for_model("gemini-2.5-pro") is RateLimiter.for_model("gemini-2.5-pro")
+
+    def test_models_have_separate_budgets(self):
+        assert RateLimiter.for_model("gemini-2.5-pro") is not RateLimiter.for_model("gemini-2.5-flash")
+
+    def test_limits_from_config(self):
+        with patch.dict("core.engines.rate_limiter.GEMINI_RATE_LIMITS",
+                        {"custom": {"rpm": 7, "tpm": 700}}):
+            limiter = RateLimiter.for_model("custom")
+        assert (limiter.rpm, limiter.tpm) == (7, 700)
+
+    def test_unknown_model_uses_default(self):
+        limiter = RateLimiter.for_model("gemini-unknown")
+        assert limiter.rpm > 0 and limiter.tpm > 0
+
+    def test_install_replaces_and_returns_previous(self):
+        local = RateLimiter.for_model("gemini-2.5-flash")
+        shared = MagicMock(model_name="gemini-2.5-flash")
+        assert RateLimiter.install(shared) is local
+        assert RateLimiter.for_model("gemini-2.5-flash") is shared
+        assert RateLimiter.install(local) is shared
+
+    def test_engine_override(self):
+        engine = GeminiEngine()
+        engine.set_model("gemini-2.5-flash")
+        engine.set_rate_limits(rpm=5, tpm=500)
+        assert RateLimiter.for_model("gemini-2.5-flash").rpm == 5
+
+
+# ═══════════════════════════════════════
+# GeminiEngine integration
+# ═══════════════════════════════════════
+
+class TestEngineIntegration:
+
+    @pytest.fixture
+    def engine(self):
+        e = GeminiEngine()
+        e._api_key = "test-key"
+        e._model = MagicMock()
+        return e
+
+    def _ok(self, prompt_tokens=None):
+        usage = SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=10) \
+            if prompt_tokens is not None else None
+        return MagicMock(candidates=[MagicMock()], text='{"title": "t"}', usage_metadata=usage)
+
+    def test_budget_checked_before_generate(self, engine):
+        engine._model.generate_content.return_value = self._ok()
+        limiter = RateLimiter.for_model(engine._model_name)
+        with patch.object(limiter, "acquire", wraps=limiter.acquire) as acquire:
+            engine._generate_with_retry(contents=["x" * 400], timeout=30)
+        acquire.assert_called_once_with(100)
+
+    def test_actual_usage_reconciled(self, engine):
+        engine._model.generate_content.return_value = self._ok(prompt_tokens=1234)
+        limiter = RateLimiter.for_model(engine._model_name)
+        with patch.object(limiter, "reconcile") as reconcile:
+            engine._generate_with_retry(contents=["x" * 400], timeout=30)
+        reconcile.assert_called_once_with(100, 1234)
+
+    def test_rate_limit_penalizes_model(self, engine):
+        engine._model.generate_content.side_effect = [Exception("429 Resource Exhausted"), self._ok()]
+        limiter = RateLimiter.for_model(engine._model_name)
+        with patch.object(limiter, "penalize") as penalize, \
+                patch("core.engines.gemini_engine.time.sleep"):
+            engine._generate_with_retry(contents=["x"], timeout=30)
+        penalize.assert_called_once()
@@ -0,0 +1,129 @@
+"""
+Tests for client/core/data/result_cache.py
+Covers: make_key, get/put round-trip, persistence across instances, prune, clear,
+        thread-safety of concurrent writers.
+"""
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+from core.data.result_cache import ResultCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = ResultCache(str(tmp_path / "result_cache.db"))
+    yield c
+    c.close()
+
+
+# ═══════════════════════════════════════
+# make_key
+# ═══════════════════════════════════════
+
+class TestMakeKey:
+
+    def test_deterministic(self):
+        a = ResultCache.make_key("abc", model="m", platform="iStock")
+        b = ResultCache.make_key("abc", platform="iStock", model="m")
+        assert a == b
+
+    def test_content_changes_key(self):
+        assert ResultCache.make_key("abc", model="m") != ResultCache.make_key("abd", model="m")
+
+    @pytest.mark.parametrize("field,value", [
+        ("model", "gemini-2.5-flash"),
+        ("platform", "Adobe & Shutterstock"),
+        ("keyword_style", "Single Words"),
+        ("prompt", "other-prompt-hash"),
+        ("max_keywords", 30),
+    ])
+    def test_each_setting_changes_key(self, field, value):
+        base = dict(model="gemini-2.5-pro", platform="iStock", keyword_style="",
+                    prompt="p", max_keywords=45)
+        changed = dict(base, **{field: value})
+        assert ResultCache.make_key("abc", **base) != ResultCache.make_key("abc", **changed)
+
+
+# ═══════════════════════════════════════
+# get / put
+# ═══════════════════════════════════════
+
+class TestGetPut:
+
+    def test_miss_returns_none(self, cache):
+        assert cache.get("missing") is None
+
+    def test_round_trip(self, cache):
+        result = {"title": "Sunset", "keywords": ["sun", "sky"], "_token_input": 100}
+        cache.put("k1", result)
+        assert cache.get("k1") == result
+
+    def test_get_returns_independent_copy(self, cache):
+        cache.put("k1", {"keywords": ["a"]})
+        first = cache.get("k1")
+        first["keywords"].append("mutated")
+        assert cache.get("k1") == {"keywords": ["a"]}
+
+    def test_put_overwrites(self, cache):
+        cache.put("k1", {"title": "old"})
+        cache.put("k1", {"title": "new"})
+        assert cache.get("k1") == {"title": "new"}
+        assert len(cache) == 1
+
+    def test_unicode_preserved(self, cache):
+        cache.put("k1", {"title": "ภูเขา"})
+        assert cache.get("k1")["title"] == "ภูเขา"
+
+    def test_unserializable_result_skipped(self, cache):
+        cache.put("k1", {"obj": object()})
+        assert cache.get("k1") is None
+
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "rc.db")
+        c1 = ResultCache(path)
+        c1.put("k1", {"title": "Persisted"})
+        c1.close()
+        c2 = ResultCache(path)
+        assert c2.get("k1") == {"title": "Persisted"}
+        c2.close()
+
+    def test_closed_cache_does_not_raise(self, tmp_path):
+        c = ResultCache(str(tmp_path / "rc.db"))
+        c.close()
+        c.put("k1", {"title": "x"})
+        assert c.get("k1") is None
+
+    def test_concurrent_writers(self, cache):
+        def writer(n):
+            for i in range(20):
+                cache.put(f"{n}-{i}", {"n": n, "i": i})
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(cache) == 120
+
+
+# ═══════════════════════════════════════
+# prune / clear
+# ═══════════════════════════════════════
+
+class TestMaintenance:
+
+    def test_prune_removes_old_entries(self, cache):
+        with patch("core.data.result_cache.time.time", return_value=time.time() - 40 * 86400):
+            cache.put("old", {"title": "old"})
+        cache.put("new", {"title": "new"})
+        assert cache.prune(max_age_days=30) == 1
+        assert cache.get("old") is None
+        assert cache.get("new") is not None
+
+    def test_clear(self, cache):
+        cache.put("a", {})
+        cache.put("b", {})
+        cache.clear()
+        assert len(cache) == 0
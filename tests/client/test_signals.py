@@ -5,7 +5,7 @@ Tests for Qt Signal emission (headless, no GUI):
   - JobManager: job_failed signal on API errors
   - JobManager: job_completed signal with summary dict
   - JobManager: credit_updated signal after finalize
-  - FileWorker: completed signal on success/error/stop
+  - FileWorker: completed signal on success/error/stop, deferred (Future) results
 """
 import threading
 import time
@@ -217,6 +217,43 @@ class TestFileWorkerSignals:
         assert sem.tryAcquire(1, 100)  # should succeed
         sem.release()
 
+    def test_worker_deferred_future_holds_slot(self, qtbot):
+        """A Future result frees the thread; the slot is held until it resolves."""
+        import concurrent.futures
+        sem = QSemaphore(1)
+        stop = threading.Event()
+        received = []
+        future = concurrent.futures.Future()
+
+        worker = FileWorker("/tmp/clip.mp4", lambda fp: future, sem, stop)
+        worker.signals.completed.connect(lambda fp, r: received.append((fp, r)))
+        worker.run()  # returns immediately
+
+        assert received == []
+        assert not sem.tryAcquire(1, 10)  # slot still taken
+
+        future.set_result({"status": "success", "title": "Clip"})
+        assert received == [("/tmp/clip.mp4", {"status": "success", "title": "Clip"})]
+        assert sem.tryAcquire(1, 100)
+        sem.release()
+
+    def test_worker_deferred_future_exception(self, qtbot):
+        import concurrent.futures
+        sem = QSemaphore(1)
+        stop = threading.Event()
+        received = []
+        future = concurrent.futures.Future()
+
+        worker = FileWorker("/tmp/clip.mp4", lambda fp: future, sem, stop)
+        worker.signals.completed.connect(lambda fp, r: received.append((fp, r)))
+        worker.run()
+        future.set_exception(RuntimeError("worker died"))
+
+        assert received[0][1]["status"] == "error"
+        assert "worker died" in received[0][1]["error"]
+        assert sem.tryAcquire(1, 100)
+        sem.release()
+
 
 # ═══════════════════════════════════════
 # JobManager Signal Simulation (no GUI)
@@ -0,0 +1,191 @@
+"""
+Tests for client/core/managers/stage_trace.py
+Covers: span recording + errors, no-op outside a scope, JSONL output, percentile summary,
+        scope hand-off across threads / asyncio tasks, worker-process collect + replay,
+        trace-file pruning.
+"""
+import os
+import json
+import time
+import asyncio
+import threading
+import pytest
+from unittest.mock import patch
+
+from core.managers import stage_trace
+from core.managers.stage_trace import StageTrace, span
+
+
+@pytest.fixture
+def trace(tmp_path):
+    t = StageTrace(str(tmp_path / "traces" / "job.jsonl"))
+    yield t
+    t.close()
+
+
+def _lines(trace):
+    trace.close()
+    with open(trace.path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+# ═══════════════════════════════════════
+# Spans
+# ═══════════════════════════════════════
+
+class TestSpan:
+
+    def test_span_written_for_current_file(self, trace):
+        with stage_trace.file_scope(trace, "a.jpg"):
+            with span("generate", attempt=1):
+                time.sleep(0.01)
+        [rec] = _lines(trace)
+        assert rec["file"] == "a.jpg"
+        assert rec["stage"] == "generate"
+        assert rec["attempt"] == 1
+        assert rec["dur"] >= 0.01
+        assert abs(rec["start"] - time.time()) < 5
+
+    def test_error_recorded_and_reraised(self, trace):
+        with stage_trace.file_scope(trace, "a.jpg"):
+            with pytest.raises(TimeoutError):
+                with span("generate"):
+                    raise TimeoutError("slow")
+        assert _lines(trace)[0]["error"] == "TimeoutError"
+
+    def test_no_scope_is_noop(self, trace):
+        with span("generate"):
+            pass
+        assert _lines(trace) == []
+
+    def test_none_trace_scope_is_noop(self):
+        with stage_trace.file_scope(None, "a.jpg"):
+            assert stage_trace.current() is None
+            with span("generate"):
+                pass
+
+    def test_scope_restored_after_exit(self, trace):
+        with stage_trace.file_scope(trace, "a.jpg"):
+            with stage_trace.file_scope(trace, "b.jpg"):
+                assert stage_trace.current()[1] == "b.jpg"
+            assert stage_trace.current()[1] == "a.jpg"
+        assert stage_trace.current() is None
+
+    def test_record_measured_duration(self, trace):
+        with stage_trace.file_scope(trace, "a.jpg"):
+            stage_trace.record("upload", 1.5, attempt=2)
+        [rec] = _lines(trace)
+        assert (rec["stage"], rec["dur"], rec["attempt"]) == ("upload", 1.5, 2)
+
+
+# ═══════════════════════════════════════
+# Summary
+# ═══════════════════════════════════════
+
+class TestSummary:
+
+    def test_percentiles_per_stage(self):
+        trace = StageTrace()
+        for i in range(1, 101):
+            trace.add("f", "generate", 0.0, i / 10)
+        trace.add("f", "parse", 0.0, 0.002)
+        summary = trace.summary()
+        assert summary["generate"] == {
+            "count": 100, "total": 505.0, "p50": 5.0, "p95": 9.5, "max": 10.0,
+        }
+        assert summary["parse"]["count"] == 1
+        assert list(summary) == ["generate", "parse"]
+
+    def test_empty(self):
+        assert StageTrace().summary() == {}
+
+    def test_no_file_when_path_empty(self):
+        trace = StageTrace()
+        trace.add("f", "generate", 0.0, 1.0)
+        trace.close()
+        assert trace.records is None
+
+
+# ═══════════════════════════════════════
+# Hand-off between threads / tasks / processes
+# ═══════════════════════════════════════
+
+class TestScopes:
+
+    def test_resume_on_other_thread(self, trace):
+        with stage_trace.file_scope(trace, "clip.mp4"):
+            scope = stage_trace.current()
+
+        def finish():
+            with stage_trace.resume(scope):
+                with span("keywords"):
+                    pass
+
+        worker = threading.Thread(target=finish)
+        worker.start()
+        worker.join()
+        assert [(r["file"], r["stage"]) for r in _lines(trace)] == [("clip.mp4", "keywords")]
+
+    def test_plain_thread_does_not_inherit(self, trace):
+        def work():
+            with span("keywords"):
+                pass
+
+        with stage_trace.file_scope(trace, "a.jpg"):
+            worker = threading.Thread(target=work)
+            worker.start()
+            worker.join()
+        assert _lines(trace) == []
+
+    def test_asyncio_tasks_keep_their_own_file(self, trace):
+        def parse():
+            with span("parse"):
+                pass
+
+        async def one(name):
+            with stage_trace.file_scope(trace, name):
+                with span("generate"):
+                    await asyncio.sleep(0.01)
+                await asyncio.to_thread(parse)   # to_thread carries the scope along
+
+        async def main():
+            await asyncio.gather(one("a.jpg"), one("b.jpg"))
+
+        asyncio.run(main())
+        by_file = {}
+        for rec in _lines(trace):
+            by_file.setdefault(rec["file"], []).append(rec["stage"])
+        assert sorted(by_file) == ["a.jpg", "b.jpg"]
+        assert all(sorted(stages) == ["generate", "parse"] for stages in by_file.values())
+
+    def test_collect_then_replay(self, trace):
+        with stage_trace.collect() as worker_trace:
+            with span("upload"):
+                pass
+            with span("processing_wait"):
+                pass
+        assert [r["stage"] for r in worker_trace.records] == ["upload", "processing_wait"]
+
+        with stage_trace.file_scope(trace, "clip.mp4"):
+            stage_trace.replay(worker_trace.records + [{"bogus": 1}])
+        assert [(r["file"], r["stage"]) for r in _lines(trace)] == [
+            ("clip.mp4", "upload"), ("clip.mp4", "processing_wait"),
+        ]
+        assert trace.summary()["upload"]["count"] == 1
+
+
+class TestForJob:
+
+    def test_prunes_old_traces(self, tmp_path):
+        folder = tmp_path / "traces"
+        folder.mkdir()
+        for i in range(5):
+            (folder / f"2026010{i}_000000_old.jsonl").write_text("")
+        with patch("core.managers.stage_trace.TRACE_DIR", str(folder)), \
+                patch("core.managers.stage_trace.STAGE_TRACE_KEEP", 3):
+            trace = StageTrace.for_job("tok/../en")
+        trace.close()
+        names = sorted(os.listdir(folder))
+        assert len(names) == 3
+        assert os.path.basename(trace.path) in names
+        assert trace.path.endswith("_token.jsonl")
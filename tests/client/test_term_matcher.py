@@ -0,0 +1,93 @@
+"""
+Tests for client/core/logic/term_matcher.py
+Covers: Aho-Corasick matching with regex \b semantics (checked against re), spans,
+        overlap resolution, case-insensitivity, sharing between CopyrightGuard and
+        KeywordProcessor.
+"""
+import random
+import re
+import pytest
+
+from core.logic.term_matcher import TermMatcher
+from core.logic.copyright_guard import CopyrightGuard
+from core.logic.keyword_processor import KeywordProcessor
+
+
+@pytest.fixture
+def matcher():
+    return TermMatcher(["nike", "coca cola", "cola", "disney", "he", "she", "hers"])
+
+
+# ═══════════════════════════════════════
+# Matching
+# ═══════════════════════════════════════
+
+class TestFind:
+
+    def test_terms_and_spans(self, matcher):
+        assert matcher.find("Nike and Coca Cola") == [
+            ("nike", 0, 4), ("coca cola", 9, 18), ("cola", 14, 18),
+        ]
+
+    def test_word_boundaries(self, matcher):
+        assert matcher.find("turnike ushers colas") == []
+        assert matcher.find("she-hers") == [("she", 0, 3), ("hers", 4, 8)]
+
+    def test_case_insensitive(self, matcher):
+        assert matcher.terms_in("DISNEY land") == ["disney"]
+
+    def test_empty_inputs(self, matcher):
+        assert matcher.find("") == []
+        assert TermMatcher([]).find("nike") == []
+        assert len(TermMatcher(["", "  ", "Nike", "nike "])) == 1
+
+    def test_terms_in_longest_first(self, matcher):
+        assert matcher.terms_in("coca cola") == ["coca cola", "cola"]
+
+    def test_spans_prefer_longest_non_overlapping(self, matcher):
+        assert matcher.spans("coca cola and cola") == [("coca cola", 0, 9), ("cola", 14, 18)]
+
+    def test_matches_regex_semantics(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            terms = [
+                "".join(rng.choice("ab -.") for _ in range(rng.randint(1, 4))).strip()
+                for _ in range(6)
+            ]
+            text = "".join(rng.choice("abAB -.") for _ in range(40))
+            expected = {
+                (t, m.start(), m.start() + len(t))
+                for t in {x.lower() for x in terms if x}
+                for m in re.finditer(r"(?=\b" + re.escape(t) + r"\b)", text, re.IGNORECASE)
+            }
+            assert set(TermMatcher(terms).find(text)) == expected
+
+
+# ═══════════════════════════════════════
+# Sharing
+# ═══════════════════════════════════════
+
+class TestShared:
+
+    def test_keyword_processor_reuses_guard_matcher(self):
+        guard = CopyrightGuard()
+        guard.initialize(["Nike", "coca cola"])
+        kp = KeywordProcessor()
+        kp.set_blacklist({"nike", "coca cola"}, matcher=guard.matcher)
+        assert kp._matcher is guard.matcher
+        assert kp._filter_blacklist(["nike shoes", "cola", "sunset"]) == ["cola", "sunset"]
+
+    def test_mismatched_matcher_rebuilt(self):
+        guard = CopyrightGuard()
+        guard.initialize(["nike"])
+        kp = KeywordProcessor()
+        kp.set_blacklist({"disney"}, matcher=guard.matcher)
+        assert kp._matcher is not guard.matcher
+        assert kp._filter_blacklist(["nike", "disney"]) == ["nike"]
+
+    def test_clean_text_single_pass(self):
+        guard = CopyrightGuard()
+        guard.initialize(["coca cola", "cola", "nike"])
+        cleaned, removed = guard.clean_text("Coca Cola, cola and Nike")
+        assert cleaned == "***, *** and ***"
+        assert removed == ["coca cola", "cola", "nike"]
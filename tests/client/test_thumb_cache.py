@@ -0,0 +1,88 @@
+"""
+Tests for client/utils/thumb_cache.py
+Covers: key by path / mtime / size / thumbnail size, lookup + LRU touch, store, prune.
+Decode-at-size itself (QImageReader) lives in ui/components/gallery.py.
+"""
+import os
+import time
+import pytest
+from unittest.mock import patch
+
+from utils import thumb_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    """Override GALLERY_THUMB_DIR to use a temp directory."""
+    path = tmp_path / "gallery_thumbs"
+    path.mkdir()
+    with patch("utils.thumb_cache.GALLERY_THUMB_DIR", str(path)):
+        yield path
+
+
+@pytest.fixture
+def photo(tmp_path):
+    path = tmp_path / "a.jpg"
+    path.write_bytes(b"\xff\xd8" + b"\x00" * 100)
+    return str(path)
+
+
+class TestKey:
+
+    def test_stable_for_unchanged_file(self, cache_dir, photo):
+        path = thumb_cache.thumb_cache_path(photo, 130)
+        assert path == thumb_cache.thumb_cache_path(photo, 130)
+        assert os.path.dirname(path) == str(cache_dir)
+        assert path.endswith("_130.jpg")
+
+    def test_changes_with_mtime_size_and_thumb_size(self, cache_dir, photo):
+        before = thumb_cache.thumb_cache_path(photo, 130)
+        assert thumb_cache.thumb_cache_path(photo, 200) != before
+        os.utime(photo, (time.time() - 1000, time.time() - 1000))
+        touched = thumb_cache.thumb_cache_path(photo, 130)
+        assert touched != before
+        with open(photo, "ab") as f:
+            f.write(b"\x00")
+        assert thumb_cache.thumb_cache_path(photo, 130) != touched
+
+    def test_missing_file(self, cache_dir, tmp_path):
+        assert thumb_cache.thumb_cache_path(str(tmp_path / "gone.jpg"), 130) == ""
+        assert thumb_cache.lookup("") is False
+
+
+class TestStoreLookup:
+
+    def test_store_then_lookup_bumps_mtime(self, cache_dir, photo):
+        path = thumb_cache.thumb_cache_path(photo, 130)
+        assert thumb_cache.lookup(path) is False
+        tmp = thumb_cache.temp_path(path)
+        with open(tmp, "wb") as f:
+            f.write(b"thumb")
+        thumb_cache.store(tmp, path)
+        assert not os.path.exists(tmp)
+        os.utime(path, (1000, 1000))
+        assert thumb_cache.lookup(path) is True
+        assert os.path.getmtime(path) > 1000
+
+    def test_store_failure_removes_temp(self, cache_dir, tmp_path):
+        tmp = tmp_path / "x.tmp"
+        tmp.write_bytes(b"thumb")
+        thumb_cache.store(str(tmp), str(tmp_path / "no" / "such" / "dir.jpg"))
+        assert not tmp.exists()
+
+
+class TestPrune:
+
+    def test_removes_least_recently_used_first(self, cache_dir):
+        now = time.time()
+        for i, name in enumerate(["old.jpg", "mid.jpg", "new.jpg"]):
+            fp = cache_dir / name
+            fp.write_bytes(b"\x00" * 100)
+            os.utime(fp, (now - 100 + i * 10, now - 100 + i * 10))
+        thumb_cache.prune(max_bytes=250)
+        assert sorted(os.listdir(cache_dir)) == ["mid.jpg", "new.jpg"]
+
+    def test_within_budget_keeps_all(self, cache_dir):
+        (cache_dir / "a.jpg").write_bytes(b"\x00" * 10)
+        thumb_cache.prune(max_bytes=1000)
+        assert os.listdir(cache_dir) == ["a.jpg"]
@@ -0,0 +1,179 @@
+"""
+Tests for client/core/engines/transcode_prefetcher.py
+Covers: look-ahead bound, prefetched hand-off, inline fallback, discard, skip_fn, stop,
+        failure → "" (caller uploads original).
+"""
+import threading
+import time
+from unittest.mock import patch
+
+from core.engines.transcode_prefetcher import TranscodePrefetcher
+
+
+class FakeTranscoder:
+    """create_fn stand-in that records concurrency and can be held at a gate."""
+
+    def __init__(self, delay=0.0, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.started = []
+        self.lock = threading.Lock()
+
+    def __call__(self, filepath):
+        with self.lock:
+            self.started.append(filepath)
+        time.sleep(self.delay)
+        if filepath in self.fail:
+            raise RuntimeError("ffmpeg crashed")
+        return filepath + ".proxy.mp4"
+
+
+def _wait_for(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+# ═══════════════════════════════════════
+# Look-ahead window
+# ═══════════════════════════════════════
+
+class TestLookahead:
+
+    def test_starts_transcoding_before_first_request(self):
+        fake = FakeTranscoder()
+        pf = TranscodePrefetcher(["a.mp4", "b.mp4", "c.mp4"], lookahead=3, workers=2, create_fn=fake)
+        pf.start()
+        assert _wait_for(lambda: len(fake.started) == 3)
+        pf.stop()
+
+    def test_window_bounds_unclaimed_proxies(self):
+        fake = FakeTranscoder()
+        videos = [f"v{i}.mp4" for i in range(10)]
+        pf = TranscodePrefetcher(videos, lookahead=3, workers=2, create_fn=fake)
+        pf.start()
+        assert _wait_for(lambda: len(fake.started) == 3)
+        time.sleep(0.1)
+        assert len(fake.started) == 3  # blocked until the upload stage claims one
+        assert pf.get("v0.mp4") == "v0.mp4.proxy.mp4"
+        assert _wait_for(lambda: len(fake.started) == 4)
+        pf.stop()
+
+    def test_in_order_dispatch(self):
+        fake = FakeTranscoder()
+        videos = [f"v{i}.mp4" for i in range(5)]
+        pf = TranscodePrefetcher(videos, lookahead=5, workers=1, create_fn=fake)
+        pf.start()
+        assert _wait_for(lambda: len(fake.started) == 5)
+        assert fake.started == videos
+        pf.stop()
+
+
+# ═══════════════════════════════════════
+# Hand-off to the upload stage
+# ═══════════════════════════════════════
+
+class TestHandoff:
+
+    def test_ready_proxy_counted_as_hit(self):
+        fake = FakeTranscoder()
+        pf = TranscodePrefetcher(["a.mp4"], lookahead=2, workers=1, create_fn=fake)
+        pf.start()
+        assert _wait_for(lambda: len(fake.started) == 1)
+        time.sleep(0.05)
+        assert pf.get("a.mp4") == "a.mp4.proxy.mp4"
+        assert pf.ready_on_arrival == 1
+        pf.stop()
+
+    def test_get_waits_for_in_progress(self):
+        fake = FakeTranscoder(delay=0.2)
+        pf = TranscodePrefetcher(["a.mp4"], lookahead=2, workers=1, create_fn=fake)
+        pf.start()
+        assert _wait_for(lambda: len(fake.started) == 1)
+        assert pf.get("a.mp4") == "a.mp4.proxy.mp4"
+        assert pf.waited == 1
+        pf.stop()
+
+    def test_not_yet_dispatched_transcoded_inline(self):
+        fake = FakeTranscoder()
+        pf = TranscodePrefetcher(["a.mp4", "b.mp4", "c.mp4"], lookahead=1, workers=1, create_fn=fake)
+        pf.start()
+        assert pf.get("c.mp4") == "c.mp4.proxy.mp4"
+        assert pf.inline == 1
+        pf.get("a.mp4")
+        pf.get("b.mp4")
+        pf.stop()
+        assert fake.started.count("c.mp4") == 1  # dispatcher skipped the claimed file
+
+    def test_failed_transcode_returns_empty(self):
+        fake = FakeTranscoder(fail={"a.mp4"})
+        pf = TranscodePrefetcher(["a.mp4"], lookahead=1, workers=1, create_fn=fake)
+        pf.start()
+        assert pf.get("a.mp4") == ""
+        pf.stop()
+
+    def test_discard_frees_slot(self):
+        fake = FakeTranscoder()
+        pf = TranscodePrefetcher(["a.mp4", "b.mp4"], lookahead=1, workers=1, create_fn=fake)
+        with patch("core.engines.transcode_prefetcher.Transcoder.cleanup_proxy") as cleanup:
+            pf.start()
+            assert _wait_for(lambda: len(fake.started) == 1)
+            pf.discard("a.mp4")
+            assert _wait_for(lambda: len(fake.started) == 2)
+            assert _wait_for(lambda: cleanup.called)
+            cleanup.assert_any_call("a.mp4.proxy.mp4")
+            pf.stop()
+
+
+# ═══════════════════════════════════════
+# Skipped videos (result cache hits)
+# ═══════════════════════════════════════
+
+class TestSkip:
+
+    def test_skipped_videos_never_transcoded(self):
+        fake = FakeTranscoder()
+        videos = ["a.mp4", "cached.mp4", "b.mp4"]
+        pf = TranscodePrefetcher(videos, lookahead=1, workers=1, create_fn=fake,
+                                 skip_fn=lambda fp: fp == "cached.mp4")
+        pf.start()
+        assert _wait_for(lambda: len(fake.started) == 1)
+        pf.get("a.mp4")
+        assert _wait_for(lambda: len(fake.started) == 2)
+        assert fake.started == ["a.mp4", "b.mp4"]  # the skip used no look-ahead slot
+        assert pf.skipped == 1
+        pf.get("b.mp4")
+        pf.stop()
+
+    def test_failing_skip_check_still_prefetches(self):
+        fake = FakeTranscoder()
+
+        def broken(fp):
+            raise OSError("unreadable")
+
+        pf = TranscodePrefetcher(["a.mp4"], lookahead=1, workers=1, create_fn=fake, skip_fn=broken)
+        pf.start()
+        assert _wait_for(lambda: fake.started == ["a.mp4"])
+        pf.stop()
+
+
+# ═══════════════════════════════════════
+# stop()
+# ═══════════════════════════════════════
+
+class TestStop:
+
+    def test_stop_halts_dispatch_and_cleans_unclaimed(self):
+        fake = FakeTranscoder()
+        videos = [f"v{i}.mp4" for i in range(10)]
+        pf = TranscodePrefetcher(videos, lookahead=2, workers=1, create_fn=fake)
+        with patch("core.engines.transcode_prefetcher.Transcoder.cleanup_proxy") as cleanup:
+            pf.start()
+            assert _wait_for(lambda: len(fake.started) == 2)
+            pf.stop()
+            time.sleep(0.3)
+            assert len(fake.started) == 2
+            assert _wait_for(lambda: cleanup.call_count == 2)
@@ -0,0 +1,223 @@
+"""
+Tests for client/core/engines/upload_manager.py
+Covers: chunked resumable protocol, resume from the acknowledged offset after connection
+        errors, non-retryable 4xx, concurrent uploads, GeminiEngine._upload_video wiring.
+"""
+import threading
+import pytest
+from unittest.mock import patch, MagicMock
+
+import httpx
+
+from core.engines.upload_manager import UploadManager, CHUNK_GRANULARITY
+from core.engines.gemini_engine import GeminiEngine, GeminiError, GeminiErrorType
+from core.engines.file_poller import FileStatePoller
+
+
+class FakeUploadServer:
+    """Minimal Gemini resumable-upload endpoint for httpx.MockTransport."""
+
+    def __init__(self, fail_offsets=(), status_error=None, delay=0.0):
+        self.fail_offsets = list(fail_offsets)   # raise ConnectError once per listed offset
+        self.status_error = status_error         # (code, status) returned for every chunk
+        self.delay = delay
+        self.sessions = {}                       # session id → bytearray
+        self.chunk_offsets = []
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        command = request.headers.get("x-goog-upload-command", "")
+        if command == "start":
+            with self.lock:
+                sid = str(len(self.sessions))
+                self.sessions[sid] = bytearray()
+            return httpx.Response(
+                200, headers={"x-goog-upload-url": f"https://fake/upload/session/{sid}"},
+            )
+
+        sid = request.url.path.rsplit("/", 1)[-1]
+        data = self.sessions[sid]
+        if command == "query":
+            return httpx.Response(200, headers={
+                "x-goog-upload-status": "active",
+                "x-goog-upload-size-received": str(len(data)),
+            })
+
+        offset = int(request.headers["x-goog-upload-offset"])
+        if offset in self.fail_offsets:
+            self.fail_offsets.remove(offset)
+            raise httpx.ConnectError("[SSL: WRONG_VERSION_NUMBER] wrong version number")
+        if self.status_error:
+            code, status = self.status_error
+            return httpx.Response(code, json={"error": {"status": status, "message": "nope"}})
+
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        threading.Event().wait(self.delay)  # time.sleep is patched by no_sleep
+        with self.lock:
+            self.active -= 1
+        assert offset == len(data), "chunk must continue from the acknowledged offset"
+        self.chunk_offsets.append(offset)
+        data.extend(request.content)
+        if "finalize" in command:
+            return httpx.Response(200, json={"file": {
+                "name": f"files/{sid}", "uri": f"https://fake/files/{sid}",
+                "state": "PROCESSING", "sizeBytes": str(len(data)),
+            }})
+        return httpx.Response(200, headers={"x-goog-upload-status": "active"})
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(bytes(range(256)) * (CHUNK_GRANULARITY * 3 // 256 + 100))
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep():
+    with patch("core.engines.upload_manager.time.sleep"):
+        yield
+
+
+def make_manager(server, **kwargs):
+    kwargs.setdefault("chunk_size", CHUNK_GRANULARITY)
+    return UploadManager("test-key", base_url="https://fake",
+                         transport=httpx.MockTransport(server.handler), **kwargs)
+
+
+# ═══════════════════════════════════════
+# Chunked upload
+# ═══════════════════════════════════════
+
+class TestChunkedUpload:
+
+    def test_uploads_in_chunks(self, video):
+        server = FakeUploadServer()
+        result = make_manager(server).upload(video)
+        assert result["name"] == "files/0"
+        assert bytes(server.sessions["0"]) == open(video, "rb").read()
+        assert server.chunk_offsets == [0, CHUNK_GRANULARITY, 2 * CHUNK_GRANULARITY,
+                                        3 * CHUNK_GRANULARITY]
+
+    def test_chunk_size_rounded_to_granularity(self):
+        manager = UploadManager("k", chunk_size=CHUNK_GRANULARITY * 2 + 1000)
+        assert manager._chunk_size == CHUNK_GRANULARITY * 2
+
+    def test_resumes_from_acknowledged_offset(self, video):
+        server = FakeUploadServer(fail_offsets=[2 * CHUNK_GRANULARITY])
+        manager = make_manager(server)
+        manager.upload(video)
+        assert bytes(server.sessions["0"]) == open(video, "rb").read()
+        assert len(server.sessions) == 1           # same session, no restart
+        assert server.chunk_offsets.count(0) == 1  # earlier chunks never re-sent
+        assert manager.resumes == 1
+
+    def test_gives_up_after_retries(self, video):
+        server = FakeUploadServer(fail_offsets=[0] * 10)
+        with pytest.raises(ConnectionError):
+            make_manager(server).upload(video)
+
+    def test_client_error_not_retried(self, video):
+        server = FakeUploadServer(status_error=(400, "INVALID_ARGUMENT"))
+        with pytest.raises(RuntimeError, match="400"):
+            make_manager(server).upload(video)
+        assert server.chunk_offsets == []
+
+    def test_server_error_retried_then_raised(self, video):
+        server = FakeUploadServer(status_error=(503, "UNAVAILABLE"))
+        with patch("core.engines.upload_manager.time.sleep") as sleep:
+            with pytest.raises(RuntimeError, match="503"):
+                make_manager(server).upload(video)
+        assert sleep.call_count >= 1
+
+
+# ═══════════════════════════════════════
+# Concurrency
+# ═══════════════════════════════════════
+
+class TestConcurrency:
+
+    def test_parallel_uploads_capped(self, video):
+        server = FakeUploadServer(delay=0.02)
+        manager = make_manager(server, max_concurrent=3, chunk_size=CHUNK_GRANULARITY * 8)
+        threads = [threading.Thread(target=manager.upload, args=(video,)) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+        assert manager.uploads == 6
+        assert 1 < server.peak <= 3
+
+    def test_shared_slots_cap_several_managers(self, video):
+        server = FakeUploadServer(delay=0.02)
+        slots = threading.BoundedSemaphore(2)
+        managers = [
+            make_manager(server, max_concurrent=4, chunk_size=CHUNK_GRANULARITY * 8, slots=slots)
+            for _ in range(3)
+        ]
+        threads = [threading.Thread(target=m.upload, args=(video,)) for m in managers * 2]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+        assert sum(m.uploads for m in managers) == 6
+        assert 1 < server.peak <= 2
+
+
+# ═══════════════════════════════════════
+# GeminiEngine integration
+# ═══════════════════════════════════════
+
+class TestEngineUpload:
+
+    @pytest.fixture
+    def engine(self):
+        e = GeminiEngine()
+        e._api_key = "test-key"
+        e._uploader = MagicMock()
+        e._uploader.upload.return_value = {"name": "files/abc", "state": "PROCESSING"}
+        return e
+
+    @staticmethod
+    def _file(state):
+        f = MagicMock()
+        f.name = "files/abc"
+        f.state.name = state
+        return f
+
+    def test_waits_for_active(self, engine):
+        states = [self._file("PROCESSING"), self._file("ACTIVE")]
+        poller = FileStatePoller(get_fn=MagicMock(side_effect=states), intervals=(0.01,))
+        with patch.object(FileStatePoller, "shared", return_value=poller):
+            video = engine._upload_video("/tmp/clip.mp4")
+        assert video.state.name == "ACTIVE"
+        engine._uploader.upload.assert_called_once_with("/tmp/clip.mp4")
+
+    def test_already_active_skips_poller(self, engine):
+        engine._uploader.upload.return_value = {"name": "files/abc", "state": "ACTIVE"}
+        with patch("core.engines.gemini_engine.genai.get_file",
+                   return_value=self._file("ACTIVE")) as get_file, \
+                patch.object(FileStatePoller, "shared") as shared:
+            engine._upload_video("/tmp/clip.mp4")
+        get_file.assert_called_once_with("files/abc")
+        shared.assert_not_called()
+
+    def test_upload_error_classified(self, engine):
+        engine._uploader.upload.side_effect = TimeoutError("Upload timed out (ReadTimeout)")
+        with pytest.raises(GeminiError) as exc:
+            engine._upload_video("/tmp/clip.mp4")
+        assert exc.value.error_type == GeminiErrorType.TIMEOUT
+
+    def test_upload_slots_passed_to_uploader(self, engine):
+        slots = threading.BoundedSemaphore(1)
+        engine.set_upload_slots(slots)
+        assert engine._get_uploader()._slots is slots
+
+    def test_set_api_key_resets_uploader(self, engine):
+        with patch("core.engines.gemini_engine.genai.configure"):
+            engine.set_api_key("other-key")
+        assert engine._get_uploader()._api_key == "other-key"
@@ -0,0 +1,92 @@
+"""
+Tests for client/core/managers/usage_ledger.py
+Covers: per-model / per-media buckets, cached tokens, result-cache hits and failures not
+        billed, tokens per file, files per minute, thread safety, debug log line.
+"""
+import threading
+from unittest.mock import patch
+
+from core.managers.usage_ledger import UsageLedger
+
+
+def _ok(inp=1000, out=200, cached=0, **extra):
+    return {"status": "success", "_token_input": inp, "_token_output": out,
+            "_token_cached": cached, **extra}
+
+
+class TestRecord:
+
+    def test_totals_and_buckets(self):
+        ledger = UsageLedger()
+        ledger.record("gemini-2.5-flash", "image", _ok(1000, 200))
+        ledger.record("gemini-2.5-flash", "image", _ok(800, 100, cached=600))
+        ledger.record("gemini-2.5-pro", "video", _ok(5000, 400))
+        s = ledger.summary()
+        assert (s["files"], s["input"], s["cached"], s["output"]) == (3, 6800, 600, 700)
+        assert s["total"] == 7500
+        assert s["tokens_per_file"] == 2500
+        flash = s["by_model"]["gemini-2.5-flash"]["image"]
+        assert (flash["files"], flash["total"], flash["tokens_per_file"]) == (2, 2100, 1050)
+        assert s["by_model"]["gemini-2.5-pro"]["video"]["cached"] == 0
+
+    def test_cache_hits_and_failures_not_billed(self):
+        ledger = UsageLedger()
+        ledger.record("m", "image", _ok(_cache_hit=True))
+        ledger.record("m", "image", {"status": "error", "error": "boom"})
+        ledger.record("m", "image", _ok(500, 50))
+        s = ledger.summary()
+        assert (s["files"], s["cache_hits"], s["failed"]) == (1, 1, 1)
+        assert s["total"] == 550
+        assert s["tokens_per_file"] == 550
+
+    def test_missing_or_bogus_token_counts(self):
+        ledger = UsageLedger()
+        ledger.record("m", "image", {"status": "success"})
+        ledger.record("m", "image", {"status": "success", "_token_input": "n/a", "_token_output": None})
+        s = ledger.summary()
+        assert s["files"] == 2
+        assert s["total"] == 0
+
+    def test_empty(self):
+        s = UsageLedger().summary()
+        assert s["total"] == 0
+        assert s["tokens_per_file"] == 0
+        assert s["by_model"] == {}
+
+    def test_concurrent_records(self):
+        ledger = UsageLedger()
+
+        def work():
+            for _ in range(500):
+                ledger.record("m", "image", _ok(10, 1))
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        s = ledger.summary()
+        assert s["files"] == 2000
+        assert s["total"] == 22000
+
+
+class TestRates:
+
+    def test_files_per_minute_counts_all_finished(self):
+        with patch("core.managers.usage_ledger.time.time", return_value=1000.0):
+            ledger = UsageLedger()
+            ledger.start()
+        for _ in range(9):
+            ledger.record("m", "image", _ok())
+        ledger.record("m", "image", {"status": "error"})
+        with patch("core.managers.usage_ledger.time.time", return_value=1030.0):
+            s = ledger.summary()
+        assert s["elapsed_sec"] == 30.0
+        assert s["files_per_min"] == 20.0
+
+    def test_log_line(self):
+        ledger = UsageLedger()
+        ledger.record("gemini-2.5-flash", "video", _ok(12000, 300, cached=10000))
+        line = ledger.log_line()
+        assert "in=12,000 (cached 10,000) out=300" in line
+        assert "gemini-2.5-flash/video: 1 files, 12,300/file" in line